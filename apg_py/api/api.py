@@ -9,6 +9,8 @@
 from apg_py.api import sabnf_grammar
 from apg_py.lib.parser import Parser
 from apg_py.lib.ast import Ast
+from apg_py.lib.opcodes import compile_rules
+from apg_py.lib.compiled_parser import generate_source
 from apg_py.lib import identifiers as id
 from apg_py.api.scanner import scanner
 from apg_py.api.syntax import syntax
@@ -16,6 +18,8 @@ from apg_py.api.semantic import semantic
 # from apg.api.attributes import attributes
 from apg_py.api.rule_dependencies import display_deps, rule_dependencies
 from apg_py.api.rule_attributes import display_rule_attributes, rule_attributes
+from apg_py.api.first_chars import first_chars
+from apg_py.api.phrase_lengths import phrase_lengths
 from apg_py.api.syntax_callbacks import add_syntax_callbacks
 from apg_py.api.semantic_callbacks import add_ast_callbacks
 from apg_py.lib.utilities import tuple_to_ascii
@@ -29,11 +33,17 @@ class Grammar():
     '''Creates a grammar object which can be used by the APG library.
     '''
 
-    def __init__(self, rules, udts, source):
+    def __init__(self, rules, udts, source, first_chars=None,
+                 phrase_lengths=None):
         '''Grammar constructor.
         @param rules The generated rules list from Api.generate().
         @param udts The generated UDT list from Api.generate().
         @param source The original SABNF syntax source.
+        @param first_chars The first character sets of the opcodes
+        from Api.generate() (see @ref first_chars.py), if any.
+        @param phrase_lengths The minimum and maximum phrase lengths
+        of the opcodes from Api.generate()
+        (see @ref phrase_lengths.py), if any.
         '''
         self.has_bkru = False
         self.has_bkrr = False
@@ -41,8 +51,10 @@ class Grammar():
             for op in rule['opcodes']:
                 if(op['type'] == id.ALT or op['type'] == id.CAT):
                     op['children'] = tuple(op['children'])
-            if(op['type'] == id.TBS or op['type'] == id.TLS):
-                op['string'] = tuple(op['string'])
+                if(op['type'] == id.TBS or op['type'] == id.TLS):
+                    op['string'] = tuple(op['string'])
+                if(op['type'] == id.CLS):
+                    op['ranges'] = tuple(op['ranges'])
             rule['opcodes'] = tuple(rule['opcodes'])
             if(rule['is_bkru']):
                 self.has_bkru = True
@@ -53,9 +65,23 @@ class Grammar():
                 self.has_bkru = True
             if(udt['is_bkrr']):
                 self.has_bkrr = True
-        self.rules = tuple(rules)
         self.udts = tuple(udts)
         self.source = source
+        self.first_chars = first_chars
+        self.phrase_lengths = phrase_lengths
+        # the compact form of the opcodes that the parser runs on
+        # (see @ref opcodes.py), the only copy of the rules kept
+        self.compiled_rules = compile_rules(
+            rules, first_chars, phrase_lengths)
+
+    @property
+    def rules(self):
+        '''The rules with the opcodes in their dictionary form.
+        They are made from the compiled rules each time they are read.
+        '''
+        return tuple(dict(rule, opcodes=tuple(op.to_dict()
+                                              for op in rule['opcodes']))
+                     for rule in self.compiled_rules)
 
 
 class Api():
@@ -144,6 +170,8 @@ class Api():
         self.rule_names = None
         self.udt_names = None
         self.rule_deps = None
+        self.first_chars = None
+        self.phrase_lengths = None
 
     def generate(self, source, strict=False, phase='all'):
         '''Generate a grammar object from an SABNF grammar syntax.
@@ -243,13 +271,31 @@ class Api():
         if(phase == 'attributes'):
             return
 
+        # discover the first characters of all opcodes
+        self.first_chars = first_chars(
+            self.rules, self.udts, self.attributes)
+
+        # discover the minimum and maximum phrase lengths of all opcodes
+        self.phrase_lengths = phrase_lengths(self.rules, self.udts)
+
         # return the grammar object
-        self.grammar = Grammar(self.rules, self.udts, self.source)
-        return Grammar(self.rules, self.udts, self.source)
+        self.grammar = Grammar(self.rules, self.udts, self.source,
+                               self.first_chars, self.phrase_lengths)
+        return Grammar(self.rules, self.udts, self.source,
+                       self.first_chars, self.phrase_lengths)
 
-    def write_grammar(self, fname):
+    def write_grammar(self, fname, compiled=False):
         '''Write the APG grammar to a file in format for later use by a parser.
         @param fname the file name to write the grammar to
+        @param compiled If True, the rules' opcodes are written as
+        compiled Python functions, one for each rule,
+        instead of the opcode tables.
+        The file can only be used with the compiled parser
+        (see @ref compiled_parser.py), e.g.
+        <pre>
+        import my_grammar
+        parser = CompiledParser(my_grammar)
+        </pre>
         '''
         def grammar_copyright():
             display = ''
@@ -275,8 +321,13 @@ class Api():
                         info['char_min'] = op['min']
                     if(op['max'] > info['char_max']):
                         info['char_max'] = op['max']
+                if(op_id == id.CLS):
+                    if(op['ranges'][0][0] < info['char_min']):
+                        info['char_min'] = op['ranges'][0][0]
+                    if(op['ranges'][-1][1] > info['char_max']):
+                        info['char_max'] = op['ranges'][-1][1]
 
-            info = {'op_counts': [0] * (id.AEN + 1),
+            info = {'op_counts': [0] * (id.CUT + 1),
                     'opcodes': 0,
                     'char_min': sys.maxsize,
                     'char_max': 0}
@@ -309,6 +360,9 @@ class Api():
             display += '\n#        BKR = ' + str(info['op_counts'][id.BKR])
             display += '\n#        ABG = ' + str(info['op_counts'][id.ABG])
             display += '\n#        AEN = ' + str(info['op_counts'][id.AEN])
+            display += '\n#        CUT = ' + str(info['op_counts'][id.CUT])
+            display += '\n#        ---   internal opcodes'
+            display += '\n#        CLS = ' + str(info['op_counts'][id.CLS])
             display += '\n# characters = ['
             display += str(info['char_min'])
             display += ' - '
@@ -350,9 +404,24 @@ class Api():
             sys.stdout = open(fname, 'w')
             print(grammar_copyright())
             print(grammar_summary(self.grammar.rules, self.grammar.udts))
+            rules = self.grammar.rules
+            if(compiled):
+                print('# COMPILED GRAMMAR')
+                print('# The rules\' opcodes are compiled to the functions')
+                print('# below. Use only with the compiled parser,')
+                print('# apg_py.lib.compiled_parser.CompiledParser.')
+                print('is_compiled = True')
+                print()
+                # the opcodes are not needed
+                rules = []
+                for rule in self.grammar.rules:
+                    rule = rule.copy()
+                    rule['opcodes'] = ()
+                    rules.append(rule)
+                rules = tuple(rules)
             print('# RULES')
             print('rules = ', end='')
-            pprint(self.grammar.rules, sort_dicts=False)
+            pprint(rules, sort_dicts=False)
             print()
             print('# UDTS')
             print('udts = ', end='')
@@ -363,7 +432,27 @@ class Api():
             print('has_bkrr = ', end='')
             print(self.grammar.has_bkrr)
             print()
+            if(not compiled):
+                # read back by compiled_rules() (see @ref opcodes.py)
+                print('# FIRST CHARACTERS')
+                print('first_chars = ', end='')
+                pprint(self.grammar.first_chars, compact=True)
+                print()
+                print('# PHRASE LENGTHS')
+                print('phrase_lengths = ', end='')
+                pprint(self.grammar.phrase_lengths, compact=True)
+                print()
             print()
+            if(compiled):
+                print('# COMPILED RULES')
+                print('# The names input, sub_begin, sub_end, hits, etc.')
+                print('# are set by the compiled parser for each parse.')
+                print(generate_source(
+                    self.grammar.compiled_rules,
+                    self.grammar.udts,
+                    self.grammar.has_bkru,
+                    self.grammar.has_bkrr))
+                print()
             print(grammar_to_string(self.lines, self.grammar.source))
             sys.stdout.close()
         finally:
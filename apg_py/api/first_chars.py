@@ -0,0 +1,136 @@
+''' @file apg_py/api/first_chars.py
+@brief Compute the first characters and empty attribute of all opcodes.
+
+The first character set of an opcode is the set of characters
+that any non-empty phrase it matches can begin with.
+The parser uses the sets to skip the ALT children that cannot
+possibly match the next input character
+(see @ref opcodes.py and Parser.opALT()).
+'''
+from apg_py.lib import identifiers as id
+
+## Sets larger than this are not kept. The opcode may begin
+# with any character as far as the parser is concerned.
+MAX_CHARS = 256
+
+
+def union(a, b):
+    '''The union of two first character sets.
+    @param a A set of characters or None for any character.
+    @param b A set of characters or None for any character.
+    @returns Returns the union, or None if it is too large.
+    '''
+    if(a is None or b is None):
+        return None
+    u = a | b
+    if(len(u) > MAX_CHARS):
+        return None
+    return u
+
+
+def first_chars(rules, udts, attributes):
+    '''Compute the first character set and the empty attribute
+    of every opcode of every rule.
+    @param rules The list of rules.
+    @param udts The list of UDTs.
+    @param attributes The rule attributes previously computed
+    (see @ref rule_attributes.py)
+    @returns Returns a tuple with one entry for each rule.
+    Each entry is a tuple with one (first, empty) pair for each opcode
+    of the rule. first is a frozenset of the character codes,
+    or None if the opcode may begin with any character.
+    empty is True if the opcode may match the empty string.
+    '''
+    def op_eval(opcodes, op_index, firsts):
+        op = opcodes[op_index]
+        op_id = op['type']
+        empty = False
+        if(op_id == id.ALT):
+            first = frozenset()
+            for child in op['children']:
+                (f, e) = op_eval(opcodes, child, firsts)
+                first = union(first, f)
+                empty = empty or e
+        elif(op_id == id.CAT):
+            first = frozenset()
+            empty = True
+            for child in op['children']:
+                (f, e) = op_eval(opcodes, child, firsts)
+                if(empty):
+                    # the first non-empty child ends the set
+                    first = union(first, f)
+                    empty = e
+        elif(op_id == id.REP):
+            (first, empty) = op_eval(opcodes, op_index + 1, firsts)
+            if(op['min'] == 0):
+                empty = True
+        elif(op_id == id.RNM):
+            first = rule_first[op['index']]
+            empty = attributes[op['index']].empty
+        elif(op_id == id.TLS):
+            first = frozenset()
+            empty = True
+            if(len(op['string'])):
+                char = op['string'][0]
+                first = {char}
+                if(char >= 97 and char <= 122):
+                    # case insensitive, the string is lower case
+                    first.add(char - 32)
+                first = frozenset(first)
+                empty = False
+        elif(op_id == id.TBS):
+            first = frozenset(op['string'][:1])
+            empty = len(op['string']) == 0
+        elif(op_id == id.TRG):
+            first = None
+            if(op['max'] - op['min'] < MAX_CHARS):
+                first = frozenset(range(op['min'], op['max'] + 1))
+        elif(op_id == id.CLS):
+            first = frozenset()
+            for (min, max) in op['ranges']:
+                first = union(first, frozenset(range(min, max + 1))
+                              if(max - min < MAX_CHARS) else None)
+        elif(op_id == id.UDT):
+            first = None
+            empty = udts[op['index']]['empty']
+        elif(op_id == id.BKR):
+            # the back referenced phrase is only known at parse time
+            first = None
+            empty = True
+        elif(op_id == id.AND or op_id == id.NOT or op_id == id.BKA or
+             op_id == id.BKN):
+            # look around operators never consume characters
+            op_eval(opcodes, op_index + 1, firsts)
+            first = frozenset()
+            empty = True
+        elif(op_id == id.ABG or op_id == id.AEN):
+            first = frozenset()
+            empty = True
+        elif(op_id == id.CUT):
+            # a cut before the first character commits the ALT
+            # whatever the character is, so the ALT child
+            # must never be skipped
+            first = None
+            empty = True
+        else:
+            raise Exception(
+                'first_chars: unrecognized opcode type', op_id)
+        firsts[op_index] = (first, empty)
+        return (first, empty)
+
+    # iterate until none of the rules' sets change
+    # (the sets only grow so this always terminates)
+    rule_first = [frozenset()] * len(rules)
+    rule_firsts = [None] * len(rules)
+    changed = True
+    while(changed):
+        changed = False
+        for rule in rules:
+            opcodes = rule['opcodes']
+            firsts = [None] * len(opcodes)
+            (first, empty) = op_eval(opcodes, 0, firsts)
+            rule_firsts[rule['index']] = tuple(firsts)
+            if(first != rule_first[rule['index']]):
+                rule_first[rule['index']] = first
+                changed = True
+    return tuple(rule_firsts)
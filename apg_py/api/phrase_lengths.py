@@ -0,0 +1,119 @@
+''' @file apg_py/api/phrase_lengths.py
+@brief Compute the minimum and maximum phrase lengths of all opcodes.
+
+The minimum is the length of the shortest phrase an opcode can match,
+the maximum the length of the longest, with id.MAX_INT for unbounded.
+The parser uses the minimums to fail the RNM, CAT and REP operators
+without executing them when there are too few characters left
+to match (see Parser.opCAT()).
+'''
+from apg_py.lib import identifiers as id
+
+
+def add(a, b):
+    '''Add two phrase lengths, either of which may be unbounded.'''
+    if(a >= id.MAX_INT - b):
+        return id.MAX_INT
+    return a + b
+
+
+def mul(a, b):
+    '''Multiply two phrase lengths, either of which may be unbounded.'''
+    if(a == 0 or b == 0):
+        return 0
+    if(a >= id.MAX_INT // b):
+        return id.MAX_INT
+    return a * b
+
+
+def phrase_lengths(rules, udts):
+    '''Compute the minimum and maximum phrase lengths of every opcode
+    of every rule.
+    @param rules The list of rules.
+    @param udts The list of UDTs.
+    @returns Returns a tuple with one entry for each rule.
+    Each entry is a tuple with one (min, max) pair for each opcode
+    of the rule. max is id.MAX_INT if the opcode's phrases are unbounded.
+    '''
+    def op_eval(opcodes, op_index, lengths):
+        op = opcodes[op_index]
+        op_id = op['type']
+        if(op_id == id.ALT):
+            min = id.MAX_INT
+            max = 0
+            for child in op['children']:
+                (cmin, cmax) = op_eval(opcodes, child, lengths)
+                if(cmin < min):
+                    min = cmin
+                if(cmax > max):
+                    max = cmax
+        elif(op_id == id.CAT):
+            min = 0
+            max = 0
+            for child in op['children']:
+                (cmin, cmax) = op_eval(opcodes, child, lengths)
+                min = add(min, cmin)
+                max = add(max, cmax)
+        elif(op_id == id.REP):
+            (cmin, cmax) = op_eval(opcodes, op_index + 1, lengths)
+            min = mul(op['min'], cmin)
+            max = mul(op['max'], cmax)
+        elif(op_id == id.RNM):
+            min = rule_min[op['index']]
+            max = rule_max[op['index']]
+        elif(op_id == id.TLS or op_id == id.TBS):
+            min = len(op['string'])
+            max = min
+        elif(op_id == id.TRG or op_id == id.CLS):
+            min = 1
+            max = 1
+        elif(op_id == id.UDT):
+            min = 0 if(udts[op['index']]['empty']) else 1
+            max = id.MAX_INT
+        elif(op_id == id.BKR):
+            # the back referenced phrase is only known at parse time
+            min = 0
+            max = id.MAX_INT
+        elif(op_id == id.AND or op_id == id.NOT or op_id == id.BKA or
+             op_id == id.BKN):
+            # look around operators never consume characters
+            op_eval(opcodes, op_index + 1, lengths)
+            min = 0
+            max = 0
+        elif(op_id == id.ABG or op_id == id.AEN or op_id == id.CUT):
+            min = 0
+            max = 0
+        else:
+            raise Exception(
+                'phrase_lengths: unrecognized opcode type', op_id)
+        lengths[op_index] = (min, max)
+        return (min, max)
+
+    # Iterate until none of the rules' lengths change.
+    # The minimums only decrease and the maximums only increase.
+    # A maximum that is still increasing after every rule has had a
+    # chance to pass its length on to every other rule
+    # is on, or depends on, a recursive cycle and is unbounded.
+    rule_min = [id.MAX_INT] * len(rules)
+    rule_max = [0] * len(rules)
+    rule_lengths = [None] * len(rules)
+    count = 0
+    changed = True
+    while(changed):
+        changed = False
+        count += 1
+        for rule in rules:
+            index = rule['index']
+            opcodes = rule['opcodes']
+            lengths = [None] * len(opcodes)
+            (min, max) = op_eval(opcodes, 0, lengths)
+            rule_lengths[index] = tuple(lengths)
+            if(min != rule_min[index]):
+                rule_min[index] = min
+                changed = True
+            if(max != rule_max[index]):
+                if(count > len(rules)):
+                    max = id.MAX_INT
+                rule_max[index] = max
+                changed = True
+    return tuple(rule_lengths)
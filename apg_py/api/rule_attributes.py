@@ -318,9 +318,11 @@ def rule_attributes(rules, rule_deps):
         id.TLS: op_tls,
         id.TBS: op_tbs,
         id.TRG: op_tbs,
+        id.CLS: op_tbs,
         id.UDT: op_udt,
         id.ABG: op_anchor,
-        id.AEN: op_anchor}
+        id.AEN: op_anchor,
+        id.CUT: op_anchor}
 
     def rule_eval(rule_index):
         attri = working_attrs[rule_index]
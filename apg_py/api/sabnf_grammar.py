@@ -3,17 +3,17 @@
 #
 
 # SUMMARY
-#      rules = 83
+#      rules = 84
 #       udts = 0
-#    opcodes = 314
+#    opcodes = 299
 #        ---   ABNF original opcodes
-#        ALT = 32
+#        ALT = 25
 #        CAT = 43
 #        REP = 27
-#        RNM = 135
+#        RNM = 136
 #        TLS = 0
-#        TBS = 59
-#        TRG = 18
+#        TBS = 48
+#        TRG = 9
 #        ---   SABNF super set opcodes
 #        UDT = 0
 #        AND = 0
@@ -23,6 +23,9 @@
 #        BKR = 0
 #        ABG = 0
 #        AEN = 0
+#        CUT = 0
+#        ---   internal opcodes
+#        CLS = 11
 # characters = [9 - 126]
 #
 
@@ -30,7 +33,7 @@
 rules = ({'name': 'file',
   'lower': 'file',
   'index': 0,
-  'line': 56,
+  'line': 62,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
@@ -41,46 +44,44 @@ rules = ({'name': 'file',
  {'name': 'blank-line',
   'lower': 'blank-line',
   'index': 1,
-  'line': 57,
+  'line': 63,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
-  'opcodes': ({'type': 2, 'children': (1, 5, 7)},
+  'opcodes': ({'type': 2, 'children': (1, 3, 5)},
               {'type': 3, 'min': 0, 'max': 9223372036854775807},
-              {'type': 1, 'children': (3, 4)},
-              {'type': 6, 'string': (32,)},
-              {'type': 6, 'string': (9,)},
+              {'type': 19, 'ranges': ((9, 9), (32, 32)), 'floor': 1},
               {'type': 3, 'min': 0, 'max': 1},
-              {'type': 4, 'index': 80},
-              {'type': 4, 'index': 81})},
+              {'type': 4, 'index': 81},
+              {'type': 4, 'index': 82})},
  {'name': 'rule',
   'lower': 'rule',
   'index': 2,
-  'line': 58,
+  'line': 64,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
   'opcodes': ({'type': 2, 'children': (1, 2, 3, 4, 5)},
               {'type': 4, 'index': 3},
-              {'type': 4, 'index': 77},
+              {'type': 4, 'index': 78},
               {'type': 4, 'index': 8},
-              {'type': 4, 'index': 77},
-              {'type': 4, 'index': 81})},
+              {'type': 4, 'index': 78},
+              {'type': 4, 'index': 82})},
  {'name': 'rule-lookup',
   'lower': 'rule-lookup',
   'index': 3,
-  'line': 59,
+  'line': 65,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
   'opcodes': ({'type': 2, 'children': (1, 2, 3)},
               {'type': 4, 'index': 5},
-              {'type': 4, 'index': 77},
+              {'type': 4, 'index': 78},
               {'type': 4, 'index': 4})},
  {'name': 'equals',
   'lower': 'equals',
   'index': 4,
-  'line': 60,
+  'line': 66,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
@@ -90,15 +91,15 @@ rules = ({'name': 'file',
  {'name': 'rule-name',
   'lower': 'rule-name',
   'index': 5,
-  'line': 61,
+  'line': 67,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
-  'opcodes': ({'type': 4, 'index': 76},)},
+  'opcodes': ({'type': 4, 'index': 77},)},
  {'name': 'defined',
   'lower': 'defined',
   'index': 6,
-  'line': 62,
+  'line': 68,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
@@ -106,7 +107,7 @@ rules = ({'name': 'file',
  {'name': 'inc-alt',
   'lower': 'inc-alt',
   'index': 7,
-  'line': 63,
+  'line': 69,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
@@ -114,7 +115,7 @@ rules = ({'name': 'file',
  {'name': 'alternation',
   'lower': 'alternation',
   'index': 8,
-  'line': 64,
+  'line': 70,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
@@ -122,13 +123,13 @@ rules = ({'name': 'file',
               {'type': 4, 'index': 9},
               {'type': 3, 'min': 0, 'max': 9223372036854775807},
               {'type': 2, 'children': (4, 5, 6)},
-              {'type': 4, 'index': 77},
+              {'type': 4, 'index': 78},
               {'type': 4, 'index': 34},
               {'type': 4, 'index': 9})},
  {'name': 'concatenation',
   'lower': 'concatenation',
   'index': 9,
-  'line': 65,
+  'line': 71,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
@@ -141,7 +142,7 @@ rules = ({'name': 'file',
  {'name': 'repetition',
   'lower': 'repetition',
   'index': 10,
-  'line': 66,
+  'line': 72,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
@@ -155,7 +156,7 @@ rules = ({'name': 'file',
  {'name': 'modifier',
   'lower': 'modifier',
   'index': 11,
-  'line': 67,
+  'line': 73,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
@@ -168,7 +169,7 @@ rules = ({'name': 'file',
  {'name': 'predicate',
   'lower': 'predicate',
   'index': 12,
-  'line': 69,
+  'line': 75,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
@@ -180,59 +181,60 @@ rules = ({'name': 'file',
  {'name': 'element',
   'lower': 'element',
   'index': 13,
-  'line': 73,
+  'line': 79,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
-  'opcodes': ({'type': 1, 'children': (1, 2, 3, 4, 5, 6, 7, 8, 9, 10)},
+  'opcodes': ({'type': 1, 'children': (1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11)},
               {'type': 4, 'index': 30},
               {'type': 4, 'index': 19},
-              {'type': 4, 'index': 43},
               {'type': 4, 'index': 44},
               {'type': 4, 'index': 45},
-              {'type': 4, 'index': 50},
+              {'type': 4, 'index': 46},
+              {'type': 4, 'index': 51},
               {'type': 4, 'index': 20},
               {'type': 4, 'index': 41},
               {'type': 4, 'index': 42},
-              {'type': 4, 'index': 53})},
+              {'type': 4, 'index': 43},
+              {'type': 4, 'index': 54})},
  {'name': 'group',
   'lower': 'group',
   'index': 14,
-  'line': 83,
+  'line': 90,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
   'opcodes': ({'type': 2, 'children': (1, 2, 3, 4)},
               {'type': 6, 'string': (40,)},
-              {'type': 4, 'index': 77},
+              {'type': 4, 'index': 78},
               {'type': 4, 'index': 8},
               {'type': 4, 'index': 15})},
  {'name': 'group-close',
   'lower': 'group-close',
   'index': 15,
-  'line': 84,
+  'line': 91,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
   'opcodes': ({'type': 2, 'children': (1, 2)},
-              {'type': 4, 'index': 77},
+              {'type': 4, 'index': 78},
               {'type': 6, 'string': (41,)})},
  {'name': 'option',
   'lower': 'option',
   'index': 16,
-  'line': 85,
+  'line': 92,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
   'opcodes': ({'type': 2, 'children': (1, 2, 3, 4)},
               {'type': 4, 'index': 17},
-              {'type': 4, 'index': 77},
+              {'type': 4, 'index': 78},
               {'type': 4, 'index': 8},
               {'type': 4, 'index': 18})},
  {'name': 'option-open',
   'lower': 'option-open',
   'index': 17,
-  'line': 86,
+  'line': 93,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
@@ -240,25 +242,25 @@ rules = ({'name': 'file',
  {'name': 'option-close',
   'lower': 'option-close',
   'index': 18,
-  'line': 87,
+  'line': 94,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
   'opcodes': ({'type': 2, 'children': (1, 2)},
-              {'type': 4, 'index': 77},
+              {'type': 4, 'index': 78},
               {'type': 6, 'string': (93,)})},
  {'name': 'rnm-op',
   'lower': 'rnm-op',
   'index': 19,
-  'line': 88,
+  'line': 95,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
-  'opcodes': ({'type': 4, 'index': 76},)},
+  'opcodes': ({'type': 4, 'index': 77},)},
  {'name': 'bkr-op',
   'lower': 'bkr-op',
   'index': 20,
-  'line': 89,
+  'line': 96,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
@@ -270,7 +272,7 @@ rules = ({'name': 'file',
  {'name': 'bkrModifier',
   'lower': 'bkrmodifier',
   'index': 21,
-  'line': 90,
+  'line': 97,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
@@ -302,7 +304,7 @@ rules = ({'name': 'file',
  {'name': 'cs',
   'lower': 'cs',
   'index': 22,
-  'line': 91,
+  'line': 98,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
@@ -310,7 +312,7 @@ rules = ({'name': 'file',
  {'name': 'ci',
   'lower': 'ci',
   'index': 23,
-  'line': 92,
+  'line': 99,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
@@ -318,7 +320,7 @@ rules = ({'name': 'file',
  {'name': 'um',
   'lower': 'um',
   'index': 24,
-  'line': 93,
+  'line': 100,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
@@ -326,7 +328,7 @@ rules = ({'name': 'file',
  {'name': 'rm',
   'lower': 'rm',
   'index': 25,
-  'line': 94,
+  'line': 101,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
@@ -334,7 +336,7 @@ rules = ({'name': 'file',
  {'name': 'bkr-name',
   'lower': 'bkr-name',
   'index': 26,
-  'line': 95,
+  'line': 102,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
@@ -345,35 +347,35 @@ rules = ({'name': 'file',
  {'name': 'rname',
   'lower': 'rname',
   'index': 27,
-  'line': 96,
+  'line': 103,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
-  'opcodes': ({'type': 4, 'index': 76},)},
+  'opcodes': ({'type': 4, 'index': 77},)},
  {'name': 'uname',
   'lower': 'uname',
   'index': 28,
-  'line': 97,
+  'line': 104,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
   'opcodes': ({'type': 2, 'children': (1, 2)},
               {'type': 6, 'string': (117, 95)},
-              {'type': 4, 'index': 76})},
+              {'type': 4, 'index': 77})},
  {'name': 'ename',
   'lower': 'ename',
   'index': 29,
-  'line': 98,
+  'line': 105,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
   'opcodes': ({'type': 2, 'children': (1, 2)},
               {'type': 6, 'string': (101, 95)},
-              {'type': 4, 'index': 76})},
+              {'type': 4, 'index': 77})},
  {'name': 'udt-op',
   'lower': 'udt-op',
   'index': 30,
-  'line': 99,
+  'line': 106,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
@@ -383,65 +385,65 @@ rules = ({'name': 'file',
  {'name': 'udt-non-empty',
   'lower': 'udt-non-empty',
   'index': 31,
-  'line': 101,
+  'line': 108,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
   'opcodes': ({'type': 2, 'children': (1, 2)},
               {'type': 6, 'string': (117, 95)},
-              {'type': 4, 'index': 76})},
+              {'type': 4, 'index': 77})},
  {'name': 'udt-empty',
   'lower': 'udt-empty',
   'index': 32,
-  'line': 102,
+  'line': 109,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
   'opcodes': ({'type': 2, 'children': (1, 2)},
               {'type': 6, 'string': (101, 95)},
-              {'type': 4, 'index': 76})},
+              {'type': 4, 'index': 77})},
  {'name': 'rep-op',
   'lower': 'rep-op',
   'index': 33,
-  'line': 103,
+  'line': 110,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
   'opcodes': ({'type': 1, 'children': (1, 5, 8, 11, 12)},
               {'type': 2, 'children': (2, 3, 4)},
-              {'type': 4, 'index': 57},
+              {'type': 4, 'index': 58},
               {'type': 4, 'index': 36},
-              {'type': 4, 'index': 59},
+              {'type': 4, 'index': 60},
               {'type': 2, 'children': (6, 7)},
-              {'type': 4, 'index': 57},
+              {'type': 4, 'index': 58},
               {'type': 4, 'index': 36},
               {'type': 2, 'children': (9, 10)},
               {'type': 4, 'index': 36},
-              {'type': 4, 'index': 59},
+              {'type': 4, 'index': 60},
               {'type': 4, 'index': 36},
-              {'type': 4, 'index': 58})},
+              {'type': 4, 'index': 59})},
  {'name': 'alt-op',
   'lower': 'alt-op',
   'index': 34,
-  'line': 108,
+  'line': 115,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
   'opcodes': ({'type': 2, 'children': (1, 2)},
               {'type': 6, 'string': (47,)},
-              {'type': 4, 'index': 77})},
+              {'type': 4, 'index': 78})},
  {'name': 'cat-op',
   'lower': 'cat-op',
   'index': 35,
-  'line': 109,
+  'line': 116,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
-  'opcodes': ({'type': 4, 'index': 78},)},
+  'opcodes': ({'type': 4, 'index': 79},)},
  {'name': 'star-op',
   'lower': 'star-op',
   'index': 36,
-  'line': 110,
+  'line': 117,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
@@ -449,7 +451,7 @@ rules = ({'name': 'file',
  {'name': 'and-op',
   'lower': 'and-op',
   'index': 37,
-  'line': 111,
+  'line': 118,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
@@ -457,7 +459,7 @@ rules = ({'name': 'file',
  {'name': 'not-op',
   'lower': 'not-op',
   'index': 38,
-  'line': 112,
+  'line': 119,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
@@ -465,7 +467,7 @@ rules = ({'name': 'file',
  {'name': 'bka-op',
   'lower': 'bka-op',
   'index': 39,
-  'line': 113,
+  'line': 120,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
@@ -473,7 +475,7 @@ rules = ({'name': 'file',
  {'name': 'bkn-op',
   'lower': 'bkn-op',
   'index': 40,
-  'line': 114,
+  'line': 121,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
@@ -481,7 +483,7 @@ rules = ({'name': 'file',
  {'name': 'abg-op',
   'lower': 'abg-op',
   'index': 41,
-  'line': 115,
+  'line': 122,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
@@ -489,15 +491,23 @@ rules = ({'name': 'file',
  {'name': 'aen-op',
   'lower': 'aen-op',
   'index': 42,
-  'line': 116,
+  'line': 123,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
   'opcodes': ({'type': 6, 'string': (37, 36)},)},
+ {'name': 'cut-op',
+  'lower': 'cut-op',
+  'index': 43,
+  'line': 124,
+  'is_bkru': False,
+  'is_bkrr': False,
+  'has_bkrr': False,
+  'opcodes': ({'type': 6, 'string': (126,)},)},
  {'name': 'trg-op',
   'lower': 'trg-op',
-  'index': 43,
-  'line': 117,
+  'index': 44,
+  'line': 125,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
@@ -505,24 +515,24 @@ rules = ({'name': 'file',
               {'type': 6, 'string': (37,)},
               {'type': 1, 'children': (3, 8, 13)},
               {'type': 2, 'children': (4, 5, 6, 7)},
-              {'type': 4, 'index': 64},
-              {'type': 4, 'index': 67},
-              {'type': 6, 'string': (45,)},
-              {'type': 4, 'index': 68},
-              {'type': 2, 'children': (9, 10, 11, 12)},
               {'type': 4, 'index': 65},
-              {'type': 4, 'index': 71},
+              {'type': 4, 'index': 68},
               {'type': 6, 'string': (45,)},
+              {'type': 4, 'index': 69},
+              {'type': 2, 'children': (9, 10, 11, 12)},
+              {'type': 4, 'index': 66},
               {'type': 4, 'index': 72},
+              {'type': 6, 'string': (45,)},
+              {'type': 4, 'index': 73},
               {'type': 2, 'children': (14, 15, 16, 17)},
-              {'type': 4, 'index': 66},
-              {'type': 4, 'index': 69},
+              {'type': 4, 'index': 67},
+              {'type': 4, 'index': 70},
               {'type': 6, 'string': (45,)},
-              {'type': 4, 'index': 70})},
+              {'type': 4, 'index': 71})},
  {'name': 'tbs-op',
   'lower': 'tbs-op',
-  'index': 44,
-  'line': 120,
+  'index': 45,
+  'line': 128,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
@@ -530,42 +540,42 @@ rules = ({'name': 'file',
               {'type': 6, 'string': (37,)},
               {'type': 1, 'children': (3, 10, 17)},
               {'type': 2, 'children': (4, 5, 6)},
-              {'type': 4, 'index': 64},
-              {'type': 4, 'index': 61},
+              {'type': 4, 'index': 65},
+              {'type': 4, 'index': 62},
               {'type': 3, 'min': 0, 'max': 9223372036854775807},
               {'type': 2, 'children': (8, 9)},
               {'type': 6, 'string': (46,)},
-              {'type': 4, 'index': 61},
-              {'type': 2, 'children': (11, 12, 13)},
-              {'type': 4, 'index': 65},
               {'type': 4, 'index': 62},
+              {'type': 2, 'children': (11, 12, 13)},
+              {'type': 4, 'index': 66},
+              {'type': 4, 'index': 63},
               {'type': 3, 'min': 0, 'max': 9223372036854775807},
               {'type': 2, 'children': (15, 16)},
               {'type': 6, 'string': (46,)},
-              {'type': 4, 'index': 62},
-              {'type': 2, 'children': (18, 19, 20)},
-              {'type': 4, 'index': 66},
               {'type': 4, 'index': 63},
+              {'type': 2, 'children': (18, 19, 20)},
+              {'type': 4, 'index': 67},
+              {'type': 4, 'index': 64},
               {'type': 3, 'min': 0, 'max': 9223372036854775807},
               {'type': 2, 'children': (22, 23)},
               {'type': 6, 'string': (46,)},
-              {'type': 4, 'index': 63})},
+              {'type': 4, 'index': 64})},
  {'name': 'tls-op',
   'lower': 'tls-op',
-  'index': 45,
-  'line': 123,
+  'index': 46,
+  'line': 131,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
   'opcodes': ({'type': 2, 'children': (1, 2, 3, 4)},
-              {'type': 4, 'index': 46},
+              {'type': 4, 'index': 47},
               {'type': 6, 'string': (34,)},
-              {'type': 4, 'index': 48},
-              {'type': 4, 'index': 47})},
+              {'type': 4, 'index': 49},
+              {'type': 4, 'index': 48})},
  {'name': 'tls-case',
   'lower': 'tls-case',
-  'index': 46,
-  'line': 124,
+  'index': 47,
+  'line': 132,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
@@ -575,16 +585,16 @@ rules = ({'name': 'file',
               {'type': 4, 'index': 22})},
  {'name': 'tls-close',
   'lower': 'tls-close',
-  'index': 47,
-  'line': 125,
+  'index': 48,
+  'line': 133,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
   'opcodes': ({'type': 6, 'string': (34,)},)},
  {'name': 'tls-string',
   'lower': 'tls-string',
-  'index': 48,
-  'line': 126,
+  'index': 49,
+  'line': 134,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
@@ -592,38 +602,38 @@ rules = ({'name': 'file',
               {'type': 1, 'children': (2, 3, 4)},
               {'type': 5, 'min': 32, 'max': 33},
               {'type': 5, 'min': 35, 'max': 126},
-              {'type': 4, 'index': 49})},
+              {'type': 4, 'index': 50})},
  {'name': 'string-tab',
   'lower': 'string-tab',
-  'index': 49,
-  'line': 127,
+  'index': 50,
+  'line': 135,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
   'opcodes': ({'type': 6, 'string': (9,)},)},
  {'name': 'cls-op',
   'lower': 'cls-op',
-  'index': 50,
-  'line': 128,
+  'index': 51,
+  'line': 136,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
   'opcodes': ({'type': 2, 'children': (1, 2, 3)},
               {'type': 6, 'string': (39,)},
-              {'type': 4, 'index': 52},
-              {'type': 4, 'index': 51})},
+              {'type': 4, 'index': 53},
+              {'type': 4, 'index': 52})},
  {'name': 'cls-close',
   'lower': 'cls-close',
-  'index': 51,
-  'line': 129,
+  'index': 52,
+  'line': 137,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
   'opcodes': ({'type': 6, 'string': (39,)},)},
  {'name': 'cls-string',
   'lower': 'cls-string',
-  'index': 52,
-  'line': 130,
+  'index': 53,
+  'line': 138,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
@@ -631,30 +641,30 @@ rules = ({'name': 'file',
               {'type': 1, 'children': (2, 3, 4)},
               {'type': 5, 'min': 32, 'max': 38},
               {'type': 5, 'min': 40, 'max': 126},
-              {'type': 4, 'index': 49})},
+              {'type': 4, 'index': 50})},
  {'name': 'pros-val',
   'lower': 'pros-val',
-  'index': 53,
-  'line': 131,
+  'index': 54,
+  'line': 139,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
   'opcodes': ({'type': 2, 'children': (1, 2, 3)},
-              {'type': 4, 'index': 54},
               {'type': 4, 'index': 55},
-              {'type': 4, 'index': 56})},
+              {'type': 4, 'index': 56},
+              {'type': 4, 'index': 57})},
  {'name': 'pros-val-open',
   'lower': 'pros-val-open',
-  'index': 54,
-  'line': 132,
+  'index': 55,
+  'line': 140,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
   'opcodes': ({'type': 6, 'string': (60,)},)},
  {'name': 'pros-val-string',
   'lower': 'pros-val-string',
-  'index': 55,
-  'line': 133,
+  'index': 56,
+  'line': 141,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
@@ -662,43 +672,43 @@ rules = ({'name': 'file',
               {'type': 1, 'children': (2, 3, 4)},
               {'type': 5, 'min': 32, 'max': 61},
               {'type': 5, 'min': 63, 'max': 126},
-              {'type': 4, 'index': 49})},
+              {'type': 4, 'index': 50})},
  {'name': 'pros-val-close',
   'lower': 'pros-val-close',
-  'index': 56,
-  'line': 134,
+  'index': 57,
+  'line': 142,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
   'opcodes': ({'type': 6, 'string': (62,)},)},
  {'name': 'rep-min',
   'lower': 'rep-min',
-  'index': 57,
-  'line': 135,
+  'index': 58,
+  'line': 143,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
-  'opcodes': ({'type': 4, 'index': 60},)},
+  'opcodes': ({'type': 4, 'index': 61},)},
  {'name': 'rep-min-max',
   'lower': 'rep-min-max',
-  'index': 58,
-  'line': 136,
+  'index': 59,
+  'line': 144,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
-  'opcodes': ({'type': 4, 'index': 60},)},
+  'opcodes': ({'type': 4, 'index': 61},)},
  {'name': 'rep-max',
   'lower': 'rep-max',
-  'index': 59,
-  'line': 137,
+  'index': 60,
+  'line': 145,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
-  'opcodes': ({'type': 4, 'index': 60},)},
+  'opcodes': ({'type': 4, 'index': 61},)},
  {'name': 'rep-num',
   'lower': 'rep-num',
-  'index': 60,
-  'line': 138,
+  'index': 61,
+  'line': 146,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
@@ -706,110 +716,104 @@ rules = ({'name': 'file',
               {'type': 5, 'min': 48, 'max': 57})},
  {'name': 'd-string',
   'lower': 'd-string',
-  'index': 61,
-  'line': 139,
+  'index': 62,
+  'line': 147,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
-  'opcodes': ({'type': 4, 'index': 73},)},
+  'opcodes': ({'type': 4, 'index': 74},)},
  {'name': 'x-string',
   'lower': 'x-string',
-  'index': 62,
-  'line': 140,
+  'index': 63,
+  'line': 148,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
-  'opcodes': ({'type': 4, 'index': 75},)},
+  'opcodes': ({'type': 4, 'index': 76},)},
  {'name': 'b-string',
   'lower': 'b-string',
-  'index': 63,
-  'line': 141,
+  'index': 64,
+  'line': 149,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
-  'opcodes': ({'type': 4, 'index': 74},)},
+  'opcodes': ({'type': 4, 'index': 75},)},
  {'name': 'dec',
   'lower': 'dec',
-  'index': 64,
-  'line': 142,
+  'index': 65,
+  'line': 150,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
-  'opcodes': ({'type': 1, 'children': (1, 2)},
-              {'type': 6, 'string': (68,)},
-              {'type': 6, 'string': (100,)})},
+  'opcodes': ({'type': 19, 'ranges': ((68, 68), (100, 100)), 'floor': 1},)},
  {'name': 'hex',
   'lower': 'hex',
-  'index': 65,
-  'line': 143,
+  'index': 66,
+  'line': 151,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
-  'opcodes': ({'type': 1, 'children': (1, 2)},
-              {'type': 6, 'string': (88,)},
-              {'type': 6, 'string': (120,)})},
+  'opcodes': ({'type': 19, 'ranges': ((88, 88), (120, 120)), 'floor': 1},)},
  {'name': 'bin',
   'lower': 'bin',
-  'index': 66,
-  'line': 144,
+  'index': 67,
+  'line': 152,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
-  'opcodes': ({'type': 1, 'children': (1, 2)},
-              {'type': 6, 'string': (66,)},
-              {'type': 6, 'string': (98,)})},
+  'opcodes': ({'type': 19, 'ranges': ((66, 66), (98, 98)), 'floor': 1},)},
  {'name': 'dmin',
   'lower': 'dmin',
-  'index': 67,
-  'line': 145,
+  'index': 68,
+  'line': 153,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
-  'opcodes': ({'type': 4, 'index': 73},)},
+  'opcodes': ({'type': 4, 'index': 74},)},
  {'name': 'dmax',
   'lower': 'dmax',
-  'index': 68,
-  'line': 146,
+  'index': 69,
+  'line': 154,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
-  'opcodes': ({'type': 4, 'index': 73},)},
+  'opcodes': ({'type': 4, 'index': 74},)},
  {'name': 'bmin',
   'lower': 'bmin',
-  'index': 69,
-  'line': 147,
+  'index': 70,
+  'line': 155,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
-  'opcodes': ({'type': 4, 'index': 74},)},
+  'opcodes': ({'type': 4, 'index': 75},)},
  {'name': 'bmax',
   'lower': 'bmax',
-  'index': 70,
-  'line': 148,
+  'index': 71,
+  'line': 156,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
-  'opcodes': ({'type': 4, 'index': 74},)},
+  'opcodes': ({'type': 4, 'index': 75},)},
  {'name': 'xmin',
   'lower': 'xmin',
-  'index': 71,
-  'line': 149,
+  'index': 72,
+  'line': 157,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
-  'opcodes': ({'type': 4, 'index': 75},)},
+  'opcodes': ({'type': 4, 'index': 76},)},
  {'name': 'xmax',
   'lower': 'xmax',
-  'index': 72,
-  'line': 150,
+  'index': 73,
+  'line': 158,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
-  'opcodes': ({'type': 4, 'index': 75},)},
+  'opcodes': ({'type': 4, 'index': 76},)},
  {'name': 'dnum',
   'lower': 'dnum',
-  'index': 73,
-  'line': 151,
+  'index': 74,
+  'line': 159,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
@@ -817,8 +821,8 @@ rules = ({'name': 'file',
               {'type': 5, 'min': 48, 'max': 57})},
  {'name': 'bnum',
   'lower': 'bnum',
-  'index': 74,
-  'line': 152,
+  'index': 75,
+  'line': 160,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
@@ -826,67 +830,64 @@ rules = ({'name': 'file',
               {'type': 5, 'min': 48, 'max': 49})},
  {'name': 'xnum',
   'lower': 'xnum',
-  'index': 75,
-  'line': 153,
+  'index': 76,
+  'line': 161,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
   'opcodes': ({'type': 3, 'min': 1, 'max': 9223372036854775807},
-              {'type': 1, 'children': (2, 3, 4)},
-              {'type': 5, 'min': 48, 'max': 57},
-              {'type': 5, 'min': 65, 'max': 70},
-              {'type': 5, 'min': 97, 'max': 102})},
+              {'type': 19,
+               'ranges': ((48, 57), (65, 70), (97, 102)),
+               'floor': 2})},
  {'name': 'alphanum',
   'lower': 'alphanum',
-  'index': 76,
-  'line': 156,
+  'index': 77,
+  'line': 164,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
-  'opcodes': ({'type': 2, 'children': (1, 4)},
-              {'type': 1, 'children': (2, 3)},
-              {'type': 5, 'min': 97, 'max': 122},
-              {'type': 5, 'min': 65, 'max': 90},
+  'opcodes': ({'type': 2, 'children': (1, 2)},
+              {'type': 19, 'ranges': ((65, 90), (97, 122)), 'floor': 2},
               {'type': 3, 'min': 0, 'max': 9223372036854775807},
-              {'type': 1, 'children': (6, 7, 8, 9)},
-              {'type': 5, 'min': 97, 'max': 122},
-              {'type': 5, 'min': 65, 'max': 90},
-              {'type': 5, 'min': 48, 'max': 57},
-              {'type': 6, 'string': (45,)})},
+              {'type': 1, 'children': (4, 5)},
+              {'type': 19,
+               'ranges': ((48, 57), (65, 90), (97, 122)),
+               'floor': 2},
+              {'type': 19, 'ranges': ((45, 45),), 'floor': 1})},
  {'name': 'owsp',
   'lower': 'owsp',
-  'index': 77,
-  'line': 157,
+  'index': 78,
+  'line': 165,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
   'opcodes': ({'type': 3, 'min': 0, 'max': 9223372036854775807},
-              {'type': 4, 'index': 79})},
+              {'type': 4, 'index': 80})},
  {'name': 'wsp',
   'lower': 'wsp',
-  'index': 78,
-  'line': 158,
+  'index': 79,
+  'line': 166,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
   'opcodes': ({'type': 3, 'min': 1, 'max': 9223372036854775807},
-              {'type': 4, 'index': 79})},
+              {'type': 4, 'index': 80})},
  {'name': 'space',
   'lower': 'space',
-  'index': 79,
-  'line': 159,
+  'index': 80,
+  'line': 167,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
   'opcodes': ({'type': 1, 'children': (1, 2, 3, 4)},
               {'type': 6, 'string': (32,)},
               {'type': 6, 'string': (9,)},
-              {'type': 4, 'index': 80},
-              {'type': 4, 'index': 82})},
+              {'type': 4, 'index': 81},
+              {'type': 4, 'index': 83})},
  {'name': 'comment',
   'lower': 'comment',
-  'index': 80,
-  'line': 163,
+  'index': 81,
+  'line': 171,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
@@ -894,12 +895,12 @@ rules = ({'name': 'file',
               {'type': 6, 'string': (59,)},
               {'type': 3, 'min': 0, 'max': 9223372036854775807},
               {'type': 1, 'children': (4, 5)},
-              {'type': 5, 'min': 32, 'max': 126},
-              {'type': 6, 'string': (9,)})},
+              {'type': 19, 'ranges': ((32, 126),), 'floor': 2},
+              {'type': 19, 'ranges': ((9, 9),), 'floor': 1})},
  {'name': 'line-end',
   'lower': 'line-end',
-  'index': 81,
-  'line': 164,
+  'index': 82,
+  'line': 172,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
@@ -909,8 +910,8 @@ rules = ({'name': 'file',
               {'type': 6, 'string': (13,)})},
  {'name': 'line-continue',
   'lower': 'line-continue',
-  'index': 82,
-  'line': 167,
+  'index': 83,
+  'line': 175,
   'is_bkru': False,
   'is_bkrr': False,
   'has_bkrr': False,
@@ -919,9 +920,7 @@ rules = ({'name': 'file',
               {'type': 6, 'string': (13, 10)},
               {'type': 6, 'string': (10,)},
               {'type': 6, 'string': (13,)},
-              {'type': 1, 'children': (6, 7)},
-              {'type': 6, 'string': (32,)},
-              {'type': 6, 'string': (9,)})})
+              {'type': 19, 'ranges': ((9, 9), (32, 32)), 'floor': 1})})
 
 # UDTS
 udts = ()
@@ -929,6 +928,596 @@ udts = ()
 has_bkru = False
 has_bkrr = False
 
+# FIRST CHARACTERS
+first_chars = (((frozenset({9, 10, 13, 32, 59, 65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76,
+              77, 78, 79, 80, 81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 97, 98,
+              99, 100, 101, 102, 103, 104, 105, 106, 107, 108, 109, 110, 111,
+              112, 113, 114, 115, 116, 117, 118, 119, 120, 121, 122}),
+   True),
+  (frozenset({9, 10, 13, 32, 59, 65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76,
+              77, 78, 79, 80, 81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 97, 98,
+              99, 100, 101, 102, 103, 104, 105, 106, 107, 108, 109, 110, 111,
+              112, 113, 114, 115, 116, 117, 118, 119, 120, 121, 122}),
+   False),
+  (frozenset({32, 9, 10, 59, 13}), False),
+  (frozenset({65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78, 79, 80,
+              81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 97, 98, 99, 100, 101, 102,
+              103, 104, 105, 106, 107, 108, 109, 110, 111, 112, 113, 114, 115,
+              116, 117, 118, 119, 120, 121, 122}),
+   False)),
+ ((frozenset({32, 9, 10, 59, 13}), False), (frozenset({32, 9}), True),
+  (frozenset({32, 9}), False), (frozenset({59}), True),
+  (frozenset({59}), False), (frozenset({10, 13}), False)),
+ ((frozenset({65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78, 79, 80,
+              81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 97, 98, 99, 100, 101, 102,
+              103, 104, 105, 106, 107, 108, 109, 110, 111, 112, 113, 114, 115,
+              116, 117, 118, 119, 120, 121, 122}),
+   False),
+  (frozenset({65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78, 79, 80,
+              81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 97, 98, 99, 100, 101, 102,
+              103, 104, 105, 106, 107, 108, 109, 110, 111, 112, 113, 114, 115,
+              116, 117, 118, 119, 120, 121, 122}),
+   False),
+  (frozenset({32, 9, 10, 59, 13}), True),
+  (frozenset({33, 34, 37, 38, 39, 40, 42, 48, 49, 50, 51, 52, 53, 54, 55, 56,
+              57, 60, 65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78,
+              79, 80, 81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 91, 92, 97, 98,
+              99, 100, 101, 102, 103, 104, 105, 106, 107, 108, 109, 110, 111,
+              112, 113, 114, 115, 116, 117, 118, 119, 120, 121, 122, 126}),
+   False),
+  (frozenset({32, 9, 10, 59, 13}), True), (frozenset({10, 13}), False)),
+ ((frozenset({65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78, 79, 80,
+              81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 97, 98, 99, 100, 101, 102,
+              103, 104, 105, 106, 107, 108, 109, 110, 111, 112, 113, 114, 115,
+              116, 117, 118, 119, 120, 121, 122}),
+   False),
+  (frozenset({65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78, 79, 80,
+              81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 97, 98, 99, 100, 101, 102,
+              103, 104, 105, 106, 107, 108, 109, 110, 111, 112, 113, 114, 115,
+              116, 117, 118, 119, 120, 121, 122}),
+   False),
+  (frozenset({32, 9, 10, 59, 13}), True), (frozenset({61}), False)),
+ ((frozenset({61}), False), (frozenset({61}), False), (frozenset({61}), False)),
+ ((frozenset({65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78, 79, 80,
+              81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 97, 98, 99, 100, 101, 102,
+              103, 104, 105, 106, 107, 108, 109, 110, 111, 112, 113, 114, 115,
+              116, 117, 118, 119, 120, 121, 122}),
+   False),),
+ ((frozenset({61}), False),), ((frozenset({61}), False),),
+ ((frozenset({33, 34, 37, 38, 39, 40, 42, 48, 49, 50, 51, 52, 53, 54, 55, 56,
+              57, 60, 65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78,
+              79, 80, 81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 91, 92, 97, 98,
+              99, 100, 101, 102, 103, 104, 105, 106, 107, 108, 109, 110, 111,
+              112, 113, 114, 115, 116, 117, 118, 119, 120, 121, 122, 126}),
+   False),
+  (frozenset({33, 34, 37, 38, 39, 40, 42, 48, 49, 50, 51, 52, 53, 54, 55, 56,
+              57, 60, 65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78,
+              79, 80, 81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 91, 92, 97, 98,
+              99, 100, 101, 102, 103, 104, 105, 106, 107, 108, 109, 110, 111,
+              112, 113, 114, 115, 116, 117, 118, 119, 120, 121, 122, 126}),
+   False),
+  (frozenset({32, 9, 10, 59, 13, 47}), True),
+  (frozenset({32, 9, 10, 59, 13, 47}), False),
+  (frozenset({32, 9, 10, 59, 13}), True), (frozenset({47}), False),
+  (frozenset({33, 34, 37, 38, 39, 40, 42, 48, 49, 50, 51, 52, 53, 54, 55, 56,
+              57, 60, 65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78,
+              79, 80, 81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 91, 92, 97, 98,
+              99, 100, 101, 102, 103, 104, 105, 106, 107, 108, 109, 110, 111,
+              112, 113, 114, 115, 116, 117, 118, 119, 120, 121, 122, 126}),
+   False)),
+ ((frozenset({33, 34, 37, 38, 39, 40, 42, 48, 49, 50, 51, 52, 53, 54, 55, 56,
+              57, 60, 65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78,
+              79, 80, 81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 91, 92, 97, 98,
+              99, 100, 101, 102, 103, 104, 105, 106, 107, 108, 109, 110, 111,
+              112, 113, 114, 115, 116, 117, 118, 119, 120, 121, 122, 126}),
+   False),
+  (frozenset({33, 34, 37, 38, 39, 40, 42, 48, 49, 50, 51, 52, 53, 54, 55, 56,
+              57, 60, 65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78,
+              79, 80, 81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 91, 92, 97, 98,
+              99, 100, 101, 102, 103, 104, 105, 106, 107, 108, 109, 110, 111,
+              112, 113, 114, 115, 116, 117, 118, 119, 120, 121, 122, 126}),
+   False),
+  (frozenset({32, 9, 10, 59, 13}), True),
+  (frozenset({32, 9, 10, 59, 13}), False),
+  (frozenset({32, 9, 10, 59, 13}), False),
+  (frozenset({33, 34, 37, 38, 39, 40, 42, 48, 49, 50, 51, 52, 53, 54, 55, 56,
+              57, 60, 65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78,
+              79, 80, 81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 91, 92, 97, 98,
+              99, 100, 101, 102, 103, 104, 105, 106, 107, 108, 109, 110, 111,
+              112, 113, 114, 115, 116, 117, 118, 119, 120, 121, 122, 126}),
+   False)),
+ ((frozenset({33, 34, 37, 38, 39, 40, 42, 48, 49, 50, 51, 52, 53, 54, 55, 56,
+              57, 60, 65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78,
+              79, 80, 81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 91, 92, 97, 98,
+              99, 100, 101, 102, 103, 104, 105, 106, 107, 108, 109, 110, 111,
+              112, 113, 114, 115, 116, 117, 118, 119, 120, 121, 122, 126}),
+   False),
+  (frozenset({33, 38, 42, 48, 49, 50, 51, 52, 53, 54, 55, 56, 57}), True),
+  (frozenset({33, 38, 42, 48, 49, 50, 51, 52, 53, 54, 55, 56, 57}), False),
+  (frozenset({34, 37, 39, 40, 60, 65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75,
+              76, 77, 78, 79, 80, 81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 91,
+              92, 97, 98, 99, 100, 101, 102, 103, 104, 105, 106, 107, 108, 109,
+              110, 111, 112, 113, 114, 115, 116, 117, 118, 119, 120, 121, 122,
+              126}),
+   False),
+  (frozenset({40}), False), (frozenset({91}), False),
+  (frozenset({34, 37, 39, 60, 65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76,
+              77, 78, 79, 80, 81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 92, 97,
+              98, 99, 100, 101, 102, 103, 104, 105, 106, 107, 108, 109, 110,
+              111, 112, 113, 114, 115, 116, 117, 118, 119, 120, 121, 122,
+              126}),
+   False)),
+ ((frozenset({33, 38, 42, 48, 49, 50, 51, 52, 53, 54, 55, 56, 57}), False),
+  (frozenset({33, 38}), False), (frozenset({33, 38}), False),
+  (frozenset({42, 48, 49, 50, 51, 52, 53, 54, 55, 56, 57}), True),
+  (frozenset({42, 48, 49, 50, 51, 52, 53, 54, 55, 56, 57}), False),
+  (frozenset({42, 48, 49, 50, 51, 52, 53, 54, 55, 56, 57}), False)),
+ ((frozenset({33, 38}), False), (frozenset({38}), False),
+  (frozenset({33}), False), (frozenset({38}), False),
+  (frozenset({33}), False)),
+ ((frozenset({34, 37, 39, 60, 65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76,
+              77, 78, 79, 80, 81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 92, 97,
+              98, 99, 100, 101, 102, 103, 104, 105, 106, 107, 108, 109, 110,
+              111, 112, 113, 114, 115, 116, 117, 118, 119, 120, 121, 122,
+              126}),
+   False),
+  (frozenset({117, 101}), False),
+  (frozenset({65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78, 79, 80,
+              81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 97, 98, 99, 100, 101, 102,
+              103, 104, 105, 106, 107, 108, 109, 110, 111, 112, 113, 114, 115,
+              116, 117, 118, 119, 120, 121, 122}),
+   False),
+  (frozenset({37}), False), (frozenset({37}), False),
+  (frozenset({34, 37}), False), (frozenset({39}), False),
+  (frozenset({92}), False), (frozenset({37}), False), (frozenset({37}), False),
+  (frozenset({126}), False), (frozenset({60}), False)),
+ ((frozenset({40}), False), (frozenset({40}), False),
+  (frozenset({32, 9, 10, 59, 13}), True),
+  (frozenset({33, 34, 37, 38, 39, 40, 42, 48, 49, 50, 51, 52, 53, 54, 55, 56,
+              57, 60, 65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78,
+              79, 80, 81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 91, 92, 97, 98,
+              99, 100, 101, 102, 103, 104, 105, 106, 107, 108, 109, 110, 111,
+              112, 113, 114, 115, 116, 117, 118, 119, 120, 121, 122, 126}),
+   False),
+  (frozenset({32, 9, 10, 59, 13, 41}), False)),
+ ((frozenset({32, 9, 10, 59, 13, 41}), False),
+  (frozenset({32, 9, 10, 59, 13}), True), (frozenset({41}), False)),
+ ((frozenset({91}), False), (frozenset({91}), False),
+  (frozenset({32, 9, 10, 59, 13}), True),
+  (frozenset({33, 34, 37, 38, 39, 40, 42, 48, 49, 50, 51, 52, 53, 54, 55, 56,
+              57, 60, 65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78,
+              79, 80, 81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 91, 92, 97, 98,
+              99, 100, 101, 102, 103, 104, 105, 106, 107, 108, 109, 110, 111,
+              112, 113, 114, 115, 116, 117, 118, 119, 120, 121, 122, 126}),
+   False),
+  (frozenset({32, 93, 9, 10, 59, 13}), False)),
+ ((frozenset({91}), False),),
+ ((frozenset({32, 93, 9, 10, 59, 13}), False),
+  (frozenset({32, 9, 10, 59, 13}), True), (frozenset({93}), False)),
+ ((frozenset({65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78, 79, 80,
+              81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 97, 98, 99, 100, 101, 102,
+              103, 104, 105, 106, 107, 108, 109, 110, 111, 112, 113, 114, 115,
+              116, 117, 118, 119, 120, 121, 122}),
+   False),),
+ ((frozenset({92}), False), (frozenset({92}), False), (frozenset({37}), True),
+  (frozenset({37}), False),
+  (frozenset({65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78, 79, 80,
+              81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 97, 98, 99, 100, 101, 102,
+              103, 104, 105, 106, 107, 108, 109, 110, 111, 112, 113, 114, 115,
+              116, 117, 118, 119, 120, 121, 122}),
+   False)),
+ ((frozenset({37}), False), (frozenset({37}), False), (frozenset({37}), False),
+  (frozenset({37}), True), (frozenset({37}), False), (frozenset({37}), False),
+  (frozenset({37}), False), (frozenset({37}), False), (frozenset({37}), False),
+  (frozenset({37}), True), (frozenset({37}), False), (frozenset({37}), False),
+  (frozenset({37}), False), (frozenset({37}), False), (frozenset({37}), False),
+  (frozenset({37}), True), (frozenset({37}), False), (frozenset({37}), False),
+  (frozenset({37}), False), (frozenset({37}), False), (frozenset({37}), False),
+  (frozenset({37}), True), (frozenset({37}), False), (frozenset({37}), False),
+  (frozenset({37}), False)),
+ ((frozenset({37}), False),), ((frozenset({37}), False),),
+ ((frozenset({37}), False),), ((frozenset({37}), False),),
+ ((frozenset({65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78, 79, 80,
+              81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 97, 98, 99, 100, 101, 102,
+              103, 104, 105, 106, 107, 108, 109, 110, 111, 112, 113, 114, 115,
+              116, 117, 118, 119, 120, 121, 122}),
+   False),
+  (frozenset({117}), False), (frozenset({101}), False),
+  (frozenset({65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78, 79, 80,
+              81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 97, 98, 99, 100, 101, 102,
+              103, 104, 105, 106, 107, 108, 109, 110, 111, 112, 113, 114, 115,
+              116, 117, 118, 119, 120, 121, 122}),
+   False)),
+ ((frozenset({65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78, 79, 80,
+              81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 97, 98, 99, 100, 101, 102,
+              103, 104, 105, 106, 107, 108, 109, 110, 111, 112, 113, 114, 115,
+              116, 117, 118, 119, 120, 121, 122}),
+   False),),
+ ((frozenset({117}), False), (frozenset({117}), False),
+  (frozenset({65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78, 79, 80,
+              81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 97, 98, 99, 100, 101, 102,
+              103, 104, 105, 106, 107, 108, 109, 110, 111, 112, 113, 114, 115,
+              116, 117, 118, 119, 120, 121, 122}),
+   False)),
+ ((frozenset({101}), False), (frozenset({101}), False),
+  (frozenset({65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78, 79, 80,
+              81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 97, 98, 99, 100, 101, 102,
+              103, 104, 105, 106, 107, 108, 109, 110, 111, 112, 113, 114, 115,
+              116, 117, 118, 119, 120, 121, 122}),
+   False)),
+ ((frozenset({117, 101}), False), (frozenset({101}), False),
+  (frozenset({117}), False)),
+ ((frozenset({117}), False), (frozenset({117}), False),
+  (frozenset({65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78, 79, 80,
+              81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 97, 98, 99, 100, 101, 102,
+              103, 104, 105, 106, 107, 108, 109, 110, 111, 112, 113, 114, 115,
+              116, 117, 118, 119, 120, 121, 122}),
+   False)),
+ ((frozenset({101}), False), (frozenset({101}), False),
+  (frozenset({65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78, 79, 80,
+              81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 97, 98, 99, 100, 101, 102,
+              103, 104, 105, 106, 107, 108, 109, 110, 111, 112, 113, 114, 115,
+              116, 117, 118, 119, 120, 121, 122}),
+   False)),
+ ((frozenset({42, 48, 49, 50, 51, 52, 53, 54, 55, 56, 57}), False),
+  (frozenset({48, 49, 50, 51, 52, 53, 54, 55, 56, 57}), False),
+  (frozenset({48, 49, 50, 51, 52, 53, 54, 55, 56, 57}), False),
+  (frozenset({42}), False),
+  (frozenset({48, 49, 50, 51, 52, 53, 54, 55, 56, 57}), False),
+  (frozenset({48, 49, 50, 51, 52, 53, 54, 55, 56, 57}), False),
+  (frozenset({48, 49, 50, 51, 52, 53, 54, 55, 56, 57}), False),
+  (frozenset({42}), False), (frozenset({42}), False), (frozenset({42}), False),
+  (frozenset({48, 49, 50, 51, 52, 53, 54, 55, 56, 57}), False),
+  (frozenset({42}), False),
+  (frozenset({48, 49, 50, 51, 52, 53, 54, 55, 56, 57}), False)),
+ ((frozenset({47}), False), (frozenset({47}), False),
+  (frozenset({32, 9, 10, 59, 13}), True)),
+ ((frozenset({32, 9, 10, 59, 13}), False),), ((frozenset({42}), False),),
+ ((frozenset({38}), False),), ((frozenset({33}), False),),
+ ((frozenset({38}), False),), ((frozenset({33}), False),),
+ ((frozenset({37}), False),), ((frozenset({37}), False),),
+ ((frozenset({126}), False),),
+ ((frozenset({37}), False), (frozenset({37}), False),
+  (frozenset({66, 98, 100, 68, 88, 120}), False), (frozenset({100, 68}), False),
+  (frozenset({100, 68}), False),
+  (frozenset({48, 49, 50, 51, 52, 53, 54, 55, 56, 57}), False),
+  (frozenset({45}), False),
+  (frozenset({48, 49, 50, 51, 52, 53, 54, 55, 56, 57}), False),
+  (frozenset({88, 120}), False), (frozenset({88, 120}), False),
+  (frozenset({48, 49, 50, 51, 52, 53, 54, 55, 56, 57, 65, 66, 67, 68, 69, 70,
+              97, 98, 99, 100, 101, 102}),
+   False),
+  (frozenset({45}), False),
+  (frozenset({48, 49, 50, 51, 52, 53, 54, 55, 56, 57, 65, 66, 67, 68, 69, 70,
+              97, 98, 99, 100, 101, 102}),
+   False),
+  (frozenset({66, 98}), False), (frozenset({66, 98}), False),
+  (frozenset({48, 49}), False), (frozenset({45}), False),
+  (frozenset({48, 49}), False)),
+ ((frozenset({37}), False), (frozenset({37}), False),
+  (frozenset({66, 98, 100, 68, 88, 120}), False), (frozenset({100, 68}), False),
+  (frozenset({100, 68}), False),
+  (frozenset({48, 49, 50, 51, 52, 53, 54, 55, 56, 57}), False),
+  (frozenset({46}), True), (frozenset({46}), False), (frozenset({46}), False),
+  (frozenset({48, 49, 50, 51, 52, 53, 54, 55, 56, 57}), False),
+  (frozenset({88, 120}), False), (frozenset({88, 120}), False),
+  (frozenset({48, 49, 50, 51, 52, 53, 54, 55, 56, 57, 65, 66, 67, 68, 69, 70,
+              97, 98, 99, 100, 101, 102}),
+   False),
+  (frozenset({46}), True), (frozenset({46}), False), (frozenset({46}), False),
+  (frozenset({48, 49, 50, 51, 52, 53, 54, 55, 56, 57, 65, 66, 67, 68, 69, 70,
+              97, 98, 99, 100, 101, 102}),
+   False),
+  (frozenset({66, 98}), False), (frozenset({66, 98}), False),
+  (frozenset({48, 49}), False), (frozenset({46}), True),
+  (frozenset({46}), False), (frozenset({46}), False),
+  (frozenset({48, 49}), False)),
+ ((frozenset({34, 37}), False), (frozenset({37}), True),
+  (frozenset({34}), False),
+  (frozenset({9, 32, 33, 35, 36, 37, 38, 39, 40, 41, 42, 43, 44, 45, 46, 47, 48,
+              49, 50, 51, 52, 53, 54, 55, 56, 57, 58, 59, 60, 61, 62, 63, 64,
+              65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78, 79, 80,
+              81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 91, 92, 93, 94, 95, 96,
+              97, 98, 99, 100, 101, 102, 103, 104, 105, 106, 107, 108, 109, 110,
+              111, 112, 113, 114, 115, 116, 117, 118, 119, 120, 121, 122, 123,
+              124, 125, 126}),
+   True),
+  (frozenset({34}), False)),
+ ((frozenset({37}), True), (frozenset({37}), False), (frozenset({37}), False),
+  (frozenset({37}), False)),
+ ((frozenset({34}), False),),
+ ((frozenset({9, 32, 33, 35, 36, 37, 38, 39, 40, 41, 42, 43, 44, 45, 46, 47, 48,
+              49, 50, 51, 52, 53, 54, 55, 56, 57, 58, 59, 60, 61, 62, 63, 64,
+              65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78, 79, 80,
+              81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 91, 92, 93, 94, 95, 96,
+              97, 98, 99, 100, 101, 102, 103, 104, 105, 106, 107, 108, 109, 110,
+              111, 112, 113, 114, 115, 116, 117, 118, 119, 120, 121, 122, 123,
+              124, 125, 126}),
+   True),
+  (frozenset({9, 32, 33, 35, 36, 37, 38, 39, 40, 41, 42, 43, 44, 45, 46, 47, 48,
+              49, 50, 51, 52, 53, 54, 55, 56, 57, 58, 59, 60, 61, 62, 63, 64,
+              65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78, 79, 80,
+              81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 91, 92, 93, 94, 95, 96,
+              97, 98, 99, 100, 101, 102, 103, 104, 105, 106, 107, 108, 109, 110,
+              111, 112, 113, 114, 115, 116, 117, 118, 119, 120, 121, 122, 123,
+              124, 125, 126}),
+   False),
+  (frozenset({32, 33}), False),
+  (frozenset({35, 36, 37, 38, 39, 40, 41, 42, 43, 44, 45, 46, 47, 48, 49, 50,
+              51, 52, 53, 54, 55, 56, 57, 58, 59, 60, 61, 62, 63, 64, 65, 66,
+              67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78, 79, 80, 81, 82,
+              83, 84, 85, 86, 87, 88, 89, 90, 91, 92, 93, 94, 95, 96, 97, 98,
+              99, 100, 101, 102, 103, 104, 105, 106, 107, 108, 109, 110, 111,
+              112, 113, 114, 115, 116, 117, 118, 119, 120, 121, 122, 123, 124,
+              125, 126}),
+   False),
+  (frozenset({9}), False)),
+ ((frozenset({9}), False),),
+ ((frozenset({39}), False), (frozenset({39}), False),
+  (frozenset({9, 32, 33, 34, 35, 36, 37, 38, 40, 41, 42, 43, 44, 45, 46, 47, 48,
+              49, 50, 51, 52, 53, 54, 55, 56, 57, 58, 59, 60, 61, 62, 63, 64,
+              65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78, 79, 80,
+              81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 91, 92, 93, 94, 95, 96,
+              97, 98, 99, 100, 101, 102, 103, 104, 105, 106, 107, 108, 109, 110,
+              111, 112, 113, 114, 115, 116, 117, 118, 119, 120, 121, 122, 123,
+              124, 125, 126}),
+   True),
+  (frozenset({39}), False)),
+ ((frozenset({39}), False),),
+ ((frozenset({9, 32, 33, 34, 35, 36, 37, 38, 40, 41, 42, 43, 44, 45, 46, 47, 48,
+              49, 50, 51, 52, 53, 54, 55, 56, 57, 58, 59, 60, 61, 62, 63, 64,
+              65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78, 79, 80,
+              81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 91, 92, 93, 94, 95, 96,
+              97, 98, 99, 100, 101, 102, 103, 104, 105, 106, 107, 108, 109, 110,
+              111, 112, 113, 114, 115, 116, 117, 118, 119, 120, 121, 122, 123,
+              124, 125, 126}),
+   True),
+  (frozenset({9, 32, 33, 34, 35, 36, 37, 38, 40, 41, 42, 43, 44, 45, 46, 47, 48,
+              49, 50, 51, 52, 53, 54, 55, 56, 57, 58, 59, 60, 61, 62, 63, 64,
+              65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78, 79, 80,
+              81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 91, 92, 93, 94, 95, 96,
+              97, 98, 99, 100, 101, 102, 103, 104, 105, 106, 107, 108, 109, 110,
+              111, 112, 113, 114, 115, 116, 117, 118, 119, 120, 121, 122, 123,
+              124, 125, 126}),
+   False),
+  (frozenset({32, 33, 34, 35, 36, 37, 38}), False),
+  (frozenset({40, 41, 42, 43, 44, 45, 46, 47, 48, 49, 50, 51, 52, 53, 54, 55,
+              56, 57, 58, 59, 60, 61, 62, 63, 64, 65, 66, 67, 68, 69, 70, 71,
+              72, 73, 74, 75, 76, 77, 78, 79, 80, 81, 82, 83, 84, 85, 86, 87,
+              88, 89, 90, 91, 92, 93, 94, 95, 96, 97, 98, 99, 100, 101, 102,
+              103, 104, 105, 106, 107, 108, 109, 110, 111, 112, 113, 114, 115,
+              116, 117, 118, 119, 120, 121, 122, 123, 124, 125, 126}),
+   False),
+  (frozenset({9}), False)),
+ ((frozenset({60}), False), (frozenset({60}), False),
+  (frozenset({9, 32, 33, 34, 35, 36, 37, 38, 39, 40, 41, 42, 43, 44, 45, 46, 47,
+              48, 49, 50, 51, 52, 53, 54, 55, 56, 57, 58, 59, 60, 61, 63, 64,
+              65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78, 79, 80,
+              81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 91, 92, 93, 94, 95, 96,
+              97, 98, 99, 100, 101, 102, 103, 104, 105, 106, 107, 108, 109, 110,
+              111, 112, 113, 114, 115, 116, 117, 118, 119, 120, 121, 122, 123,
+              124, 125, 126}),
+   True),
+  (frozenset({62}), False)),
+ ((frozenset({60}), False),),
+ ((frozenset({9, 32, 33, 34, 35, 36, 37, 38, 39, 40, 41, 42, 43, 44, 45, 46, 47,
+              48, 49, 50, 51, 52, 53, 54, 55, 56, 57, 58, 59, 60, 61, 63, 64,
+              65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78, 79, 80,
+              81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 91, 92, 93, 94, 95, 96,
+              97, 98, 99, 100, 101, 102, 103, 104, 105, 106, 107, 108, 109, 110,
+              111, 112, 113, 114, 115, 116, 117, 118, 119, 120, 121, 122, 123,
+              124, 125, 126}),
+   True),
+  (frozenset({9, 32, 33, 34, 35, 36, 37, 38, 39, 40, 41, 42, 43, 44, 45, 46, 47,
+              48, 49, 50, 51, 52, 53, 54, 55, 56, 57, 58, 59, 60, 61, 63, 64,
+              65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78, 79, 80,
+              81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 91, 92, 93, 94, 95, 96,
+              97, 98, 99, 100, 101, 102, 103, 104, 105, 106, 107, 108, 109, 110,
+              111, 112, 113, 114, 115, 116, 117, 118, 119, 120, 121, 122, 123,
+              124, 125, 126}),
+   False),
+  (frozenset({32, 33, 34, 35, 36, 37, 38, 39, 40, 41, 42, 43, 44, 45, 46, 47,
+              48, 49, 50, 51, 52, 53, 54, 55, 56, 57, 58, 59, 60, 61}),
+   False),
+  (frozenset({63, 64, 65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78,
+              79, 80, 81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 91, 92, 93, 94,
+              95, 96, 97, 98, 99, 100, 101, 102, 103, 104, 105, 106, 107, 108,
+              109, 110, 111, 112, 113, 114, 115, 116, 117, 118, 119, 120, 121,
+              122, 123, 124, 125, 126}),
+   False),
+  (frozenset({9}), False)),
+ ((frozenset({62}), False),),
+ ((frozenset({48, 49, 50, 51, 52, 53, 54, 55, 56, 57}), False),),
+ ((frozenset({48, 49, 50, 51, 52, 53, 54, 55, 56, 57}), False),),
+ ((frozenset({48, 49, 50, 51, 52, 53, 54, 55, 56, 57}), False),),
+ ((frozenset({48, 49, 50, 51, 52, 53, 54, 55, 56, 57}), False),
+  (frozenset({48, 49, 50, 51, 52, 53, 54, 55, 56, 57}), False)),
+ ((frozenset({48, 49, 50, 51, 52, 53, 54, 55, 56, 57}), False),),
+ ((frozenset({48, 49, 50, 51, 52, 53, 54, 55, 56, 57, 65, 66, 67, 68, 69, 70,
+              97, 98, 99, 100, 101, 102}),
+   False),),
+ ((frozenset({48, 49}), False),), ((frozenset({100, 68}), False),),
+ ((frozenset({88, 120}), False),), ((frozenset({66, 98}), False),),
+ ((frozenset({48, 49, 50, 51, 52, 53, 54, 55, 56, 57}), False),),
+ ((frozenset({48, 49, 50, 51, 52, 53, 54, 55, 56, 57}), False),),
+ ((frozenset({48, 49}), False),), ((frozenset({48, 49}), False),),
+ ((frozenset({48, 49, 50, 51, 52, 53, 54, 55, 56, 57, 65, 66, 67, 68, 69, 70,
+              97, 98, 99, 100, 101, 102}),
+   False),),
+ ((frozenset({48, 49, 50, 51, 52, 53, 54, 55, 56, 57, 65, 66, 67, 68, 69, 70,
+              97, 98, 99, 100, 101, 102}),
+   False),),
+ ((frozenset({48, 49, 50, 51, 52, 53, 54, 55, 56, 57}), False),
+  (frozenset({48, 49, 50, 51, 52, 53, 54, 55, 56, 57}), False)),
+ ((frozenset({48, 49}), False), (frozenset({48, 49}), False)),
+ ((frozenset({48, 49, 50, 51, 52, 53, 54, 55, 56, 57, 65, 66, 67, 68, 69, 70,
+              97, 98, 99, 100, 101, 102}),
+   False),
+  (frozenset({48, 49, 50, 51, 52, 53, 54, 55, 56, 57, 65, 66, 67, 68, 69, 70,
+              97, 98, 99, 100, 101, 102}),
+   False)),
+ ((frozenset({65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78, 79, 80,
+              81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 97, 98, 99, 100, 101, 102,
+              103, 104, 105, 106, 107, 108, 109, 110, 111, 112, 113, 114, 115,
+              116, 117, 118, 119, 120, 121, 122}),
+   False),
+  (frozenset({65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78, 79, 80,
+              81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 97, 98, 99, 100, 101, 102,
+              103, 104, 105, 106, 107, 108, 109, 110, 111, 112, 113, 114, 115,
+              116, 117, 118, 119, 120, 121, 122}),
+   False),
+  (frozenset({45, 48, 49, 50, 51, 52, 53, 54, 55, 56, 57, 65, 66, 67, 68, 69,
+              70, 71, 72, 73, 74, 75, 76, 77, 78, 79, 80, 81, 82, 83, 84, 85,
+              86, 87, 88, 89, 90, 97, 98, 99, 100, 101, 102, 103, 104, 105, 106,
+              107, 108, 109, 110, 111, 112, 113, 114, 115, 116, 117, 118, 119,
+              120, 121, 122}),
+   True),
+  (frozenset({45, 48, 49, 50, 51, 52, 53, 54, 55, 56, 57, 65, 66, 67, 68, 69,
+              70, 71, 72, 73, 74, 75, 76, 77, 78, 79, 80, 81, 82, 83, 84, 85,
+              86, 87, 88, 89, 90, 97, 98, 99, 100, 101, 102, 103, 104, 105, 106,
+              107, 108, 109, 110, 111, 112, 113, 114, 115, 116, 117, 118, 119,
+              120, 121, 122}),
+   False),
+  (frozenset({48, 49, 50, 51, 52, 53, 54, 55, 56, 57, 65, 66, 67, 68, 69, 70,
+              71, 72, 73, 74, 75, 76, 77, 78, 79, 80, 81, 82, 83, 84, 85, 86,
+              87, 88, 89, 90, 97, 98, 99, 100, 101, 102, 103, 104, 105, 106,
+              107, 108, 109, 110, 111, 112, 113, 114, 115, 116, 117, 118, 119,
+              120, 121, 122}),
+   False),
+  (frozenset({45}), False)),
+ ((frozenset({32, 9, 10, 59, 13}), True),
+  (frozenset({32, 9, 10, 59, 13}), False)),
+ ((frozenset({32, 9, 10, 59, 13}), False),
+  (frozenset({32, 9, 10, 59, 13}), False)),
+ ((frozenset({32, 9, 10, 59, 13}), False), (frozenset({32}), False),
+  (frozenset({9}), False), (frozenset({59}), False),
+  (frozenset({10, 13}), False)),
+ ((frozenset({59}), False), (frozenset({59}), False),
+  (frozenset({9, 32, 33, 34, 35, 36, 37, 38, 39, 40, 41, 42, 43, 44, 45, 46, 47,
+              48, 49, 50, 51, 52, 53, 54, 55, 56, 57, 58, 59, 60, 61, 62, 63,
+              64, 65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78, 79,
+              80, 81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 91, 92, 93, 94, 95,
+              96, 97, 98, 99, 100, 101, 102, 103, 104, 105, 106, 107, 108, 109,
+              110, 111, 112, 113, 114, 115, 116, 117, 118, 119, 120, 121, 122,
+              123, 124, 125, 126}),
+   True),
+  (frozenset({9, 32, 33, 34, 35, 36, 37, 38, 39, 40, 41, 42, 43, 44, 45, 46, 47,
+              48, 49, 50, 51, 52, 53, 54, 55, 56, 57, 58, 59, 60, 61, 62, 63,
+              64, 65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78, 79,
+              80, 81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 91, 92, 93, 94, 95,
+              96, 97, 98, 99, 100, 101, 102, 103, 104, 105, 106, 107, 108, 109,
+              110, 111, 112, 113, 114, 115, 116, 117, 118, 119, 120, 121, 122,
+              123, 124, 125, 126}),
+   False),
+  (frozenset({32, 33, 34, 35, 36, 37, 38, 39, 40, 41, 42, 43, 44, 45, 46, 47,
+              48, 49, 50, 51, 52, 53, 54, 55, 56, 57, 58, 59, 60, 61, 62, 63,
+              64, 65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78, 79,
+              80, 81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 91, 92, 93, 94, 95,
+              96, 97, 98, 99, 100, 101, 102, 103, 104, 105, 106, 107, 108, 109,
+              110, 111, 112, 113, 114, 115, 116, 117, 118, 119, 120, 121, 122,
+              123, 124, 125, 126}),
+   False),
+  (frozenset({9}), False)),
+ ((frozenset({10, 13}), False), (frozenset({13}), False),
+  (frozenset({10}), False), (frozenset({13}), False)),
+ ((frozenset({10, 13}), False), (frozenset({10, 13}), False),
+  (frozenset({13}), False), (frozenset({10}), False), (frozenset({13}), False),
+  (frozenset({32, 9}), False)))
+
+# PHRASE LENGTHS
+phrase_lengths = (((0, 9223372036854775807), (1, 9223372036854775807), (1, 9223372036854775807),
+  (4, 9223372036854775807)),
+ ((1, 9223372036854775807), (0, 9223372036854775807), (1, 1),
+  (0, 9223372036854775807), (1, 9223372036854775807), (1, 2)),
+ ((4, 9223372036854775807), (2, 9223372036854775807), (0, 9223372036854775807),
+  (1, 9223372036854775807), (0, 9223372036854775807), (1, 2)),
+ ((2, 9223372036854775807), (1, 9223372036854775807), (0, 9223372036854775807),
+  (1, 2)),
+ ((1, 2), (2, 2), (1, 1)), ((1, 9223372036854775807),), ((1, 1),), ((2, 2),),
+ ((1, 9223372036854775807), (1, 9223372036854775807), (0, 9223372036854775807),
+  (2, 9223372036854775807), (0, 9223372036854775807), (1, 9223372036854775807),
+  (1, 9223372036854775807)),
+ ((1, 9223372036854775807), (1, 9223372036854775807), (0, 9223372036854775807),
+  (2, 9223372036854775807), (1, 9223372036854775807),
+  (1, 9223372036854775807)),
+ ((1, 9223372036854775807), (0, 9223372036854775807), (1, 9223372036854775807),
+  (1, 9223372036854775807), (3, 9223372036854775807), (3, 9223372036854775807),
+  (1, 9223372036854775807)),
+ ((1, 9223372036854775807), (1, 9223372036854775807), (1, 2),
+  (0, 9223372036854775807), (1, 9223372036854775807),
+  (1, 9223372036854775807)),
+ ((1, 2), (2, 2), (2, 2), (1, 1), (1, 1)),
+ ((1, 9223372036854775807), (3, 9223372036854775807), (1, 9223372036854775807),
+  (5, 9223372036854775807), (3, 9223372036854775807), (2, 9223372036854775807),
+  (2, 9223372036854775807), (2, 9223372036854775807), (2, 2), (2, 2), (1, 1),
+  (2, 9223372036854775807)),
+ ((3, 9223372036854775807), (1, 1), (0, 9223372036854775807),
+  (1, 9223372036854775807), (1, 9223372036854775807)),
+ ((1, 9223372036854775807), (0, 9223372036854775807), (1, 1)),
+ ((3, 9223372036854775807), (1, 1), (0, 9223372036854775807),
+  (1, 9223372036854775807), (1, 9223372036854775807)),
+ ((1, 1),), ((1, 9223372036854775807), (0, 9223372036854775807), (1, 1)),
+ ((1, 9223372036854775807),),
+ ((2, 9223372036854775807), (1, 1), (0, 4), (2, 4), (1, 9223372036854775807)),
+ ((2, 4), (2, 4), (2, 2), (0, 2), (2, 2), (2, 2), (2, 2), (2, 4), (2, 2),
+  (0, 2), (2, 2), (2, 2), (2, 2), (2, 4), (2, 2), (0, 2), (2, 2), (2, 2),
+  (2, 2), (2, 4), (2, 2), (0, 2), (2, 2), (2, 2), (2, 2)),
+ ((2, 2),), ((2, 2),), ((2, 2),), ((2, 2),),
+ ((1, 9223372036854775807), (3, 9223372036854775807), (3, 9223372036854775807),
+  (1, 9223372036854775807)),
+ ((1, 9223372036854775807),),
+ ((3, 9223372036854775807), (2, 2), (1, 9223372036854775807)),
+ ((3, 9223372036854775807), (2, 2), (1, 9223372036854775807)),
+ ((3, 9223372036854775807), (3, 9223372036854775807), (3, 9223372036854775807)),
+ ((3, 9223372036854775807), (2, 2), (1, 9223372036854775807)),
+ ((3, 9223372036854775807), (2, 2), (1, 9223372036854775807)),
+ ((1, 9223372036854775807), (3, 9223372036854775807), (1, 9223372036854775807),
+  (1, 1), (1, 9223372036854775807), (2, 9223372036854775807),
+  (1, 9223372036854775807), (1, 1), (2, 9223372036854775807), (1, 1),
+  (1, 9223372036854775807), (1, 1), (1, 9223372036854775807)),
+ ((1, 9223372036854775807), (1, 1), (0, 9223372036854775807)),
+ ((1, 9223372036854775807),), ((1, 1),), ((1, 1),), ((1, 1),), ((2, 2),),
+ ((2, 2),), ((2, 2),), ((2, 2),), ((1, 1),),
+ ((5, 9223372036854775807), (1, 1), (4, 9223372036854775807),
+  (4, 9223372036854775807), (1, 1), (1, 9223372036854775807), (1, 1),
+  (1, 9223372036854775807), (4, 9223372036854775807), (1, 1),
+  (1, 9223372036854775807), (1, 1), (1, 9223372036854775807),
+  (4, 9223372036854775807), (1, 1), (1, 9223372036854775807), (1, 1),
+  (1, 9223372036854775807)),
+ ((3, 9223372036854775807), (1, 1), (2, 9223372036854775807),
+  (2, 9223372036854775807), (1, 1), (1, 9223372036854775807),
+  (0, 9223372036854775807), (2, 9223372036854775807), (1, 1),
+  (1, 9223372036854775807), (2, 9223372036854775807), (1, 1),
+  (1, 9223372036854775807), (0, 9223372036854775807), (2, 9223372036854775807),
+  (1, 1), (1, 9223372036854775807), (2, 9223372036854775807), (1, 1),
+  (1, 9223372036854775807), (0, 9223372036854775807), (2, 9223372036854775807),
+  (1, 1), (1, 9223372036854775807)),
+ ((2, 9223372036854775807), (0, 2), (1, 1), (0, 9223372036854775807), (1, 1)),
+ ((0, 2), (2, 2), (2, 2), (2, 2)), ((1, 1),),
+ ((0, 9223372036854775807), (1, 1), (1, 1), (1, 1), (1, 1)), ((1, 1),),
+ ((2, 9223372036854775807), (1, 1), (0, 9223372036854775807), (1, 1)),
+ ((1, 1),), ((0, 9223372036854775807), (1, 1), (1, 1), (1, 1), (1, 1)),
+ ((2, 9223372036854775807), (1, 1), (0, 9223372036854775807), (1, 1)),
+ ((1, 1),), ((0, 9223372036854775807), (1, 1), (1, 1), (1, 1), (1, 1)),
+ ((1, 1),), ((1, 9223372036854775807),), ((1, 9223372036854775807),),
+ ((1, 9223372036854775807),), ((1, 9223372036854775807), (1, 1)),
+ ((1, 9223372036854775807),), ((1, 9223372036854775807),),
+ ((1, 9223372036854775807),), ((1, 1),), ((1, 1),), ((1, 1),),
+ ((1, 9223372036854775807),), ((1, 9223372036854775807),),
+ ((1, 9223372036854775807),), ((1, 9223372036854775807),),
+ ((1, 9223372036854775807),), ((1, 9223372036854775807),),
+ ((1, 9223372036854775807), (1, 1)), ((1, 9223372036854775807), (1, 1)),
+ ((1, 9223372036854775807), (1, 1)),
+ ((1, 9223372036854775807), (1, 1), (0, 9223372036854775807), (1, 1), (1, 1),
+  (1, 1)),
+ ((0, 9223372036854775807), (1, 9223372036854775807)),
+ ((1, 9223372036854775807), (1, 9223372036854775807)),
+ ((1, 9223372036854775807), (1, 1), (1, 1), (1, 9223372036854775807), (2, 3)),
+ ((1, 9223372036854775807), (1, 1), (0, 9223372036854775807), (1, 1), (1, 1),
+  (1, 1)),
+ ((1, 2), (2, 2), (1, 1), (1, 1)),
+ ((2, 3), (1, 2), (2, 2), (1, 1), (1, 1), (1, 1)))
+
 
 def to_string():
     '''Displays the original SABNF syntax.'''
@@ -988,6 +1577,12 @@ def to_string():
     sabnf += ";      Returns EMPTY or NOMATCH. Never consumes any characters.\n"
     sabnf += ";   8. String end anchor, AEN(%$) matches the end of the input string location.\n"
     sabnf += ";      Returns EMPTY or NOMATCH. Never consumes any characters.\n"
+    sabnf += ";   9. Cut, CUT(~), commits the innermost alternation or repetition of the rule\n"
+    sabnf += ";      that it appears in. Always returns EMPTY. Never consumes any characters.\n"
+    sabnf += ";      If the alternative (or repetition) fails after the cut,\n"
+    sabnf += ";      the alternation fails without trying the remaining alternatives\n"
+    sabnf += ";      (the repetition fails instead of ending with the previous repetition).\n"
+    sabnf += ";      e.g. record = \"@\" ~ name / \"#\" ~ number\n"
     sabnf += ";\n"
     sabnf += "file                = *(blank-line / rule)\n"
     sabnf += "blank-line          = *(%d32/%d9) [comment] line-end\n"
@@ -1015,6 +1610,7 @@ def to_string():
     sabnf += "                    / bkr-op\n"
     sabnf += "                    / abg-op\n"
     sabnf += "                    / aen-op\n"
+    sabnf += "                    / cut-op\n"
     sabnf += "                    / pros-val\n"
     sabnf += "group               = %d40 owsp  alternation group-close\n"
     sabnf += "group-close         = owsp %d41\n"
@@ -1050,6 +1646,7 @@ def to_string():
     sabnf += "bkn-op              = %d33.33\n"
     sabnf += "abg-op              = %d37.94\n"
     sabnf += "aen-op              = %d37.36\n"
+    sabnf += "cut-op              = %d126\n"
     sabnf += "trg-op              = %d37 ((dec dmin %d45 dmax) \n"
     sabnf += "                    / (hex xmin %d45 xmax) \n"
     sabnf += "                    / (bin bmin %d45 bmax))\n"
@@ -21,6 +21,8 @@ def semantic(api):
     api.ast.translate(data)
     rules = data['rules']
     remove_redundant_opcodes(rules)
+    if(not data['errors']):
+        merge_character_classes(rules)
     return {
         'errors': data['errors'],
         'rules': rules,
@@ -72,3 +74,111 @@ def adjust_children(j, opcodes):
                 for m in range(len(op['children'])):
                     if(op['children'][m] > j):
                         op['children'][m] -= 1
+
+
+def merge_character_classes(rules):
+    '''Opcodes ALT whose children all match a single character -
+    TRG, TBS and TLS of one character or ALTs of them -
+    are replaced with a single character class opcode, CLS.
+    The CLS opcode holds the sorted, non-overlapping list of
+    the character ranges that the children match
+    and the floor, the smallest phrase index at which it can match
+    in look behind mode.
+    TRG never matches the first input character in look behind mode,
+    TBS and TLS do. An ALT that mixes them is replaced with an ALT
+    of two CLS opcodes, one for each floor.
+    The rule's opcodes are rebuilt without the removed children.
+    @param rules The grammar object rules.'''
+    for rule in rules:
+        opcodes = rule['opcodes']
+        merged = []
+        merge_opcode(0, opcodes, merged)
+        rule['opcodes'] = merged
+
+
+def merge_opcode(i, opcodes, merged):
+    '''Copy an opcode and its children to the list of merged opcodes,
+    replacing ALTs of single character terminals with CLS opcodes.
+    The children follow their parents, in the same order as the
+    opcodes generated from the AST.
+    @param i The index of the opcode to copy.
+    @param opcodes The list of opcodes for a given rule.
+    @param merged The list of merged opcodes.
+    @returns Returns the index of the copied opcode in the merged list.'''
+    op = opcodes[i]
+    index = len(merged)
+    if(op['type'] == id.ALT):
+        ranges = class_ranges(i, opcodes)
+        if(ranges):
+            classes = []
+            # the TRG ranges, usually the wider ones, are tried first
+            for floor in (2, 1):
+                floor_ranges = [(min, max) for (min, max, f) in ranges
+                                if(f == floor)]
+                if(floor_ranges):
+                    classes.append({'type': id.CLS,
+                                    'ranges': merge_ranges(floor_ranges),
+                                    'floor': floor})
+            if(len(classes) > 1):
+                merged.append({'type': id.ALT,
+                               'children': [index + 1, index + 2]})
+            merged += classes
+            return index
+    merged.append(op)
+    if(op['type'] == id.ALT or op['type'] == id.CAT):
+        children = []
+        for child in op['children']:
+            children.append(merge_opcode(child, opcodes, merged))
+        op['children'] = children
+    elif(op['type'] == id.REP or op['type'] == id.AND
+         or op['type'] == id.NOT or op['type'] == id.BKA
+         or op['type'] == id.BKN):
+        merge_opcode(i + 1, opcodes, merged)
+    return index
+
+
+def class_ranges(i, opcodes):
+    '''Find the character ranges matched by an opcode,
+    if it matches exactly one character.
+    @param i The opcode index of reference.
+    @param opcodes The list of opcodes for a given rule.
+    @returns Returns a list of (min, max, floor) ranges or
+    None if the opcode does not match a single character.
+    floor is the smallest phrase index at which the range
+    can match in look behind mode.'''
+    op = opcodes[i]
+    if(op['type'] == id.TRG):
+        # TRG never matches the first input character in look behind mode
+        return [(op['min'], op['max'], 2)]
+    if(op['type'] == id.TBS and len(op['string']) == 1):
+        char = op['string'][0]
+        return [(char, char, 1)]
+    if(op['type'] == id.TLS and len(op['string']) == 1):
+        char = op['string'][0]
+        if(char >= 97 and char <= 122):
+            # case insensitive, the string is lower case
+            return [(char - 32, char - 32, 1), (char, char, 1)]
+        return [(char, char, 1)]
+    if(op['type'] == id.ALT):
+        ranges = []
+        for child in op['children']:
+            child_ranges = class_ranges(child, opcodes)
+            if(child_ranges is None):
+                return None
+            ranges += child_ranges
+        return ranges
+    return None
+
+
+def merge_ranges(ranges):
+    '''Sort the character ranges and merge those that overlap or touch.
+    @param ranges A list of (min, max) ranges.
+    @returns Returns the tuple of merged ranges.'''
+    merged = []
+    for (min, max) in sorted(ranges):
+        if(merged and min <= merged[-1][1] + 1):
+            if(max > merged[-1][1]):
+                merged[-1] = (merged[-1][0], max)
+        else:
+            merged.append((min, max))
+    return tuple(merged)
@@ -26,6 +26,7 @@ def add_ast_callbacks(ast):
     ast.add_callback('rnm-op', semantic_rnm_op)
     ast.add_callback('abg-op', semantic_abg_op)
     ast.add_callback('aen-op', semantic_aen_op)
+    ast.add_callback('cut-op', semantic_cut_op)
     ast.add_callback('bka-op', semantic_bka_op)
     ast.add_callback('bkn-op', semantic_bkn_op)
     ast.add_callback('ci', semantic_ci)
@@ -363,6 +364,12 @@ def semantic_aen_op(state, input, phrase_index, phrase_length, data):
     return id.SEM_OK
 
 
+def semantic_cut_op(state, input, phrase_index, phrase_length, data):
+    if(state == id.SEM_POST):
+        data['top_rule']['opcodes'].append({'type': id.CUT, })
+    return id.SEM_OK
+
+
 def semantic_bka_op(state, input, phrase_index, phrase_length, data):
     if(state == id.SEM_POST):
         data['top_rule']['opcodes'].append({'type': id.BKA, })
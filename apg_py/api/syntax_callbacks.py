@@ -23,6 +23,7 @@ def add_syntax_callbacks(parser):
     parser.add_callbacks({'bkn-op': syntax_bkn_op})
     parser.add_callbacks({'abg-op': syntax_abg_op})
     parser.add_callbacks({'aen-op': syntax_aen_op})
+    parser.add_callbacks({'cut-op': syntax_cut_op})
 
 
 def append_error(user_data, index, msg):
@@ -148,3 +149,10 @@ def syntax_aen_op(data):
         msg = "%$ operator (end of input anchor) not allowed "
         msg += "with strict ABNF"
         append_error(data['user_data'], data['phrase_index'], msg)
+
+
+def syntax_cut_op(data):
+    if(data['state'] is id.MATCH and data['user_data']['strict'] is True):
+        msg = "~ operator (cut) not allowed "
+        msg += "with strict ABNF"
+        append_error(data['user_data'], data['phrase_index'], msg)
@@ -2,11 +2,13 @@
 @brief ApgExp - a RegExp-like pattern matching engine.
 '''
 import sys
+import time
 import types
 import copy
 from apg_py.lib import identifiers as id
 from apg_py.lib import utilities as utils
-from apg_py.lib.parser import Parser
+from apg_py.lib.parser import Parser, LimitExceeded
+from apg_py.lib.dfa import grammar_dfa
 from apg_py.lib.ast import Ast
 from apg_py.lib.trace import Trace
 from apg_py.api.api import Api
@@ -14,6 +16,12 @@ from apg_py.api.api import Api
 
 class Result():
     '''A class for returning the results of a pattern match.
+
+    node_hits and max_tree_depth are the parser's statistics
+    of the match. They are None only if the pattern was matched
+    by its DFA, without the parser, which is opt-in
+    (see ApgExp.use_dfa). The regular rules are then also matched
+    with regular expressions, each counted as a single node.
     '''
 
     def __init__(
@@ -76,6 +84,26 @@ class Result():
         return string
 
 
+class DfaResult():
+    '''The parts of the parser's result used by ApgExp
+    for patterns matched by a DFA (see @ref dfa.py).
+    '''
+
+    def __init__(self, sub_begin, end):
+        '''The DfaResult class constructor. Only called internally by ApgExp.
+        @param sub_begin The index the match began at.
+        @param end The index following the matched phrase or -1.'''
+        if(end < 0):
+            self.state = id.NOMATCH
+            self.phrase_length = 0
+        else:
+            self.phrase_length = end - sub_begin
+            self.state = id.MATCH if(self.phrase_length) else id.EMPTY
+        # the DFA has no parse tree
+        self.node_hits = None
+        self.max_tree_depth = None
+
+
 class ApgExp():
     '''The ApgExp class provides a pattern-matching engine similar
     to JavaScript's [RegExp](https://developer.mozilla.org/en-US/docs/Web/JavaScript/Reference/Global_Objects/RegExp)'''
@@ -132,6 +160,11 @@ class ApgExp():
         self.pattern = pattern
         self.grammar = api.grammar
         self.parser = Parser(self.grammar)
+        # each match attempt parses the same input, convert it once
+        # - the parser keeps the last input until another is matched
+        self.parser.keep_input = True
+        # the failed match attempts need no error position
+        self.parser.error_position = False
         self.__ast = None
         if(self._trace_):
             mode = 'd' if(self._character_codes_) else 'dc'
@@ -141,17 +174,32 @@ class ApgExp():
         self.last_index = 0
         self.max_tree_depth = 0
         self.max_node_hits = 0
+        self.max_parse_time = 0
+        self.max_ast_records = 0
+        self.max_bkr_entries = 0
+        ## If True, match the patterns that are fully regular with
+        # their DFA (see @ref dfa.py), not the parser, and the regular
+        # rules of the others with regular expressions
+        # (see Parser.match_regex()). This is faster, but the results
+        # then have no node_hits or max_tree_depth, they are None,
+        # or count a regular rule as a single node.
+        self.use_dfa = False
+        self.__deadline = None
+        self.__last = None
 
     def __callback_factory(self, name):
         def fn(state, source, index, length, data):
             if(state == id.SEM_POST):
-                self.rules[name.lower()].append(source[index:index + length])
+                self.rules[name.lower()].append(
+                    tuple(source[index:index + length]))
         return fn
 
     def __get_input(self, input):
+        # the parser takes the string or tuple as is,
+        # the DFA takes the character codes
         if(self._character_codes_):
             if(isinstance(input, tuple)):
-                input_tuple = input
+                codes = input
             else:
                 # input must be a list or tuple of integers
                 msg = '"c" flag is set - '
@@ -159,27 +207,99 @@ class ApgExp():
                 raise Exception(msg)
         else:
             if(isinstance(input, str)):
-                input_tuple = utils.string_to_tuple(input)
+                codes = utils.string_to_codes(input)
             else:
                 # input must be a string
                 msg = '"c" flag is not set - '
                 msg += 'input must be a string'
                 raise Exception(msg)
-        return input_tuple
+        return (input, codes)
+
+    def __parse(self, input, sub_beg):
+        # patterns that are fully regular are matched with the
+        # start rule's DFA unless the match is traced, limited
+        # or the rule phrases are needed
+        (source, codes) = input
+        if(self.use_dfa and not(
+                self._trace_ or len(self.rules) or self.max_node_hits or
+                self.max_tree_depth or self.parser.budgets)):
+            dfa = grammar_dfa(self.grammar, self.parser.rules, 0)
+            if(dfa is not None):
+                return DfaResult(sub_beg, dfa.match(
+                    codes, sub_beg, len(codes)))
+        if(self.__deadline is not None):
+            # each match attempt has the time left to the method call
+            remaining = self.__deadline - time.monotonic()
+            if(remaining <= 0 and self.__last is not None):
+                raise LimitExceeded(
+                    'parse time limit exceeded, limit = %g seconds' %
+                    self.max_parse_time, self.__last)
+            self.parser.set_time_limit(max(remaining, 1e-9))
+        self.parser.regular_rules = self.use_dfa
+        self.__last = self.parser.parse(source, sub_begin=sub_beg)
+        return self.__last
+
+    def __start(self):
+        # the parse time limit applies to each exec(), test()
+        # or split() call as a whole
+        self.__last = None
+        self.__deadline = None
+        if(self.max_parse_time):
+            self.__deadline = time.monotonic() + self.max_parse_time
 
     def set_tree_depth(self, depth):
         '''Limit the maximum tree depth that the parser may make.
-        @param depth The maximum allowed tree node depth.
-        If the parser exceeds this limit an exception is raised.'''
+        @param depth The maximum allowed tree node depth,
+        0 for no limit.
+        If the parser exceeds this limit a LimitExceeded exception
+        is raised.
+        Note that earlier versions set the parser's node hit limit
+        instead, so the depth limited the number of node hits.'''
         self.max_tree_depth = max(0, depth)
-        self.parser.set_node_hit_limit(self.max_tree_depth)
+        self.parser.set_tree_depth_limit(
+            self.max_tree_depth or id.MAX_INT)
 
     def set_node_hits(self, hits):
         '''Limit the maximum number of parse tree nodes that the parser may visit.
-        @param hits The maximum allowed number of node hits the parser can make.
-        If the parser exceeds this limit an exception is raised.'''
+        @param hits The maximum allowed number of node hits the parser
+        can make, 0 for no limit.
+        If the parser exceeds this limit a LimitExceeded exception
+        is raised.'''
         self.max_node_hits = max(0, hits)
-        self.parser.set_node_hit_limit(self.max_node_hits)
+        self.parser.set_node_hit_limit(
+            self.max_node_hits or id.MAX_INT)
+
+    def set_parse_time(self, seconds):
+        '''Limit the time that each call to exec(), test() or split()
+        may take to find its matches.
+        @param seconds The maximum allowed time in seconds,
+        0 for no limit.
+        If the parser exceeds this limit a LimitExceeded exception
+        is raised.'''
+        self.max_parse_time = max(0, seconds)
+        self.parser.set_time_limit(self.max_parse_time)
+
+    def set_ast_records(self, records):
+        '''Limit the number of AST records that the parser may make
+        for the rule phrases (see include()).
+        @param records The maximum allowed number of AST records,
+        0 for no limit.
+        If the parser exceeds this limit a LimitExceeded exception
+        is raised.'''
+        self.max_ast_records = max(0, records)
+        self.parser.set_ast_record_limit(
+            self.max_ast_records or id.MAX_INT)
+
+    def set_bkr_entries(self, entries):
+        '''Limit the number of back referenced phrases that
+        the parser may keep.
+        @param entries The maximum allowed number of back referenced
+        phrases, 0 for no limit.
+        If the parser exceeds this limit a LimitExceeded exception
+        is raised.'''
+        self.max_bkr_entries = max(0, entries)
+        self.parser.set_bkr_entry_limit(
+            self.max_bkr_entries or id.MAX_INT)
 
     def define_udts(self, callbacks):
         '''UDTs are user-written callback functions for specialized pattern matching.
@@ -301,9 +421,10 @@ class ApgExp():
         @returns Returns the result object if pattern is matched.
         None otherwise.
         '''
-        input_tuple = self.__get_input(input)
+        self.__start()
+        input_codes = self.__get_input(input)
         sub_beg = self.last_index
-        sub_end = len(input_tuple)
+        sub_end = len(input)
         if(sub_beg >= sub_end):
             # user may have set bad value for last_index
             return None
@@ -312,7 +433,7 @@ class ApgExp():
             if(self._trace_):
                 print()
                 print('trace beginning at sticky character ' + str(sub_beg))
-            parser_result = self.parser.parse(input_tuple, sub_begin=sub_beg)
+            parser_result = self.__parse(input_codes, sub_beg)
             if(parser_result.state == id.MATCH
                or parser_result.state == id.EMPTY):
                 # set up return result
@@ -332,8 +453,7 @@ class ApgExp():
                 if(self._trace_):
                     print()
                     print('trace beginning at character ' + str(sub_beg))
-                parser_result = self.parser.parse(
-                    input_tuple, sub_begin=sub_beg)
+                parser_result = self.__parse(input_codes, sub_beg)
                 self.last_index = 0
                 if(parser_result.state == id.MATCH
                    or parser_result.state == id.EMPTY):
@@ -361,9 +481,10 @@ class ApgExp():
     def test(self, input):
         '''Same as @ref exec() except for the return.
         @returns Returns True if a pattern match is found, False otherwise.'''
-        input_tuple = self.__get_input(input)
+        self.__start()
+        input_codes = self.__get_input(input)
         sub_beg = self.last_index
-        sub_end = len(input_tuple)
+        sub_end = len(input)
         if(sub_beg >= sub_end):
             # user may have set bad value for last_index
             return False
@@ -372,7 +493,7 @@ class ApgExp():
             if(self._trace_):
                 print()
                 print('trace beginning at sticky character ' + str(sub_beg))
-            parser_result = self.parser.parse(input_tuple, sub_begin=sub_beg)
+            parser_result = self.__parse(input_codes, sub_beg)
             if(parser_result.state == id.MATCH
                or parser_result.state == id.EMPTY):
                 self.last_index = sub_beg +  \
@@ -385,8 +506,7 @@ class ApgExp():
                 if(self._trace_):
                     print()
                     print('trace beginning at character ' + str(sub_beg))
-                parser_result = self.parser.parse(
-                    input_tuple, sub_begin=sub_beg)
+                parser_result = self.__parse(input_codes, sub_beg)
                 self.last_index = 0
                 if(parser_result.state == id.MATCH
                    or parser_result.state == id.EMPTY):
@@ -432,25 +552,21 @@ class ApgExp():
                 return ['']
             gen = []
             for interval in intervals:
-                tup = input_tuple[interval[0]:interval[1]]
-                if(self._character_codes_):
-                    gen.append(tup)
-                else:
-                    gen.append(utils.tuple_to_string(tup))
+                gen.append(input[interval[0]:interval[1]])
             return gen
 
-        input_tuple = self.__get_input(input)
-        if(len(input_tuple) == 0):
+        self.__start()
+        input_codes = self.__get_input(input)
+        if(len(input) == 0):
             # input is empty, return empty string or character code array
             return gen_output([])
         if(limit <= 0):
             limit = sys.maxsize
         sub_beg = 0
-        sub_end = len(input_tuple)
+        sub_end = len(input)
         intervals = []
         while(sub_beg < sub_end and limit > 0):
-            parser_result = self.parser.parse(
-                input_tuple, sub_begin=sub_beg)
+            parser_result = self.__parse(input_codes, sub_beg)
             if(parser_result.state == id.MATCH):
                 limit -= 1
                 intervals.append(
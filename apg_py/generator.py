@@ -17,6 +17,7 @@ options:
                         for each rule, display the rules it references and all rules referring to it
   -da, --display-rule-attributes
                         for each rule, display the rule attributes (left-recursive, etc.)
+  -c, --compiled        write the rules as compiled Python functions for use with the compiled parser (CompiledParser) instead of the opcode tables
   --index               if specified, rules are displayed by index(the order they appear in the grammar), otherwise alphabetically
 
 NOTES: 1) Multiple input files can be specified with by comma-separated names. The files will be concatenated in the order in which they appear. 2) The output file name is
@@ -126,6 +127,15 @@ def main():
         help='for each rule, display the rule attributes (left-recursive, etc.)',
         dest='display_attributes',
         action='store_true')
+    hlp = 'write the rules as compiled Python functions '
+    hlp += 'for use with the compiled parser (CompiledParser) '
+    hlp += 'instead of the opcode tables'
+    parser.add_argument(
+        '-c',
+        '--compiled',
+        help=hlp,
+        dest='compiled',
+        action='store_true')
     hlp = 'if specified, rules are displayed by index'
     hlp += '(the order they appear in the grammar), '
     hlp += 'otherwise alphabetically'
@@ -186,5 +196,5 @@ def main():
 
     if(not args.dry_run):
         outname = args.output if(args.output) else result['default_output']
-        api.write_grammar(outname)
+        api.write_grammar(outname, args.compiled)
         print('grammar object written to file ' + outname)
@@ -2,6 +2,7 @@
 @brief A class for creating and translating the Abstract Syntax Tree (AST).'''
 
 import copy
+from array import array
 from apg_py.lib import identifiers as id
 
 
@@ -20,54 +21,49 @@ def inner_add_callback(nodes, name, callback):
         raise Exception('add_callback name not recognized', name)
 
 
-def inner_translate(input, nodes, records, data=None):
+def inner_translate(input, nodes, names, columns, data=None):
     '''Traverse the AST and call the user's callback functions for
     translation of the saved AST node phrases.
     Called by both the original AST
     and the shallow copy of the AST passed to the pattern-matching results.
     @param input The input string to the parser as a tuple of integers.
     @param nodes The list of AST nodes.
-    @param records The list of AST node records.
+    @param names The node names, indexed by node number.
+    @param columns The AST record columns (see @ref Ast.columns).
     @param data arbitary user data to be passed to the callback functions
     '''
+    # Note that the callback functions could be modified or
+    # removed (set to None)
+    # between the parsing of the input string and the translation
+    # of the AST. Therefore, there may be retained records for
+    # nodes that have no callback function assigned to them.
+    callbacks = [nodes[name] for name in names]
+    (record_nodes, states, indexes, lengths, links) = columns
     i = 0
-    while(i < len(records)):
-        record = records[i]
-        callback = nodes[record['name']]
-        if(record['state'] == id.SEM_PRE):
-            # Note that the callback functions could be modified or
-            # removed (set to None)
-            # between the parsing of the input string and the translation
-            # of the AST. Therefore, there may be retained records for
-            # nodes that have no callback function assigned to them.
-            if(callback):
-                ret = callback(
-                    id.SEM_PRE,
-                    input,
-                    record['phrase_index'],
-                    record['phrase_length'],
-                    data)
+    count = len(states)
+    while(i < count):
+        callback = callbacks[record_nodes[i]]
+        if(callback):
+            if(states[i] == id.SEM_PRE):
+                ret = callback(id.SEM_PRE, input, indexes[i], lengths[i],
+                               data)
                 if(ret == id.SEM_SKIP):
-                    callback(
-                        id.SEM_POST,
-                        input,
-                        record['phrase_index'],
-                        record['phrase_length'],
-                        data)
-                    i = record['that_record']
-        else:
-            if(callback):
-                callback(
-                    id.SEM_POST,
-                    input,
-                    record['phrase_index'],
-                    record['phrase_length'],
-                    data)
+                    callback(id.SEM_POST, input, indexes[i], lengths[i],
+                             data)
+                    i = links[i]
+            else:
+                callback(id.SEM_POST, input, indexes[i], lengths[i], data)
         i += 1
 
 
 class Ast():
-    '''A class for capturing the AST as the parser traverses the parse tree.'''
+    '''A class for capturing the AST as the parser traverses the parse tree.
+
+    The records are kept in parallel columns of integers,
+    one entry per record, rather than as a dictionary per record.
+    The nodes are numbered, the rules first in rule index order,
+    then the UDTs in UDT index order.
+    '''
 
     def __init__(self, parser):
         '''Class constructor.
@@ -76,12 +72,46 @@ class Ast():
         parser.ast = self
         self.input = []  # will be set by the parser
         self.indexStack = []
-        self.records = []
+        ## The node number of each record.
+        self.record_nodes = array('l')
+        ## The state of each record, SEM_PRE or SEM_POST.
+        self.record_states = array('l')
+        ## The phrase index of each record.
+        self.record_indexes = array('l')
+        ## The phrase length of each record.
+        self.record_lengths = array('l')
+        ## The index of the matching SEM_POST or SEM_PRE record.
+        self.record_links = array('l')
+        ## All of the record columns in the order
+        # (nodes, states, phrase indexes, phrase lengths, links).
+        self.columns = (self.record_nodes, self.record_states,
+                        self.record_indexes, self.record_lengths,
+                        self.record_links)
         self.nodes = {}
+        ## The lower case name of each node, by node number.
+        self.names = []
+        ## The node number of the first UDT.
+        self.udt_base = len(parser.rules)
         for rule in parser.rules:
             self.nodes[rule['lower']] = None
+            self.names.append(rule['lower'])
         for udt in parser.udts:
             self.nodes[udt['lower']] = None
+            self.names.append(udt['lower'])
+        ## The callback function of each node, by node number.
+        self.callbacks = [None] * len(self.names)
+        ## True if the records are translated at each commit of the parse
+        # (see @ref Ast.translate_on_commit()).
+        self.incremental = False
+        # the user data of the translations at the commits
+        self.commit_data = None
+        # the number of leading records already translated
+        self.translated = 0
+        # the record of the open node skipped by its callback, if any
+        self.skip = None
+        # the phrase index at the end of the latest parse,
+        # if it ran on a parse context (see adopt())
+        self.end = None
 
     def copy(self):
         '''Make a copy suitable for adding callback functions
@@ -95,17 +125,59 @@ class Ast():
         '''
         class ast_copy():
             def __init__(cls, ast_to_copy):
-                cls.input = copy.copy(ast_to_copy.input)
-                cls.records = copy.deepcopy(ast_to_copy.records)
+                input = ast_to_copy.input
+                # tuples, strings, memory views and memory maps
+                # are shared
+                cls.input = input.copy() if(
+                    isinstance(input, (list, bytearray, array))) else input
+                cls.columns = tuple(
+                    array('l', column) for column in ast_to_copy.columns)
                 cls.nodes = copy.copy(ast_to_copy.nodes)
+                cls.names = ast_to_copy.names
 
             def add_callback(cls, name, callback):
                 inner_add_callback(cls.nodes, name, callback)
 
             def translate(cls, data=None):
-                inner_translate(cls.input, cls.nodes, cls.records, data)
+                inner_translate(cls.input, cls.nodes, cls.names,
+                                cls.columns, data)
         return ast_copy(self)
 
+    def fork(self, parser):
+        '''Make an AST with its own, empty record columns
+        for a parse on a parse context (see Parser.context()),
+        so that parses on many contexts never share records.
+        The nodes and callback functions are shared with this AST.
+        @param parser The parse context.
+        @returns Returns the new AST.'''
+        ast = copy.copy(self)
+        ast.parser = parser
+        ast.indexStack = []
+        ast.record_nodes = array('l')
+        ast.record_states = array('l')
+        ast.record_indexes = array('l')
+        ast.record_lengths = array('l')
+        ast.record_links = array('l')
+        ast.columns = (ast.record_nodes, ast.record_states,
+                       ast.record_indexes, ast.record_lengths,
+                       ast.record_links)
+        ast.end = None
+        return ast
+
+    def adopt(self, ast):
+        '''Take over the records of a parse on a parse context.
+        The AST then holds the records of that parse,
+        as if it had run on the parser itself.
+        @param ast The AST of the parse context, from fork().'''
+        self.input = ast.input
+        self.indexStack = ast.indexStack
+        (self.record_nodes, self.record_states, self.record_indexes,
+         self.record_lengths, self.record_links) = ast.columns
+        self.columns = ast.columns
+        self.translated = ast.translated
+        self.skip = ast.skip
+        self.end = ast.parser.phrase_index
+
     def add_callback(self, name, callback):
         '''Add a callback function to the named AST node.
         @param name The name of the node to add the callback to.
@@ -121,59 +193,75 @@ class Ast():
             - data - the user-supplied data (see @ref Ast.translate()
         '''
         inner_add_callback(self.nodes, name, callback)
+        lower = name.lower()
+        for (node, node_name) in enumerate(self.names):
+            if(node_name == lower):
+                self.callbacks[node] = callback
 
-    def down(self, name):
+    @property
+    def records(self):
+        '''The AST records as a list of dictionaries.
+        The records are not stored this way, this is a (slow) view
+        for inspecting them.'''
+        records = []
+        for i in range(len(self.record_states)):
+            name = self.names[self.record_nodes[i]]
+            records.append({
+                'name': name,
+                'this_record': i,
+                'that_record': self.record_links[i],
+                'state': self.record_states[i],
+                'callback': self.nodes[name],
+                'phrase_index': self.record_indexes[i],
+                'phrase_length': self.record_lengths[i],
+            })
+        return records
+
+    def down(self, node, phrase_index=0):
         '''Saves an AST record as the parser traverses down through a
         node with an assigned callback function.
-        @param name The rule or UDT name of the node.
+        @param node The node number of the rule or UDT.
+        @param phrase_index Index of the first input character
+        of the node's phrase.
         '''
-        if(self.nodes[name]):
+        if(self.callbacks[node]):
             # only keep records for rule/UDT names that have callback functions
-            this_record = len(self.records)
-            self.indexStack.append(this_record)
-            self.records.append({
-                'name': name,
-                'this_record': this_record,
-                'that_record': None,
-                'state': id.SEM_PRE,
-                'callback': self.nodes[name],
-                'phrase_index': None,
-                'phrase_length': None,
-            })
+            self.indexStack.append(len(self.record_states))
+            self.record_nodes.append(node)
+            self.record_states.append(id.SEM_PRE)
+            # completed by up()
+            self.record_indexes.append(phrase_index)
+            self.record_lengths.append(0)
+            self.record_links.append(0)
 
-    def up(self, name, phrase_index, phrase_length):
+    def up(self, node, phrase_index, phrase_length):
         '''Saves an AST record as the parser traverses up through a
         node with an assigned callback function.
         Completes the matching "down" record with the information
         that was not available during the downward traversal of the node.
-        @param name The rule or UDT name of the node.
+        @param node The node number of the rule or UDT.
         @param phrase_index Index of the first input character of the matched phrase.
         @param phrase_length The number of input characters matched.
         '''
-        if(self.nodes[name]):
+        if(self.callbacks[node]):
             # only keep records for rule/UDT names that have callback functions
-            this_record = len(self.records)
+            this_record = len(self.record_states)
             that_record = self.indexStack.pop()
-            self.records.append({
-                'name': name,
-                'this_record': this_record,
-                'that_record': that_record,
-                'state': id.SEM_POST,
-                'callback': self.nodes[name],
-                'phrase_index': phrase_index,
-                'phrase_length': phrase_length,
-            })
-            self.records[that_record]['that_record'] = this_record
-            self.records[that_record]['phrase_index'] = phrase_index
-            self.records[that_record]['phrase_length'] = phrase_length
+            self.record_nodes.append(node)
+            self.record_states.append(id.SEM_POST)
+            self.record_indexes.append(phrase_index)
+            self.record_lengths.append(phrase_length)
+            self.record_links.append(that_record)
+            self.record_links[that_record] = this_record
+            self.record_indexes[that_record] = phrase_index
+            self.record_lengths[that_record] = phrase_length
 
     def save_state(self):
         '''Saves the state of the AST. Should be called by the RNM operators
         so that the state can be restored should the branch below fail.
-        The state is a list saving off the length of the list of
-        records and the index stack.
+        @returns Returns the number of records.
         '''
-        return [len(self.records), len(self.indexStack)]
+        return len(self.record_states)
 
     def restore_state(self, state):
         '''Restores the AST to a previously saved state.
@@ -182,13 +270,123 @@ class Ast():
         @param state the return value of a previous call
         to @ref Ast.save_state()
         '''
-        del self.records[state[0]:]
-        del self.indexStack[state[1]:]
+        for column in self.columns:
+            del column[state:]
+        # the open nodes whose records were removed
+        stack = self.indexStack
+        while(stack and stack[-1] >= state):
+            stack.pop()
+
+    def save_records(self, begin):
+        '''Make a copy of the records generated by a rule.
+        The record links are saved relative to the first record.
+        @param begin The index of the first record generated by the rule,
+        a previous return value of @ref Ast.save_state().
+        @returns Returns the copied columns or None if no records.'''
+        if(begin == len(self.record_states)):
+            return None
+        saved = [column[begin:] for column in self.columns]
+        links = saved[4]
+        for i in range(len(links)):
+            links[i] -= begin
+        return tuple(saved)
+
+    def replay_records(self, saved):
+        '''Append a copy of previously saved records.
+        @param saved The return value of a previous call
+        to @ref Ast.save_records().'''
+        begin = len(self.record_states)
+        for i in range(4):
+            self.columns[i].extend(saved[i])
+        links = self.record_links
+        for link in saved[4]:
+            links.append(link + begin)
 
     def clear(self):
         '''Clear the AST for reuse by the parser.'''
-        del self.records[0:]
+        for column in self.columns:
+            del column[0:]
         del self.indexStack[0:]
+        self.translated = 0
+        self.skip = None
+        self.end = None
+
+    def translate_on_commit(self, data=None):
+        '''Translate the AST while the input string is parsed.
+        Each time a cut commits the parse to the phrase matched so far
+        (see the cut operator in SABNF.md), the records saved
+        so far are translated and freed, so that the AST of a long
+        input string need not be held in memory all at once.
+        The nodes that are still open at a commit have their SEM_PRE
+        callback called with the phrase they have matched so far.
+        Call @ref Ast.translate() after the parse
+        to translate the remaining records.
+        The records are never translated at commits
+        if the parser has a memo table.
+        @param data User-supplied data which is made available to the
+        callback functions during the parse.
+        '''
+        self.incremental = True
+        self.commit_data = data
+
+    def commit(self, phrase_index):
+        '''Called by the parser when a cut commits the parse.
+        Translates the records saved since the last commit and
+        frees all of the records except those of the open nodes.
+        @param phrase_index The phrase index of the cut.
+        '''
+        self.translate_records(self.commit_data, phrase_index)
+        keep = self.indexStack
+        for column in self.columns:
+            column[0:] = array('l', [column[k] for k in keep])
+        if(self.skip is not None):
+            self.skip = keep.index(self.skip)
+        self.translated = len(keep)
+        self.indexStack = list(range(len(keep)))
+
+    def translate_records(self, data, phrase_index):
+        '''Translates the records that have not been translated yet.
+        @param data User-supplied data for the callback functions.
+        @param phrase_index The phrase index of the parser.
+        The phrases of the open nodes end here.
+        '''
+        callbacks = [self.nodes[name] for name in self.names]
+        (record_nodes, states, indexes, lengths, links) = self.columns
+        input = self.input
+        i = self.translated
+        count = len(states)
+        while(i < count):
+            if(self.skip is not None):
+                # the records of a node skipped by its callback function
+                post = links[self.skip]
+                if(post <= self.skip):
+                    # the node is still open
+                    break
+                self.skip = None
+                i = post
+            callback = callbacks[record_nodes[i]]
+            if(callback):
+                if(states[i] == id.SEM_PRE):
+                    index = indexes[i]
+                    if(links[i] > i):
+                        length = lengths[i]
+                    else:
+                        # an open node
+                        length = phrase_index - index
+                    ret = callback(id.SEM_PRE, input, index, length, data)
+                    if(ret == id.SEM_SKIP):
+                        if(links[i] > i):
+                            callback(id.SEM_POST, input, index, length,
+                                     data)
+                            i = links[i]
+                        else:
+                            self.skip = i
+                            continue
+                else:
+                    callback(id.SEM_POST, input, indexes[i], lengths[i],
+                             data)
+            i += 1
+        self.translated = i if(self.skip is None) else count
 
     def translate(self, data=None):
         '''Do a depth-first traversal of the AST nodes,
@@ -196,6 +394,15 @@ class Ast():
         1) if a record for the node has been created and
         2) if the user has attached a callback function to the node
         with @ref Ast.add_callback().
+        If the AST is translated on commits
+        (see @ref Ast.translate_on_commit()), only the records
+        not yet translated are.
         @param data User-supplied data which is made available to the
         callback functions but is otherwise ignored by the AST.'''
-        inner_translate(self.input, self.nodes, self.records, data)
+        if(self.incremental):
+            end = self.parser.phrase_index if(
+                self.end is None) else self.end
+            self.translate_records(data, end)
+            return
+        inner_translate(self.input, self.nodes, self.names, self.columns,
+                        data)
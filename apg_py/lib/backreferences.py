@@ -1,7 +1,16 @@
 ''' @file apg_py/lib/backreferences.py
 @brief Back reference stack class
 
-Used for both universal and recursive back referencing.'''
+Used for both universal and recursive back referencing.
+
+Every push is also recorded in a single journal of the stack names,
+in the order of the pushes.
+The state of all of the named stacks is then just the length
+of the journal and restoring a saved state pops the pushes
+made since, most recent first.
+The parser saves the state on nearly every ALT, CAT, REP
+and look around node visit, so the cost of saving no longer
+grows with the number of back referenced rules.'''
 
 
 class BackrefenceStack:
@@ -17,6 +26,8 @@ class BackrefenceStack:
         self.names = names
         for name in names:
             self.stack[name] = []
+        # the named stack of each push, in order
+        self.journal = []
 
     def save_phrase(self, name, offset, length):
         '''Pushes a phrase on the named stack.
@@ -27,6 +38,7 @@ class BackrefenceStack:
         '''
         assert(name in self.names)
         self.stack[name].append([offset, length])
+        self.journal.append(self.stack[name])
 
     def get_phrase(self, name):
         '''Retrieves the last phrase on the named stack.
@@ -39,21 +51,43 @@ class BackrefenceStack:
             return self.stack[name][length - 1]
         return None
 
+    def last_phrase(self, name):
+        '''Retrieves the last phrase on the named stack as a tuple,
+        e.g. to compare or to use as a dictionary key.
+        @param name The (lower case) rule or UDT name that captured the phrase.
+        @returns Returns the (offset, length) tuple of the last phrase
+        or None if none.
+        '''
+        phrases = self.stack[name]
+        if(phrases):
+            return tuple(phrases[-1])
+        return None
+
     def save_state(self):
         '''Save the stack state.
-        @returns Returns a list of the named stack lengths.
+        @returns Returns the number of phrases pushed so far.
         '''
-        state = []
-        for name in self.names:
-            state.append(len(self.stack[name]))
-        return state
+        return len(self.journal)
 
     def restore_state(self, state):
-        '''Restores all named stack lengths to a previously saved state.
+        '''Restores all named stacks to a previously saved state.
         @param state The return value from a previous call
         to @ref save_state().
         '''
-        i = 0
+        journal = self.journal
+        while(len(journal) > state):
+            journal.pop().pop()
+
+    def commit(self):
+        '''Frees all but the last phrase on each named stack.
+        Called when no earlier stack state will ever be restored,
+        i.e. when the parse has committed to the phrase matched so far.
+        The journal is left with the remaining phrases
+        so that restoring the state 0 still empties the stacks.
+        '''
+        del self.journal[0:]
         for name in self.names:
-            del self.stack[name][state[i]:]
-            i += 1
+            phrases = self.stack[name]
+            if(phrases):
+                del phrases[:-1]
+                self.journal.append(phrases)
@@ -0,0 +1,906 @@
+''' @file apg_py/lib/compiled_parser.py
+@brief A parser that compiles the grammar's rules into Python functions.
+
+The Parser (@ref parser.py) interprets the opcodes.
+For every node of the parse tree it looks up the opcode,
+selects the operator function from a dictionary
+and reads the opcode's fields.
+The CompiledParser instead generates Python source code for the grammar,
+one function for each rule, and compiles it once with compile().
+The rule's opcodes are generated inline: straight-line code for CAT,
+early-exit chains for ALT, loops for REP and inlined terminal comparisons.
+The repetition bounds and the terminal strings are constants
+in the generated code.
+As in the interpreter, when the parse is not observed by
+rule callback functions or an AST the regular rules are matched with
+their regular expressions (see @ref regex_rules.py), the nodes with
+too few characters left to match fail at once and the ALT children
+that cannot begin with the next character are skipped.
+
+The results, the AST, the rule and UDT callback functions,
+back referencing and look around are the same as for the Parser.
+Tracing, statistics and memoization are handled only by the opcode
+interpreter. If a Trace, Stats or Memo object is attached to the parser,
+the parse falls back to the interpreter.
+'''
+import types
+import weakref
+from apg_py.lib import identifiers as id
+from apg_py.lib.parser import Parser
+from apg_py.lib.regex_rules import grammar_regex_rules
+
+# the compiled code objects, keyed on the grammar objects
+_cache = weakref.WeakKeyDictionary()
+
+# the longest terminal string that is compared inline
+_INLINE_STRING = 16
+# the most character class ranges that are compared inline
+_INLINE_RANGES = 4
+# the deepest indentation and loop nesting of inlined opcodes,
+# well within the limits of the Python compiler
+_MAX_INDENT = 24
+_MAX_LOOPS = 8
+
+# functions and names needed by all of the generated functions
+_PRELUDE = """from bisect import bisect_right
+
+ACTIVE = %d
+MATCH = %d
+EMPTY = %d
+NOMATCH = %d
+
+
+def down_check(depth):
+    global max_depth, mark, hits_limit
+    if(depth >= depth_limit or hits >= hits_limit):
+        # the parser checks its limits with the statistics so far
+        parser.node_hits = hits
+        parser.max_tree_depth = max(max_depth, depth)
+        parser.max_phrase_length = max_i - sub_begin
+        parser.check_limits(depth)
+        hits_limit = parser.hits_check
+    if(depth > max_depth):
+        max_depth = depth
+        mark = min(depth + 1, depth_limit)
+
+
+def tls_match(i, string, text):
+    # compare with the case folded input, if any (see Parser.fold())
+    folded = parser.folded
+    if(folded is None):
+        folded = parser.fold()
+    base = parser.fold_base
+    if(folded and i >= base):
+        return folded.startswith(text, i - base)
+    for char in string:
+        ichar = input[i]
+        if(ichar >= 65 and ichar <= 90):
+            ichar += 32
+        if(char != ichar):
+            return False
+        i += 1
+    return True
+
+
+def tbs_match(i, string):
+    for char in string:
+        if(char != input[i]):
+            return False
+        i += 1
+    return True
+
+
+def cls_table(ranges):
+    bitmap = bytearray(256)
+    for (min, max) in ranges:
+        for char in range(min, 1 + (max if(max < 256) else 255)):
+            bitmap[char] = 1
+    return (bytes(bitmap), tuple(r[0] for r in ranges),
+            tuple(r[1] for r in ranges))
+
+
+def cls_match(char, table):
+    if(char < 256):
+        return table[0][char]
+    k = bisect_right(table[1], char) - 1
+    return k >= 0 and char <= table[2][k]
+
+
+def udt_ahead(i, index):
+    udt = udts[index]
+    lower = udt['lower']
+    cbData['state'] = ACTIVE
+    cbData['phrase_index'] = i
+    cbData['phrase_length'] = 0
+    cbData['max_phrase_length'] = max_i - sub_begin
+    udt_callbacks[index](cbData)
+    parser.UDTValidate(
+        cbData['state'],
+        i,
+        cbData['phrase_length'],
+        sub_end,
+        udt['name'],
+        udt['empty'])
+    state = cbData['state']
+    if(state != NOMATCH):
+        if(ast and not look):
+            node = ast.udt_base + index
+            ast.down(node)
+            ast.up(node, cbData['phrase_index'], cbData['phrase_length'])
+        if(udt['is_bkru']):
+            bkru.save_phrase(
+                lower, cbData['phrase_index'], cbData['phrase_length'])
+        if(udt['is_bkrr']):
+            bkrr.save_phrase(
+                lower, cbData['phrase_index'], cbData['phrase_length'])
+    return state, i + cbData['phrase_length']
+
+
+def udt_behind(index):
+    msg = 'UDT('
+    msg += udts[index]['name']
+    msg += ') called. '
+    msg += 'UDTs not allowed in look behind mode (operators && and !!).'
+    raise Exception(msg)
+
+
+def bkr_ahead(i, lower, mode, case):
+    if(mode == %d):
+        phrase = bkru.get_phrase(lower)
+    else:
+        phrase = bkrr.get_phrase(lower)
+    bkr_index = phrase[0]
+    bkr_length = phrase[1]
+    if(bkr_length == 0):
+        return EMPTY, i
+    if(i + bkr_length > sub_end):
+        return NOMATCH, i
+    if(case == %d):
+        folded = parser.folded
+        if(folded is None):
+            folded = parser.fold()
+        base = parser.fold_base
+        if(folded and i >= base and bkr_index >= base):
+            j = bkr_index - base
+            if(folded[j:j + bkr_length] !=
+               folded[i - base:i - base + bkr_length]):
+                return NOMATCH, i
+            return MATCH, i + bkr_length
+    for j in range(bkr_length):
+        bkr_char = input[bkr_index + j]
+        input_char = input[i + j]
+        if(case == %d):
+            if(bkr_char >= 65 and bkr_char <= 90):
+                bkr_char += 32
+            if(input_char >= 65 and input_char <= 90):
+                input_char += 32
+        if(bkr_char != input_char):
+            return NOMATCH, i
+    return MATCH, i + bkr_length
+
+
+def regex_ahead(i, index):
+    # match a regular rule with its regular expression or DFA
+    # instead of its opcodes (see Parser.match_regex())
+    global max_i
+    parser.phrase_index = i
+    parser.lookaround = look
+    parser.max_phrase_length = max_i - sub_begin
+    if(not parser.match_regex(index)):
+        return None, i
+    max_i = parser.max_phrase_length + sub_begin
+    return parser.state, parser.phrase_index
+
+
+def commit(i):
+    # a cut has committed the parse
+    parser.phrase_index = i
+    parser.commit()
+
+
+def bkr_behind(name):
+    msg = 'BKR('
+    msg += name
+    msg += ') called. '
+    msg += 'Back referencing not allowed in look behind mode '
+    msg += '(operators && and !!).'
+    raise Exception(msg)
+""" % (id.ACTIVE, id.MATCH, id.EMPTY, id.NOMATCH,
+       id.BKR_MODE_UM, id.BKR_MODE_CI, id.BKR_MODE_CI)
+
+
+class CompiledParser(Parser):
+    '''A parser that runs the grammar compiled to Python functions.
+    It is used exactly like @ref Parser.
+    <pre>
+    parser = CompiledParser(grammar)
+    result = parser.parse(input)
+    </pre>
+    The grammar is compiled only once,
+    all parsers for the same grammar object share the compiled code.
+
+    The grammar can also be a grammar file written
+    already compiled by Api.write_grammar(fname, compiled=True)
+    (or the generator's --compiled option).
+    Such a grammar file has no opcodes, so tracing,
+    statistics and memoization are not available.
+    '''
+
+    runs_compiled = True
+
+    def __init__(self, grammar):
+        '''CompiledParser constructor.
+        @param grammar The grammar object generated from an SABNF grammar
+        by the API (see @ref api.py).'''
+        super().__init__(grammar)
+        self.is_compiled = getattr(grammar, 'is_compiled', False)
+        self.code = None
+        if(not self.is_compiled):
+            self.code = _cache.get(grammar, None)
+            if(self.code is None):
+                found = grammar_regex_rules(grammar, self.rules)
+                source = generate_source(
+                    self.rules,
+                    self.udts,
+                    grammar.has_bkru,
+                    grammar.has_bkrr,
+                    [k for (k, entry) in enumerate(found)
+                     if(entry is not None)])
+                self.code = compile(
+                    source, '<apg_py compiled grammar>', 'exec')
+                _cache[grammar] = self.code
+        # the namespaces not in use by a parse,
+        # concurrent parses each take their own
+        self.namespaces = [self.namespace()]
+        self.compiled_start = False
+
+    def namespace(self):
+        '''Only called internally by the parser,
+        never called explicitly by the user.
+        Makes a namespace of the compiled functions.
+        The parse state is kept in the namespace's global variables.
+        @returns Returns the namespace dictionary.
+        '''
+        functions = {}
+        if(self.is_compiled):
+            # each parser gets its own copy of the grammar file's functions
+            for (name, value) in vars(self.grammar).items():
+                if(isinstance(value, types.FunctionType)):
+                    value = types.FunctionType(
+                        value.__code__, functions, name)
+                functions[name] = value
+        else:
+            exec(self.code, functions)
+        return functions
+
+    def configure(self, start_rule, user_data):
+        '''Only called internally by the parser,
+        never called explicitly by the user.
+        The arguments are the same as for @ref Parser.configure().'''
+        if(self.is_compiled and (self.trace or self.stats or self.memo)):
+            raise Exception('trace, stats and memo are not available '
+                            'for a compiled grammar file')
+        super().configure(start_rule, user_data)
+
+    def reset(self, sub_begin, sub_length):
+        '''Only called internally by the parser,
+        never called explicitly by the user.
+        Runs the compiled start rule in the next parse unless
+        it is observed. The arguments are the same as
+        for @ref Parser.reset().'''
+        super().reset(sub_begin, sub_length)
+        self.compiled_start = not(self.trace or self.stats or self.memo)
+
+    def opExecute(self, op_index):
+        '''Only called internally by the parser,
+        never called explicitly by the user.
+        Runs the compiled start rule if the parse is not
+        falling back to the interpreter.
+        '''
+        if(self.compiled_start):
+            self.compiled_start = False
+            self.execute_compiled()
+        else:
+            super().opExecute(op_index)
+
+    def execute_compiled(self):
+        '''Only called internally by the parser,
+        never called explicitly by the user.
+        Initializes the parser's state in the compiled functions'
+        namespace, executes the start rule and copies the state back.
+        '''
+        try:
+            functions = self.namespaces.pop()
+        except IndexError:
+            # all are in use by other parses
+            functions = self.namespace()
+        functions['parser'] = self
+        functions['input'] = self.input
+        functions['input_len'] = len(self.input)
+        functions['sub_begin'] = self.sub_begin
+        functions['sub_end'] = self.sub_end
+        functions['cbData'] = self.cbData
+        functions['callbacks'] = self.rule_callbacks
+        functions['udt_callbacks'] = self.udt_callbacks
+        functions['udts'] = self.udts
+        functions['ast'] = self.ast
+        functions['bkru'] = self.bkru_stack
+        functions['bkrr'] = self.bkrr_stack
+        functions['hits'] = 0
+        functions['hits_limit'] = self.hits_check
+        functions['depth_limit'] = self.tree_depth_limit
+        functions['max_depth'] = 0
+        functions['mark'] = min(1, self.tree_depth_limit)
+        functions['max_i'] = self.sub_begin
+        functions['look'] = 0
+        functions['cut'] = False
+        functions['choices'] = 0
+        functions['look_table'] = self.look_table if(
+            self.look_cache) else None
+        functions['prune'] = self.prune
+        functions['prune_behind'] = self.prune_behind
+        functions['regex'] = self.regex
+        start = functions['rule_%d_a' % self.start_rule]
+        try:
+            self.state, self.phrase_index = start(self.sub_begin, 1)
+        finally:
+            self.node_hits = functions['hits']
+            self.max_tree_depth = functions['max_depth']
+            self.max_phrase_length = functions['max_i'] - self.sub_begin
+            # set by the regular expression matches
+            self.lookaround = 0
+            functions['input'] = None
+            functions['cbData'] = None
+            functions['parser'] = None
+            self.namespaces.append(functions)
+
+
+def generate_source(rules, udts, has_bkru, has_bkrr, regular=()):
+    '''Generate the Python source code for a grammar.
+    Each rule gets a function rule_&lt;index&gt;_a for look ahead
+    (and normal) mode. Rules that can be reached in look behind mode
+    get a second function, rule_&lt;index&gt;_b.
+    Opcodes nested too deeply are split off into functions
+    op_&lt;rule index&gt;_&lt;opcode index&gt;_a (or _b).
+    Each function has the prototype
+    <pre>state, phrase_index = func(phrase_index, tree_depth)</pre>
+    @param rules The grammar's rules with compiled opcodes
+    (see @ref opcodes.py).
+    @param udts The grammar's UDTs.
+    @param has_bkru True if the grammar has universal mode back references.
+    @param has_bkrr True if the grammar has recursive mode back references.
+    @param regular The indexes of the regular rules
+    (see @ref regex_rules.py). Their functions match the rule's
+    regular expression instead of the opcodes when the parse enables it.
+    @returns Returns the source code as a string.
+    '''
+    return _Generator(rules, udts, has_bkru, has_bkrr, regular).generate()
+
+
+class _Generator():
+    '''For internal use only.
+    Generates the source code for @ref generate_source().
+    Each rule's opcodes are generated inline in the rule's function:
+    straight-line code for CAT, early-exit chains for ALT, loops for REP
+    and inlined terminal comparisons.
+    Opcodes nested too deeply for the Python compiler are split off
+    into functions of their own.'''
+
+    def __init__(self, rules, udts, has_bkru, has_bkrr, regular):
+        self.rules = rules
+        self.udts = udts
+        self.has_bkru = has_bkru
+        self.has_bkrr = has_bkrr
+        self.regular = frozenset(regular)
+        self.lines = []
+        self.tables = []
+        self.done = set()
+        self.todo = []
+        # the cut and choices globals are only needed with cuts
+        self.has_cut = False
+        for rule in rules:
+            for op in rule['opcodes']:
+                if(op.type == id.CUT):
+                    self.has_cut = True
+
+    def generate(self):
+        self.lines.append(_PRELUDE)
+        for rule in reversed(self.rules):
+            self.require('rule', rule['index'], 0, False)
+        while(self.todo):
+            (kind, rule_index, op_index, behind) = self.todo.pop()
+            if(kind == 'rule'):
+                self.rule_function(rule_index, behind)
+            else:
+                self.op_function(rule_index, op_index, behind)
+        if(self.tables):
+            # the character class tables
+            self.lines.append('')
+            self.lines.append('')
+            self.lines += self.tables
+        return '\n'.join(self.lines) + '\n'
+
+    def require(self, kind, rule_index, op_index, behind):
+        '''Schedule a function to be generated, if not already done.
+        @returns Returns the function name.'''
+        key = (kind, rule_index, op_index, behind)
+        if(key not in self.done):
+            self.done.add(key)
+            self.todo.append(key)
+        suffix = 'b' if(behind) else 'a'
+        if(kind == 'rule'):
+            return 'rule_%d_%s' % (rule_index, suffix)
+        return 'op_%d_%d_%s' % (rule_index, op_index, suffix)
+
+    def emit(self, indent, line):
+        self.lines.append('    ' * indent + line)
+
+    def header(self, name, comment):
+        self.lines.append('')
+        self.lines.append('')
+        self.lines.append('def %s(i, d):' % name)
+        self.emit(1, '# ' + comment)
+        if(self.has_cut):
+            self.emit(1, 'global hits, max_i, look, cut, choices')
+        else:
+            self.emit(1, 'global hits, max_i, look')
+
+    def down(self, indent, depth):
+        '''Count the node hit and check the limits.'''
+        self.emit(indent, 'hits += 1')
+        self.emit(indent, 'if(%s >= mark or hits >= hits_limit):' % depth)
+        self.emit(indent + 1, 'down_check(%s)' % depth)
+
+    def save_bkr(self, indent, n):
+        if(self.has_bkru):
+            self.emit(indent, 'saveu_%d = bkru.save_state()' % n)
+        if(self.has_bkrr):
+            self.emit(indent, 'saver_%d = bkrr.save_state()' % n)
+
+    def restore_bkr(self, indent, n):
+        if(self.has_bkru):
+            self.emit(indent, 'bkru.restore_state(saveu_%d)' % n)
+        if(self.has_bkrr):
+            self.emit(indent, 'bkrr.restore_state(saver_%d)' % n)
+
+    def rule_function(self, rule_index, behind):
+        rule = self.rules[rule_index]
+        lower = repr(rule['lower'])
+        self.header(self.require('rule', rule_index, 0, behind),
+                    'RNM(' + rule['name'] + ')')
+        self.down(1, 'd')
+        if(rule['has_bkrr']):
+            self.emit(1, 'save_rule = bkrr.save_state()')
+        self.emit(1, 'begin = i')
+        self.emit(1, 'callback = callbacks[%d]' % rule_index)
+        self.emit(1, 'if(callback):')
+        self.emit(2, "cbData['state'] = ACTIVE")
+        self.emit(2, "cbData['phrase_index'] = i")
+        self.emit(2, "cbData['phrase_length'] = 0")
+        self.emit(2, "cbData['max_phrase_length'] = max_i - sub_begin")
+        self.emit(2, 'callback(cbData)')
+        if(not behind):
+            # the AST is never kept in look behind mode
+            self.emit(1, 'keep = ast and not look')
+            self.emit(1, 'if(keep):')
+            self.emit(2, 'saved = ast.save_state()')
+            self.emit(2, 'ast.down(%d, i)' % rule_index)
+        if(rule_index in self.regular and not behind):
+            # the rule's regular expression, if it is enabled
+            self.emit(1, 'state = None')
+            self.emit(1, 'if(regex is not None and regex[%d] is not None):'
+                      % rule_index)
+            self.emit(2, 'state, i = regex_ahead(i, %d)' % rule_index)
+            self.emit(1, 'if(state is None):')
+            self.node(2, rule_index, 0, behind, 1, 0)
+        elif(len(rule['opcodes'])):
+            self.node(1, rule_index, 0, behind, 1, 0)
+        if(behind):
+            self.emit(1, 'length = begin - i')
+            self.emit(1, 'begin = i')
+        else:
+            self.emit(1, 'length = i - begin')
+        self.emit(1, 'if(callback):')
+        self.emit(2, "cbData['state'] = state")
+        self.emit(2, "cbData['phrase_length'] = length")
+        self.emit(2, "cbData['phrase_index'] = begin")
+        self.emit(2, 'callback(cbData)')
+        if(not behind):
+            self.emit(1, 'if(state == NOMATCH):')
+            self.emit(2, 'if(keep):')
+            self.emit(3, 'ast.restore_state(saved)')
+            self.emit(1, 'else:')
+            self.emit(2, 'if(keep):')
+            self.emit(3, 'ast.up(%d, begin, length)' % rule_index)
+        elif(rule['is_bkru'] or rule['is_bkrr']):
+            self.emit(1, 'if(state != NOMATCH):')
+        # save the phrase for later back referencing
+        if(rule['is_bkru']):
+            self.emit(2, 'bkru.save_phrase(%s, begin, length)' % lower)
+        if(rule['is_bkrr']):
+            self.emit(2, 'bkrr.save_phrase(%s, begin, length)' % lower)
+        if(rule['has_bkrr']):
+            self.emit(1, 'bkrr.restore_state(save_rule)')
+        self.emit(1, 'return state, i')
+
+    def op_function(self, rule_index, op_index, behind):
+        rule = self.rules[rule_index]
+        name = self.require('op', rule_index, op_index, behind)
+        self.header(name, 'opcode %d of RNM(%s)' % (op_index, rule['name']))
+        self.node(1, rule_index, op_index, behind, 0, 0, inline=True)
+        self.emit(1, 'return state, i')
+
+    def node(self, indent, rule_index, op_index, behind, offset, loops,
+             inline=False):
+        '''Generate the code for a node that leaves
+        its state in "state" and the phrase index in "i".
+        @param indent The indentation level of the code.
+        @param rule_index The index of the rule the opcode belongs to.
+        @param op_index The index of the opcode.
+        @param behind True if in look behind mode.
+        @param offset The node's tree depth relative to the function's "d".
+        @param loops The number of loops the code is nested in.
+        @param inline If True, always generate the node inline.
+        '''
+        op = self.rules[rule_index]['opcodes'][op_index]
+        depth = 'd + %d' % offset if(offset) else 'd'
+        if(op.type == id.RNM):
+            if(op.min_length):
+                # too few characters left to match
+                self.emit(indent, 'if(%s):' % self.too_short(op, behind))
+                self.down(indent + 1, depth)
+                self.emit(indent + 1, 'state = NOMATCH')
+                self.emit(indent, 'else:')
+                indent += 1
+            if(op.choice):
+                # the rule's cuts can not commit the parse
+                self.emit(indent, 'choices += 1')
+            self.emit(indent, 'state, i = %s(i, %s)' % (
+                self.require('rule', op.index, 0, behind), depth))
+            if(op.choice):
+                self.emit(indent, 'choices -= 1')
+            return
+        nested = (op.type == id.ALT or op.type == id.CAT
+                  or op.type == id.REP or op.type == id.AND
+                  or op.type == id.NOT or op.type == id.BKA
+                  or op.type == id.BKN)
+        if(nested and not inline and
+           (indent >= _MAX_INDENT or loops >= _MAX_LOOPS)):
+            # too deeply nested, split off into a function
+            self.emit(indent, 'state, i = %s(i, %s)' % (
+                self.require('op', rule_index, op_index, behind), depth))
+            return
+        self.down(indent, depth)
+        if((op.type == id.CAT or op.type == id.REP) and op.min_length):
+            # too few characters left to match
+            self.emit(indent, 'if(%s):' % self.too_short(op, behind))
+            self.emit(indent + 1, 'state = NOMATCH')
+            self.emit(indent, 'else:')
+            indent += 1
+        if(op.type == id.ALT):
+            self.alt(indent, rule_index, op_index, op, behind, offset, loops)
+        elif(op.type == id.CAT):
+            self.cat(indent, rule_index, op_index, op, behind, offset, loops)
+        elif(op.type == id.REP):
+            self.rep(indent, rule_index, op_index, op, behind, offset, loops)
+        elif(nested):
+            self.look(indent, rule_index, op_index, op, offset, loops)
+        elif(op.type == id.TRG):
+            if(behind):
+                # same as the interpreter, the first input character
+                # is never matched in look behind mode
+                self.emit(indent, 'if(i > 1 and %d <= input[i - 1] <= %d):'
+                          % (op.min, op.max))
+            else:
+                self.emit(indent, 'if(i < sub_end and %d <= input[i] <= %d):'
+                          % (op.min, op.max))
+            self.matched(indent, '1', behind)
+        elif(op.type == id.CLS):
+            if(behind):
+                # a class merged from TRGs has the TRG floor
+                self.emit(indent, 'if(i >= %d and %s):'
+                          % (op.floor, self.char_class(op, 'input[i - 1]')))
+            else:
+                self.emit(indent, 'if(i < sub_end and %s):'
+                          % self.char_class(op, 'input[i]'))
+            self.matched(indent, '1', behind)
+        elif(op.type == id.TLS or op.type == id.TBS):
+            self.string(indent, op, behind)
+        elif(op.type == id.UDT):
+            if(behind):
+                self.emit(indent, 'udt_behind(%d)' % op.index)
+            else:
+                self.emit(indent, 'state, i = udt_ahead(i, %d)' % op.index)
+                self.emit(indent, 'if(i > max_i and not look):')
+                self.emit(indent + 1, 'max_i = i')
+        elif(op.type == id.BKR):
+            if(behind):
+                self.emit(indent, 'bkr_behind(%r)' % op.name)
+            else:
+                self.emit(indent, 'state, i = bkr_ahead(i, %r, %d, %d)' % (
+                    op.lower, op.bkr_mode, op.bkr_case))
+                self.emit(indent, 'if(i > max_i and not look):')
+                self.emit(indent + 1, 'max_i = i')
+        elif(op.type == id.ABG):
+            self.emit(indent, 'state = EMPTY if(i == 0) else NOMATCH')
+        elif(op.type == id.AEN):
+            self.emit(indent, 'state = EMPTY if(i == input_len) else NOMATCH')
+        elif(op.type == id.CUT):
+            self.emit(indent, 'state = EMPTY')
+            if(op.commits):
+                self.emit(indent, 'cut = True')
+            if(not op.choice and not behind):
+                self.emit(indent, 'if(not look and not choices):')
+                self.emit(indent + 1, 'commit(i)')
+        else:
+            raise Exception('compiled parser: unrecognized opcode', op.type)
+
+    def too_short(self, op, behind):
+        '''The test for too few characters left to match an opcode
+        (see Parser.too_short()).'''
+        if(behind):
+            return 'prune_behind and i < %d' % op.min_length
+        return 'prune and sub_end - i < %d' % op.min_length
+
+    def alt_child(self, indent, rule_index, op, child, behind, offset,
+                  loops):
+        '''Generate an ALT child, skipped if its first character set
+        excludes the next input character, as for the ALT lookup table
+        (see Parser.opALT()).'''
+        if(behind or op.alt_table is None):
+            self.node(indent, rule_index, child, behind, offset, loops)
+            return
+        if(child in op.alt_default):
+            # skipped only for the characters in the table without it
+            chars = [char for (char, children) in op.alt_table.items()
+                     if(child not in children)]
+            if(not chars):
+                self.node(indent, rule_index, child, behind, offset, loops)
+                return
+            test = 'prune and i < sub_end and input[i] in %s'
+        else:
+            # tried only for the characters in the table with it
+            chars = [char for (char, children) in op.alt_table.items()
+                     if(child in children)]
+            test = 'prune and not(i < sub_end and input[i] in %s)'
+        name = 'alt_%d' % len(self.tables)
+        self.tables.append('%s = frozenset(%r)' % (name, sorted(chars)))
+        self.emit(indent, 'if(%s):' % (test % name))
+        self.emit(indent + 1, 'state = NOMATCH')
+        self.emit(indent, 'else:')
+        self.node(indent + 1, rule_index, child, behind, offset, loops)
+
+    def alt(self, indent, rule_index, n, op, behind, offset, loops):
+        self.emit(indent, '# ALT(%d)' % len(op.children))
+        self.emit(indent, 'index_%d = i' % n)
+        children = op.children
+        if(behind):
+            children = tuple(reversed(children))
+        else:
+            self.save_bkr(indent, n)
+        test = 'if(state == NOMATCH):'
+        if(op.commits):
+            self.emit(indent, 'outer_%d = cut' % n)
+            self.emit(indent, 'cut = False')
+            # a child committed by a cut fails the ALT
+            test = 'if(state == NOMATCH and not cut):'
+        self.alt_child(indent, rule_index, op, children[0], behind,
+                       offset + 1, loops)
+        for child in children[1:]:
+            # try the next child only if the previous children all failed
+            self.emit(indent, test)
+            self.emit(indent + 1, 'i = index_%d' % n)
+            if(not behind):
+                self.restore_bkr(indent + 1, n)
+            if(op.commits):
+                self.emit(indent + 1, 'cut = False')
+            self.alt_child(indent + 1, rule_index, op, child, behind,
+                           offset + 1, loops)
+        if(op.commits):
+            self.emit(indent, 'cut = outer_%d' % n)
+        self.emit(indent, 'if(state == NOMATCH):')
+        self.emit(indent + 1, 'i = index_%d' % n)
+        if(not behind):
+            self.restore_bkr(indent + 1, n)
+        self.emit(indent, 'else:')
+        if(behind):
+            self.emit(indent + 1, 'state = MATCH')
+        else:
+            self.emit(indent + 1,
+                      'state = MATCH if(i > index_%d) else EMPTY' % n)
+
+    def cat(self, indent, rule_index, n, op, behind, offset, loops):
+        self.emit(indent, '# CAT(%d)' % len(op.children))
+        children = op.children
+        if(behind):
+            children = tuple(reversed(children))
+        else:
+            self.emit(indent, 'keep_%d = ast and not look' % n)
+            self.emit(indent, 'if(keep_%d):' % n)
+            self.emit(indent + 1, 'saved_%d = ast.save_state()' % n)
+        self.emit(indent, 'index_%d = i' % n)
+        if(not behind):
+            self.save_bkr(indent, n)
+        self.node(indent, rule_index, children[0], behind, offset + 1, loops)
+        for child in children[1:]:
+            # continue only if the previous children all succeeded
+            self.emit(indent, 'if(state != NOMATCH):')
+            self.node(indent + 1, rule_index, child, behind, offset + 1,
+                      loops)
+        self.emit(indent, 'if(state == NOMATCH):')
+        self.emit(indent + 1, 'i = index_%d' % n)
+        if(not behind):
+            self.restore_bkr(indent + 1, n)
+            self.emit(indent + 1, 'if(keep_%d):' % n)
+            self.emit(indent + 2, 'ast.restore_state(saved_%d)' % n)
+        self.emit(indent, 'else:')
+        self.emit(indent + 1, 'state = MATCH')
+
+    def rep(self, indent, rule_index, n, op, behind, offset, loops):
+        rep_max = str(op.max) if(op.max < id.MAX_INT) else 'inf'
+        self.emit(indent, '# REP(%d,%s)' % (op.min, rep_max))
+        count = op.min > 0 or op.max < id.MAX_INT
+        if(count):
+            self.emit(indent, 'count_%d = 0' % n)
+        self.emit(indent, 'index_%d = i' % n)
+        self.emit(indent, 'state = ACTIVE')
+        if(not behind):
+            self.emit(indent, 'keep_%d = ast and not look' % n)
+        if(op.commits):
+            self.emit(indent, 'outer_%d = cut' % n)
+        self.emit(indent, 'while(i < sub_end):')
+        if(op.commits):
+            self.emit(indent + 1, 'cut = False')
+        self.save_bkr(indent + 1, n)
+        if(not behind):
+            self.emit(indent + 1, 'if(keep_%d):' % n)
+            self.emit(indent + 2, 'saved_%d = ast.save_state()' % n)
+        self.node(indent + 1, rule_index, n + 1, behind, offset + 1,
+                  loops + 1)
+        self.emit(indent + 1, 'if(state == EMPTY):')
+        self.emit(indent + 2, 'break')
+        self.emit(indent + 1, 'if(state == NOMATCH):')
+        self.restore_bkr(indent + 2, n)
+        if(not behind):
+            self.emit(indent + 2, 'if(keep_%d):' % n)
+            self.emit(indent + 3, 'ast.restore_state(saved_%d)' % n)
+        self.emit(indent + 2, 'break')
+        if(count):
+            self.emit(indent + 1, 'count_%d += 1' % n)
+        if(op.max < id.MAX_INT):
+            self.emit(indent + 1, 'if(count_%d == %d):' % (n, op.max))
+            self.emit(indent + 2, 'break')
+        test = 'if'
+        if(op.commits):
+            self.emit(indent, 'committed_%d = state == NOMATCH and cut' % n)
+            self.emit(indent, 'cut = outer_%d' % n)
+            # a repetition committed by a cut fails the REP
+            self.emit(indent, 'if(committed_%d):' % n)
+            self.emit(indent + 1, 'state = NOMATCH')
+            test = 'elif'
+        if(op.min > 0):
+            self.emit(indent, '%s(state == EMPTY or count_%d >= %d):' %
+                      (test, n, op.min))
+            self.emit(indent + 1,
+                      'state = EMPTY if(i == index_%d) else MATCH' % n)
+            self.emit(indent, 'else:')
+            self.emit(indent + 1, 'state = NOMATCH')
+        elif(op.commits):
+            self.emit(indent, 'else:')
+            self.emit(indent + 1,
+                      'state = EMPTY if(i == index_%d) else MATCH' % n)
+        else:
+            self.emit(indent, 'state = EMPTY if(i == index_%d) else MATCH' % n)
+
+    def look(self, indent, rule_index, n, op, offset, loops):
+        names = {id.AND: 'AND', id.NOT: 'NOT', id.BKA: 'BKA', id.BKN: 'BKN'}
+        self.emit(indent, '# ' + names[op.type])
+        self.emit(indent, 'index_%d = i' % n)
+        child = self.rules[rule_index]['opcodes'][n + 1]
+        if((op.type == id.BKA or op.type == id.BKN) and child.min_length):
+            # too few characters behind to match, BKA fails, BKN succeeds
+            self.emit(indent, 'if(prune_behind and i < %d):'
+                      % child.min_length)
+            self.emit(indent + 1, 'state = %s' % (
+                'NOMATCH' if(op.type == id.BKA) else 'EMPTY'))
+            self.emit(indent, 'else:')
+            indent += 1
+        # the cached result, if any (see Parser.look_find())
+        key = '%d, %d, i' % (rule_index, n)
+        for (mode, name) in op.look_bkrs or ():
+            key += ', %s.last_phrase(%r)' % (
+                'bkru' if(mode == id.BKR_MODE_UM) else 'bkrr', name)
+        self.emit(indent, 'state = None')
+        self.emit(indent, 'if(look_table is not None):')
+        self.emit(indent + 1, 'key_%d = (%s)' % (n, key))
+        self.emit(indent + 1, 'state = look_table.get(key_%d)' % n)
+        self.emit(indent, 'if(state is None):')
+        indent += 1
+        self.emit(indent, 'look += 1')
+        self.save_bkr(indent, n)
+        self.node(indent, rule_index, n + 1,
+                  op.type == id.BKA or op.type == id.BKN, offset + 1, loops)
+        self.restore_bkr(indent, n)
+        self.emit(indent, 'look -= 1')
+        self.emit(indent, 'i = index_%d' % n)
+        if(op.type == id.AND or op.type == id.BKA):
+            # succeeds if the child succeeds
+            self.emit(indent, 'if(state != NOMATCH):')
+        else:
+            # succeeds if the child fails
+            self.emit(indent, 'if(state == NOMATCH):')
+        self.emit(indent + 1, 'state = EMPTY')
+        self.emit(indent, 'else:')
+        self.emit(indent + 1, 'state = NOMATCH')
+        self.emit(indent, 'if(look_table is not None):')
+        self.emit(indent + 1, 'parser.look_store(key_%d, state)' % n)
+
+    def matched(self, indent, length, behind):
+        '''The tail of a terminal node's "if matched" statement.'''
+        if(behind):
+            self.emit(indent + 1, 'i -= ' + length)
+        else:
+            self.emit(indent + 1, 'i += ' + length)
+            # the maximum phrase length is never kept in look around mode
+            self.emit(indent + 1, 'if(i > max_i and not look):')
+            self.emit(indent + 2, 'max_i = i')
+        self.emit(indent + 1, 'state = MATCH')
+        self.emit(indent, 'else:')
+        self.emit(indent + 1, 'state = NOMATCH')
+
+    def char_class(self, op, char):
+        '''The test of a character against a CLS opcode's ranges.
+        @param op The CLS opcode.
+        @param char The expression for the character.
+        @returns Returns the test expression.'''
+        if(len(op.ranges) > _INLINE_RANGES):
+            name = 'cls_%d' % len(self.tables)
+            self.tables.append('%s = cls_table(%r)' % (name, op.ranges))
+            return 'cls_match(%s, %s)' % (char, name)
+        tests = []
+        for (min, max) in op.ranges:
+            if(min == max):
+                tests.append('%s == %d' % (char, min))
+            else:
+                tests.append('%d <= %s <= %d' % (min, char, max))
+        return '(' + ' or '.join(tests) + ')'
+
+    def string(self, indent, op, behind):
+        length = len(op.string)
+        if(length == 0):
+            if(op.type == id.TLS):
+                # EMPTY match allowed, only in TLS
+                self.emit(indent, 'state = EMPTY')
+            else:
+                self.emit(indent, 'state = MATCH')
+            return
+        if(behind):
+            test = 'i - %d >= 0' % length
+            begin = 'i - %d' % length
+        else:
+            test = 'i + %d <= sub_end' % length
+            begin = 'i'
+        if(length > _INLINE_STRING):
+            if(op.type == id.TLS):
+                test += ' and tls_match(%s, %r, %r)' % (
+                    begin, op.string, op.folded)
+            else:
+                test += ' and tbs_match(%s, %r)' % (begin, op.string)
+        else:
+            for j in range(length):
+                char = op.string[j]
+                if(behind):
+                    ichar = 'input[i - %d]' % (length - j)
+                else:
+                    ichar = 'input[i + %d]' % j if(j) else 'input[i]'
+                if(op.type == id.TLS and char >= 97 and char <= 122):
+                    # matches both upper and lower case
+                    test += ' and %s | 32 == %d' % (ichar, char)
+                elif(op.type == id.TLS and char >= 65 and char <= 90):
+                    # upper case input characters are converted
+                    # to lower case and can never match
+                    test += ' and False'
+                else:
+                    test += ' and %s == %d' % (ichar, char)
+        self.emit(indent, 'if(%s):' % test)
+        self.matched(indent, str(length), behind)
@@ -0,0 +1,418 @@
+''' @file apg_py/lib/dfa.py
+@brief Compile the regular rules to deterministic finite automata.
+
+The regular rules (see @ref regex_rules.py) can also be matched
+by a DFA stored as transition arrays.
+Unlike the Python regular expressions, the DFA works directly on
+the tuples of integers the parser is given,
+whatever the size of the character codes.
+The parser uses it for the regular rules when the input has no
+`str` view or Python has no atomic groups (see Parser.match_regex()).
+ApgExp uses it to search for patterns that are fully regular.
+
+The rule is first compiled to a small program for a
+backtracking matcher with the instructions
+
+  - CHAR - match one character in a set of ranges
+  - SPLIT - try the first branch, backtrack to the second
+  - JUMP - continue at another instruction
+  - ENTER, EXIT - an atomic group, ALT and REP,
+  no backtracking into it once it has been exited
+  - MATCH - the rule has matched
+
+The DFA states are the sets of the matcher's threads that are
+still alive after each character, in backtracking priority order,
+as in a Pike VM.
+Because each thread remembers the atomic groups it has entered
+and exited, a thread that exits a group can cut all of the
+lower priority threads through the same group.
+This keeps the APG semantics - an ALT matches its first
+matching child, a REP as many repetitions as it can.
+'''
+import array
+import weakref
+from bisect import bisect_right
+from apg_py.lib import identifiers as id
+from apg_py.lib.regex_rules import grammar_regex_rules
+
+## The largest number of DFA states.
+# Rules that need more are executed by the parser as usual.
+MAX_STATES = 1000
+## The largest number of program instructions.
+MAX_PROGRAM = 2000
+
+# the program instructions
+_CHAR = 0  # [_CHAR, ranges]
+_SPLIT = 1  # [_SPLIT, first, second]
+_JUMP = 2  # [_JUMP, next]
+_ENTER = 3  # [_ENTER]
+_EXIT = 4  # [_EXIT]
+_MATCH = 5  # [_MATCH]
+
+## The state has no match.
+NONE = 0
+## A match ends at the character that entered the state.
+NEW = 1
+## The previous match still stands.
+KEEP = 2
+
+# offset of the atomic group instances entered during a step
+_NEW_INSTANCE = 1 << 20
+
+# the DFAs of the grammars' rules, compiled when first needed
+_cache = weakref.WeakKeyDictionary()
+_UNKNOWN = 0
+
+
+def program(rules, rule_index):
+    '''Compile a rule to a program for the backtracking matcher.
+    @param rules The compiled rules (see @ref opcodes.py).
+    @param rule_index The index of the rule to compile.
+    @returns Returns the program as a tuple of instructions,
+    or None if the rule cannot be compiled.
+    '''
+    prog = []
+    active = set()
+
+    def op_compile(opcodes, op_index):
+        # returns True if the opcode is nullable, None if not compiled
+        if(len(prog) > MAX_PROGRAM):
+            return None
+        op = opcodes[op_index]
+        op_id = op.type
+        if(op_id == id.CAT):
+            nullable = True
+            for child in op.children:
+                result = op_compile(opcodes, child)
+                if(result is None):
+                    return None
+                nullable = nullable and result
+            return nullable
+        if(op_id == id.ALT):
+            nullable = False
+            jumps = []
+            last = len(op.children) - 1
+            prog.append([_ENTER])
+            for (i, child) in enumerate(op.children):
+                if(i < last):
+                    split = [_SPLIT, len(prog) + 1, None]
+                    prog.append(split)
+                result = op_compile(opcodes, child)
+                if(result is None):
+                    return None
+                nullable = nullable or result
+                if(i < last):
+                    jump = [_JUMP, None]
+                    prog.append(jump)
+                    jumps.append(jump)
+                    split[2] = len(prog)
+            for jump in jumps:
+                jump[1] = len(prog)
+            prog.append([_EXIT])
+            return nullable
+        if(op_id == id.REP):
+            prog.append([_ENTER])
+            for i in range(op.min):
+                if(op_compile(opcodes, op_index + 1) is not False):
+                    # not compiled or an empty repetition
+                    return None
+            if(op.max == id.MAX_INT):
+                loop = len(prog)
+                split = [_SPLIT, loop + 1, None]
+                prog.append(split)
+                if(op_compile(opcodes, op_index + 1) is not False):
+                    return None
+                prog.append([_JUMP, loop])
+                split[2] = len(prog)
+            else:
+                splits = []
+                for i in range(op.max - op.min):
+                    split = [_SPLIT, len(prog) + 1, None]
+                    prog.append(split)
+                    splits.append(split)
+                    if(op_compile(opcodes, op_index + 1) is not False):
+                        return None
+                for split in splits:
+                    split[2] = len(prog)
+            prog.append([_EXIT])
+            return op.min == 0
+        if(op_id == id.RNM):
+            opcodes = rules[op.index]['opcodes']
+            if(op.index in active or not opcodes):
+                return None
+            active.add(op.index)
+            result = op_compile(opcodes, 0)
+            active.remove(op.index)
+            return result
+        if(op_id == id.TLS):
+            for char in op.string:
+                if(char >= 97 and char <= 122):
+                    # case insensitive, the string is lower case
+                    prog.append([_CHAR, ((char - 32, char - 32),
+                                         (char, char))])
+                else:
+                    prog.append([_CHAR, ((char, char),)])
+            return len(op.string) == 0
+        if(op_id == id.TBS):
+            for char in op.string:
+                prog.append([_CHAR, ((char, char),)])
+            return len(op.string) == 0
+        if(op_id == id.TRG):
+            prog.append([_CHAR, ((op.min, op.max),)])
+            return False
+        if(op_id == id.CLS):
+            prog.append([_CHAR, op.ranges])
+            return False
+        # look around, anchors, UDT, BKR and CUT
+        return None
+
+    opcodes = rules[rule_index]['opcodes']
+    active.add(rule_index)
+    if(not opcodes or op_compile(opcodes, 0) is None or
+       len(prog) > MAX_PROGRAM):
+        return None
+    prog.append([_MATCH])
+    return tuple(tuple(ins) for ins in prog)
+
+
+def step(prog, threads, char):
+    '''Advance the matcher's threads over one character.
+    @param prog The program.
+    @param threads The threads of a DFA state,
+    or None to begin the match.
+    Each is a (pc, inside, exited) tuple where pc is the index
+    of a CHAR or MATCH instruction, inside the atomic group instances
+    the thread is in and exited those it has exited that other
+    threads are still in.
+    @param char The next character.
+    @returns Returns the threads and the state's match code.
+    '''
+    out = []
+    seen = set()
+    cut = set()
+    status = [False, False]  # [matched, new match]
+    instance = [_NEW_INSTANCE]
+
+    def add(pc, inside, exited):
+        if(status[0]):
+            # all lower priority threads fail after a match
+            return
+        for group in inside:
+            if(group in cut):
+                return
+        for group in exited:
+            if(group in cut):
+                return
+        thread = (pc, inside, exited)
+        if(thread in seen):
+            return
+        seen.add(thread)
+        ins = prog[pc]
+        kind = ins[0]
+        if(kind == _CHAR):
+            out.append(thread)
+        elif(kind == _SPLIT):
+            add(ins[1], inside, exited)
+            add(ins[2], inside, exited)
+        elif(kind == _JUMP):
+            add(ins[1], inside, exited)
+        elif(kind == _ENTER):
+            instance[0] += 1
+            add(pc + 1, inside + (instance[0],), exited)
+        elif(kind == _EXIT):
+            group = inside[-1]
+            add(pc + 1, inside[:-1], exited + (group,))
+            # the lower priority threads through this group fail
+            cut.add(group)
+        else:
+            out.append(thread)
+            status[0] = True
+            status[1] = True
+
+    if(threads is None):
+        add(0, (), ())
+    else:
+        for (pc, inside, exited) in threads:
+            ins = prog[pc]
+            if(ins[0] == _MATCH):
+                # carry the previous match, unless it has been cut
+                if(not status[0] and cut.isdisjoint(exited)):
+                    out.append((pc, inside, exited))
+                    status[0] = True
+                continue
+            for (min, max) in ins[1]:
+                if(char >= min and char <= max):
+                    add(pc + 1, inside, exited)
+                    break
+    # forget the groups that no thread is in,
+    # they can no longer cut any thread,
+    # and number the groups in order of appearance
+    pending = set()
+    for thread in out:
+        pending.update(thread[1])
+    names = {}
+    for thread in out:
+        for group in thread[1]:
+            if(group not in names):
+                names[group] = len(names)
+    for thread in out:
+        for group in sorted(thread[2]):
+            if(group in pending and group not in names):
+                names[group] = len(names)
+    canonical = []
+    for (pc, inside, exited) in out:
+        canonical.append((pc, tuple(names[group] for group in inside),
+                          tuple(sorted(names[group] for group in exited
+                                       if(group in pending)))))
+    if(status[1]):
+        code = NEW
+    elif(status[0]):
+        code = KEEP
+    else:
+        code = NONE
+    return (tuple(canonical), code)
+
+
+class Dfa():
+    '''A deterministic finite automaton for one regular rule.
+
+    The characters are divided into classes of characters that
+    no instruction of the program tells apart.
+    A character's class is found by bisecting the sorted class
+    boundaries in points, or from the low table for characters below 256.
+    The next state of state s on a character of class k is
+    table[s * classes + k].
+    accept[s] is the state's match code, NONE, NEW or KEEP,
+    and live[s] is 1 if the state can match more characters.
+    State 0 is the start state.
+    '''
+
+    def __init__(self, prog):
+        '''The Dfa class constructor.
+        Raises an exception if the DFA has more than MAX_STATES states.
+        @param prog The program (see program()).'''
+        bounds = set()
+        for ins in prog:
+            if(ins[0] == _CHAR):
+                for (min, max) in ins[1]:
+                    bounds.add(min)
+                    bounds.add(max + 1)
+        self.points = tuple(sorted(bounds))
+        self.classes = len(self.points) + 1
+        self.low = array.array(
+            'i', [bisect_right(self.points, char) for char in range(256)])
+        # a representative character of each class,
+        # -1 for the characters below the first boundary
+        chars = (-1,) + self.points
+        # the same threads are different states if they
+        # have different match codes
+        (threads, code) = step(prog, None, -1)
+        states = {(threads, code): 0}
+        queue = [threads]
+        accept = [code]
+        table = []
+        live = []
+        index = 0
+        while(index < len(queue)):
+            threads = queue[index]
+            index += 1
+            alive = False
+            for (pc, inside, exited) in threads:
+                if(prog[pc][0] == _CHAR):
+                    alive = True
+            live.append(1 if(alive) else 0)
+            for char in chars:
+                # never read if the state is not live
+                next_state = 0
+                if(alive):
+                    (next_threads, code) = step(prog, threads, char)
+                    next_state = states.get((next_threads, code), None)
+                    if(next_state is None):
+                        if(len(queue) >= MAX_STATES):
+                            raise Exception(
+                                'DFA state limit exceeded, limit = %d' %
+                                MAX_STATES)
+                        next_state = len(queue)
+                        states[(next_threads, code)] = next_state
+                        queue.append(next_threads)
+                        accept.append(code)
+                table.append(next_state)
+        self.states = len(queue)
+        self.table = array.array('i', table)
+        self.accept = bytes(accept)
+        self.live = bytes(live)
+
+    def match(self, input, begin, end):
+        '''Match the rule at the beginning of a substring.
+        @param input The input, a sequence of character codes.
+        @param begin The index of the first character to match.
+        @param end The index following the last character
+        that may be matched.
+        @returns Returns the index following the matched phrase,
+        or -1 if the rule does not match.
+        '''
+        table = self.table
+        accept = self.accept
+        live = self.live
+        low = self.low
+        points = self.points
+        classes = self.classes
+        state = 0
+        found = begin if(accept[0] == NEW) else -1
+        index = begin
+        while(index < end and live[state]):
+            char = input[index]
+            index += 1
+            if(0 <= char < 256):
+                state = table[state * classes + low[char]]
+            else:
+                state = table[state * classes + bisect_right(points, char)]
+            code = accept[state]
+            if(code == NEW):
+                found = index
+            elif(code == NONE):
+                found = -1
+        return found
+
+    def search(self, input, begin, end):
+        '''Find the first phrase the rule matches.
+        @param input The input, a sequence of character codes.
+        @param begin The index to begin the search at.
+        @param end The index following the last character
+        that may be matched.
+        @returns Returns the (index, length) of the matched phrase,
+        or None if the rule matches nowhere.
+        '''
+        for index in range(begin, end):
+            found = self.match(input, index, end)
+            if(found >= 0):
+                return (index, found - index)
+        return None
+
+
+def grammar_dfa(grammar, rules, rule_index):
+    '''Get the DFA of a regular rule,
+    compiling it the first time it is needed.
+    @param grammar The grammar object.
+    @param rules The grammar's compiled rules.
+    @param rule_index The index of the rule.
+    @returns Returns the DFA, or None if the rule is not regular
+    or cannot be compiled to a DFA.
+    '''
+    dfas = _cache.get(grammar, None)
+    if(dfas is None):
+        dfas = [_UNKNOWN] * len(rules)
+        _cache[grammar] = dfas
+    dfa = dfas[rule_index]
+    if(dfa is _UNKNOWN):
+        dfa = None
+        if(grammar_regex_rules(grammar, rules)[rule_index] is not None):
+            prog = program(rules, rule_index)
+            if(prog is not None):
+                try:
+                    dfa = Dfa(prog)
+                except Exception:
+                    # too many states
+                    dfa = None
+        dfas[rule_index] = dfa
+    return dfa
@@ -25,6 +25,10 @@ BKA = 15  # positive look behind
 BKN = 16  # negative look behind
 ABG = 17  # anchor - begin of string
 AEN = 18  # anchor - end of string
+CUT = 20  # cut - commits the enclosing ALT or REP
+
+# internal operators, generated by the API's optimizations
+CLS = 19  # character class, an ALT of single character terminals
 
 # the parser states
 ACTIVE = 100
@@ -71,6 +75,8 @@ dict = {
     BKN: 'BKN',
     ABG: 'ABG',
     AEN: 'AEN',
+    CUT: 'CUT',
+    CLS: 'CLS',
     ACTIVE: 'ACTIVE',
     MATCH: 'MATCH',
     EMPTY: 'EMPTY',
@@ -0,0 +1,276 @@
+''' @file apg_py/lib/memo.py
+@brief Packrat memoization of the parser's rule name (RNM) phrase matches.
+
+Without memoization, the parser re-parses the same rule at the same
+phrase index every time an enclosing ALT or REP backtracks.
+For some grammars this can lead to an exponential number of node hits.
+With memoization, the outcome of each rule at each phrase index,
+including the AST records it generated, is saved and replayed on
+subsequent visits.
+
+An incremental memo table also records the characters that each rule
+examined. After an edit of the input string, the results of the rules
+that examined only characters before the edit, or only characters after
+it, are still valid and are kept for the next parse
+(see @ref Parser.reparse()).
+'''
+from array import array
+from collections import OrderedDict
+from apg_py.lib import identifiers as id
+
+
+class Memo():
+    '''A class for memoizing the rule name (RNM) phrase matches.
+    Attach it to a parser to turn on memoization.
+    <pre>
+    parser = Parser(grammar)
+    memo = Memo(parser)
+    result = parser.parse(input)
+    print(result.memo_hits, result.memo_misses)
+    </pre>
+    Note that rules that save phrases for back referencing
+    or that refer, directly or indirectly, to rules that do
+    or to back referencing operators can never be memoized.
+    Their results depend on the state of the back reference stacks
+    and not only on the phrase index.
+
+    Note also that rule callback functions (see @ref Parser.add_callbacks())
+    for a rule and any of the rules below it are only called
+    the first time the rule is evaluated at a given phrase index.
+    Replayed matches do not call the rule callback functions.
+    '''
+
+    def __init__(self, parser, max_size=1000000, incremental=False):
+        '''Memo constructor.
+        @param parser The parser to attach this memo table to.
+        @param max_size The maximum size of the memo table.
+        Each memoized rule result counts 1 plus the number of AST records
+        saved with it. When the table is full, the least recently used
+        results are evicted.
+        @param incremental If True, the characters examined by each rule
+        are saved with its result and the table can be kept for a
+        re-parse of the edited input string (see @ref Parser.reparse()).
+        The parse is slower, the regular expressions and the fused REP
+        loops are not used.
+        '''
+        self.parser = parser
+        parser.memo = self
+        self.max_size = max(1, max_size)
+        self.incremental = incremental
+        self.table = OrderedDict()
+        self.size = 0
+        # the (table, size) kept by edit() for the next parse
+        self.edited = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # which rules are eligible for memoization
+        self.eligible = eligible_rules(parser.rules, parser.udts)
+        # which rules are presently memoized - defaults to all eligible rules
+        self.enabled = list(self.eligible)
+
+    def clear(self):
+        '''Clear the memo table and the statistics.
+        Called by the parser at the beginning of each parse.
+        The results kept by edit(), if any, become the table.'''
+        if(self.edited is None):
+            self.table.clear()
+            self.size = 0
+        else:
+            (self.table, self.size) = self.edited
+            self.edited = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def rule_index(self, name):
+        '''For internal use only. Look up a rule index from its name.'''
+        index = self.parser.rule_indexes.get(name.lower(), None)
+        if(index is None):
+            raise Exception('memo: name is not a rule name', name)
+        return index
+
+    def include(self, names=[]):
+        '''Memoize only the named rules.
+        @param names A list of rule names.
+        An empty list will include ALL eligible rules.
+        Invalid names or rules that are not eligible for memoization
+        will raise an Exception.
+        '''
+        if(len(names) == 0):
+            self.enabled = list(self.eligible)
+            return
+        enabled = [False] * len(self.eligible)
+        for name in names:
+            index = self.rule_index(name)
+            if(not self.eligible[index]):
+                raise Exception(
+                    'memo: rule depends on back referencing, '
+                    'cannot be memoized', name)
+            enabled[index] = True
+        self.enabled = enabled
+
+    def exclude(self, names=[]):
+        '''Memoize all eligible rules except the named rules.
+        @param names A list of rule names.
+        An empty list will include ALL eligible rules.
+        Invalid names will raise an Exception.
+        '''
+        enabled = list(self.eligible)
+        for name in names:
+            enabled[self.rule_index(name)] = False
+        self.enabled = enabled
+
+    def execute(self, op_index, rule_index):
+        '''Called by the parser for each memoized rule name (RNM) operator.
+        Either replays a previously saved result
+        or executes the operator and saves the result.
+        @param op_index The index of the RNM opcode.
+        @param rule_index The index of the rule the RNM opcode refers to.
+        '''
+        parser = self.parser
+        key = (rule_index, parser.phrase_index,
+               parser.current_look_direction)
+        entry = self.table.get(key, None)
+        keep_ast = parser.ast and parser.lookaround == 0
+        if(entry is not None):
+            # replay the saved result
+            self.hits += 1
+            self.table.move_to_end(key)
+            parser.state = entry[0]
+            parser.phrase_index = entry[1]
+            if(parser.lookaround == 0 and parser.phrase_index -
+               parser.sub_begin > parser.max_phrase_length):
+                parser.max_phrase_length = (parser.phrase_index -
+                                            parser.sub_begin)
+            if(keep_ast and entry[2]):
+                parser.ast.replay_records(entry[2])
+            if(parser.spans):
+                parser.span_low = min(parser.span_low, entry[3][0])
+                parser.span_high = max(parser.span_high, entry[3][1])
+            return
+        self.misses += 1
+        if(keep_ast):
+            begin = parser.ast.save_state()
+        if(parser.spans):
+            outer = (parser.span_low, parser.span_high)
+            parser.span_low = parser.phrase_index
+            parser.span_high = parser.phrase_index
+        parser.opRNM(op_index)
+        records = None
+        if(keep_ast and parser.state != id.NOMATCH):
+            records = parser.ast.save_records(begin)
+        self.store(key, (parser.state, parser.phrase_index, records,
+                         self.span(outer if(parser.spans) else None)))
+
+    def span(self, outer):
+        '''For internal use only.
+        A rule is complete, merge the characters it examined
+        into those of the enclosing rule.
+        @param outer The (low, high) span of the enclosing rule,
+        saved when the rule began, or None if not recorded.
+        @returns Returns the rule's (low, high) span or None.'''
+        if(outer is None):
+            return None
+        parser = self.parser
+        span = (parser.span_low, parser.span_high)
+        parser.span_low = min(outer[0], span[0])
+        parser.span_high = max(outer[1], span[1])
+        return span
+
+    def edit(self, offset, deleted, inserted):
+        '''Keep the results that an edit of the input string
+        cannot change for the next parse (see @ref Parser.reparse()).
+        A result is kept if its rule examined only characters before
+        the edit. It is moved with the characters if its rule examined
+        only characters after the edit.
+        @param offset The index of the first character deleted
+        or of the insertion.
+        @param deleted The number of characters deleted.
+        @param inserted The number of characters inserted.
+        '''
+        delta = inserted - deleted
+        end = offset + deleted
+        table = OrderedDict()
+        size = 0
+        for (key, entry) in self.table.items():
+            span = entry[3]
+            if(span is None):
+                continue
+            records = entry[2]
+            if(span[1] <= offset):
+                table[key] = entry
+            elif(span[0] >= end):
+                if(records):
+                    # the phrase indexes of the AST records
+                    records = (records[0], records[1],
+                               array('l', (index + delta
+                                           for index in records[2])),
+                               records[3], records[4])
+                table[(key[0], key[1] + delta, key[2])] = (
+                    entry[0], entry[1] + delta, records,
+                    (span[0] + delta, span[1] + delta))
+            else:
+                continue
+            size += 1
+            if(records):
+                size += len(records[0])
+        self.edited = (table, size)
+
+    def store(self, key, entry):
+        '''For internal use only.
+        Saves an entry in the table, evicting the least recently used
+        entries if the table is full.'''
+        self.table[key] = entry
+        self.size += 1
+        if(entry[2]):
+            self.size += len(entry[2][0])
+        while(self.size > self.max_size and len(self.table) > 1):
+            evicted = self.table.popitem(last=False)[1]
+            self.size -= 1
+            if(evicted[2]):
+                self.size -= len(evicted[2][0])
+            self.evictions += 1
+
+
+def eligible_rules(rules, udts):
+    '''Determine which rules can be memoized.
+    A rule can be memoized if neither it nor any rule it refers to,
+    directly or indirectly, saves phrases for back referencing
+    or uses the back reference operator.
+    @param rules The grammar's rules.
+    @param udts The grammar's UDTs.
+    @returns Returns a list of booleans, one for each rule.'''
+    rule_count = len(rules)
+    # does each rule, by itself, touch the back reference stacks
+    direct = [False] * rule_count
+    refers = []
+    for rule in rules:
+        refs = set()
+        bkr = rule['is_bkru'] or rule['is_bkrr'] or rule['has_bkrr']
+        for op in rule['opcodes']:
+            if(op.type == id.RNM):
+                refs.add(op.index)
+            elif(op.type == id.BKR):
+                bkr = True
+            elif(op.type == id.UDT):
+                udt = udts[op.index]
+                if(udt['is_bkru'] or udt['is_bkrr']):
+                    bkr = True
+        direct[rule['index']] = bkr
+        refers.append(refs)
+    eligible = [True] * rule_count
+    for i in range(rule_count):
+        # depth-first search of all rules referenced by rule i
+        visited = set()
+        stack = [i]
+        while(stack):
+            j = stack.pop()
+            if(j in visited):
+                continue
+            visited.add(j)
+            if(direct[j]):
+                eligible[i] = False
+                break
+            stack.extend(refers[j])
+    return eligible
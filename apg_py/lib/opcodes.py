@@ -0,0 +1,482 @@
+''' @file apg_py/lib/opcodes.py
+@brief The compact, compiled form of a grammar's opcodes.
+
+The grammar files written by Api.write_grammar()
+hold the rule opcodes as plain dictionaries.
+That keeps them easy to read and print, but costs a hash lookup
+for every opcode field the parser reads and a full dictionary
+of memory for every opcode.
+Before parsing, the opcodes are compiled once per grammar into
+Opcode objects with fixed slots.
+The grammar objects generated by the API (see @ref api.py)
+keep only the compiled opcodes
+and make the dictionary form from them when it is read.
+Rule and UDT names are interned and identical terminal strings
+(TLS and TBS) share a single tuple.
+
+If the grammar has first character sets (see @ref first_chars.py),
+each ALT opcode also gets a lookup table of the children
+that can match, keyed on the next input character.
+If the grammar has phrase lengths (see @ref phrase_lengths.py),
+each opcode also gets its minimum and maximum phrase length.
+The grammar objects from Api.generate() and the grammar files
+written by Api.write_grammar() have both.
+
+REP opcodes whose child is a single character terminal,
+an ALT of single character terminals or a TBS get the
+information the parser needs to match all of the repetitions
+in a single loop (see Parser.opREPscan()).
+
+If the grammar has cut (CUT) operators, each cut is matched
+with the ALT or REP opcode that it commits (see cut_scopes()).
+
+If the grammar has back references, each look around opcode
+gets the back referenced names that its result may depend on
+(see look_bkrs()).
+'''
+import sys
+import weakref
+from apg_py.lib import identifiers as id
+
+# compiled rules of grammars that have no compiled_rules attribute,
+# e.g. the grammar files written by Api.write_grammar()
+_cache = weakref.WeakKeyDictionary()
+
+# the opcodes with a single child, the next opcode
+_SINGLE_CHILD = (id.REP, id.AND, id.NOT, id.BKA, id.BKN)
+
+# the opcodes that may backtrack after a child has matched
+_CHOICES = (id.ALT, id.REP, id.AND, id.NOT, id.BKA, id.BKN)
+
+# the opcode fields of the dictionary form of the opcodes
+_FIELDS = ('type', 'children', 'min', 'max', 'index', 'empty',
+           'string', 'name', 'lower', 'bkr_case', 'bkr_mode', 'is_udt',
+           'ranges', 'floor')
+
+# the fields of the dictionary form of each opcode type,
+# besides the type, in the order the API generates them
+_DICT_FIELDS = {
+    id.ALT: ('children',),
+    id.CAT: ('children',),
+    id.REP: ('min', 'max'),
+    id.RNM: ('index',),
+    id.TRG: ('min', 'max'),
+    id.TBS: ('string',),
+    id.TLS: ('string',),
+    id.UDT: ('empty', 'index'),
+    id.BKR: ('name', 'lower', 'bkr_case', 'bkr_mode', 'is_udt', 'empty',
+             'index'),
+    id.CLS: ('ranges', 'floor'),
+}
+
+# the fields of every opcode type
+_COMMON = ('type', 'min_length', 'max_length')
+
+# the fields of each opcode type, besides the common fields
+_TYPE_FIELDS = {
+    id.ALT: ('children', 'alt_table', 'alt_default', 'commits'),
+    id.CAT: ('children',),
+    id.REP: ('min', 'max', 'scan', 'scan_string', 'commits'),
+    id.RNM: ('index', 'choice'),
+    id.TRG: ('min', 'max'),
+    id.TBS: ('string',),
+    id.TLS: ('string', 'folded'),
+    id.UDT: ('index', 'empty'),
+    id.AND: ('look_bkrs',),
+    id.NOT: ('look_bkrs',),
+    id.BKR: ('index', 'empty', 'name', 'lower', 'bkr_case', 'bkr_mode',
+             'is_udt'),
+    id.BKA: ('look_bkrs',),
+    id.BKN: ('look_bkrs',),
+    id.ABG: (),
+    id.AEN: (),
+    id.CUT: ('commits', 'choice'),
+    id.CLS: ('ranges', 'floor', 'bitmap', 'starts', 'ends'),
+}
+
+
+class Opcode():
+    '''A single compiled opcode.
+    The fields are read by attribute, e.g. op.type, op.children.
+    Fields that the opcode type does not use are None.
+    Each opcode type is a subclass with slots for only the fields
+    it uses, the others are read from the class attributes.
+    For compatibility, the fields can also be read
+    as for the dictionary opcodes, e.g. op['type'].
+
+    ALT opcodes may have two more fields.
+    alt_table maps an input character to the tuple of the children
+    that can match a phrase beginning with it.
+    alt_default is the tuple of the children that can match
+    when the character is not in the table or at the end of the input.
+
+    min_length and max_length are the minimum and maximum phrase lengths
+    of the opcode, if known.
+
+    REP opcodes may have a scan or a scan_string field.
+    scan is a tuple with one (type, ranges, floor) entry for the child,
+    or for each child of an ALT child, matching a single character.
+    type is the terminal's opcode type, ranges a tuple of the
+    (min, max) character ranges it matches and floor the smallest
+    phrase index at which it can match in look behind mode.
+    scan_string is the string of a TBS child.
+
+    CLS opcodes have the fields the parser uses to match a character.
+    bitmap is a bytes object of 256 flags, non-zero if the character
+    is in the class, for the characters below 256.
+    starts and ends are the first and last characters of the ranges,
+    for a binary search with the bisect module.
+    floor is the smallest phrase index at which the class can match
+    in look behind mode, 2 if it was merged from TRG opcodes, else 1.
+
+    commits is True for the ALT and REP opcodes that are committed
+    by a cut and for the CUT opcodes that commit one.
+    choice is True for the RNM and CUT opcodes of a grammar with cuts
+    if an enclosing opcode of the rule may still backtrack,
+    i.e. an ALT, a REP or a look around operator.
+    The ALT or REP committed by a CUT opcode is not counted.
+
+    folded is, for the TLS opcodes, the (lower case) string as a str,
+    compared with the case folded input (see Parser.fold()).
+
+    look_bkrs is, for the AND, NOT, BKA and BKN opcodes,
+    the tuple of the (mode, name) pairs of the back references
+    below the opcode, in its rule or in the rules it refers to.
+    The look around result may depend on the last phrase of each
+    of these names. It is None if there are none.
+    '''
+    __slots__ = _COMMON
+
+    def __new__(cls, op, strings):
+        '''Make an opcode of the subclass of its type.'''
+        return object.__new__(_CLASSES[op['type']])
+
+    def __init__(self, op, strings):
+        '''Opcode constructor.
+        @param op The dictionary form of the opcode.
+        @param strings A dictionary of the terminal strings
+        compiled so far, used to share identical strings.
+        '''
+        for slot in self.fields:
+            setattr(self, slot, None)
+        for key, value in op.items():
+            if(key == 'children'):
+                value = tuple(value)
+            elif(key == 'string'):
+                value = tuple(value)
+                value = strings.setdefault(value, value)
+            elif(key == 'name' or key == 'lower'):
+                value = sys.intern(value)
+            elif(key == 'ranges'):
+                value = tuple(tuple(r) for r in value)
+            setattr(self, key, value)
+        if(self.type == id.CLS):
+            if(self.floor is None):
+                # grammar files written before the floor was kept
+                self.floor = 1
+            bitmap = bytearray(256)
+            for (min, max) in self.ranges:
+                for char in range(min, 1 + (max if(max < 256) else 255)):
+                    bitmap[char] = 1
+            self.bitmap = bytes(bitmap)
+            self.starts = tuple(r[0] for r in self.ranges)
+            self.ends = tuple(r[1] for r in self.ranges)
+        elif(self.type == id.TLS):
+            self.folded = ''.join(map(chr, self.string))
+
+    def __getitem__(self, key):
+        '''Read a field as for the dictionary form of the opcode.'''
+        try:
+            value = getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+        if(value is None):
+            raise KeyError(key)
+        return value
+
+    def to_dict(self):
+        '''Convert back to the dictionary form of the opcode.
+        The keys are in the order the API generates them.
+        @returns Returns the dictionary form of the opcode.'''
+        op = {'type': self.type}
+        for field in _DICT_FIELDS.get(self.type, ()):
+            op[field] = getattr(self, field)
+        return op
+
+    def __repr__(self):
+        return 'Opcode(' + repr(self.to_dict()) + ')'
+
+    def __reduce__(self):
+        '''Pickle and copy the opcode as its type and field values.'''
+        return (_restore, (self.type,
+                           tuple(getattr(self, f) for f in self.fields)))
+
+
+# the fields an opcode type does not use are None
+for _field in set(_FIELDS).union(*_TYPE_FIELDS.values()):
+    if(_field not in _COMMON):
+        setattr(Opcode, _field, None)
+
+# the Opcode subclass of each opcode type
+_CLASSES = {}
+for (_type, _fields) in _TYPE_FIELDS.items():
+    _CLASSES[_type] = type('Opcode' + id.dict[_type], (Opcode,), {
+        '__slots__': _fields, 'fields': _COMMON + _fields})
+
+
+def _restore(type, values):
+    '''Make an opcode from the values of __reduce__().'''
+    op = object.__new__(_CLASSES[type])
+    for (field, value) in zip(op.fields, values):
+        setattr(op, field, value)
+    return op
+
+
+def alt_table(op, firsts, tuples):
+    '''Build the lookup table of an ALT opcode's viable children.
+    @param op The compiled ALT opcode.
+    @param firsts The (first, empty) pairs of the rule's opcodes.
+    @param tuples A dictionary of the child tuples built so far,
+    used to share identical tuples.
+    '''
+    def viable(char):
+        children = []
+        for child in op.children:
+            (first, empty) = firsts[child]
+            if(empty or first is None or char in first):
+                children.append(child)
+        children = tuple(children)
+        return tuples.setdefault(children, children)
+
+    chars = set()
+    for child in op.children:
+        first = firsts[child][0]
+        if(first is not None):
+            chars |= first
+    table = {}
+    for char in chars:
+        table[char] = viable(char)
+    default = viable(None)
+    if(default == op.children):
+        for children in table.values():
+            if(children != op.children):
+                break
+        else:
+            # no child can ever be skipped
+            return
+    op.alt_table = table
+    op.alt_default = default
+
+
+def char_ranges(op):
+    '''Get the scan entry of a single character terminal.
+    @param op The compiled terminal opcode.
+    @returns Returns the (type, ranges, floor) entry
+    or None if the opcode is not a single character terminal.
+    '''
+    if(op.type == id.TRG):
+        # TRG never matches the first input character in look behind mode
+        return (id.TRG, ((op.min, op.max),), 2)
+    if(op.type == id.TBS and len(op.string) == 1):
+        char = op.string[0]
+        return (id.TBS, ((char, char),), 1)
+    if(op.type == id.TLS and len(op.string) == 1):
+        char = op.string[0]
+        if(char >= 97 and char <= 122):
+            return (id.TLS, ((char, char), (char - 32, char - 32)), 1)
+        return (id.TLS, ((char, char),), 1)
+    if(op.type == id.CLS):
+        return (id.CLS, op.ranges, op.floor)
+    return None
+
+
+def rep_scan(op, opcodes, op_index):
+    '''Set the scan fields of a REP opcode, if its child qualifies.
+    @param op The compiled REP opcode.
+    @param opcodes The rule's compiled opcodes.
+    @param op_index The index of the REP opcode.
+    '''
+    child = opcodes[op_index + 1]
+    if(child.type == id.ALT):
+        entries = []
+        for index in child.children:
+            entry = char_ranges(opcodes[index])
+            if(entry is None):
+                return
+            entries.append(entry)
+        op.scan = tuple(entries)
+        return
+    entry = char_ranges(child)
+    if(entry is not None):
+        op.scan = (entry,)
+    elif(child.type == id.TBS and len(child.string)):
+        op.scan_string = child.string
+
+
+def cut_scopes(opcodes, has_cut):
+    '''Set the commits and choice fields of a rule's opcodes.
+    A cut commits the innermost ALT or REP that encloses it in the rule,
+    if any. The scope of a cut ends at a look around operator
+    and at the rule itself - a cut never commits an opcode
+    of another rule.
+    @param opcodes The rule's compiled opcodes.
+    @param has_cut True if any rule of the grammar has a cut.
+    '''
+    if(not has_cut):
+        return
+    # the parent of each opcode
+    parents = [None] * len(opcodes)
+    for (index, op) in enumerate(opcodes):
+        if(op.type == id.ALT or op.type == id.CAT):
+            for child in op.children:
+                parents[child] = index
+        elif(op.type in _SINGLE_CHILD):
+            parents[index + 1] = index
+
+    def choice(index):
+        # does any opcode from here up to the rule's root backtrack
+        while(index is not None):
+            if(opcodes[index].type in _CHOICES):
+                return True
+            index = parents[index]
+        return False
+
+    for (index, op) in enumerate(opcodes):
+        if(op.type == id.RNM):
+            op.choice = choice(parents[index])
+        elif(op.type == id.CUT):
+            parent = parents[index]
+            path = []
+            while(parent is not None and opcodes[parent].type == id.CAT):
+                path.append(opcodes[parent])
+                parent = parents[parent]
+            scope = None if(parent is None) else opcodes[parent]
+            if(scope is not None and
+               (scope.type == id.ALT or scope.type == id.REP)):
+                op.commits = True
+                scope.commits = True
+                op.choice = choice(parents[parent])
+                for cat in path:
+                    # a CAT that fails for want of characters
+                    # must still run its cut
+                    cat.min_length = 0
+            else:
+                op.choice = scope is not None
+
+
+def look_bkrs(rules):
+    '''Set the look_bkrs field of the rules' look around opcodes.
+    The result of a look around operator depends only on the
+    phrase index, unless a back reference below it reads the
+    back referenced phrases saved before it was reached.
+    @param rules The compiled rules.
+    '''
+    # the back references of each rule and the rules it refers to
+    reads = []
+    refers = []
+    for rule in rules:
+        reads.append(set())
+        refers.append(set())
+        for op in rule['opcodes']:
+            if(op.type == id.BKR):
+                reads[-1].add((op.bkr_mode, op.lower))
+            elif(op.type == id.RNM):
+                refers[-1].add(op.index)
+    if(not any(reads)):
+        return
+    changed = True
+    while(changed):
+        changed = False
+        for (index, rule_refers) in enumerate(refers):
+            for other in rule_refers:
+                if(not reads[other] <= reads[index]):
+                    reads[index] |= reads[other]
+                    changed = True
+
+    def below(opcodes, index):
+        # the back references of the opcode and its children
+        op = opcodes[index]
+        if(op.type == id.ALT or op.type == id.CAT):
+            found = set()
+            for child in op.children:
+                found |= below(opcodes, child)
+            return found
+        if(op.type in _SINGLE_CHILD):
+            return below(opcodes, index + 1)
+        if(op.type == id.RNM):
+            return reads[op.index]
+        if(op.type == id.BKR):
+            return {(op.bkr_mode, op.lower)}
+        return set()
+
+    for rule in rules:
+        opcodes = rule['opcodes']
+        for (index, op) in enumerate(opcodes):
+            if(op.type in _SINGLE_CHILD and op.type != id.REP):
+                found = below(opcodes, index + 1)
+                if(found):
+                    op.look_bkrs = tuple(sorted(found))
+
+
+def compile_rules(rules, first_chars=None, phrase_lengths=None):
+    '''Compile the rules' opcodes.
+    The rule dictionaries themselves are copied, not modified.
+    @param rules The grammar's rules.
+    @param first_chars The first character sets of the opcodes
+    (see @ref first_chars.py), if any.
+    @param phrase_lengths The minimum and maximum phrase lengths
+    of the opcodes (see @ref phrase_lengths.py), if any.
+    @returns Returns a tuple of the copied rules
+    with the compiled opcodes.'''
+    strings = {}
+    tuples = {}
+    compiled = []
+    has_cut = False
+    for rule in rules:
+        for op in rule['opcodes']:
+            if(op['type'] == id.CUT):
+                has_cut = True
+    for rule in rules:
+        cpy = rule.copy()
+        cpy['name'] = sys.intern(rule['name'])
+        cpy['lower'] = sys.intern(rule['lower'])
+        cpy['opcodes'] = tuple(Opcode(op, strings)
+                               for op in rule['opcodes'])
+        for (index, op) in enumerate(cpy['opcodes']):
+            if(op.type == id.REP):
+                rep_scan(op, cpy['opcodes'], index)
+        if(first_chars):
+            firsts = first_chars[rule['index']]
+            for op in cpy['opcodes']:
+                if(op.type == id.ALT):
+                    alt_table(op, firsts, tuples)
+        if(phrase_lengths):
+            lengths = phrase_lengths[rule['index']]
+            for (op, (min, max)) in zip(cpy['opcodes'], lengths):
+                op.min_length = min
+                op.max_length = max
+        cut_scopes(cpy['opcodes'], has_cut)
+        compiled.append(cpy)
+    look_bkrs(compiled)
+    return tuple(compiled)
+
+
+def compiled_rules(grammar):
+    '''Get the compiled rules of a grammar object.
+    Grammar objects generated by the API are compiled when they are
+    constructed. Other grammar objects are compiled the first time
+    they are used and the result is cached.
+    The first character sets and phrase lengths are read from
+    the grammar files that have them.
+    @param grammar The grammar object.
+    @returns Returns a tuple of the rules with the compiled opcodes.'''
+    rules = getattr(grammar, 'compiled_rules', None)
+    if(rules is not None):
+        return rules
+    rules = _cache.get(grammar, None)
+    if(rules is None):
+        rules = compile_rules(grammar.rules,
+                              getattr(grammar, 'first_chars', None),
+                              getattr(grammar, 'phrase_lengths', None))
+        _cache[grammar] = rules
+    return rules
@@ -0,0 +1,124 @@
+''' @file apg_py/lib/parallel_parser.py
+@brief Parse many input strings in parallel in a pool of processes.
+
+Python threads do not run Python code in parallel.
+The ParallelParser spreads the input strings over a pool of
+worker processes instead.
+The grammar and the callback functions are sent to each worker
+once, when it starts, and each worker builds its parser once.
+The input strings are then sent to the workers in chunks and
+each chunk is parsed with @ref Parser.parse_many().
+
+The callback functions, the grammar object and the input strings
+are sent to the workers with `pickle`.
+The callback functions must therefore be module-level functions.
+A grammar module is sent by name and imported by each worker.
+'''
+import importlib
+import os
+import types
+from concurrent.futures import ProcessPoolExecutor
+from apg_py.lib.parser import Parser
+from apg_py.lib.ast import Ast
+
+## The most input strings sent to a worker at once.
+MAX_CHUNK = 1000
+
+# the parser and the AST of a worker process
+_parser = None
+_ast = None
+
+
+def _start_worker(grammar, parser_class, callbacks, ast_callbacks):
+    '''Build the parser of a worker process.'''
+    global _parser, _ast
+    if(isinstance(grammar, str)):
+        grammar = importlib.import_module(grammar)
+    _parser = parser_class(grammar)
+    if(callbacks):
+        _parser.add_callbacks(callbacks)
+    _ast = None
+    if(ast_callbacks):
+        _ast = Ast(_parser)
+        for (name, callback) in ast_callbacks.items():
+            _ast.add_callback(name, callback)
+
+
+def _parse_chunk(inputs, start_rule):
+    '''Parse a chunk of input strings in a worker process.'''
+    if(_ast is None):
+        return list(_parser.parse_many(inputs, start_rule))
+    results = []
+    for result in _parser.parse_many(inputs, start_rule):
+        data = []
+        _ast.translate(data)
+        results.append((result, data))
+    return results
+
+
+class ParallelParser():
+    '''Parses many input strings in a pool of worker processes.
+    <pre>
+    with ParallelParser(grammar, callbacks={'rule': rule_callback}) as pp:
+        results = pp.parse(inputs)
+    </pre>
+    '''
+
+    def __init__(self, grammar, callbacks=None, ast_callbacks=None,
+                 workers=None, parser_class=Parser):
+        '''ParallelParser constructor. Starts the worker processes.
+        @param grammar The grammar object generated by the API
+        (see @ref api.py) or an imported grammar module.
+        @param callbacks The rule and UDT callback functions,
+        a dictionary as for @ref Parser.add_callbacks().
+        @param ast_callbacks If not None, a dictionary of the AST
+        callback functions of the named nodes (see @ref Ast.add_callback()).
+        Each input string's AST is translated in the worker and the
+        data list passed to the callback functions is returned.
+        @param workers The number of worker processes.
+        Defaults to the number of processors.
+        @param parser_class The parser class, Parser, StackParser
+        or CompiledParser.
+        '''
+        if(isinstance(grammar, types.ModuleType)):
+            # a module cannot be pickled, the workers import it
+            grammar = grammar.__name__
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_start_worker,
+            initargs=(grammar, parser_class, callbacks, ast_callbacks))
+
+    def parse(self, inputs, start_rule=None):
+        '''Parses the input strings.
+        @param inputs An iterable of input strings (see @ref Parser.parse()).
+        They must be picklable.
+        @param start_rule Name of the grammar's start rule
+            (defaults to first rule of the SABNF grammar.)
+        @returns Returns a list of the results, in the order of the inputs.
+        Each result is a BatchResult (see @ref Parser.parse_many())
+        or, if there are AST callback functions, a (BatchResult, data)
+        tuple where data is the list passed to the AST callback functions.
+        '''
+        inputs = list(inputs)
+        # a few chunks for each worker, so that the workers that
+        # finish early can take on more, large enough to
+        # make the cost of sending each chunk small
+        size = len(inputs) // (self.workers * 4)
+        size = max(1, min(size, MAX_CHUNK))
+        chunks = [inputs[i:i + size] for i in range(0, len(inputs), size)]
+        results = []
+        for chunk in self.pool.map(_parse_chunk, chunks,
+                                   [start_rule] * len(chunks)):
+            results.extend(chunk)
+        return results
+
+    def close(self):
+        '''Stops the worker processes.'''
+        self.pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -1,8 +1,58 @@
 ''' @file apg_py/lib/parser.py @brief The APG parser.'''
 
 # from pprint import pprint
+import asyncio
+import functools
+import time
+from bisect import bisect_right
+from collections import namedtuple
 from apg_py.lib import identifiers as id
+from apg_py.lib import utilities as utils
 from apg_py.lib.backreferences import BackrefenceStack
+from apg_py.lib.opcodes import Opcode, compiled_rules
+from apg_py.lib.regex_rules import grammar_regex_rules, enabled_patterns
+from apg_py.lib.dfa import grammar_dfa
+
+# the look behind direction, read for every node by opExecuteFast()
+_BEHIND = id.LOOKAROUND_BEHIND
+
+# the str.translate() table of the ASCII case folding of the TLS
+# strings and the case insensitive back references
+_FOLD = str.maketrans('ABCDEFGHIJKLMNOPQRSTUVWXYZ',
+                      'abcdefghijklmnopqrstuvwxyz')
+
+## The most look around results cached during a parse
+# (see Parser.look_find()). The cache is emptied when it is full.
+LOOK_CACHE_SIZE = 100000
+
+## The lightweight result of each parse of parse_many().
+# The fields are those of the same name in ParserResult.
+BatchResult = namedtuple('BatchResult', (
+    'success', 'state', 'phrase_length', 'sub_begin', 'sub_end',
+    'max_phrase_length', 'node_hits'))
+
+
+class LimitExceeded(Exception):
+    '''Raised when a parse exceeds one of the parser's limits
+    (see Parser.set_tree_depth_limit(), Parser.set_node_hit_limit(),
+    Parser.set_time_limit(), Parser.set_ast_record_limit()
+    and Parser.set_bkr_entry_limit()).
+    It carries the statistics of the parse so far.'''
+
+    def __init__(self, message, parser):
+        '''Initialize the exception.
+        @param message The exception message.
+        @param parser The parser object or the ParserResult
+        of the last parse.'''
+        super().__init__(message)
+        # the number of parse tree nodes processed
+        self.node_hits = parser.node_hits
+        # the maximum parse tree depth reached
+        self.max_tree_depth = parser.max_tree_depth
+        # the maximum phrase length reached by the parser
+        self.max_phrase_length = parser.max_phrase_length
+        # the furthest input string index reached by the parser
+        self.position = parser.sub_begin + parser.max_phrase_length
 
 
 class ParserResult:
@@ -28,14 +78,23 @@ class ParserResult:
         cls.sub_end = parser.sub_end
         # the total length (number of character) in the substring to parse
         cls.sub_length = parser.sub_end - parser.sub_begin
-        # the number of parse tree nodes processed
+        # the number of parse tree nodes processed - a rule matched
+        # by its regular expression or DFA (see Parser.match_regex())
+        # counts as a single node, none of its opcodes are executed
         cls.node_hits = parser.node_hits
-        # the maximum parse tree depth reached
+        # the maximum parse tree depth reached,
+        # also without the opcodes of the rules matched as a whole
         cls.max_tree_depth = parser.max_tree_depth
         # the maximum phrase length reached by the parser -
         # likely to be exactly or close to the point of failure
-        # if the state is NOMATCH
+        # if the state is NOMATCH - that of the opcodes alone, also if
+        # regular rules were matched with regular expressions or nodes
+        # were pruned (see Parser.repeat())
         cls.max_phrase_length = parser.max_phrase_length
+        # the number of rule results replayed from
+        # and saved to the memo table, if any (see @ref memo.py)
+        cls.memo_hits = parser.memo.hits if(parser.memo) else 0
+        cls.memo_misses = parser.memo.misses if(parser.memo) else 0
 
     def __str__(cls):
         '''Generate a string representation of the parser state.
@@ -54,30 +113,150 @@ class ParserResult:
                                    str(cls.max_phrase_length))
         display += '%19s: %s\n' % ('node_hits', str(cls.node_hits))
         display += '%19s: %s\n' % ('max_tree_depth', str(cls.max_tree_depth))
+        display += '%19s: %s\n' % ('memo_hits', str(cls.memo_hits))
+        display += '%19s: %s\n' % ('memo_misses', str(cls.memo_misses))
         return display
 
 
 class Parser:
     '''The Parser class for parsing an APG grammar.'''
 
+    ## True if the parser can run a grammar file written already
+    # compiled by Api.write_grammar(fname, compiled=True),
+    # a grammar without opcodes (see CompiledParser).
+    runs_compiled = False
+
     def __init__(self, grammar):
         '''The Parser class constructor.
         @param grammar The grammar object generated from an SABNF grammar
         by the API (see @ref api.py).'''
+        if(getattr(grammar, 'is_compiled', False) and
+           not self.runs_compiled):
+            raise Exception(
+                'the grammar file is compiled and has no opcodes, '
+                'it can only be parsed with the CompiledParser '
+                '(apg_py.lib.compiled_parser)')
 
-        self.rules = grammar.rules
+        self.rules = compiled_rules(grammar)
+        self.grammar = grammar
         self.udts = grammar.udts
         self.rule_count = len(self.rules)
         self.udt_count = len(self.udts)
+        # a UDT or back reference may be reached in look behind mode
+        self.behind_terminals = False
+        for rule in self.rules:
+            for op in rule['opcodes']:
+                if((op.type == id.BKA or op.type == id.BKN) and
+                   (op.look_bkrs or self.udt_count)):
+                    self.behind_terminals = True
         self.trace = None
         self.ast = None
         self.stats = None
+        self.memo = None
         self.tree_depth_limit = id.MAX_INT
         self.node_hits_limit = id.MAX_INT
+        # the limits checked every check_interval node hits
+        self.time_limit = 0
+        self.ast_record_limit = id.MAX_INT
+        self.bkr_entry_limit = id.MAX_INT
+        self.check_interval = 1000
+        self.budgets = False
+        # the node hits of the next check of the limits
+        self.hits_check = id.MAX_INT
+        self.deadline = None
         self.max_tree_depth = 0
         self.tree_depth = 0
         self.node_hits = 0
         self.max_phrase_length = 0
+        self.prune = False
+        # prune the nodes in look behind mode (see configure())
+        self.prune_behind = False
+        self.fuse = False
+        # set by a cut for the ALT or REP it commits (see opCUT())
+        self.cut = False
+        # the number of rules with an open choice point (see opCUT())
+        self.choices = 0
+        # the characters examined by the nodes, [span_low, span_high),
+        # are only recorded for an incremental memo table (see reparse())
+        self.spans = False
+        self.span_low = 0
+        self.span_high = 0
+        # cache the results of the look around operators
+        # (see look_find()) - may be set False to always
+        # execute the look around operators' children
+        self.cache_lookaround = True
+        self.look_cache = False
+        self.look_table = {}
+        self.input = None
+        # match the regular rules with regular expressions or DFAs
+        # (see match_regex()) - may be set False to always
+        # execute the rules' opcodes
+        self.regular_rules = True
+        self.regex = None
+        # find the error position, max_phrase_length, of a failed parse
+        # that matched regular rules (see repeat()) - may be set False
+        # if it is not needed
+        self.error_position = True
+        # the regular rules find their own error positions
+        # (see match_regex()) if the failed parse is not repeated
+        self.regex_reach = False
+        self.text = None
+        # the case folded str view of the input characters
+        # [fold_base, fold_end) (see fold())
+        self.folded = None
+        self.fold_base = 0
+        self.fold_end = 0
+        # the (input, character codes, str view,
+        # (case folded str view, fold_base, fold_end))
+        # of the last input tuple or string, kept for the next parse
+        # only if keep_input is True - set by ApgExp, which parses
+        # the same input many times - otherwise nothing of the input
+        # is kept after the parse
+        self.keep_input = False
+        self.text_cache = (None, None, None, None)
+        # executes the child nodes (see parse())
+        self.execute = self.opExecute
+        self.select_operators()
+        # the parse contexts not in use (see context())
+        self.contexts = []
+        # initialize rule callback functions
+        self.rule_callbacks = [None] * self.rule_count
+        if(self.udt_count):
+            self.udt_callbacks = [None] * self.udt_count
+        else:
+            self.udt_callbacks = []
+        # rule indexes for quick look up
+        # list of rule + UDT names for back referencing
+        bkru_names = []
+        bkrr_names = []
+        self.rule_indexes = {}
+        for rule in self.rules:
+            self.rule_indexes[rule['lower']] = rule['index']
+            if(rule['is_bkru']):
+                bkru_names.append(rule['lower'])
+            if(rule['is_bkrr']):
+                bkrr_names.append(rule['lower'])
+        self.udt_indexes = {}
+        if(self.udt_count):
+            for udt in self.udts:
+                self.udt_indexes[udt['lower']] = udt['index']
+            if(udt['is_bkru']):
+                bkru_names.append(udt['lower'])
+            if(udt['is_bkrr']):
+                bkrr_names.append(udt['lower'])
+        # set up for back referencing
+        self.bkru_stack = None
+        self.bkrr_stack = None
+        if(grammar.has_bkru):
+            self.bkru_stack = BackrefenceStack(bkru_names)
+        if(grammar.has_bkrr):
+            self.bkrr_stack = BackrefenceStack(bkrr_names)
+
+    def select_operators(self):
+        '''Only called internally by the parser,
+        never called explicitly by the user.
+        Makes the tables of the operator functions for each opcode type.
+        '''
         self.opSelect = {
             id.ALT: self.opALT,
             id.CAT: self.opCAT,
@@ -86,6 +265,7 @@ class Parser:
             id.TLS: self.opTLS,
             id.TBS: self.opTBS,
             id.TRG: self.opTRG,
+            id.CLS: self.opCLS,
             id.UDT: self.opUDT,
             id.AND: self.opAND,
             id.NOT: self.opNOT,
@@ -94,6 +274,7 @@ class Parser:
             id.BKN: self.opBKN,
             id.ABG: self.opABG,
             id.AEN: self.opAEN,
+            id.CUT: self.opCUT,
         }
         self.opSelectBehind = {
             id.ALT: self.opALTbehind,
@@ -103,6 +284,7 @@ class Parser:
             id.TLS: self.opTLSbehind,
             id.TBS: self.opTBSbehind,
             id.TRG: self.opTRGbehind,
+            id.CLS: self.opCLSbehind,
             id.UDT: self.opUDTbehind,
             id.AND: self.opAND,
             id.NOT: self.opNOT,
@@ -111,39 +293,8 @@ class Parser:
             id.BKN: self.opBKN,
             id.ABG: self.opABG,
             id.AEN: self.opAEN,
+            id.CUT: self.opCUT,
         }
-        # initialize rule callback functions
-        self.rule_callbacks = [None] * self.rule_count
-        if(self.udt_count):
-            self.udt_callbacks = [None] * self.udt_count
-        else:
-            self.udt_callbacks = []
-        # rule indexes for quick look up
-        # list of rule + UDT names for back referencing
-        bkru_names = []
-        bkrr_names = []
-        self.rule_indexes = {}
-        for rule in self.rules:
-            self.rule_indexes[rule['lower']] = rule['index']
-            if(rule['is_bkru']):
-                bkru_names.append(rule['lower'])
-            if(rule['is_bkrr']):
-                bkrr_names.append(rule['lower'])
-        self.udt_indexes = {}
-        if(self.udt_count):
-            for udt in self.udts:
-                self.udt_indexes[udt['lower']] = udt['index']
-            if(udt['is_bkru']):
-                bkru_names.append(udt['lower'])
-            if(udt['is_bkrr']):
-                bkrr_names.append(udt['lower'])
-        # set up for back referencing
-        self.bkru_stack = None
-        self.bkrr_stack = None
-        if(grammar.has_bkru):
-            self.bkru_stack = BackrefenceStack(bkru_names)
-        if(grammar.has_bkrr):
-            self.bkrr_stack = BackrefenceStack(bkrr_names)
 
     def add_callbacks(self, callbacks):
         '''Add callback functions to the rule name (RNM) nodes.
@@ -197,7 +348,7 @@ class Parser:
 
     def set_tree_depth_limit(self, maxt):
         '''Set a maximum tree depth.
-        The parser will raise an Exception if the parse
+        The parser will raise a LimitExceeded exception if the parse
         tree depth exceeds the specified maximum.
         @param maxt the maximum allowed parse tree depth'''
 
@@ -205,11 +356,89 @@ class Parser:
 
     def set_node_hit_limit(self, maxt):
         '''Set a maximum number of node hits.
-        The parser will raise an Exception if the number
+        The parser will raise a LimitExceeded exception if the number
         of node hits exceeds the specified maximum.
         @param maxt the maximum allowed number of node hits'''
         self.node_hits_limit = max(0, maxt)
 
+    def set_time_limit(self, seconds):
+        '''Set a maximum time for each parse.
+        The parser will raise a LimitExceeded exception if a parse
+        runs past the specified time.
+        The time is checked every check_interval node hits.
+        @param seconds the maximum allowed time in seconds,
+        0 for no limit'''
+        self.time_limit = max(0, seconds)
+        self.set_budgets()
+
+    def set_ast_record_limit(self, maxt):
+        '''Set a maximum number of AST records.
+        The parser will raise a LimitExceeded exception if the AST
+        holds more than the specified maximum number of records.
+        The records are counted every check_interval node hits.
+        @param maxt the maximum allowed number of AST records'''
+        self.ast_record_limit = max(0, maxt)
+        self.set_budgets()
+
+    def set_bkr_entry_limit(self, maxt):
+        '''Set a maximum number of back reference stack entries.
+        The parser will raise a LimitExceeded exception if the
+        back reference stacks hold more than the specified maximum
+        number of phrases.
+        The phrases are counted every check_interval node hits.
+        @param maxt the maximum allowed number of back referenced
+        phrases'''
+        self.bkr_entry_limit = max(0, maxt)
+        self.set_budgets()
+
+    def set_budgets(self):
+        '''Only called internally by the parser,
+        never called explicitly by the user.
+        Notes whether any of the limits checked every check_interval
+        node hits are set.'''
+        self.budgets = bool(self.time_limit or
+                            self.ast_record_limit != id.MAX_INT or
+                            self.bkr_entry_limit != id.MAX_INT)
+
+    def check_limits(self, depth):
+        '''Only called internally by the parser,
+        never called explicitly by the user.
+        Called when the parse tree depth reaches its limit or the
+        node hits reach hits_check. Raises a LimitExceeded exception
+        if any limit is exceeded, otherwise sets the node hits
+        of the next check.
+        @param depth The parse tree depth of the present node.'''
+        if(depth >= self.tree_depth_limit):
+            self.max_tree_depth = max(self.max_tree_depth, depth)
+            raise LimitExceeded(
+                'parse tree depth limit exceeded, limit = %d' %
+                self.tree_depth_limit, self)
+        if(self.node_hits >= self.node_hits_limit):
+            raise LimitExceeded(
+                'node hits limit exceeded, limit = %d' %
+                self.node_hits_limit, self)
+        if(self.deadline is not None and time.monotonic() >= self.deadline):
+            raise LimitExceeded(
+                'parse time limit exceeded, limit = %g seconds' %
+                self.time_limit, self)
+        if(self.ast and len(self.ast.record_states) > self.ast_record_limit):
+            raise LimitExceeded(
+                'AST records limit exceeded, limit = %d' %
+                self.ast_record_limit, self)
+        if(self.bkr_entry_limit != id.MAX_INT):
+            entries = 0
+            if(self.bkru_stack):
+                entries += len(self.bkru_stack.journal)
+            if(self.bkrr_stack):
+                entries += len(self.bkrr_stack.journal)
+            if(entries > self.bkr_entry_limit):
+                raise LimitExceeded(
+                    'back reference entries limit exceeded, limit = %d' %
+                    self.bkr_entry_limit, self)
+        if(self.budgets):
+            self.hits_check = min(self.node_hits_limit,
+                                  self.node_hits + self.check_interval)
+
     def parse(
             self,
             input,
@@ -218,8 +447,12 @@ class Parser:
             sub_length=0,
             user_data=None):
         '''Parses an input string.
-        @param input A tuple of positive integers representing
-        the input string.
+        @param input The input string. A tuple (or list) of positive
+        integers, the character codes, or a str. It may also be
+        any other sequence of character codes that can be indexed
+        and sliced without copying, such as bytes, bytearray,
+        memoryview, array.array or mmap.mmap objects.
+        The callback functions always see a sequence of character codes.
         @param start_rule Name of the grammar's start rule
             (defaults to first rule of the SABNF grammar.)
         @param sub_begin The index of the first integer of the substring
@@ -228,31 +461,288 @@ class Parser:
             (<=0 indicates end of input string.)
         @param user_data Data which will be passed to the callback functions
             strictly for user's use.
+        @returns Returns a ParserResult object.
+
+        The parser itself is not changed by an unobserved parse
+        (see context()) and may be used by many threads at once.
             '''
+        context = self.context()
+        result = context.run(input, start_rule, sub_begin, sub_length,
+                             user_data)
+        if(self.keep_input and (type(input) is tuple or
+                                type(input) is str) and
+           (context.text is not None or context.folded is not None)):
+            # keep the character codes and the str views of an unchanged
+            # input for the next parse
+            self.text_cache = (input, context.input, context.text,
+                               (context.folded, context.fold_base,
+                                context.fold_end))
+        self.release(context)
+        return result
+
+    async def parse_async(
+            self,
+            input,
+            start_rule=None,
+            sub_begin=0,
+            sub_length=0,
+            user_data=None,
+            executor=None):
+        '''Parses an input string without blocking the asyncio
+        event loop.
+        <pre>
+        result = await parser.parse_async(input)
+        </pre>
+        The recursive parser cannot suspend a parse.
+        It runs parse() in the executor, which defaults to the
+        event loop's default executor, and the callback functions
+        are called in the executor's thread.
+        A cancelled parse runs on to its end in the executor.
+        The StackParser can also parse in the event loop's thread
+        (see StackParser.parse_async()).
+        @param executor A concurrent.futures executor or None.
+        The other arguments and the result are those of parse().
+        '''
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, functools.partial(
+            self.parse, input, start_rule, sub_begin, sub_length,
+            user_data))
+
+    def parse_many(self, inputs, start_rule=None, buffer=None,
+                   user_data=None):
+        '''Parses many input strings, or many substrings of one input
+        string, with the same start rule.
+        The start rule, the callback functions and the parser's settings
+        are looked up once for all of the parses.
+        <pre>
+        for result in parser.parse_many(records):
+            ...
+        for result in parser.parse_many(spans, buffer=input):
+            ...
+        </pre>
+        @param inputs An iterable of input strings (see parse()) or,
+        if buffer is given, of (sub_begin, sub_length) substrings
+        of the buffer.
+        @param start_rule Name of the grammar's start rule
+            (defaults to first rule of the SABNF grammar.)
+        @param buffer If not None, the input string of all of the parses.
+        It is converted to character codes once and never sliced.
+        @param user_data Data which will be passed to the callback functions
+            strictly for user's use.
+        @returns Returns a generator of BatchResult tuples,
+        one for each input string or substring.
+        The AST, trace, statistics and memo table, if any, hold
+        those of the latest parse while the generator is suspended.
+        Changes to the parser's callback functions or settings
+        take effect in the next call to parse_many().
+        '''
+        context = self.context()
+        try:
+            context.configure(start_rule, user_data)
+            if(buffer is not None):
+                context.load(buffer)
+            settings = (context.regex, context.prune, context.prune_behind)
+            for input in inputs:
+                (sub_begin, sub_length) = (0, 0)
+                if(buffer is None):
+                    context.load(input)
+                else:
+                    (sub_begin, sub_length) = input
+                (context.regex, context.prune,
+                 context.prune_behind) = settings
+                context.reset(sub_begin, sub_length)
+                context.opExecute(0)
+                if(context.repeat(sub_begin, sub_length)):
+                    context.opExecute(0)
+                if(context is not self and context.ast):
+                    # the next parse gets new records
+                    self.ast.adopt(context.ast)
+                    context.ast = self.ast.fork(context)
+                yield BatchResult(
+                    context.state != id.NOMATCH and
+                    context.phrase_index == context.sub_end,
+                    context.state,
+                    context.phrase_index - context.sub_begin,
+                    context.sub_begin,
+                    context.sub_end,
+                    context.max_phrase_length,
+                    context.node_hits)
+        finally:
+            self.release(context)
+
+    def reparse(self, offset, deleted, inserted, start_rule=None,
+                user_data=None):
+        '''Parses the input string of the previous parse after an edit.
+        The memoized rule results that the edit cannot change are
+        reused and only the rest of the input string is parsed again.
+        The results and the AST are those of a parse() of the edited
+        input string.
+        Requires a memo table kept for the incremental re-parse,
+        <pre>
+        Memo(parser, incremental=True)
+        parser.parse(input)
+        parser.reparse(offset, deleted, inserted)
+        </pre>
+        and a previous parse of a whole input string.
+        @param offset The index of the first character deleted
+        or of the insertion.
+        @param deleted The number of characters deleted.
+        @param inserted The characters inserted, a str or a sequence of
+        character codes.
+        @param start_rule Name of the grammar's start rule
+            (defaults to first rule of the SABNF grammar.)
+        @param user_data Data which will be passed to the callback functions
+            strictly for user's use.
+        @returns Returns a ParserResult object.
+        The edited input string is the parser's `input`,
+        or `text` if the input strings are str.
+        '''
+        if(not self.memo or not self.memo.incremental):
+            raise Exception('reparse requires an incremental memo table')
+        if(self.input is None or self.sub_begin != 0 or
+           self.sub_end != len(self.input)):
+            raise Exception('reparse requires a previous parse of '
+                            'a whole input string')
+        if(offset < 0 or deleted < 0 or offset + deleted > self.sub_end):
+            raise Exception('reparse edit is outside of the input string')
+        if(isinstance(self.text, str)):
+            if(not isinstance(inserted, str)):
+                inserted = utils.tuple_to_string(inserted)
+            input = (self.text[:offset] + inserted +
+                     self.text[offset + deleted:])
+        else:
+            if(isinstance(inserted, str)):
+                inserted = utils.string_to_tuple(inserted)
+            codes = self.input
+            input = (tuple(codes[:offset]) + tuple(inserted) +
+                     tuple(codes[offset + deleted:]))
+        self.memo.edit(offset, deleted, len(inserted))
+        return self.parse(input, start_rule, user_data=user_data)
+
+    def context(self):
+        '''Only called internally by the parser,
+        never called explicitly by the user.
+        Gets the object that holds the state of a single parse.
+        A parse that is observed by a trace, statistics or a
+        memo table runs on the parser itself - these objects keep
+        the state of the parse for the user to read afterwards.
+        Any other parse runs on a shallow copy of the parser
+        with its own operator tables and back reference stacks,
+        so that one parser can run many parses concurrently.
+        The copies are reused by later parses, refreshed with
+        the parser's present callbacks and settings.
+        If the parser has an AST, each copy gets its own AST record
+        columns (see Ast.fork()) and the parser's AST takes over
+        the records of each parse when it is complete (see release()).
+        The AST holds the records of the parse completed last.
+        @returns Returns the parser or its copy.
+        '''
+        if(self.trace or self.stats or self.memo):
+            return self
+        try:
+            context = self.contexts.pop()
+        except IndexError:
+            # none left over from previous parses
+            context = object.__new__(type(self))
+            context.__dict__.update(self.__dict__)
+            context.select_operators()
+            if(self.bkru_stack):
+                context.bkru_stack = BackrefenceStack(self.bkru_stack.names)
+            if(self.bkrr_stack):
+                context.bkrr_stack = BackrefenceStack(self.bkrr_stack.names)
+        else:
+            own = (context.opSelect, context.opSelectBehind,
+                   context.bkru_stack, context.bkrr_stack)
+            context.__dict__.update(self.__dict__)
+            (context.opSelect, context.opSelectBehind,
+             context.bkru_stack, context.bkrr_stack) = own
+        if(self.ast):
+            context.ast = self.ast.fork(context)
+        return context
+
+    def release(self, context):
+        '''Only called internally by the parser,
+        never called explicitly by the user.
+        A parse on a context from context() is complete.
+        Keeps the context for the next parse,
+        without holding on to the input.
+        The parser's AST, if any, takes over the parse's AST records.
+        '''
+        if(context is not self):
+            if(context.ast):
+                self.ast.adopt(context.ast)
+                context.ast = None
+            context.input = None
+            context.text = None
+            context.folded = None
+            context.cbData = None
+            self.contexts.append(context)
+
+    def run(self, input, start_rule, sub_begin, sub_length, user_data):
+        '''Only called internally by the parser,
+        never called explicitly by the user.
+        Parses the input string on the parse context (see context()).
+        The arguments are those of parse().
+        @returns Returns a ParserResult object.
+        '''
+        self.setup(input, start_rule, sub_begin, sub_length, user_data)
+        self.opExecute(0)
+        if(self.repeat(sub_begin, sub_length)):
+            self.opExecute(0)
+        return ParserResult(self)
+
+    def repeat(self, sub_begin, sub_length):
+        '''Only called internally by the parser,
+        never called explicitly by the user.
+        A regular expression or DFA cannot tell how far a rule looked
+        before it failed or matched a shorter phrase,
+        nor can a pruned node that fails without being executed.
+        A failed parse that matched regular rules with them, or was
+        pruned, is parsed again with the opcodes alone and no pruning,
+        for the error position, max_phrase_length, of the opcodes -
+        unless a callback function would see the repeated parse
+        (see match_regex()).
+        A successful parse needs no repeat, its max_phrase_length
+        is always the length of the substring parsed.
+        @param sub_begin The sub_begin of the parse, see parse().
+        @param sub_length The sub_length of the parse, see parse().
+        @returns Returns True if the parse is reset to be executed again.
+        '''
+        if((self.regex is None and not self.prune) or self.regex_reach or
+           not self.error_position or
+           (self.state != id.NOMATCH and self.phrase_index == self.sub_end)):
+            return False
+        self.regex = None
+        self.prune = False
+        self.prune_behind = False
+        self.reset(sub_begin, sub_length)
+        return True
 
-        # initialize
+    def setup(self, input, start_rule, sub_begin, sub_length, user_data):
+        '''Only called internally by the parser,
+        never called explicitly by the user.
+        Initializes the parse context for a parse of the input string.
+        The arguments are those of parse().
+        '''
+        self.configure(start_rule, user_data)
+        self.load(input)
+        self.reset(sub_begin, sub_length)
+
+    def configure(self, start_rule, user_data):
+        '''Only called internally by the parser,
+        never called explicitly by the user.
+        Initializes the parse context for any number of parses
+        with the same start rule and settings (see parse_many()).
+        The arguments are those of parse().
+        '''
         if(start_rule):
             # search for rule name
-            lower = start_rule.lower()
-            self.start_rule = None
-            for rule in self.rules:
-                if(rule['lower'] == lower):
-                    self.start_rule = rule['index']
-                    break
+            self.start_rule = self.rule_indexes.get(start_rule.lower(), None)
             if(self.start_rule is None):
                 raise Exception('start rule not a valid rule name', start_rule)
         else:
             # use the first rule
             self.start_rule = 0
-        self.input = input
-        self.sub_begin = sub_begin
-        input_len = len(input)
-        if(sub_length > 0):
-            self.sub_end = self.sub_begin + sub_length
-            if(self.sub_end > input_len):
-                self.sub_end = input_len
-        else:
-            self.sub_end = input_len
         # verify that all UDT callbacks are set, if any
         if(self.udt_count):
             for udt in self.udts:
@@ -263,11 +753,121 @@ class Parser:
                     raise Exception(
                         'All UDTs require a callback function. None for '
                         + name)
+        # select the memoizing RNM operator only if memoization is on
+        opRNM = self.opRNMmemo if(self.memo) else self.opRNM
+        self.opSelect[id.RNM] = opRNM
+        self.opSelectBehind[id.RNM] = opRNM
+        # dummy opcode for start rule
+        self.start = Opcode({'type': id.RNM, 'index': self.start_rule}, {})
+        # prune the branches of the parse tree that cannot match -
+        # skip the ALT children that cannot match the next character
+        # and fail the nodes that need more characters than are left -
+        # only if it is not observable - no trace, statistics or
+        # rule callbacks that expect to see the failed attempts -
+        # a failed parse is parsed again without pruning for its
+        # error position (see repeat()), unless the UDT callbacks
+        # would see that
+        self.prune = not(self.trace or self.stats or
+                         any(self.rule_callbacks) or
+                         (self.error_position and self.udt_count))
+        # a UDT or back reference raises an exception in look behind mode
+        # (see opUDTbehind()) - if one may be reached in look behind
+        # mode, those nodes are not pruned, so that it still does
+        self.prune_behind = self.prune and not self.behind_terminals
+        # match the REP of terminals in a single loop (see opREPscan())
+        # unless every node is traced
+        self.fuse = not self.trace
+        # match the regular rules with their regular expressions
+        # (see match_regex()) if none of their nodes are observed
+        # or counted against the limits
+        self.regex = None
+        # record the characters examined by the memoized rules
+        # if the memo table is kept for an incremental re-parse,
+        # the fused REPs and the regular expressions cannot tell
+        # how far they have looked
+        self.spans = bool(self.memo and self.memo.incremental)
+        if(self.spans):
+            self.fuse = False
+        # cache the look around results unless the nodes below
+        # the look around operators are observed - by a trace or
+        # the rule callbacks - or their examined characters recorded
+        self.look_cache = self.cache_lookaround and not(
+            self.trace or self.spans or any(self.rule_callbacks))
+        instrumented = (self.trace or self.stats or self.spans or
+                        self.budgets or
+                        self.node_hits_limit != id.MAX_INT or
+                        self.tree_depth_limit != id.MAX_INT)
+        if(self.regular_rules and not instrumented):
+            self.regex = enabled_patterns(
+                grammar_regex_rules(self.grammar, self.rules),
+                self.rules, self.rule_callbacks, self.ast)
+        # a failed parse is repeated without the regular expressions
+        # to find its error position (see repeat()) unless the callback
+        # functions would see the repeated parse
+        self.regex_reach = self.error_position and bool(
+            self.udt_count or any(self.rule_callbacks))
+        # execute the nodes without the trace, statistics and
+        # limit checks if none of them are in use
+        self.execute = self.opExecute if(
+            instrumented) else self.opExecuteFast
+        self.cbData = {'state': id.ACTIVE,
+                       'input': None,
+                       'sub_begin': 0,
+                       'sub_end': 0,
+                       'phrase_index': 0,
+                       'phrase_length': 0,
+                       'max_phrase_length': 0,
+                       'user_data': user_data}
+
+    def load(self, input):
+        '''Only called internally by the parser,
+        never called explicitly by the user.
+        Sets the input string of the following parses.
+        @param input The input string, see parse().
+        '''
+        # the character codes of the input and its str views, if any
+        (cached, codes, self.text, folded) = self.text_cache
+        if(folded):
+            (self.folded, self.fold_base, self.fold_end) = folded
+        if(cached is not input):
+            codes = input
+            self.text = None
+            self.folded = None
+            if(isinstance(input, str)):
+                # the regular expressions match the string itself
+                codes = utils.string_to_codes(input)
+                self.text = input
+            elif(type(input) is not tuple and type(input) is not list):
+                # bytes, arrays and memory maps are matched in place,
+                # a str view would copy the whole input
+                self.text = False
+        self.input = codes
+        self.cbData['input'] = codes
+        if(self.ast):
+            self.ast.input = codes
+
+    def reset(self, sub_begin, sub_length):
+        '''Only called internally by the parser,
+        never called explicitly by the user.
+        Initializes the state of a parse of the loaded input string.
+        The arguments are those of parse().
+        '''
+        self.sub_begin = sub_begin
+        input_len = len(self.input)
+        if(sub_length > 0):
+            self.sub_end = self.sub_begin + sub_length
+            if(self.sub_end > input_len):
+                self.sub_end = input_len
+        else:
+            self.sub_end = input_len
         if(self.ast):
-            # initialize the AST
-            self.ast.input = input
-            self.ast.indexStack.clear()
-            self.ast.records.clear()
+            self.ast.clear()
+        if(self.memo):
+            self.memo.clear()
+        if(self.bkru_stack):
+            self.bkru_stack.restore_state(0)
+        if(self.bkrr_stack):
+            self.bkrr_stack.restore_state(0)
         self.max_phrase_length = 0
         self.node_hits = 0
         self.tree_depth = 0
@@ -276,18 +876,27 @@ class Parser:
         self.phrase_index = self.sub_begin
         self.lookaround = 0
         self.current_look_direction = id.LOOKAROUND_NONE
-        # dummy opcode for start rule
-        self.opcodes = ({'type': id.RNM, 'index': self.start_rule},)
-        self.cbData = {'state': id.ACTIVE,
-                       'input': self.input,
-                       'sub_begin': self.sub_begin,
-                       'sub_end': self.sub_end,
-                       'phrase_index': self.sub_begin,
-                       'phrase_length': 0,
-                       'max_phrase_length': 0,
-                       'user_data': user_data}
-        self.opExecute(0)
-        return ParserResult(self)
+        self.cut = False
+        self.choices = 0
+        self.look_table = {}
+        self.opcodes = (self.start,)
+        self.hits_check = self.node_hits_limit
+        self.deadline = None
+        if(self.budgets):
+            self.hits_check = min(self.node_hits_limit, self.check_interval)
+            if(self.time_limit):
+                self.deadline = time.monotonic() + self.time_limit
+        if(self.folded is not None and (
+                self.sub_begin < self.fold_base or
+                self.sub_end > self.fold_end)):
+            # folded for a different part of the input
+            self.folded = None
+        self.span_low = self.sub_begin
+        self.span_high = self.sub_begin
+        cbData = self.cbData
+        cbData['sub_begin'] = self.sub_begin
+        cbData['sub_end'] = self.sub_end
+        cbData['phrase_index'] = self.sub_begin
 
     def opALT(self, op_index):
         '''Only called internally by the parser,
@@ -296,13 +905,25 @@ class Parser:
         op = self.opcodes[op_index]
         index = self.phrase_index
         state = id.NOMATCH
-        for childOp in op['children']:
+        children = op.children
+        if(self.prune and op.alt_table is not None):
+            # only the children that can begin with the next character
+            if(index < self.sub_end):
+                children = op.alt_table.get(
+                    self.input[index], op.alt_default)
+            else:
+                children = op.alt_default
+        if(op.commits):
+            outer = self.cut
+        for childOp in children:
             self.state = id.ACTIVE
+            if(op.commits):
+                self.cut = False
             if(self.bkru_stack):
                 saveu = self.bkru_stack.save_state()
             if(self.bkrr_stack):
                 saver = self.bkrr_stack.save_state()
-            self.opExecute(childOp)
+            self.execute(childOp)
             if(self.state == id.NOMATCH):
                 # reset phrase index on failure
                 self.phrase_index = index
@@ -310,10 +931,16 @@ class Parser:
                     self.bkru_stack.restore_state(saveu)
                 if(self.bkrr_stack):
                     self.bkrr_stack.restore_state(saver)
+                if(op.commits and self.cut):
+                    # committed by a cut, the remaining children
+                    # are not tried
+                    break
             else:
                 # ALT succeeds when first child succeeds
                 state = id.MATCH if(self.phrase_index > index) else id.EMPTY
                 break
+        if(op.commits):
+            self.cut = outer
         self.state = state
 
     def opALTbehind(self, op_index):
@@ -323,16 +950,26 @@ class Parser:
         op = self.opcodes[op_index]
         index = self.phrase_index
         state = id.NOMATCH
-        for childOp in reversed(op['children']):
+        if(op.commits):
+            outer = self.cut
+        for childOp in reversed(op.children):
             self.state = id.ACTIVE
-            self.opExecute(childOp)
+            if(op.commits):
+                self.cut = False
+            self.execute(childOp)
             if(self.state == id.NOMATCH):
                 # reset phrase index on failure
                 self.phrase_index = index
+                if(op.commits and self.cut):
+                    # committed by a cut, the remaining children
+                    # are not tried
+                    break
             else:
                 # ALT succeeds when first child succeeds
                 state = id.MATCH
                 break
+        if(op.commits):
+            self.cut = outer
         self.state = state
 
     def opCAT(self, op_index):
@@ -340,6 +977,11 @@ class Parser:
         never called explicitly by the user.
         '''
         op = self.opcodes[op_index]
+        if(self.prune and op.min_length and
+           self.sub_end - self.phrase_index < op.min_length):
+            # too few characters left to match
+            self.state = id.NOMATCH
+            return
         if(self.ast and self.lookaround == 0):
             savedAstState = self.ast.save_state()
         index = self.phrase_index
@@ -348,9 +990,9 @@ class Parser:
             saveu = self.bkru_stack.save_state()
         if(self.bkrr_stack):
             saver = self.bkrr_stack.save_state()
-        for childOp in op['children']:
+        for childOp in op.children:
             self.state = id.ACTIVE
-            self.opExecute(childOp)
+            self.execute(childOp)
             if(self.state == id.NOMATCH):
                 # CAT fails if any child fails
                 self.phrase_index = index
@@ -369,13 +1011,18 @@ class Parser:
         never called explicitly by the user.
         '''
         op = self.opcodes[op_index]
+        if(self.prune_behind and op.min_length and
+           self.phrase_index < op.min_length):
+            # too few characters left to match
+            self.state = id.NOMATCH
+            return
         if(self.ast and self.lookaround == 0):
             savedAstState = self.ast.save_state()
         index = self.phrase_index
         state = id.MATCH
-        for childOp in reversed(op['children']):
+        for childOp in reversed(op.children):
             self.state = id.ACTIVE
-            self.opExecute(childOp)
+            self.execute(childOp)
             if(self.state == id.NOMATCH):
                 # CAT fails if any child fails
                 self.phrase_index = index
@@ -390,23 +1037,35 @@ class Parser:
         never called explicitly by the user.
         '''
         op = self.opcodes[op_index]
+        if(self.prune and op.min_length and
+           self.too_short(op.min_length)):
+            # too few characters left to match
+            self.state = id.NOMATCH
+            return
+        if(self.fuse and (op.scan is not None
+                          or op.scan_string is not None)):
+            self.opREPscan(op_index)
+            return
         repCount = 0
         index = self.phrase_index
+        committed = False
+        if(op.commits):
+            outer = self.cut
         while(True):
             if(self.phrase_index >= self.sub_end):
                 # exit on end of string
                 break
             # execute the child node
             self.state = id.ACTIVE
+            if(op.commits):
+                self.cut = False
             if(self.bkru_stack):
                 saveu = self.bkru_stack.save_state()
             if(self.bkrr_stack):
                 saver = self.bkrr_stack.save_state()
             if(self.ast and self.lookaround == 0):
                 savedAstState = self.ast.save_state()
-            self.opExecute(op_index + 1)
-            if(self.state == id.MATCH):
-                i = 0
+            self.execute(op_index + 1)
             if(self.state == id.EMPTY):
                 # end if child node return EMPTY (prevents infinite loop)
                 break
@@ -418,11 +1077,15 @@ class Parser:
                     self.bkrr_stack.restore_state(saver)
                 if(self.ast and self.lookaround == 0):
                     self.ast.restore_state(savedAstState)
+                # a repetition committed by a cut fails the REP
+                committed = op.commits and self.cut
                 break
             repCount += 1
-            if(repCount == op['max']):
+            if(repCount == op.max):
                 # end when the repetition count has maxed out
                 break
+        if(op.commits):
+            self.cut = outer
         # done with repetitions, evaluate the match count
         # abs() keeps the phrase length positive in look behind mode
         #       - in this case the phrase index is moving backwards
@@ -432,44 +1095,178 @@ class Parser:
             # this may not seem obvious, but that's the way it works out
             self.state = id.EMPTY if(
                 repPhraseLength == 0) else id.MATCH
-        elif(repCount >= op['min']):
+        elif(repCount >= op.min and not committed):
             self.state = id.EMPTY if(
                 repPhraseLength == 0) else id.MATCH
         else:
             self.state = id.NOMATCH
 
+    def opREPscan(self, op_index):
+        '''Only called internally by the parser,
+        never called explicitly by the user.
+        Replaces @ref opREP() when the REP child is a single character
+        terminal, an ALT of single character terminals or a TBS
+        (see @ref opcodes.py).
+        All repetitions are matched in a single loop without executing
+        the child nodes. The node hits, tree depth and statistics
+        of the child nodes are updated in aggregate and are the same
+        as if the child nodes had been executed.
+        '''
+        op = self.opcodes[op_index]
+        child = self.opcodes[op_index + 1]
+        input = self.input
+        sub_end = self.sub_end
+        behind = self.current_look_direction == id.LOOKAROUND_BEHIND
+        begin = self.phrase_index
+        index = begin
+        count = 0
+        miss = False
+        if(op.scan_string is not None):
+            string = op.scan_string
+            length = len(string)
+            while(index < sub_end):
+                if(behind):
+                    first = index - length
+                    last = index
+                else:
+                    first = index
+                    last = index + length
+                if(first < 0 or last > sub_end
+                   or tuple(input[first:last]) != string):
+                    miss = True
+                    break
+                index = first if(behind) else last
+                count += 1
+                if(count == op.max):
+                    break
+            entries = ((child.type, None, 0),)
+            hits = (count,)
+        elif(len(op.scan) == 1 and len(op.scan[0][1]) == 1 and not behind):
+            # a single character range
+            (min, max) = op.scan[0][1][0]
+            limit = sub_end
+            if(op.max < sub_end - index):
+                limit = index + op.max
+            while(index < limit):
+                char = input[index]
+                if(char < min or char > max):
+                    break
+                index += 1
+            count = index - begin
+            miss = index < limit
+            entries = op.scan
+            hits = (count,)
+        else:
+            # ALT children are tried in reverse order in look behind mode
+            entries = op.scan
+            if(behind):
+                entries = tuple(reversed(entries))
+            hits = [0] * len(entries)
+            while(index < sub_end):
+                char = input[index - 1] if(behind) else input[index]
+                for (k, (type, ranges, floor)) in enumerate(entries):
+                    if(behind and index < floor):
+                        continue
+                    for (min, max) in ranges:
+                        if(char >= min and char <= max):
+                            break
+                    else:
+                        continue
+                    break
+                else:
+                    miss = True
+                    break
+                hits[k] += 1
+                index = index - 1 if(behind) else index + 1
+                count += 1
+                if(count == op.max):
+                    break
+        # account for the child nodes
+        if(count or miss):
+            is_alt = child.type == id.ALT
+            depth = self.tree_depth + 1
+            nodes = count + miss
+            if(is_alt):
+                depth += 1
+                if(self.prune and child.alt_table is not None and
+                   not behind):
+                    # only the matching child is tried (see opALT())
+                    nodes += count
+                else:
+                    for k in range(len(hits)):
+                        nodes += hits[k] * (k + 1)
+                    if(miss):
+                        # every ALT child fails
+                        nodes += len(hits)
+            self.node_hits += nodes
+            if(depth >= self.tree_depth_limit or
+               self.node_hits >= self.hits_check):
+                self.check_limits(depth)
+            if(depth > self.max_tree_depth):
+                self.max_tree_depth = depth
+            if(self.stats):
+                stats = self.stats
+                if(is_alt):
+                    stats.collect_count(id.ALT, id.MATCH, count)
+                    stats.collect_count(id.ALT, id.NOMATCH, miss)
+                for (k, entry) in enumerate(entries):
+                    stats.collect_count(entry[0], id.MATCH, hits[k])
+                    # the children tried before the matching child fail
+                    for j in range(k):
+                        stats.collect_count(
+                            entries[j][0], id.NOMATCH, hits[k])
+                    stats.collect_count(entry[0], id.NOMATCH, miss)
+        # evaluate the match count as for opREP()
+        self.phrase_index = index
+        if(self.lookaround == 0 and
+           self.phrase_index - self.sub_begin > self.max_phrase_length):
+            self.max_phrase_length = self.phrase_index - self.sub_begin
+        if(count >= op.min):
+            self.state = id.EMPTY if(index == begin) else id.MATCH
+        else:
+            self.state = id.NOMATCH
+
     def opRNM(self, op_index):
         '''Only called internally by the parser,
         never called explicitly by the user.
         '''
         parentOps = self.opcodes
         op = self.opcodes[op_index]
-        rule = self.rules[op['index']]
+        if(self.prune and op.min_length and
+           self.too_short(op.min_length)):
+            # too few characters left to match
+            self.state = id.NOMATCH
+            return
+        rule = self.rules[op.index]
         lower = rule['lower']
         self.opcodes = rule['opcodes']
+        if(op.choice):
+            # the rule's cuts can not commit the parse (see opCUT())
+            self.choices += 1
         if(rule['has_bkrr']):
             saver = self.bkrr_stack.save_state()
         self.state = id.ACTIVE
         phrase_index = self.phrase_index
         phrase_length = 0
-        if(self.rule_callbacks[op['index']]):
+        if(self.rule_callbacks[op.index]):
             # handle rule callback function (down)
             self.cbData['state'] = id.ACTIVE
             self.cbData['phrase_index'] = phrase_index
             self.cbData['phrase_length'] = 0
             self.cbData['max_phrase_length'] = self.max_phrase_length
-            self.rule_callbacks[op['index']](self.cbData)
+            self.rule_callbacks[op.index](self.cbData)
         if(self.ast and self.lookaround == 0):
             savedAstState = self.ast.save_state()
-            self.ast.down(lower)
-        self.opExecute(0)
+            self.ast.down(op.index, phrase_index)
+        if(self.regex is None or not self.match_regex(op.index)):
+            self.execute(0)
         if(self.current_look_direction == id.LOOKAROUND_BEHIND):
             # phrase index is moving backwards here
             phrase_length = phrase_index - self.phrase_index
             phrase_index = self.phrase_index
         else:
             phrase_length = self.phrase_index - phrase_index
-        if(self.rule_callbacks[op['index']]):
+        if(self.rule_callbacks[op.index]):
             # handle rule callback function (up)
             self.cbData['state'] = self.state
             self.cbData['phrase_length'] = phrase_length
@@ -477,14 +1274,14 @@ class Parser:
                 self.cbData['phrase_index'] = self.phrase_index
             else:
                 self.cbData['phrase_index'] = phrase_index
-            self.rule_callbacks[op['index']](self.cbData)
+            self.rule_callbacks[op.index](self.cbData)
         # handle back referencing, if any
         if(self.state == id.NOMATCH):
             if(self.ast and self.lookaround == 0):
                 self.ast.restore_state(savedAstState)
         else:
             if(self.ast and self.lookaround == 0):
-                self.ast.up(lower, phrase_index, phrase_length)
+                self.ast.up(op.index, phrase_index, phrase_length)
             # save the phrase for later back referencing
             if(rule['is_bkru']):
                 self.bkru_stack.save_phrase(
@@ -499,33 +1296,49 @@ class Parser:
             # The recursive back reference will always fail because
             # it is both saved and removed on restore.
             self.bkrr_stack.restore_state(saver)
+        if(op.choice):
+            self.choices -= 1
         self.opcodes = parentOps
 
+    def opRNMmemo(self, op_index):
+        '''Only called internally by the parser,
+        never called explicitly by the user.
+        Replaces @ref opRNM() when memoization is on (see @ref memo.py).
+        '''
+        rule_index = self.opcodes[op_index].index
+        if(self.memo.enabled[rule_index]):
+            self.memo.execute(op_index, rule_index)
+        else:
+            self.opRNM(op_index)
+
     def opTLS(self, op_index):
         '''Only called internally by the parser,
         never called explicitly by the user.
         '''
         op = self.opcodes[op_index]
         index = self.phrase_index
-        length = len(op['string'])
+        length = len(op.string)
         if(length == 0):
             # EMPTY match allowed, only in TLS
             self.state = id.EMPTY
             return
         state = id.NOMATCH
         if(index + length <= self.sub_end):
-            state = id.MATCH
-            for char in op['string']:
-                ichar = self.input[index]
-                if(ichar >= 65 and ichar <= 90):
-                    ichar += 32
-                if(char != ichar):
-                    state = id.NOMATCH
-                    break
-                index += 1
+            folded = self.folded
+            if(folded is None):
+                folded = self.fold()
+            base = self.fold_base
+            if(folded and index >= base):
+                if(folded.startswith(op.folded, index - base)):
+                    state = id.MATCH
+            else:
+                state = self.tls_match(op.string, index)
         self.state = state
         if(state == id.MATCH):
             self.phrase_index += length
+            if(self.lookaround == 0 and
+               self.phrase_index - self.sub_begin > self.max_phrase_length):
+                self.max_phrase_length = self.phrase_index - self.sub_begin
 
     def opTLSbehind(self, op_index):
         '''Only called internally by the parser,
@@ -533,38 +1346,56 @@ class Parser:
         '''
         op = self.opcodes[op_index]
         index = self.phrase_index
-        length = len(op['string'])
+        length = len(op.string)
         if(length == 0):
             # EMPTY match allowed, only in TLS
             self.state = id.EMPTY
             return
         state = id.NOMATCH
         if(index - length >= 0):
-            state = id.MATCH
-            index -= length
-            for char in op['string']:
-                ichar = self.input[index]
-                if(ichar >= 65 and ichar <= 90):
-                    ichar += 32
-                if(char != ichar):
-                    state = id.NOMATCH
-                    break
-                index += 1
+            folded = self.folded
+            if(folded is None):
+                folded = self.fold()
+            base = self.fold_base
+            if(folded and index - length >= base):
+                if(folded.startswith(op.folded, index - length - base)):
+                    state = id.MATCH
+            else:
+                state = self.tls_match(op.string, index - length)
         self.state = state
         if(state == id.MATCH):
             self.phrase_index -= length
 
+    def tls_match(self, string, index):
+        '''Only called internally by the parser,
+        never called explicitly by the user.
+        Compares a TLS string with the input, one character at a time,
+        if the input has no case folded str view (see fold()).
+        @param string The TLS opcode's (lower case) string.
+        @param index The index of the first input character to compare.
+        @returns Returns MATCH or NOMATCH.
+        '''
+        input = self.input
+        for char in string:
+            ichar = input[index]
+            if(ichar >= 65 and ichar <= 90):
+                ichar += 32
+            if(char != ichar):
+                return id.NOMATCH
+            index += 1
+        return id.MATCH
+
     def opTBS(self, op_index):
         '''Only called internally by the parser,
         never called explicitly by the user.
         '''
         op = self.opcodes[op_index]
         index = self.phrase_index
-        length = len(op['string'])
+        length = len(op.string)
         state = id.NOMATCH
         if(index + length <= self.sub_end):
             state = id.MATCH
-            for char in op['string']:
+            for char in op.string:
                 if(char != self.input[index]):
                     state = id.NOMATCH
                     break
@@ -572,6 +1403,9 @@ class Parser:
         self.state = state
         if(state == id.MATCH):
             self.phrase_index += length
+            if(self.lookaround == 0 and
+               self.phrase_index - self.sub_begin > self.max_phrase_length):
+                self.max_phrase_length = self.phrase_index - self.sub_begin
 
     def opTBSbehind(self, op_index):
         '''Only called internally by the parser,
@@ -579,12 +1413,12 @@ class Parser:
         '''
         op = self.opcodes[op_index]
         index = self.phrase_index
-        length = len(op['string'])
+        length = len(op.string)
         state = id.NOMATCH
         if(index - length >= 0):
             state = id.MATCH
             index -= length
-            for char in op['string']:
+            for char in op.string:
                 if(char != self.input[index]):
                     state = id.NOMATCH
                     break
@@ -602,9 +1436,12 @@ class Parser:
         state = id.NOMATCH
         if(index < self.sub_end):
             char = self.input[index]
-            if(char >= op['min'] and char <= op['max']):
+            if(char >= op.min and char <= op.max):
                 state = id.MATCH
                 self.phrase_index += 1
+                length = self.phrase_index - self.sub_begin
+                if(self.lookaround == 0 and length > self.max_phrase_length):
+                    self.max_phrase_length = length
         self.state = state
 
     def opTRGbehind(self, op_index):
@@ -616,7 +1453,46 @@ class Parser:
         state = id.NOMATCH
         if(index > 0):
             char = self.input[index]
-            if(char >= op['min'] and char <= op['max']):
+            if(char >= op.min and char <= op.max):
+                state = id.MATCH
+                self.phrase_index -= 1
+        self.state = state
+
+    def opCLS(self, op_index):
+        '''Only called internally by the parser,
+        never called explicitly by the user.
+        '''
+        op = self.opcodes[op_index]
+        state = id.NOMATCH
+        if(self.phrase_index < self.sub_end):
+            char = self.input[self.phrase_index]
+            if(char < 256):
+                found = op.bitmap[char]
+            else:
+                k = bisect_right(op.starts, char) - 1
+                found = k >= 0 and char <= op.ends[k]
+            if(found):
+                state = id.MATCH
+                self.phrase_index += 1
+                length = self.phrase_index - self.sub_begin
+                if(self.lookaround == 0 and length > self.max_phrase_length):
+                    self.max_phrase_length = length
+        self.state = state
+
+    def opCLSbehind(self, op_index):
+        '''Only called internally by the parser,
+        never called explicitly by the user.
+        '''
+        op = self.opcodes[op_index]
+        state = id.NOMATCH
+        if(self.phrase_index >= op.floor):
+            char = self.input[self.phrase_index - 1]
+            if(char < 256):
+                found = op.bitmap[char]
+            else:
+                k = bisect_right(op.starts, char) - 1
+                found = k >= 0 and char <= op.ends[k]
+            if(found):
                 state = id.MATCH
                 self.phrase_index -= 1
         self.state = state
@@ -661,13 +1537,13 @@ class Parser:
         never called explicitly by the user.
         '''
         op = self.opcodes[op_index]
-        udt = self.udts[op['index']]
+        udt = self.udts[op.index]
         lower = udt['lower']
         self.cbData['state'] = id.ACTIVE
         self.cbData['phrase_index'] = self.phrase_index
         self.cbData['phrase_length'] = 0
         self.cbData['max_phrase_length'] = self.max_phrase_length
-        self.udt_callbacks[op['index']](self.cbData)
+        self.udt_callbacks[op.index](self.cbData)
         self.UDTValidate(
             self.cbData['state'],
             self.phrase_index,
@@ -679,28 +1555,32 @@ class Parser:
         # handle back referencing, if any
         if(self.state != id.NOMATCH):
             if(self.ast and self.lookaround == 0):
-                self.ast.down(lower)
+                node = self.ast.udt_base + op.index
+                self.ast.down(node)
                 self.ast.up(
-                    lower,
+                    node,
                     self.cbData['phrase_index'],
                     self.cbData['phrase_length'])
             # save the phrase for later back referencing
             if(udt['is_bkru']):
                 self.bkru_stack.save_phrase(
-                    udt['lower'],
+                    lower,
                     self.cbData['phrase_index'],
                     self.cbData['phrase_length'])
             if(udt['is_bkrr']):
                 self.bkrr_stack.save_phrase(
-                    udt['lower'],
+                    lower,
                     self.cbData['phrase_index'],
                     self.cbData['phrase_length'])
         self.phrase_index += self.cbData['phrase_length']
+        if(self.lookaround == 0 and
+           self.phrase_index - self.sub_begin > self.max_phrase_length):
+            self.max_phrase_length = self.phrase_index - self.sub_begin
 
     def opUDTbehind(self, op_index):
         '''UDT operator not allowed in look behind mode.'''
         op = self.opcodes[op_index]
-        udt = self.udts[op['index']]
+        udt = self.udts[op.index]
         msg = 'UDT('
         msg += udt['name']
         msg += ') called. '
@@ -712,6 +1592,10 @@ class Parser:
         never called explicitly by the user.
         '''
         index = self.phrase_index
+        if(self.look_cache):
+            key = self.look_key(self.opcodes[op_index], index)
+            if(self.look_find(key)):
+                return
         self.state = id.ACTIVE
         self.lookaround += 1
         saveDir = self.current_look_direction
@@ -721,7 +1605,7 @@ class Parser:
         if(self.bkru_stack):
             saveu = self.bkru_stack.save_state()
         #
-        self.opExecute(op_index + 1)
+        self.execute(op_index + 1)
         #
         if(self.bkrr_stack):
             self.bkrr_stack.restore_state(saver)
@@ -737,12 +1621,18 @@ class Parser:
         self.phrase_index = index
         self.lookaround -= 1
         self.current_look_direction = saveDir
+        if(self.look_cache):
+            self.look_store(key, self.state)
 
     def opNOT(self, op_index):
         '''Only called internally by the parser,
         never called explicitly by the user.
         '''
         index = self.phrase_index
+        if(self.look_cache):
+            key = self.look_key(self.opcodes[op_index], index)
+            if(self.look_find(key)):
+                return
         self.state = id.ACTIVE
         self.lookaround += 1
         saveDir = self.current_look_direction
@@ -752,7 +1642,7 @@ class Parser:
         if(self.bkru_stack):
             saveu = self.bkru_stack.save_state()
         #
-        self.opExecute(op_index + 1)
+        self.execute(op_index + 1)
         #
         if(self.bkrr_stack):
             self.bkrr_stack.restore_state(saver)
@@ -767,12 +1657,24 @@ class Parser:
         self.phrase_index = index
         self.lookaround -= 1
         self.current_look_direction = saveDir
+        if(self.look_cache):
+            self.look_store(key, self.state)
 
     def opBKA(self, op_index):
         '''Only called internally by the parser,
         never called explicitly by the user.
         '''
         index = self.phrase_index
+        child = self.opcodes[op_index + 1]
+        if(self.prune_behind and child.min_length and
+           index < child.min_length):
+            # too few characters behind to match, BKA fails
+            self.state = id.NOMATCH
+            return
+        if(self.look_cache):
+            key = self.look_key(self.opcodes[op_index], index)
+            if(self.look_find(key)):
+                return
         self.state = id.ACTIVE
         self.lookaround += 1
         saveDir = self.current_look_direction
@@ -782,7 +1684,7 @@ class Parser:
         if(self.bkru_stack):
             saveu = self.bkru_stack.save_state()
         #
-        self.opExecute(op_index + 1)
+        self.execute(op_index + 1)
         #
         if(self.bkrr_stack):
             self.bkrr_stack.restore_state(saver)
@@ -798,12 +1700,24 @@ class Parser:
         self.phrase_index = index
         self.lookaround -= 1
         self.current_look_direction = saveDir
+        if(self.look_cache):
+            self.look_store(key, self.state)
 
     def opBKN(self, op_index):
         '''Only called internally by the parser,
         never called explicitly by the user.
         '''
         index = self.phrase_index
+        child = self.opcodes[op_index + 1]
+        if(self.prune_behind and child.min_length and
+           index < child.min_length):
+            # too few characters behind to match, BKN succeeds
+            self.state = id.EMPTY
+            return
+        if(self.look_cache):
+            key = self.look_key(self.opcodes[op_index], index)
+            if(self.look_find(key)):
+                return
         self.state = id.ACTIVE
         self.lookaround += 1
         saveDir = self.current_look_direction
@@ -813,7 +1727,7 @@ class Parser:
         if(self.bkru_stack):
             saveu = self.bkru_stack.save_state()
         #
-        self.opExecute(op_index + 1)
+        self.execute(op_index + 1)
         #
         if(self.bkrr_stack):
             self.bkrr_stack.restore_state(saver)
@@ -828,16 +1742,75 @@ class Parser:
         self.phrase_index = index
         self.lookaround -= 1
         self.current_look_direction = saveDir
+        if(self.look_cache):
+            self.look_store(key, self.state)
+
+    def look_key(self, op, index):
+        '''Only called internally by the parser,
+        never called explicitly by the user.
+        The key of a look around result in the cache (see look_find()).
+        @param op The look around opcode.
+        @param index The phrase index of the look around operator.
+        @returns Returns the key, the opcode and the phrase index and,
+        if the result depends on the back referenced phrases,
+        the last phrase of each name it may read.
+        '''
+        if(op.look_bkrs is None):
+            return (op, index)
+        key = [op, index]
+        for (mode, name) in op.look_bkrs:
+            if(mode == id.BKR_MODE_UM):
+                key.append(self.bkru_stack.last_phrase(name))
+            else:
+                key.append(self.bkrr_stack.last_phrase(name))
+        return tuple(key)
+
+    def look_find(self, key):
+        '''Only called internally by the parser,
+        never called explicitly by the user.
+        Looks up a look around result in the cache.
+        A look around operator leaves no phrase, no AST records
+        and no back referenced phrases behind,
+        so its result is only the state, EMPTY or NOMATCH.
+        That depends only on the input, the phrase index and
+        the back referenced phrases its children read,
+        so the children need to be executed only once
+        for each phrase index and back referenced phrases.
+        If the parse has statistics, the hits and misses are
+        counted (see Stats.collect_look()).
+        @param key The cache key from look_key().
+        @returns Returns True, with the state set, if the result
+        was in the cache, False otherwise.
+        '''
+        state = self.look_table.get(key)
+        if(self.stats):
+            self.stats.collect_look(key[0].type, state is not None)
+        if(state is None):
+            return False
+        self.state = state
+        return True
+
+    def look_store(self, key, state):
+        '''Only called internally by the parser,
+        never called explicitly by the user.
+        Saves a look around result in the cache.
+        @param key The cache key from look_key().
+        @param state The look around result, EMPTY or NOMATCH.
+        '''
+        table = self.look_table
+        if(len(table) >= LOOK_CACHE_SIZE):
+            table.clear()
+        table[key] = state
 
     def opBKR(self, op_index):
         '''Only called internally by the parser,
         never called explicitly by the user.
         '''
         op = self.opcodes[op_index]
-        if(op['bkr_mode'] == id.BKR_MODE_UM):
-            phrase = self.bkru_stack.get_phrase(op['lower'])
-        elif(op['bkr_mode'] == id.BKR_MODE_RM):
-            phrase = self.bkrr_stack.get_phrase(op['lower'])
+        if(op.bkr_mode == id.BKR_MODE_UM):
+            phrase = self.bkru_stack.get_phrase(op.lower)
+        elif(op.bkr_mode == id.BKR_MODE_RM):
+            phrase = self.bkrr_stack.get_phrase(op.lower)
         else:
             raise Exception('BKR mode not recognized')
         bkrIndex = phrase[0]
@@ -848,37 +1821,50 @@ class Parser:
         state = id.NOMATCH
         if(self.phrase_index + bkrLength <= self.sub_end):
             state = id.MATCH
-            if(op['bkr_case'] == id.BKR_MODE_CS):
+            if(op.bkr_case == id.BKR_MODE_CS):
                 for i in range(bkrLength):
                     bkrChar = self.input[bkrIndex + i]
                     inputChar = self.input[self.phrase_index + i]
                     if(bkrChar != inputChar):
                         state = id.NOMATCH
                         break
-            elif(op['bkr_case'] == id.BKR_MODE_CI):
-                for i in range(bkrLength):
-                    bkrChar = self.input[bkrIndex + i]
-                    inputChar = self.input[self.phrase_index + i]
-                    if(bkrChar >= 65 and bkrChar <= 90):
-                        bkrChar += 32
-                    if(inputChar >= 65 and inputChar <= 90):
-                        inputChar += 32
-                    if(bkrChar != inputChar):
+            elif(op.bkr_case == id.BKR_MODE_CI):
+                folded = self.folded
+                if(folded is None):
+                    folded = self.fold()
+                base = self.fold_base
+                index = self.phrase_index - base
+                if(folded and index >= 0 and bkrIndex >= base):
+                    bkrIndex -= base
+                    if(folded[bkrIndex:bkrIndex + bkrLength] !=
+                       folded[index:index + bkrLength]):
                         state = id.NOMATCH
-                        break
+                else:
+                    for i in range(bkrLength):
+                        bkrChar = self.input[bkrIndex + i]
+                        inputChar = self.input[self.phrase_index + i]
+                        if(bkrChar >= 65 and bkrChar <= 90):
+                            bkrChar += 32
+                        if(inputChar >= 65 and inputChar <= 90):
+                            inputChar += 32
+                        if(bkrChar != inputChar):
+                            state = id.NOMATCH
+                            break
             else:
                 raise Exception('BKR case not recognized')
 
         self.state = state
         if(state == id.MATCH):
             self.phrase_index += bkrLength
-        return
+            if(self.lookaround == 0 and
+               self.phrase_index - self.sub_begin > self.max_phrase_length):
+                self.max_phrase_length = self.phrase_index - self.sub_begin
 
     def opBKRbehind(self, op_index):
         '''Back references not allowed in look behind mode.'''
         op = self.opcodes[op_index]
         msg = 'BKR('
-        msg += op['name']
+        msg += op.name
         msg += ') called. '
         msg += 'Back referencing not allowed in look behind mode '
         msg += '(operators && and !!).'
@@ -908,6 +1894,141 @@ class Parser:
         else:
             self.state = id.NOMATCH
 
+    def opCUT(self, op_index):
+        '''Only called internally by the parser,
+        never called explicitly by the user.
+        '''
+        op = self.opcodes[op_index]
+        # CUT always succeeds
+        self.state = id.EMPTY
+        if(op.commits):
+            # the enclosing ALT or REP may not backtrack past here
+            self.cut = True
+        if(not op.choice and self.choices == 0 and
+           self.lookaround == 0 and not self.memo):
+            # no node of the parse tree may backtrack past here
+            self.commit()
+
+    def commit(self):
+        '''Only called internally by the parser,
+        never called explicitly by the user.
+        A cut has committed the parse to the phrase matched so far -
+        the parse either fails or succeeds with it.
+        Frees the universal mode back referenced phrases that can
+        no longer be matched and, if the AST is translated on commits
+        (see Ast.translate_on_commit()), translates and frees the
+        AST records.
+        '''
+        if(self.bkru_stack):
+            self.bkru_stack.commit()
+        if(self.ast and self.ast.incremental):
+            self.ast.commit(self.phrase_index)
+
+    def match_regex(self, rule_index):
+        '''Only called internally by the parser,
+        never called explicitly by the user.
+        Matches a regular rule with its regular expression
+        (see @ref regex_rules.py), or with its DFA (see @ref dfa.py)
+        if the input has no str view, instead of executing its opcodes.
+        A regular expression or DFA cannot tell how far a rule looked
+        before it failed or matched a shorter phrase.
+        A failed parse is parsed again with the opcodes (see repeat()).
+        If the callback functions would see that, the opcodes of a rule
+        are executed instead if they may look past the furthest position
+        reached so far - max_phrase_length, the error position of
+        a failed parse, is then the same as for the opcodes alone.
+        A rule that is matched counts as a single node hit.
+        @param rule_index The index of the rule.
+        @returns Returns False if the rule's opcodes must be executed.
+        '''
+        regex = self.regex[rule_index]
+        if(regex is None or
+           self.current_look_direction == id.LOOKAROUND_BEHIND):
+            return False
+        if(regex[0] is not None and self.str_view()):
+            match = regex[0].match(
+                self.text, self.phrase_index, self.sub_end)
+            end = -1 if(match is None) else match.end()
+        else:
+            dfa = grammar_dfa(self.grammar, self.rules, rule_index)
+            if(dfa is None):
+                return False
+            end = dfa.match(self.input, self.phrase_index, self.sub_end)
+        if(self.regex_reach and self.lookaround == 0):
+            # the rule's opcodes find how far the rule looked
+            # if it may be past the furthest position so far
+            longest = self.rules[rule_index]['opcodes'][0].max_length
+            if(longest is None or self.phrase_index + longest >
+               max(end, self.sub_begin + self.max_phrase_length)):
+                return False
+        if(end < 0):
+            self.state = id.NOMATCH
+        else:
+            self.state = id.MATCH if(end > self.phrase_index) else regex[1]
+            self.phrase_index = end
+            if(self.lookaround == 0 and
+               self.phrase_index - self.sub_begin > self.max_phrase_length):
+                self.max_phrase_length = self.phrase_index - self.sub_begin
+        return True
+
+    def str_view(self):
+        '''Only called internally by the parser,
+        never called explicitly by the user.
+        @returns Returns the str view of the input, made on first use,
+        or False if the input has none.
+        '''
+        if(self.text is None):
+            try:
+                self.text = ''.join(map(chr, self.input))
+            except (ValueError, OverflowError):
+                # a character code too large for a str
+                self.text = False
+        return self.text
+
+    def fold(self):
+        '''Only called internally by the parser,
+        never called explicitly by the user.
+        Makes the case folded str view of the characters parsed,
+        [sub_begin, sub_end), with the upper case ASCII letters
+        converted to lower case, on first use.
+        The TLS strings and the case insensitive back references
+        are then compared with a single str comparison
+        instead of converting each input character.
+        Only the look behind operators see the characters before
+        sub_begin, they are compared one character at a time.
+        @returns Returns the case folded str view
+        or False if the input has no str view.
+        '''
+        begin = self.fold_base = self.sub_begin
+        end = self.fold_end = self.sub_end
+        text = False
+        if(self.text):
+            text = self.text[begin:end]
+        elif(self.text is None):
+            try:
+                text = ''.join(map(chr, self.input[begin:end]))
+            except (ValueError, OverflowError):
+                # a character code too large for a str
+                pass
+        if(text is False):
+            self.folded = False
+        elif(text.isascii()):
+            self.folded = text.lower()
+        else:
+            self.folded = text.translate(_FOLD)
+        return self.folded
+
+    def too_short(self, min_length):
+        '''Only called internally by the parser,
+        never called explicitly by the user.
+        @param min_length The minimum phrase length of a node.
+        @returns Returns True if there are fewer than min_length
+        characters left to match in the present look direction.
+        '''
+        if(self.current_look_direction == id.LOOKAROUND_BEHIND):
+            return self.prune_behind and self.phrase_index < min_length
+        return self.sub_end - self.phrase_index < min_length
+
     def opExecute(self, op_index):
         '''Only called internally by the parser,
         never called explicitly by the user.
@@ -916,12 +2037,106 @@ class Parser:
         opSelect = self.opSelectBehind if(
             self.current_look_direction
             == id.LOOKAROUND_BEHIND) else self.opSelect
-        opFunc = opSelect.get(op['type'], None)
+        opFunc = opSelect.get(op.type, None)
         index = self.phrase_index
         self.execDown(op)
+        if(self.spans):
+            self.examine(op, index)
         opFunc(op_index)
+        if(self.spans and op.type == id.REP):
+            self.examine_rep()
         self.execUp(op, index)
 
+    def reach(self, op, begin):
+        '''Only called internally by the parser,
+        never called explicitly by the user.
+        Find the characters that a node may examine itself,
+        not counting those examined by its child nodes.
+        @param op The node's opcode.
+        @param begin The node's phrase index.
+        @returns Returns (low, high). The node's own result depends only
+        on the characters input[low:high] and, where the range runs past
+        the end of the input string, on where the input string ends.
+        '''
+        op_type = op.type
+        if(op_type == id.REP):
+            # the repetitions end at the end of the input string,
+            # examine_rep() covers the later repetitions
+            if(self.prune and op.min_length):
+                if(self.current_look_direction == _BEHIND):
+                    return (begin - op.min_length, begin + 1)
+                return (begin, begin + max(op.min_length, 1))
+            return (begin, begin + 1)
+        if(op_type == id.UDT):
+            # the UDT callback may look anywhere
+            return (-1, id.MAX_INT)
+        if(op_type == id.ABG):
+            # is there a character before the phrase index
+            return (begin - 1, begin)
+        if(op_type == id.AEN):
+            # is there a character at the phrase index
+            return (begin, begin + 1)
+        behind = self.current_look_direction == _BEHIND
+        length = 0
+        if(op_type == id.TLS or op_type == id.TBS):
+            length = len(op.string)
+        elif(op_type == id.TRG or op_type == id.CLS):
+            length = 1
+        elif(op_type == id.BKR):
+            if(not behind):
+                stack = self.bkru_stack if(
+                    op.bkr_mode == id.BKR_MODE_UM) else self.bkrr_stack
+                length = stack.get_phrase(op.lower)[1]
+        elif(self.prune):
+            if(op_type == id.ALT and op.alt_table is not None
+               and not behind):
+                # the next character selects the ALT children
+                length = 1
+            elif((op_type == id.CAT or op_type == id.RNM)
+                 and op.min_length):
+                length = op.min_length
+        if(behind):
+            return (begin - length, begin)
+        return (begin, begin + length)
+
+    def examine(self, op, begin):
+        '''Only called internally by the parser,
+        never called explicitly by the user.
+        Adds the characters a node examines to the present span
+        (see reach()).
+        '''
+        (low, high) = self.reach(op, begin)
+        if(low < self.span_low):
+            self.span_low = low
+        if(high > self.span_high):
+            self.span_high = high
+
+    def examine_rep(self):
+        '''Only called internally by the parser,
+        never called explicitly by the user.
+        A REP is complete, the last repetition looked for
+        the end of the input string at the phrase index.
+        '''
+        if(self.phrase_index >= self.span_high):
+            self.span_high = self.phrase_index + 1
+
+    def opExecuteFast(self, op_index):
+        '''Only called internally by the parser,
+        never called explicitly by the user.
+        Replaces opExecute() when there is no trace,
+        no statistics and no limits.
+        Only the node hits and the tree depth are counted.
+        '''
+        self.node_hits += 1
+        self.tree_depth += 1
+        if(self.tree_depth > self.max_tree_depth):
+            self.max_tree_depth = self.tree_depth
+        if(self.current_look_direction == _BEHIND):
+            self.opSelectBehind[self.opcodes[op_index].type](op_index)
+        else:
+            self.opSelect[self.opcodes[op_index].type](op_index)
+        self.tree_depth -= 1
+
     def execDown(self, op):
         '''Only called internally by the parser,
         never called explicitly by the user.
@@ -930,14 +2145,9 @@ class Parser:
             self.trace.down(op)
         self.tree_depth += 1
         self.node_hits += 1
-        if(self.tree_depth >= self.tree_depth_limit):
-            raise Exception(
-                'parse tree depth limit exceeded, limit = %d' %
-                self.tree_depth_limit)
-        if(self.node_hits >= self.node_hits_limit):
-            raise Exception(
-                'node hits limit exceeded, limit = %d' %
-                self.node_hits_limit)
+        if(self.tree_depth >= self.tree_depth_limit or
+           self.node_hits >= self.hits_check):
+            self.check_limits(self.tree_depth)
         if(self.tree_depth > self.max_tree_depth):
             self.max_tree_depth = self.tree_depth
 
@@ -946,10 +2156,6 @@ class Parser:
         never called explicitly by the user.
         '''
         self.tree_depth -= 1
-        if(self.lookaround == 0):
-            totalLength = self.phrase_index - self.sub_begin
-            if(totalLength > self.max_phrase_length):
-                self.max_phrase_length = totalLength
         if(self.trace):
             self.trace.up(op, begin_index)
         if(self.stats):
@@ -0,0 +1,254 @@
+''' @file apg_py/lib/regex_rules.py
+@brief Lower the regular rules of a grammar to Python regular expressions.
+
+A rule is regular if neither it nor any rule it refers to,
+directly or indirectly, is recursive or has a UDT, a back reference,
+a look behind operator or an end of string anchor.
+Each regular rule is compiled to a single anchored `re` pattern
+which the parser matches against a `str` view of the input
+instead of executing the rule's opcodes (see Parser.match_regex()).
+
+The patterns must keep the APG semantics, which are those of a
+parsing expression grammar.
+An ALT is the first of its children that matches
+and a REP matches as many repetitions as it can.
+Neither ever gives back characters to let a later node match.
+This is what atomic groups and possessive quantifiers do,
+which are only available in Python 3.11 and later.
+With earlier versions, and for inputs with character codes too large
+for a `str`, the regular rules are matched by a DFA
+instead (see @ref dfa.py).
+
+The fast path skips all of the nodes below the rule.
+It is only taken when none of them are observable,
+i.e. when there is no trace or statistics
+and neither the rule nor any rule it refers to
+has a callback function or an AST node (see enabled_patterns()).
+'''
+import re
+import sys
+import weakref
+from apg_py.lib import identifiers as id
+
+## True if the regular expressions have atomic groups
+# and possessive quantifiers.
+ATOMIC = sys.version_info >= (3, 11)
+
+## The longest pattern that will be compiled.
+# Rules that are used many times in a rule are inlined for each use
+# and the patterns may grow very large.
+MAX_PATTERN = 10000
+
+# the largest character code in a Python str
+_MAX_CHAR = 0x10FFFF
+
+# the regular rules of grammars, computed once per grammar
+_cache = weakref.WeakKeyDictionary()
+
+
+def char(code):
+    '''The pattern for a single character.'''
+    return re.escape(chr(code))
+
+
+def char_class(ranges):
+    '''The pattern for a class of character ranges.
+    @param ranges A sequence of (min, max) character ranges.
+    @returns Returns the pattern, or one that never matches
+    if none of the characters can be in a str.'''
+    items = []
+    for (min, max) in ranges:
+        if(min > _MAX_CHAR):
+            continue
+        if(max > _MAX_CHAR):
+            max = _MAX_CHAR
+        if(min == max):
+            items.append(char(min))
+        else:
+            items.append(char(min) + '-' + char(max))
+    if(not items):
+        return '(?!)'
+    return '[' + ''.join(items) + ']'
+
+
+def regex_rules(rules):
+    '''Find the regular rules and compile their patterns.
+    @param rules The compiled rules (see @ref opcodes.py).
+    @returns Returns a tuple with one entry for each rule.
+    The entry is None if the rule is not regular.
+    Otherwise it is a (pattern, empty_state, refers_to) tuple.
+    pattern is the compiled regular expression, or None if Python
+    has no atomic groups, empty_state is the
+    state the rule returns when it matches an empty phrase
+    and refers_to is the set of the indexes of the rule and of all
+    of the rules it refers to.
+    '''
+    # (pattern source, nullable, empty state, refers to) of each rule
+    # False while the rule is being lowered, to detect recursion
+    lowered = [None] * len(rules)
+
+    def lower_rule(index):
+        if(lowered[index] is None):
+            lowered[index] = False
+            refers_to = {index}
+            opcodes = rules[index]['opcodes']
+            result = None
+            if(opcodes):
+                result = lower_op(opcodes, 0, refers_to)
+            if(result is None):
+                lowered[index] = ()
+            else:
+                (source, nullable) = result
+                if(len(source) > MAX_PATTERN):
+                    lowered[index] = ()
+                else:
+                    lowered[index] = (source, nullable,
+                                      empty_state(opcodes[0]),
+                                      frozenset(refers_to))
+        # recursive or not regular
+        return lowered[index] or None
+
+    def empty_state(op):
+        # CAT returns MATCH even when its phrase is empty
+        if(op.type == id.CAT):
+            return id.MATCH
+        if(op.type == id.RNM):
+            return lowered[op.index][2]
+        return id.EMPTY
+
+    def partial(op):
+        # True if the opcode may fail with the phrase index advanced,
+        # a REP that fails after one or more repetitions
+        # does not reset the phrase index and neither does
+        # a parent REP, the regular expression always does
+        while(op.type == id.RNM):
+            op = rules[op.index]['opcodes'][0]
+        return op.type == id.REP and op.min > 1
+
+    def lower_op(opcodes, op_index, refers_to):
+        # returns (source, nullable) or None if not regular
+        # the source is always a single atom
+        op = opcodes[op_index]
+        op_id = op.type
+        if(op_id == id.ALT or op_id == id.CAT):
+            sources = []
+            nullable = op_id == id.CAT
+            for child in op.children:
+                result = lower_op(opcodes, child, refers_to)
+                if(result is None):
+                    return None
+                sources.append(result[0])
+                if(op_id == id.ALT):
+                    nullable = nullable or result[1]
+                else:
+                    nullable = nullable and result[1]
+            if(op_id == id.ALT):
+                # the first child to match, no backtracking
+                return ('(?>' + '|'.join(sources) + ')', nullable)
+            return ('(?:' + ''.join(sources) + ')', nullable)
+        if(op_id == id.REP):
+            result = lower_op(opcodes, op_index + 1, refers_to)
+            if(result is None or result[1] or
+               partial(opcodes[op_index + 1])):
+                # REP stops on an empty repetition,
+                # the regular expression counts it
+                return None
+            if(op.max == id.MAX_INT):
+                count = '{%d,}' % op.min
+            else:
+                count = '{%d,%d}' % (op.min, op.max)
+            # possessive, no backtracking
+            return ('(?:' + result[0] + count + '+)', op.min == 0)
+        if(op_id == id.RNM):
+            result = lower_rule(op.index)
+            if(result is None):
+                return None
+            refers_to.update(result[3])
+            return (result[0], result[1])
+        if(op_id == id.TLS):
+            source = ''
+            for code in op.string:
+                if(code >= 97 and code <= 122):
+                    # case insensitive, the string is lower case
+                    source += '[' + chr(code - 32) + chr(code) + ']'
+                else:
+                    source += char(code)
+            return ('(?:' + source + ')', len(op.string) == 0)
+        if(op_id == id.TBS):
+            source = ''.join(char(code) for code in op.string)
+            return ('(?:' + source + ')', len(op.string) == 0)
+        if(op_id == id.TRG):
+            return (char_class(((op.min, op.max),)), False)
+        if(op_id == id.CLS):
+            return (char_class(op.ranges), False)
+        if(op_id == id.AND or op_id == id.NOT):
+            result = lower_op(opcodes, op_index + 1, refers_to)
+            if(result is None):
+                return None
+            look = '(?=' if(op_id == id.AND) else '(?!'
+            return (look + result[0] + ')', True)
+        if(op_id == id.ABG):
+            # matches only at the beginning of the full input string
+            return ('\\A', True)
+        # UDT, BKR, BKA, BKN, AEN and CUT
+        # (AEN is the end of the full input string,
+        # the pattern only sees the end of the substring)
+        return None
+
+    found = []
+    for rule in rules:
+        result = lower_rule(rule['index'])
+        if(result is None or partial(rule['opcodes'][0])):
+            found.append(None)
+            continue
+        (source, nullable, state, refers_to) = result
+        # the rules below are skipped, they cannot save back references
+        bkr = False
+        for index in refers_to:
+            if(index != rule['index'] and (rules[index]['is_bkru'] or
+                                           rules[index]['is_bkrr'])):
+                bkr = True
+        if(bkr):
+            found.append(None)
+        else:
+            found.append((re.compile(source) if(ATOMIC) else None,
+                          state, refers_to))
+    return tuple(found)
+
+
+def grammar_regex_rules(grammar, rules):
+    '''Get the regular rules of a grammar,
+    computing them the first time they are needed.
+    @param grammar The grammar object.
+    @param rules The grammar's compiled rules.
+    @returns Returns the result of regex_rules().'''
+    found = _cache.get(grammar, None)
+    if(found is None):
+        found = regex_rules(rules)
+        _cache[grammar] = found
+    return found
+
+
+def enabled_patterns(found, rules, rule_callbacks, ast):
+    '''Select the regular rules whose patterns can be used in a parse.
+    @param found The regular rules from regex_rules().
+    @param rules The compiled rules.
+    @param rule_callbacks The parser's rule callback functions.
+    @param ast The parser's AST object, if any.
+    @returns Returns a list with a (pattern, empty_state) tuple
+    for each regular rule that can be matched without executing its
+    opcodes, otherwise None.
+    Returns None if no pattern can be used.
+    '''
+    observed = set()
+    for rule in rules:
+        index = rule['index']
+        if(rule_callbacks[index] or (ast and ast.nodes[rule['lower']])):
+            observed.add(index)
+    patterns = [None] * len(rules)
+    any_enabled = False
+    for (index, entry) in enumerate(found):
+        if(entry is not None and observed.isdisjoint(entry[2])):
+            patterns[index] = (entry[0], entry[1])
+            any_enabled = True
+    return patterns if(any_enabled) else None
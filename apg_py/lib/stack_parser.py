@@ -0,0 +1,773 @@
+''' @file apg_py/lib/stack_parser.py
+@brief A non-recursive version of the APG parser.
+
+The recursive parser (@ref parser.py) executes each node of the parse tree
+with a Python function call to the node's operator, which, in turn,
+calls the operators of its child nodes.
+The parse tree depth is therefore limited by the Python recursion limit.
+The StackParser executes the same opcodes with an explicit stack
+of node frames. It can parse arbitrarily deep inputs.
+The results, AST, callback functions, trace and statistics
+are identical to those of the recursive parser.
+
+Because the parse state is all in the frames, the StackParser can also
+suspend a parse and resume it later.
+This is used to parse input strings that arrive in chunks
+(see StackParser.stream()).
+'''
+import asyncio
+import time
+from array import array
+from apg_py.lib import identifiers as id
+from apg_py.lib import utilities as utils
+from apg_py.lib.parser import Parser, ParserResult
+
+# frame slots common to all frames
+_TYPE = 0  # the opcode type
+_OP = 1  # the opcode
+_BEGIN = 2  # the phrase index when the node was entered
+_INDEX = 3  # the phrase index saved by the operator for backtracking
+# frame slots for ALT and CAT
+_CHILDREN = 4  # the child opcode indexes, reversed in look behind mode
+_CHILD = 5  # the index of the child presently executing
+_SAVEU = 6  # the saved universal back reference stack state
+_SAVER = 7  # the saved recursive back reference stack state
+_AST = 8  # the saved AST state
+_BEHIND = 9  # True if the node is executed in look behind mode
+# frame slots for ALT and REP
+_CUT = 10  # True if a cut has committed the present child
+# frame slots for REP
+_COUNT = 4  # the repetition count
+# _CHILD is the child opcode index for REP
+# frame slots for RNM
+_PARENT = 4  # the parent rule's opcodes
+_RULE = 5  # the rule
+_RULE_INDEX = 6  # the rule index
+_KEY = 9  # the memo table key, if any
+_RECORDS = 10  # the AST record count at the beginning of a memoized rule
+_SPAN = 11  # the enclosing rule's examined characters, if recorded
+# frame slots for AND, NOT, BKA and BKN
+_DIRECTION = 4  # the saved look around direction
+_LOOK_KEY = 5  # the look around cache key, if any
+_LOOK = (id.AND, id.NOT, id.BKA, id.BKN)
+
+
+class StackParser(Parser):
+    '''A non-recursive parser.
+    It is used exactly like @ref Parser.
+    <pre>
+    parser = StackParser(grammar)
+    result = parser.parse(input)
+    </pre>
+    '''
+
+    def opExecute(self, op_index):
+        '''Executes the node at op_index and all nodes below it.
+        Only called internally by the parser,
+        never called explicitly by the user.
+        '''
+        for _ in self.steps(op_index, None, 0):
+            pass
+
+    async def parse_async(
+            self,
+            input,
+            start_rule=None,
+            sub_begin=0,
+            sub_length=0,
+            user_data=None,
+            executor=None,
+            node_hits=1000,
+            interval=0.005):
+        '''Parses an input string without blocking the asyncio
+        event loop.
+        <pre>
+        result = await parser.parse_async(input)
+        </pre>
+        Unless an executor is given, the parse runs in the event loop's
+        thread and gives the other tasks their turn every few
+        milliseconds. The parse stops if its task is cancelled.
+        The results, AST and callback functions are those of parse().
+        @param executor If not None, a concurrent.futures executor to
+        run parse() in (see Parser.parse_async()).
+        @param node_hits The number of node hits between the checks
+        of the time.
+        @param interval The time in seconds between the turns of the
+        other tasks. If 0, they have a turn at every check.
+        The other arguments are those of parse().
+        @returns Returns a ParserResult object.
+        '''
+        if(executor is not None):
+            return await super().parse_async(
+                input, start_rule, sub_begin, sub_length, user_data,
+                executor)
+        context = self.context()
+        try:
+            context.setup(input, start_rule, sub_begin, sub_length,
+                          user_data)
+            turn = time.perf_counter() + interval
+            while(True):
+                for _ in context.steps(0, None, node_hits):
+                    if(time.perf_counter() >= turn):
+                        await asyncio.sleep(0)
+                        turn = time.perf_counter() + interval
+                if(not context.repeat(sub_begin, sub_length)):
+                    return ParserResult(context)
+        finally:
+            self.release(context)
+
+    def stream(self, start_rule=None, user_data=None):
+        '''Begins a parse of an input string that arrives in chunks.
+        <pre>
+        stream = parser.stream()
+        for chunk in chunks:
+            stream.feed(chunk)
+        result = stream.finish()
+        </pre>
+        The parse runs as far as the characters received so far allow
+        and resumes where it stopped when the next chunk arrives.
+        The results are those of parse() on the whole input string.
+        @param start_rule Name of the grammar's start rule
+            (defaults to first rule of the SABNF grammar.)
+        @param user_data Data which will be passed to the callback functions
+            strictly for user's use.
+        @returns Returns a Stream object.
+        '''
+        return Stream(self, start_rule, user_data)
+
+    def steps(self, op_index, stream, pause):
+        '''Only called internally by the parser,
+        never called explicitly by the user.
+        A generator that executes the node at op_index and all nodes
+        below it.
+        It only yields to wait for more input, if stream is a Stream,
+        or every pause node hits, if pause is not 0.
+        '''
+        # these do not change during the parse
+        trace = self.trace
+        stats = self.stats
+        ast = self.ast
+        bkru_stack = self.bkru_stack
+        bkrr_stack = self.bkrr_stack
+        terminals = self.opSelect
+        terminals_behind = self.opSelectBehind
+        prune = self.prune
+        prune_behind = self.prune_behind
+        fuse = self.fuse
+        spans = self.spans
+        limited = (self.tree_depth_limit != id.MAX_INT or
+                   self.hits_check != id.MAX_INT)
+        ALT = id.ALT
+        CAT = id.CAT
+        REP = id.REP
+        RNM = id.RNM
+        CUT = id.CUT
+        ACTIVE = id.ACTIVE
+        NOMATCH = id.NOMATCH
+        BEHIND = id.LOOKAROUND_BEHIND
+        pruned = (CAT, REP, RNM)
+        stack = []
+        call = op_index
+        check = self.node_hits + pause
+        while(True):
+            if(call >= 0):
+                # down - enter a new node
+                if(pause and self.node_hits >= check):
+                    # let the caller run (see parse_async())
+                    check = self.node_hits + pause
+                    yield
+                op = self.opcodes[call]
+                begin = self.phrase_index
+                if(stream is not None):
+                    need = stream.need(op, begin)
+                    if(need > self.sub_end):
+                        # suspend until the node can see all
+                        # of the characters it may read
+                        begin -= yield from stream.wait(stack, need)
+                if(spans):
+                    self.examine(op, begin)
+                if(trace):
+                    trace.down(op)
+                self.tree_depth += 1
+                self.node_hits += 1
+                if(limited and (
+                        self.tree_depth >= self.tree_depth_limit or
+                        self.node_hits >= self.hits_check)):
+                    self.check_limits(self.tree_depth)
+                if(self.tree_depth > self.max_tree_depth):
+                    self.max_tree_depth = self.tree_depth
+                op_type = op.type
+                behind = self.current_look_direction == BEHIND
+                if((prune_behind if(behind) else prune) and
+                   op.min_length and op_type in pruned and
+                   (begin if(behind) else self.sub_end - begin)
+                   < op.min_length):
+                    # too few characters left to match
+                    self.state = NOMATCH
+                elif(op_type == ALT or op_type == CAT):
+                    children = op.children
+                    if(behind):
+                        children = tuple(reversed(children))
+                    elif(prune and op.alt_table is not None):
+                        # only the children that can begin with
+                        # the next character
+                        if(begin < self.sub_end):
+                            children = op.alt_table.get(
+                                self.input[begin], op.alt_default)
+                        else:
+                            children = op.alt_default
+                    if(children):
+                        frame = [op_type, op, begin, begin, children, 0,
+                                 None, None, None, behind, False]
+                        if(op_type == CAT and ast and self.lookaround == 0):
+                            frame[_AST] = ast.save_state()
+                        if(not behind):
+                            if(bkru_stack):
+                                frame[_SAVEU] = bkru_stack.save_state()
+                            if(bkrr_stack):
+                                frame[_SAVER] = bkrr_stack.save_state()
+                        self.state = ACTIVE
+                        stack.append(frame)
+                        call = children[0]
+                        continue
+                    # no ALT child can match
+                    self.state = NOMATCH
+                elif(op_type == REP):
+                    if(fuse and (op.scan is not None
+                                 or op.scan_string is not None)):
+                        # the repetitions do not recurse
+                        self.opREPscan(call)
+                    else:
+                        frame = [op_type, op, begin, begin, 0,
+                                 None, None, None, None, None, False]
+                        call = self.rep_next(frame, call)
+                        if(call >= 0):
+                            stack.append(frame)
+                            continue
+                        self.rep_done(frame)
+                elif(op_type == RNM):
+                    call = self.rnm_down(stack, op, begin)
+                    if(call >= 0):
+                        continue
+                elif(op_type == id.AND or op_type == id.NOT):
+                    if(self.look_down(stack, op, begin)):
+                        call += 1
+                        continue
+                elif(op_type == id.BKA or op_type == id.BKN):
+                    min_length = self.opcodes[call + 1].min_length
+                    if(prune_behind and min_length and
+                       begin < min_length):
+                        # too few characters behind to match,
+                        # BKA fails and BKN succeeds
+                        self.state = NOMATCH if(
+                            op_type == id.BKA) else id.EMPTY
+                    elif(self.look_down(stack, op, begin)):
+                        call += 1
+                        continue
+                elif(op_type == CUT):
+                    if(op.commits):
+                        # the nearest ALT or REP below the CATs
+                        # is the one committed
+                        i = len(stack) - 1
+                        while(stack[i][_TYPE] == CAT):
+                            i -= 1
+                        stack[i][_CUT] = True
+                    self.opCUT(call)
+                elif(behind):
+                    # terminal nodes do not recurse
+                    terminals_behind[op_type](call)
+                else:
+                    terminals[op_type](call)
+            else:
+                # a child node is complete, return to the parent node
+                frame = stack[-1]
+                op_type = frame[_TYPE]
+                if(op_type == ALT):
+                    if(self.state == NOMATCH):
+                        # reset phrase index on failure
+                        self.phrase_index = frame[_INDEX]
+                        if(not frame[_BEHIND]):
+                            if(bkru_stack):
+                                bkru_stack.restore_state(frame[_SAVEU])
+                            if(bkrr_stack):
+                                bkrr_stack.restore_state(frame[_SAVER])
+                        frame[_CHILD] += 1
+                        # a child committed by a cut fails the ALT
+                        if(not frame[_CUT] and
+                           frame[_CHILD] < len(frame[_CHILDREN])):
+                            # try the next child
+                            self.state = ACTIVE
+                            if(not frame[_BEHIND]):
+                                if(bkru_stack):
+                                    frame[_SAVEU] = bkru_stack.save_state()
+                                if(bkrr_stack):
+                                    frame[_SAVER] = bkrr_stack.save_state()
+                            call = frame[_CHILDREN][frame[_CHILD]]
+                            continue
+                    elif(frame[_BEHIND]):
+                        # ALT succeeds when first child succeeds
+                        self.state = id.MATCH
+                    else:
+                        self.state = id.MATCH if(
+                            self.phrase_index > frame[_INDEX]) else id.EMPTY
+                elif(op_type == CAT):
+                    if(self.state == NOMATCH):
+                        # CAT fails if any child fails
+                        self.phrase_index = frame[_INDEX]
+                        if(not frame[_BEHIND]):
+                            if(bkru_stack):
+                                bkru_stack.restore_state(frame[_SAVEU])
+                            if(bkrr_stack):
+                                bkrr_stack.restore_state(frame[_SAVER])
+                        if(ast and self.lookaround == 0):
+                            ast.restore_state(frame[_AST])
+                    else:
+                        frame[_CHILD] += 1
+                        if(frame[_CHILD] < len(frame[_CHILDREN])):
+                            self.state = ACTIVE
+                            call = frame[_CHILDREN][frame[_CHILD]]
+                            continue
+                        self.state = id.MATCH
+                elif(op_type == REP):
+                    if(self.rep_child(frame)):
+                        if(stream is not None and
+                           self.phrase_index >= self.sub_end):
+                            yield from stream.wait(
+                                stack, self.phrase_index + 1)
+                        call = self.rep_next(frame, -1)
+                        if(call >= 0):
+                            continue
+                    self.rep_done(frame)
+                    if(spans):
+                        self.examine_rep()
+                elif(op_type == RNM):
+                    self.rnm_up(frame)
+                else:
+                    self.look_up(frame)
+                stack.pop()
+                op = frame[_OP]
+                begin = frame[_BEGIN]
+            # up - the node is complete
+            self.tree_depth -= 1
+            if(trace):
+                trace.up(op, begin)
+            if(stats):
+                stats.collect(op)
+            if(not stack):
+                # the first node is complete
+                return
+            call = -1
+
+    def rep_next(self, frame, op_index):
+        '''Only called internally by the parser,
+        never called explicitly by the user.
+        Start the next REP repetition, if any.
+        @param frame The REP frame.
+        @param op_index The REP opcode index or -1 if the frame
+        is already on the stack.
+        @returns Returns the child opcode index or -1 if no more
+        repetitions.
+        '''
+        if(self.phrase_index >= self.sub_end):
+            # exit on end of string
+            return -1
+        if(op_index >= 0):
+            # save the child index for later repetitions
+            frame[_CHILD] = op_index + 1
+        self.state = id.ACTIVE
+        if(self.bkru_stack):
+            frame[_SAVEU] = self.bkru_stack.save_state()
+        if(self.bkrr_stack):
+            frame[_SAVER] = self.bkrr_stack.save_state()
+        if(self.ast and self.lookaround == 0):
+            frame[_AST] = self.ast.save_state()
+        return frame[_CHILD]
+
+    def rep_child(self, frame):
+        '''Only called internally by the parser,
+        never called explicitly by the user.
+        A REP child is complete.
+        @returns Returns True if another repetition is allowed.
+        '''
+        if(self.state == id.EMPTY):
+            # end if child node return EMPTY (prevents infinite loop)
+            return False
+        if(self.state == id.NOMATCH):
+            # end if the child node fails
+            if(self.bkru_stack):
+                self.bkru_stack.restore_state(frame[_SAVEU])
+            if(self.bkrr_stack):
+                self.bkrr_stack.restore_state(frame[_SAVER])
+            if(self.ast and self.lookaround == 0):
+                self.ast.restore_state(frame[_AST])
+            return False
+        frame[_COUNT] += 1
+        # the next repetition is not committed
+        frame[_CUT] = False
+        # end when the repetition count has maxed out
+        return frame[_COUNT] != frame[_OP]['max']
+
+    def rep_done(self, frame):
+        '''Only called internally by the parser,
+        never called explicitly by the user.
+        Evaluate the REP match count.
+        '''
+        repPhraseLength = abs(self.phrase_index - frame[_INDEX])
+        if(self.state == id.EMPTY):
+            self.state = id.EMPTY if(
+                repPhraseLength == 0) else id.MATCH
+        elif(frame[_COUNT] >= frame[_OP]['min'] and not frame[_CUT]):
+            # a repetition committed by a cut fails the REP
+            self.state = id.EMPTY if(
+                repPhraseLength == 0) else id.MATCH
+        else:
+            self.state = id.NOMATCH
+
+    def rnm_down(self, stack, op, begin):
+        '''Only called internally by the parser,
+        never called explicitly by the user.
+        Enter a rule name node.
+        @returns Returns the index of the rule's first opcode or
+        -1 if the rule's result was replayed from the memo table
+        or matched by its regular expression.
+        '''
+        rule_index = op.index
+        frame = [id.RNM, op, begin, begin, self.opcodes, None, rule_index,
+                 None, None, None, None, None]
+        if(self.memo and self.memo.enabled[rule_index]):
+            memo = self.memo
+            key = (rule_index, begin, self.current_look_direction)
+            entry = memo.table.get(key, None)
+            if(entry is not None):
+                # replay the saved result
+                memo.hits += 1
+                memo.table.move_to_end(key)
+                self.state = entry[0]
+                self.phrase_index = entry[1]
+                if(self.lookaround == 0 and self.phrase_index -
+                   self.sub_begin > self.max_phrase_length):
+                    self.max_phrase_length = (self.phrase_index -
+                                              self.sub_begin)
+                if(self.ast and self.lookaround == 0 and entry[2]):
+                    self.ast.replay_records(entry[2])
+                if(self.spans):
+                    self.span_low = min(self.span_low, entry[3][0])
+                    self.span_high = max(self.span_high, entry[3][1])
+                return -1
+            memo.misses += 1
+            frame[_KEY] = key
+            if(self.ast and self.lookaround == 0):
+                frame[_RECORDS] = self.ast.save_state()
+            if(self.spans):
+                frame[_SPAN] = (self.span_low, self.span_high)
+                self.span_low = begin
+                self.span_high = begin
+        rule = self.rules[rule_index]
+        frame[_RULE] = rule
+        self.opcodes = rule['opcodes']
+        if(op.choice):
+            # the rule's cuts can not commit the parse (see opCUT())
+            self.choices += 1
+        if(rule['has_bkrr']):
+            frame[_SAVER] = self.bkrr_stack.save_state()
+        self.state = id.ACTIVE
+        if(self.rule_callbacks[rule_index]):
+            # handle rule callback function (down)
+            self.cbData['state'] = id.ACTIVE
+            self.cbData['phrase_index'] = begin
+            self.cbData['phrase_length'] = 0
+            self.cbData['max_phrase_length'] = self.max_phrase_length
+            self.rule_callbacks[rule_index](self.cbData)
+        if(self.ast and self.lookaround == 0):
+            frame[_AST] = self.ast.save_state()
+            self.ast.down(rule_index, begin)
+        if(self.regex is not None and self.match_regex(rule_index)):
+            # the rule is complete
+            self.rnm_up(frame)
+            return -1
+        stack.append(frame)
+        return 0
+
+    def rnm_up(self, frame):
+        '''Only called internally by the parser,
+        never called explicitly by the user.
+        The rule name node is complete.
+        '''
+        rule = frame[_RULE]
+        rule_index = frame[_RULE_INDEX]
+        lower = rule['lower']
+        phrase_index = frame[_INDEX]
+        if(self.current_look_direction == id.LOOKAROUND_BEHIND):
+            # phrase index is moving backwards here
+            phrase_length = phrase_index - self.phrase_index
+            phrase_index = self.phrase_index
+        else:
+            phrase_length = self.phrase_index - phrase_index
+        if(self.rule_callbacks[rule_index]):
+            # handle rule callback function (up)
+            self.cbData['state'] = self.state
+            self.cbData['phrase_length'] = phrase_length
+            self.cbData['phrase_index'] = phrase_index
+            self.rule_callbacks[rule_index](self.cbData)
+        # handle back referencing, if any
+        if(self.state == id.NOMATCH):
+            if(self.ast and self.lookaround == 0):
+                self.ast.restore_state(frame[_AST])
+        else:
+            if(self.ast and self.lookaround == 0):
+                self.ast.up(rule_index, phrase_index, phrase_length)
+            # save the phrase for later back referencing
+            if(rule['is_bkru']):
+                self.bkru_stack.save_phrase(
+                    lower, phrase_index, phrase_length)
+            if(rule['is_bkrr']):
+                self.bkrr_stack.save_phrase(
+                    lower, phrase_index, phrase_length)
+        if(rule['has_bkrr']):
+            # pop the recursive back referencing stack
+            self.bkrr_stack.restore_state(frame[_SAVER])
+        if(frame[_OP].choice):
+            self.choices -= 1
+        self.opcodes = frame[_PARENT]
+        if(frame[_KEY] is not None):
+            # save the result in the memo table
+            records = None
+            if(frame[_RECORDS] is not None and self.state != id.NOMATCH):
+                records = self.ast.save_records(frame[_RECORDS])
+            self.memo.store(
+                frame[_KEY], (self.state, self.phrase_index, records,
+                              self.memo.span(frame[_SPAN])))
+
+    def look_down(self, stack, op, begin):
+        '''Only called internally by the parser,
+        never called explicitly by the user.
+        Enter a look around (AND, NOT, BKA or BKN) node.
+        @returns Returns True if the node's frame is pushed,
+        False if the result was in the cache (see Parser.look_find()).
+        '''
+        key = None
+        if(self.look_cache):
+            key = self.look_key(op, begin)
+            if(self.look_find(key)):
+                return False
+        frame = [op.type, op, begin, begin,
+                 self.current_look_direction, key, None, None]
+        self.state = id.ACTIVE
+        self.lookaround += 1
+        if(op.type == id.AND or op.type == id.NOT):
+            self.current_look_direction = id.LOOKAROUND_AHEAD
+        else:
+            self.current_look_direction = id.LOOKAROUND_BEHIND
+        if(self.bkrr_stack):
+            frame[_SAVER] = self.bkrr_stack.save_state()
+        if(self.bkru_stack):
+            frame[_SAVEU] = self.bkru_stack.save_state()
+        stack.append(frame)
+        return True
+
+    def look_up(self, frame):
+        '''Only called internally by the parser,
+        never called explicitly by the user.
+        The look around (AND, NOT, BKA or BKN) node is complete.
+        '''
+        if(self.bkrr_stack):
+            self.bkrr_stack.restore_state(frame[_SAVER])
+        if(self.bkru_stack):
+            self.bkru_stack.restore_state(frame[_SAVEU])
+        if(frame[_TYPE] == id.AND or frame[_TYPE] == id.BKA):
+            # succeeds if child succeeds
+            if(self.state == id.EMPTY or self.state == id.MATCH):
+                self.state = id.EMPTY
+            else:
+                self.state = id.NOMATCH
+        else:
+            # succeeds if child fails
+            if(self.state == id.NOMATCH):
+                self.state = id.EMPTY
+            else:
+                self.state = id.NOMATCH
+        self.phrase_index = frame[_INDEX]
+        self.lookaround -= 1
+        self.current_look_direction = frame[_DIRECTION]
+        if(frame[_LOOK_KEY] is not None):
+            self.look_store(frame[_LOOK_KEY], self.state)
+
+
+class Stream():
+    '''A parse of an input string that arrives in chunks
+    (see StackParser.stream()).
+
+    Before each node reads the input, the parse is suspended until
+    all of the characters that the node may read have arrived,
+    or the input string has ended.
+    The nodes therefore make the same decisions as they would
+    on the whole input string and no character is read twice.
+    Only the nodes that cannot know how far they will read,
+    the UDTs, wait for the end of the input string.
+    The regular expressions and the fused REP loops are not used,
+    they read as far as the input string goes.
+
+    The characters that no backtracking can return to are dropped
+    from the buffer, if nothing else can see them - i.e. if
+    the parse has no trace, statistics, AST, memo table,
+    callback functions, back references or look behind operators.
+    The buffer then holds only the input still open to backtracking.
+    '''
+
+    ## The smallest number of characters dropped from the buffer at once.
+    trim_size = 4096
+
+    def __init__(self, parser, start_rule, user_data):
+        '''Begins the parse, see StackParser.stream().'''
+        self.parser = parser
+        # the characters received and not yet dropped
+        self.buffer = array('I')
+        # the index of the first character of the buffer
+        self.base = 0
+        # the number of characters received after the parse completed
+        self.length = 0
+        self.finished = False
+        context = parser.context()
+        context.setup(self.buffer, start_rule, 0, 0, user_data)
+        context.regex = None
+        context.fuse = False
+        # a pruned node cannot tell how far it would have matched
+        # and the failed parse cannot be repeated (see Parser.repeat())
+        if(context.error_position):
+            context.prune = False
+            context.prune_behind = False
+        self.context = context
+        self.trim = not(context.trace or context.stats or context.ast or
+                        context.memo or context.udt_count or
+                        context.bkru_stack or context.bkrr_stack or
+                        any(context.rule_callbacks))
+        if(self.trim):
+            for rule in context.rules:
+                for op in rule['opcodes']:
+                    if(op.type == id.BKA or op.type == id.BKN or
+                       op.type == id.ABG):
+                        self.trim = False
+        self.steps = context.steps(0, self, 0)
+        self.resume()
+
+    def feed(self, chunk):
+        '''Parses the next chunk of the input string.
+        @param chunk The characters, a str or
+        a sequence of character codes (see Parser.parse()).
+        '''
+        if(self.finished):
+            raise Exception('stream is finished, no more input allowed')
+        if(isinstance(chunk, str)):
+            chunk = utils.string_to_codes(chunk)
+        if(self.steps is None):
+            # the parse is complete, only the input length matters
+            self.length += len(chunk)
+            return
+        self.buffer.extend(iter(chunk))
+        self.context.sub_end = len(self.buffer)
+        self.context.cbData['sub_end'] = self.context.sub_end
+        self.resume()
+
+    def finish(self):
+        '''Ends the input string and completes the parse.
+        @returns Returns a ParserResult object,
+        the same as Parser.parse() would for the whole input string.
+        '''
+        if(self.finished):
+            raise Exception('stream is finished')
+        self.finished = True
+        if(self.steps is not None):
+            self.resume()
+        context = self.context
+        # the indexes of the whole input string
+        length = self.base + len(self.buffer) + self.length
+        context.phrase_index += self.base
+        context.sub_begin += self.base
+        context.sub_end = length
+        result = ParserResult(context)
+        result.input_length = length
+        self.parser.release(context)
+        self.context = None
+        self.buffer = None
+        return result
+
+    def resume(self):
+        '''Only called internally by the stream,
+        never called explicitly by the user.
+        Runs the parse until it waits for more input or is complete.
+        '''
+        try:
+            next(self.steps)
+        except StopIteration:
+            self.steps = None
+
+    def need(self, op, begin):
+        '''Only called internally by the parser,
+        never called explicitly by the user.
+        @param op The opcode of the node to execute.
+        @param begin The node's phrase index.
+        @returns Returns the number of characters, from the beginning
+        of the buffer, that the node may read (see Parser.reach()).
+        '''
+        return self.context.reach(op, begin)[1]
+
+    def wait(self, stack, need):
+        '''Only called internally by the parser,
+        never called explicitly by the user.
+        A generator that yields until the buffer has the needed
+        characters or the input string has ended.
+        @param stack The parser's frame stack.
+        @param need The number of characters needed from the
+        beginning of the buffer.
+        @returns Returns the number of characters dropped from the
+        beginning of the buffer while waiting.
+        '''
+        shift = 0
+        while(need - shift > self.context.sub_end and not self.finished):
+            if(self.trim):
+                shift += self.drop(stack)
+            yield
+        return shift
+
+    def drop(self, stack):
+        '''Only called internally by the stream,
+        never called explicitly by the user.
+        Drops the characters that no backtracking can return to
+        from the beginning of the buffer and moves the parser's
+        indexes to match.
+        @param stack The parser's frame stack.
+        @returns Returns the number of characters dropped.
+        '''
+        context = self.context
+        # a node that fails leaves its phrase index at its beginning,
+        # an ALT, REP or look ahead parent continues from there
+        # while a CAT or RNM parent, or an ALT or REP parent
+        # committed by a cut, fails in turn
+        count = context.phrase_index
+        for i in range(1, len(stack)):
+            parent = stack[i - 1]
+            if(parent[_TYPE] == id.CAT or parent[_TYPE] == id.RNM):
+                continue
+            if((parent[_TYPE] == id.ALT or parent[_TYPE] == id.REP)
+               and parent[_CUT]):
+                continue
+            if(stack[i][_BEGIN] < count):
+                count = stack[i][_BEGIN]
+        if(count < self.trim_size or count * 2 < len(self.buffer)):
+            # not worth copying the buffer
+            return 0
+        del self.buffer[:count]
+        self.base += count
+        context.phrase_index -= count
+        context.sub_begin -= count
+        context.sub_end -= count
+        context.cbData['sub_end'] = context.sub_end
+        for frame in stack:
+            frame[_BEGIN] -= count
+            frame[_INDEX] -= count
+            if(frame[_TYPE] in _LOOK):
+                # the key holds the old phrase index
+                frame[_LOOK_KEY] = None
+        # so do the cached look around results
+        context.look_table.clear()
+        return count
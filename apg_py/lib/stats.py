@@ -10,6 +10,9 @@ class Stats():
         parser.stats = self
         self.stats = {}
         self.rule_stats = {}
+        # the look around cache (hits, misses) of each look around
+        # operator (see Parser.look_find())
+        self.look_stats = {}
         self.names = {}
         for rule in self.parser.rules:
             self.names[rule['lower']] = rule['name']
@@ -36,8 +39,12 @@ class Stats():
         self.stats[id.BKN] = s.copy()
         self.stats[id.ABG] = s.copy()
         self.stats[id.AEN] = s.copy()
+        self.stats[id.CUT] = s.copy()
+        self.stats[id.CLS] = s.copy()
         for name in self.names:
             self.rule_stats[name] = s.copy()
+        for op_type in (id.AND, id.NOT, id.BKA, id.BKN):
+            self.look_stats[op_type] = [0, 0]
 
     def total(self, stat):
         '''For internal use. Computes the total number of hits.'''
@@ -46,19 +53,50 @@ class Stats():
     def collect(self, op):
         '''Called by the parser for each node to collect the hit count.'''
         state = self.parser.state
-        self.stats[op['type']][state] += 1
-        if(op['type'] == id.RNM):
-            rule = self.parser.rules[op['index']]
+        self.stats[op.type][state] += 1
+        if(op.type == id.RNM):
+            rule = self.parser.rules[op.index]
             self.rule_stats[rule['lower']][state] += 1
-        if(op['type'] == id.UDT):
-            udt = self.parser.udts[op['index']]
+        if(op.type == id.UDT):
+            udt = self.parser.udts[op.index]
             self.rule_stats[udt['lower']][state] += 1
 
+    def collect_count(self, op_type, state, count):
+        '''Called by the parser to collect the hit count
+        of a number of nodes at once.
+        @param op_type The opcode type of the nodes.
+        @param state The state of the nodes.
+        @param count The number of nodes.'''
+        self.stats[op_type][state] += count
+
+    def collect_look(self, op_type, hit):
+        '''Called by the parser to count a look up
+        of a look around result in the cache.
+        @param op_type The opcode type of the look around operator.
+        @param hit True if the result was in the cache.'''
+        self.look_stats[op_type][0 if(hit) else 1] += 1
+
+    def look_rate(self, op_type=None):
+        '''The look around cache hit rate.
+        @param op_type The opcode type of a look around operator,
+        id.AND, id.NOT, id.BKA or id.BKN.
+        If None, the rate of all of the look around operators.
+        @returns Returns the fraction of the look ups
+        that were in the cache, 0 if there were none.'''
+        if(op_type is None):
+            hits = sum(stat[0] for stat in self.look_stats.values())
+            total = hits + sum(stat[1] for stat in self.look_stats.values())
+        else:
+            (hits, misses) = self.look_stats[op_type]
+            total = hits + misses
+        return hits / total if(total) else 0
+
     def display(self):
         '''Display the parse tree node hit statistics.
         It will first display the node statistics for the various
         node operators.
-        It then displays the rule name and UDT name statistics.
+        It then displays the rule name and UDT name statistics
+        and the look around cache hits, if any.
         Operators and rule/UDT names for which the hit count is 0 are
         not displayed.'''
         mTotal = 0
@@ -118,3 +156,13 @@ class Stats():
                     stat[id.MATCH], stat[id.EMPTY], stat[id.NOMATCH],
                     count, self.names[name])
                 print(p)
+        if(not any(sum(stat) for stat in self.look_stats.values())):
+            return
+        print()
+        print('    LOOK AROUND CACHE STATISTICS')
+        print('%5s %7s %7s %7s' % ('', 'HITS', 'MISSES', 'RATE'))
+        for (op_type, (hits, misses)) in self.look_stats.items():
+            if(hits + misses):
+                print('%5s %7d %7d %6.1f%%' % (
+                    id.dict.get(op_type), hits, misses,
+                    100 * self.look_rate(op_type)))
@@ -34,6 +34,7 @@ class Trace():
         for any trace line.
         '''
         self.file = sys.stdout
+        self.owns_file = False
         if(mode not in ['x', 'xc', 'd', 'dc']):
             raise Exception('mode must be one of x, d, xc, dc: found: ', mode)
         self.mode = mode
@@ -41,6 +42,7 @@ class Trace():
         parser.trace = self
         if(fname):
             self.file = open(fname, "w")
+            self.owns_file = True
         self.line_max = line_max
         self.selectOp = {
             id.ALT: self.traceALT,
@@ -50,6 +52,7 @@ class Trace():
             id.TLS: self.traceTLS,
             id.TBS: self.traceTBS,
             id.TRG: self.traceTRG,
+            id.CLS: self.traceCLS,
             id.UDT: self.traceUDT,
             id.AND: self.traceAND,
             id.NOT: self.traceNOT,
@@ -58,6 +61,7 @@ class Trace():
             id.BKN: self.traceBKN,
             id.ABG: self.traceABG,
             id.AEN: self.traceAEN,
+            id.CUT: self.traceCUT,
         }
         self.select_mode = {
             'x': self.phrasex,
@@ -68,7 +72,7 @@ class Trace():
 
     def __del__(self):
         '''Destructor for ensuring that the output file is closed, if any.'''
-        if(self.file and self.file != sys.stdout):
+        if(self.file and self.owns_file):
             # self.file.flush()
             self.file.close()
             self.file = None
@@ -93,52 +97,63 @@ class Trace():
 
     def traceALT(self, op):
         '''For internal use only.'''
-        return 'ALT(' + str(len(op['children'])) + ')'
+        return 'ALT(' + str(len(op.children)) + ')'
 
     def traceCAT(self, op):
         '''For internal use only.'''
-        return 'CAT(' + str(len(op['children'])) + ')'
+        return 'CAT(' + str(len(op.children)) + ')'
 
     def traceREP(self, op):
         '''For internal use only.'''
-        rep_max = str(op['max']) if(op['max'] < id.MAX_INT) else 'inf'
-        return 'REP(' + str(op['min']) + ',' + rep_max + ')'
+        rep_max = str(op.max) if(op.max < id.MAX_INT) else 'inf'
+        return 'REP(' + str(op.min) + ',' + rep_max + ')'
 
     def traceRNM(self, op):
         '''For internal use only.'''
-        rule = self.parser.rules[op['index']]
+        rule = self.parser.rules[op.index]
         return 'RNM(' + rule['name'] + ')'
 
     def traceUDT(self, op):
         '''For internal use only.'''
-        udt = self.parser.udts[op['index']]
+        udt = self.parser.udts[op.index]
         return 'UDT(' + udt['name'] + ')'
 
     def traceTLS(self, op):
         '''For internal use only.'''
-        tChars = min(3, len(op['string']))
-        tEnd = '...' if(len(op['string']) > tChars) else ''
+        tChars = min(3, len(op.string))
+        tEnd = '...' if(len(op.string) > tChars) else ''
         display = ''
         for i in range(tChars):
             if(i > 0):
                 display += ','
-            display += str(op['string'][i])
+            display += str(op.string[i])
         return 'TLS(' + display + tEnd + ')'
 
     def traceTBS(self, op):
         '''For internal use only.'''
-        tChars = min(3, len(op['string']))
-        tEnd = '...' if(len(op['string']) > tChars) else ''
+        tChars = min(3, len(op.string))
+        tEnd = '...' if(len(op.string) > tChars) else ''
         display = ''
         for i in range(tChars):
             if(i > 0):
                 display += ','
-            display += str(op['string'][i])
+            display += str(op.string[i])
         return 'TBS(' + display + tEnd + ')'
 
     def traceTRG(self, op):
         '''For internal use only.'''
-        return 'TRG(' + str(op['min']) + ',' + str(op['max']) + ')'
+        return 'TRG(' + str(op.min) + ',' + str(op.max) + ')'
+
+    def traceCLS(self, op):
+        '''For internal use only.'''
+        tRanges = min(3, len(op.ranges))
+        tEnd = '...' if(len(op.ranges) > tRanges) else ''
+        display = ''
+        for i in range(tRanges):
+            if(i > 0):
+                display += ','
+            display += str(op.ranges[i][0]) + '-' + str(op.ranges[i][1])
+        return 'CLS(' + display + tEnd + ')'
 
     def traceAND(self, op):
         '''For internal use only.'''
@@ -151,12 +166,12 @@ class Trace():
     def traceBKR(self, op):
         '''For internal use only.'''
         case = '%i'
-        if(op['bkr_case'] == id.BKR_MODE_CS):
+        if(op.bkr_case == id.BKR_MODE_CS):
             case = '%s'
         mode = '%u'
-        if(op['bkr_mode'] == id.BKR_MODE_RM):
+        if(op.bkr_mode == id.BKR_MODE_RM):
             case = '%r'
-        return 'BKR(\\' + case + mode + op['name'] + ')'
+        return 'BKR(\\' + case + mode + op.name + ')'
 
     def traceBKA(self, op):
         '''For internal use only.'''
@@ -174,6 +189,10 @@ class Trace():
         '''For internal use only.'''
         return 'AEN'
 
+    def traceCUT(self, op):
+        '''For internal use only.'''
+        return 'CUT'
+
     def phrasex(self, phrase):
         '''For internal use only.'''
         ret = ''
@@ -240,7 +259,7 @@ class Trace():
             arrow = '<- '
         else:
             arrow = '-> '
-        fn = self.selectOp.get(op['type'])
+        fn = self.selectOp.get(op.type)
         ret = self.indent(self.parser.tree_depth)
         ret += '|-|-|'
         ret += fn(op)
@@ -274,7 +293,7 @@ class Trace():
         stateDisplay = id.dict.get(state, None)[0]
         ret += '|' + stateDisplay + '|' + \
             str(phrase_length) + '|'
-        fn = self.selectOp.get(op['type'])
+        fn = self.selectOp.get(op.type)
         ret += fn(op)
         if(state == id.MATCH):
             ret += arrow
@@ -22,6 +22,22 @@ def string_to_tuple(string):
     return tuple(lst)
 
 
+def string_to_codes(string):
+    '''Converts a string to a sequence of the
+    Unicode values of the string characters, like string_to_tuple(),
+    but without a Python loop and with less memory.
+    @param string The string to convert.
+    @return A bytes object if all of the characters are Latin-1,
+    otherwise a memoryview of 4-byte unsigned integers.
+    '''
+    try:
+        return string.encode('latin-1')
+    except UnicodeEncodeError:
+        # surrogatepass keeps unpaired surrogates, as str does
+        encoding = 'utf-32-le' if(sys.byteorder == 'little') else 'utf-32-be'
+        return memoryview(string.encode(encoding, 'surrogatepass')).cast('I')
+
+
 def tuple_to_string(input):
     '''Converts a tuple of Unicode values to the equivalent string.
     @param input The tuple of Unicode values to convert.
@@ -0,0 +1,312 @@
+''' @file benchmarks/main.py
+@brief Compare the speed of the parser variants.
+Run
+<pre>python3 benchmarks/main.py --help</pre>
+to see all of the options.
+@dir benchmarks
+@brief Benchmarks of the parsers on the test grammars.
+Each grammar in tests/grammars is parsed with a sample input
+many times by each parser and the best time is displayed.
+'''
+import sys
+import os
+import time
+# add the current working directory to the path
+# DO NOT MOVE THE FOLLOWING STATEMENT
+# if using autopep8 formatter, for example, set argument '--ignore=E402'
+sys.path.append(os.getcwd())
+from apg_py.lib import identifiers as id
+from apg_py.lib import utilities as utils
+from apg_py.lib import parser as parser_module
+from apg_py.lib.parser import Parser
+from apg_py.lib.stack_parser import StackParser
+from apg_py.lib.compiled_parser import CompiledParser
+from apg_py.lib.backreferences import BackrefenceStack
+from apg_py.api.api import Api
+from apg_py.api import sabnf_grammar
+from tests.grammars import abnf
+from tests.grammars import anbncn
+from tests.grammars import ast_branch_fail
+from tests.grammars import float
+from tests.grammars import float_anchors
+from tests.grammars import float_bka_alt
+from tests.grammars import float_bka_cat
+from tests.grammars import float_bka_rep
+from tests.grammars import float_bka_rnm
+from tests.grammars import float_bka_tls
+from tests.grammars import float_bkn_tls
+from tests.grammars import float_udt
+from tests.grammars import recursive_html
+from tests.grammars import recursive_mr
+from tests.grammars import universal_bkr
+from tests.grammars import universal_html
+
+
+def udt_sign(cbData):
+    # matches '+', '-' or empty string
+    cbData['phrase_length'] = 0
+    cbData['state'] = id.EMPTY
+    if(cbData['phrase_index'] < cbData['sub_end']):
+        char = cbData['input'][cbData['phrase_index']]
+        if(char == 43 or char == 45):
+            cbData['phrase_length'] = 1
+            cbData['state'] = id.MATCH
+
+
+def udt_integer(cbData):
+    # matches any string of digits 0-9
+    index = cbData['phrase_index']
+    length = 0
+    while(index < cbData['sub_end']):
+        char = cbData['input'][index]
+        if(char >= 48 and char <= 57):
+            length += 1
+            index += 1
+        else:
+            break
+    if(length > 0):
+        cbData['state'] = id.MATCH
+        cbData['phrase_length'] = length
+    else:
+        cbData['phrase_length'] = 0
+        cbData['state'] = id.NOMATCH
+
+
+html = '<html><div><h1><h2></h2></h1></div><p><a></a></p></html>'
+# (name, grammar, input, sub_begin, UDT callbacks, start rule)
+benchmarks = [
+    ('abnf', abnf, '{' * 200, 0, None, None),
+    ('anbncn', anbncn, 'a' * 100 + 'b' * 100 + 'c' * 100, 0, None, None),
+    ('ast_branch_fail', ast_branch_fail, 'xyzabcxyz', 0, None, None),
+    ('float', float, '+1234567890.0987654321E-10', 0, None, None),
+    ('float_anchors', float_anchors, '+1234567890.0987654321E-10', 0,
+     None, None),
+    ('float_bka_alt', float_bka_alt, '---abc+12.34E+10', 6, None, None),
+    ('float_bka_cat', float_bka_cat, '---abcabcx+12.34E+10', 10,
+     None, None),
+    ('float_bka_rep', float_bka_rep, '---ABCabcABC+12.34E+10', 12,
+     None, None),
+    ('float_bka_rnm', float_bka_rnm, '123+123.456E-10', 3, None, None),
+    ('float_bka_tls', float_bka_tls, '---abc+12.34E+10', 6, None, None),
+    ('float_bkn_tls', float_bkn_tls, '---xyz+12.34E+10', 6, None, None),
+    ('float_udt', float_udt, '+1234567890.0987654321E-10', 0,
+     {'e_sign': udt_sign, 'u_integer': udt_integer}, None),
+    ('recursive_html', recursive_html, html, 0, None, None),
+    ('recursive_mr', recursive_mr, html, 0, None, None),
+    ('universal_bkr', universal_bkr, 'xxabcabc', 2, None, 'tls-start'),
+    ('universal_html', universal_html, '<html><div></div></div>', 0,
+     None, None),
+    ('sabnf_grammar', sabnf_grammar, sabnf_grammar.to_string(), 0,
+     None, None),
+]
+
+
+def best_time(parser, input, sub_begin, start_rule, repeat):
+    '''Parse the input repeat times.
+    @returns Returns the best time and the last parser result.'''
+    best = None
+    for i in range(repeat):
+        start = time.perf_counter()
+        result = parser.parse(
+            input, sub_begin=sub_begin, start_rule=start_rule)
+        elapsed = time.perf_counter() - start
+        if(best is None or elapsed < best):
+            best = elapsed
+    return (best, result)
+
+
+def run(names, repeat):
+    '''Run the named benchmarks (all if names is empty).'''
+    print('%-16s %10s %12s %12s %8s' %
+          ('grammar', 'node hits', 'Parser', 'Compiled', 'speedup'))
+    for (name, grammar, input, sub_begin, udts, start_rule) in benchmarks:
+        if(names and name not in names):
+            continue
+        input = utils.string_to_tuple(input)
+        times = []
+        for parser_class in (Parser, CompiledParser):
+            parser = parser_class(grammar)
+            if(udts):
+                parser.add_callbacks(udts)
+            (elapsed, result) = best_time(
+                parser, input, sub_begin, start_rule, repeat)
+            if(not result.success):
+                raise Exception('benchmark parse failed', name)
+            times.append(elapsed)
+        print('%-16s %10d %10.3fms %10.3fms %7.2fx' % (
+            name, result.node_hits, times[0] * 1000, times[1] * 1000,
+            times[0] / times[1]))
+
+
+class SnapshotStack(BackrefenceStack):
+    '''The back reference stack as it was before the journal.
+    The saved state is a list of the lengths of all of the named stacks,
+    restoring it truncates each of them.'''
+
+    def save_phrase(self, name, offset, length):
+        self.stack[name].append([offset, length])
+
+    def save_state(self):
+        state = []
+        for name in self.names:
+            state.append(len(self.stack[name]))
+        return state
+
+    def restore_state(self, state):
+        if(state == 0):
+            # the parser empties the stacks with the state 0
+            state = [0] * len(self.names)
+        i = 0
+        for name in self.names:
+            del self.stack[name][state[i]:]
+            i += 1
+
+
+def bkr_grammar(count):
+    '''A recursive grammar with count recursively back referenced rules,
+    nested elements each closed by its own back referenced name,
+    e.g. &lt;3abc&gt; ... &lt;/abc&gt;.'''
+    alts = []
+    rules = ''
+    for k in range(count):
+        alts.append('"%d" N%d ">" *E "</" \\%%rN%d' % (k, k, k))
+        rules += 'N%d = 1*%%d97-122\n' % k
+    source = 'E = "<" (' + ' / '.join(alts) + ') ">"\n' + rules
+    return Api().generate(source)
+
+
+def bkr_input(count, depth, width):
+    '''Nested elements, width children at each level down to depth.'''
+    def element(level):
+        k = level % count
+        name = 'abcdefghij'[k % 10] * (1 + level % 3)
+        inner = ''
+        if(level < depth):
+            inner = element(level + 1) * (width if(level % 4 == 0) else 1)
+        return '<%d%s>%s</%s>' % (k, name, inner, name)
+    return element(0)
+
+
+def nested_html(depth):
+    '''Nested recursive_html documents.'''
+    html = '<a></a>'
+    for level in range(depth):
+        name = 'div' if(level % 2) else 'p'
+        html = '<%s>%s%s</%s>' % (name, html, '<b><i></i></b>', name)
+    return html
+
+
+# (name, grammar, input, sub_begin, start rule)
+bkr_benchmarks = [
+    ('recursive_html', recursive_html, nested_html(20), 0, None),
+    ('universal_bkr', universal_bkr, 'xxabcabc', 2, 'tls-start'),
+    ('bkr_rules_20', bkr_grammar(20), bkr_input(20, 24, 2), 0, None),
+]
+
+
+def run_bkr(names, repeat):
+    '''Compare the back reference stack journal with the snapshots
+    of all of the named stack lengths it replaced
+    (all if names is empty).'''
+    print('%-16s %10s %-12s %12s %12s %8s' %
+          ('grammar', 'node hits', 'parser', 'snapshot', 'journal',
+           'speedup'))
+    for (name, grammar, input, sub_begin, start_rule) in bkr_benchmarks:
+        if(names and name not in names):
+            continue
+        input = utils.string_to_tuple(input)
+        for parser_class in (Parser, StackParser):
+            times = []
+            for stack_class in (SnapshotStack, BackrefenceStack):
+                # the parsers make their stacks with this class
+                parser_module.BackrefenceStack = stack_class
+                try:
+                    parser = parser_class(grammar)
+                    (elapsed, result) = best_time(
+                        parser, input, sub_begin, start_rule, repeat)
+                finally:
+                    parser_module.BackrefenceStack = BackrefenceStack
+                if(not result.success):
+                    raise Exception('benchmark parse failed', name)
+                times.append(elapsed)
+            print('%-16s %10d %-12s %10.3fms %10.3fms %7.2fx' % (
+                name, result.node_hits, parser_class.__name__,
+                times[0] * 1000, times[1] * 1000, times[0] / times[1]))
+
+
+def run_dispatch(names, repeat):
+    '''Compare the time per node of the instrumented node loop,
+    forced here with an unreachable node hits limit,
+    with the uninstrumented loop (all if names is empty).
+    The regular rules are executed as opcodes
+    so that both loops see the same nodes.'''
+    print('%-16s %10s %12s %12s %8s' %
+          ('grammar', 'node hits', 'instrumented', 'fast', 'speedup'))
+    for (name, grammar, input, sub_begin, udts, start_rule) in benchmarks:
+        if(names and name not in names):
+            continue
+        input = utils.string_to_tuple(input)
+        times = []
+        for instrumented in (True, False):
+            parser = Parser(grammar)
+            parser.regular_rules = False
+            if(instrumented):
+                parser.set_node_hit_limit(id.MAX_INT - 1)
+            if(udts):
+                parser.add_callbacks(udts)
+            (elapsed, result) = best_time(
+                parser, input, sub_begin, start_rule, repeat)
+            if(not result.success):
+                raise Exception('benchmark parse failed', name)
+            times.append(elapsed)
+        print('%-16s %10d %10.0fns %10.0fns %7.2fx' % (
+            name, result.node_hits, times[0] * 1e9 / result.node_hits,
+            times[1] * 1e9 / result.node_hits, times[0] / times[1]))
+
+
+def usage():
+    display = 'usage: python3 benchmarks/main.py [option] [grammar ...]\n'
+    display += '       compare the parsers on the named grammars '
+    display += '(default all)\n'
+    display += '       --help       display this help\n'
+    display += '       --dispatch   compare the time per node with '
+    display += 'and without instrumentation\n'
+    display += '       --bkr        compare the back reference stack '
+    display += 'journal with\n'
+    display += '                    the snapshots of all of the stack '
+    display += 'lengths\n'
+    display += '       --repeat=n   parse each input n times, '
+    display += 'keep the best (default 20)\n'
+    display += '       grammars:\n'
+    for benchmark in benchmarks:
+        display += '           ' + benchmark[0] + '\n'
+    display += '       --bkr grammars:\n'
+    for benchmark in bkr_benchmarks:
+        display += '           ' + benchmark[0] + '\n'
+    return display
+
+
+names = []
+repeat = 20
+dispatch = False
+bkr = False
+for arg in sys.argv[1:]:
+    if(arg == '--help'):
+        print(usage())
+        exit()
+    if(arg == '--dispatch'):
+        dispatch = True
+        continue
+    if(arg == '--bkr'):
+        bkr = True
+        continue
+    if(arg.startswith('--repeat=')):
+        repeat = max(1, int(arg[len('--repeat='):]))
+        continue
+    names.append(arg)
+if(dispatch):
+    run_dispatch(names, repeat)
+elif(bkr):
+    run_bkr(names, repeat)
+else:
+    run(names, repeat)
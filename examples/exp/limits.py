@@ -48,7 +48,7 @@ print(result)
 
 # limit node hits
 exp = ApgExp(pattern)
-exp.set_node_hits(40)
+exp.set_node_hits(30)
 testno += 1
 try:
     result = exp.exec(input)
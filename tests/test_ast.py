@@ -270,6 +270,38 @@ class TestAST(unittest.TestCase):
         found = re.search('B\n', data['string'])
         self.assertTrue(found, 'expected to find "B"')
 
+    def test_ast_7(self):
+        '''Test the record columns after a failed branch.'''
+        parser = Parser(ast_branch_fail)
+        ast = Ast(parser)
+        for name in ast.nodes:
+            ast.add_callback(name, lambda *args: id.SEM_OK)
+        result = parser.parse(utils.string_to_tuple('xyzxyz'))
+        self.assertTrue(result.success)
+        found = [(record['name'], record['state'], record['that_record'],
+                  record['phrase_index'], record['phrase_length'])
+                 for record in ast.records]
+        self.assertEqual(found, [
+            ('start', id.SEM_PRE, 7, 0, 6),
+            ('left', id.SEM_PRE, 4, 0, 3),
+            ('alt2', id.SEM_PRE, 3, 0, 3),
+            ('alt2', id.SEM_POST, 2, 0, 3),
+            ('left', id.SEM_POST, 1, 0, 3),
+            ('right', id.SEM_PRE, 6, 3, 3),
+            ('right', id.SEM_POST, 5, 3, 3),
+            ('start', id.SEM_POST, 0, 0, 6)])
+        self.assertEqual(ast.indexStack, [])
+        phrases = []
+        copy = ast.copy()
+        copy.add_callback('right', lambda state, input, index, length,
+                          data: data.append((state, index, length)))
+        copy.translate(phrases)
+        self.assertEqual(phrases, [(id.SEM_PRE, 3, 3), (id.SEM_POST, 3, 3)])
+        # the copy is independent of the parser
+        parser.parse(utils.string_to_tuple('xyzabcxyz'))
+        self.assertEqual(len(ast.record_states), 10)
+        self.assertEqual(len(copy.columns[0]), 8)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+import asyncio
+import io
+from concurrent.futures import ThreadPoolExecutor
+from apg_py.lib.parser import Parser
+from apg_py.lib.stack_parser import StackParser
+from apg_py.lib.ast import Ast
+from apg_py.lib.trace import Trace
+from apg_py.api.api import Api
+from tests.grammars import recursive_html
+from tests.test_stack_parser import rule_callback, ast_callback
+
+
+def run(parser_class, input, **kwargs):
+    '''Parse with the trace, rule callbacks and the AST attached
+    and collect everything that the parser produces.'''
+    parser = parser_class(recursive_html)
+    callbacks = {}
+    for rule in parser.rules:
+        callbacks[rule['name']] = rule_callback
+    parser.add_callbacks(callbacks)
+    trace = Trace(parser)
+    trace.file = io.StringIO()
+    ast = Ast(parser)
+    for name in ast.nodes:
+        ast.add_callback(name, ast_callback)
+    log = []
+    if(kwargs):
+        result = asyncio.run(parser.parse_async(input, user_data=log,
+                                                **kwargs))
+    else:
+        result = parser.parse(input, user_data=log)
+    data = []
+    ast.translate(data)
+    return (str(result), trace.file.getvalue(), log, data)
+
+
+class TestAsync(unittest.TestCase):
+    """Test parsing in an asyncio event loop."""
+
+    def test_async_1(self):
+        '''Test that everything the parser produces is unchanged.'''
+        input = '<html><div></div><p><a></a></p></html>'
+        expected = run(StackParser, input)
+        self.assertEqual(run(StackParser, input, node_hits=3,
+                             interval=0), expected)
+        with ThreadPoolExecutor(1) as executor:
+            self.assertEqual(run(StackParser, input, executor=executor),
+                             expected)
+            self.assertEqual(run(Parser, input, executor=executor),
+                             expected)
+
+    def test_async_2(self):
+        '''Test that the other tasks run during the parse
+        and that the parse can be cancelled.'''
+        api = Api()
+        grammar = api.generate('S = *("a" B)\nB = "b"\n')
+        parser = StackParser(grammar)
+        # execute the opcodes, not the regular expression
+        parser.regular_rules = False
+        input = 'ab' * 1000
+        turns = []
+
+        async def count():
+            while(True):
+                turns.append(1)
+                await asyncio.sleep(0)
+
+        async def parse():
+            task = asyncio.create_task(count())
+            await asyncio.sleep(0)
+            result = await parser.parse_async(input, node_hits=100,
+                                              interval=0)
+            task.cancel()
+            return result
+
+        result = asyncio.run(parse())
+        self.assertTrue(result.success)
+        self.assertTrue(len(turns) > 10)
+
+        async def cancel():
+            task = asyncio.create_task(parser.parse_async(
+                input, node_hits=100, interval=0))
+            await asyncio.sleep(0)
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                return True
+            return False
+
+        self.assertTrue(asyncio.run(cancel()))
+        # the parse context is kept for the next parse
+        self.assertEqual(len(parser.contexts), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
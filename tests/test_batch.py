@@ -0,0 +1,73 @@
+import unittest
+from apg_py.lib import identifiers as id
+from apg_py.lib.parser import Parser
+from apg_py.lib.stack_parser import StackParser
+from apg_py.lib.compiled_parser import CompiledParser
+from apg_py.lib.ast import Ast
+from apg_py.api.api import Api
+from tests.grammars import float_udt
+from tests.test_stack_parser import udtSign, udtInteger
+
+
+def callback(state, input, index, length, data):
+    if(state == id.SEM_PRE):
+        data.append(tuple(input[index:index + length]))
+    return id.SEM_OK
+
+
+class TestBatch(unittest.TestCase):
+    """Test parsing many input strings at once."""
+
+    def test_batch_1(self):
+        '''Test that the results are those of the single parses.'''
+        api = Api()
+        grammar = api.generate('S = 1*(W / " ")\nW = 1*%d97-122\n')
+        inputs = ['one two', '', 'one 2', ' ', 'abc']
+        for parser_class in [Parser, StackParser, CompiledParser]:
+            parser = parser_class(grammar)
+            for start_rule in [None, 'w']:
+                found = list(parser.parse_many(inputs, start_rule))
+                self.assertEqual(len(found), len(inputs))
+                for (result, input) in zip(found, inputs):
+                    expected = parser.parse(input, start_rule)
+                    for name in result._fields:
+                        self.assertEqual(getattr(result, name),
+                                         getattr(expected, name))
+            # substrings of one buffer
+            buffer = ''.join(inputs)
+            spans = []
+            begin = 0
+            for input in inputs:
+                spans.append((begin, len(input)))
+                begin += len(input)
+            found = parser.parse_many(spans, buffer=buffer)
+            for (result, input) in zip(found, inputs):
+                expected = parser.parse(buffer, sub_begin=result.sub_begin,
+                                        sub_length=len(input))
+                self.assertEqual(result.success, expected.success)
+                self.assertEqual(result.phrase_length,
+                                 expected.phrase_length)
+            self.assertRaises(Exception, list,
+                              parser.parse_many(inputs, 'x'))
+
+    def test_batch_2(self):
+        '''Test the AST and the UDTs of each parse.'''
+        parser = StackParser(float_udt)
+        parser.add_callbacks({'e_sign': udtSign, 'u_integer': udtInteger})
+        ast = Ast(parser)
+        ast.add_callback('integer', callback)
+        buffer = b'+12.5E3,-7,x'
+        phrases = []
+        for result in parser.parse_many([(0, 7), (8, 2), (11, 1)],
+                                        buffer=buffer):
+            data = []
+            ast.translate(data)
+            phrases.append((result.success, data))
+        self.assertEqual(phrases, [(True, [(49, 50)]), (True, [(55,)]),
+                                   (False, [])])
+        self.assertEqual(len(parser.contexts), 1)
+        self.assertTrue(parser.contexts[0].ast is None)
+
+
+if __name__ == '__main__':
+    unittest.main()
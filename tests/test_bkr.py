@@ -2,6 +2,7 @@ import unittest
 from apg_py.lib import identifiers as id
 from apg_py.lib import utilities as utils
 from apg_py.lib.parser import Parser
+from apg_py.lib.backreferences import BackrefenceStack
 from tests.grammars import recursive_html
 from tests.grammars import recursive_html_cs
 from tests.grammars import recursive_html_udt
@@ -128,6 +129,24 @@ class TestBkru(unittest.TestCase):
         result = parser.parse(utils.string_to_tuple(input))
         self.assertFalse(result.success)
 
+    def test_bkru_4(self):
+        '''Test saving and restoring the back reference stacks.'''
+        stack = BackrefenceStack(('a', 'b'))
+        stack.save_phrase('a', 0, 1)
+        state = stack.save_state()
+        stack.save_phrase('b', 1, 2)
+        inner = stack.save_state()
+        stack.save_phrase('a', 3, 4)
+        stack.save_phrase('b', 7, 1)
+        self.assertEqual(stack.get_phrase('a'), [3, 4])
+        stack.restore_state(inner)
+        self.assertEqual(stack.get_phrase('a'), [0, 1])
+        self.assertEqual(stack.get_phrase('b'), [1, 2])
+        stack.restore_state(state)
+        self.assertEqual(stack.stack, {'a': [[0, 1]], 'b': []})
+        stack.restore_state(state)
+        self.assertEqual(stack.save_state(), state)
+
 
 if __name__ == '__main__':
     unittest.main()
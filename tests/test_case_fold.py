@@ -0,0 +1,76 @@
+import unittest
+from apg_py.lib import utilities as utils
+from apg_py.lib.parser import Parser
+from apg_py.lib.stack_parser import StackParser
+from apg_py.lib.compiled_parser import CompiledParser
+from apg_py.api.api import Api
+
+PARSERS = [Parser, StackParser, CompiledParser]
+
+
+class TestCaseFold(unittest.TestCase):
+    """Test the case folded str view of the input."""
+
+    def test_case_fold_1(self):
+        '''Test the TLS strings and the case insensitive back references
+        with and without the case folded input.'''
+        api = Api()
+        grammar = api.generate(
+            'S = "abcdefghijklmnopqrstu" "-" A "-" \\A "-" &&"c-" "x"\n'
+            'A = 1*%d65-122 / 1*%d192-255\n')
+        inputs = [('ABCDEFGHIJKLMNOPQRSTU-aBc-AbC-x', True),
+                  ('abcdefghijklmnopqrstu-ab-ac-x', False),
+                  ('abcdefghijklmnopqrstu-ab-AB-x', False),
+                  ('abcdefghijklmnopqrstu-ç-Ç-x', False),
+                  ('abcdefghijklmnopqrstu-ç-ç-x', False),
+                  ('abcdefghijklmnopqrstu-C-c-x', True)]
+        for parser_class in PARSERS:
+            parser = parser_class(grammar)
+            # execute the opcodes, not the regular expressions
+            parser.regular_rules = False
+            for (input, success) in inputs:
+                for converted in (input, utils.string_to_tuple(input),
+                                  input.encode('latin-1')):
+                    result = parser.parse(converted)
+                    self.assertEqual(result.success, success,
+                                     (parser_class.__name__, converted))
+
+    def test_case_fold_2(self):
+        '''Test that the input is only folded when needed, once.'''
+        api = Api()
+        input = 'ABC-x'
+        parser = Parser(api.generate('S = "abc" "-" %d120\n'))
+        parser.regular_rules = False
+        parser.keep_input = True
+        self.assertTrue(parser.parse(input).success)
+        self.assertEqual(parser.text_cache[3], ('abc-x', 0, 5))
+        parser = Parser(api.generate('S = 3%d65-67 %d45 %d120\n'))
+        parser.regular_rules = False
+        parser.keep_input = True
+        self.assertTrue(parser.parse(input).success)
+        self.assertEqual(parser.text_cache[3][0], None)
+        # an input without a str view is not copied
+        self.assertTrue(parser.parse(input.encode()).success)
+
+    def test_case_fold_3(self):
+        '''Test that only the characters parsed are folded.'''
+        api = Api()
+        grammar = api.generate('S = &&"ab" "c" "DE"\n')
+        input = utils.string_to_tuple('xxABcdexx' * 1000)
+        for parser_class in PARSERS:
+            parser = parser_class(grammar)
+            parser.regular_rules = False
+            parser.keep_input = True
+            # the look behind reads the characters before the span
+            result = parser.parse(input, sub_begin=9 * 500 + 4,
+                                  sub_length=3)
+            self.assertTrue(result.success)
+            if(parser_class is not CompiledParser):
+                # the compiled parser compares short strings inline
+                self.assertEqual(parser.text_cache[3], ('cde', 4504, 4507))
+            self.assertFalse(parser.parse(input, sub_begin=4,
+                                          sub_length=4).success)
+
+
+if __name__ == '__main__':
+    unittest.main()
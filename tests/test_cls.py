@@ -0,0 +1,131 @@
+import unittest
+import io
+import os
+import tempfile
+from apg_py.lib import identifiers as id
+from apg_py.lib import utilities as utils
+from apg_py.lib.parser import Parser
+from apg_py.lib.stack_parser import StackParser
+from apg_py.lib.compiled_parser import CompiledParser
+from apg_py.lib.trace import Trace
+from apg_py.lib.stats import Stats
+from apg_py.api.api import Api
+
+
+class TestCls(unittest.TestCase):
+    """Test the character class opcode."""
+
+    def test_cls_1(self):
+        '''Test merging ALTs of single character terminals.'''
+        api = Api()
+        grammar = api.generate(
+            'S = (%d97-122/%d65-90/%d48-57/%d45) "x" / A\n'
+            'A = ("q" / %d48 / (%d49-50 / %d51)) / (%d48 / "ab")\n')
+        ops = grammar.rules[0]['opcodes']
+        # TRG and TBS do not look behind the same, one class for each
+        self.assertEqual(ops[2], {'type': id.ALT, 'children': (3, 4)})
+        self.assertEqual(ops[3], {'type': id.CLS, 'ranges': (
+            (48, 57), (65, 90), (97, 122)), 'floor': 2})
+        self.assertEqual(ops[4], {'type': id.CLS, 'ranges': ((45, 45),),
+                                  'floor': 1})
+        self.assertEqual(ops[5]['type'], id.TLS)
+        ops = grammar.rules[1]['opcodes']
+        self.assertEqual(ops[0]['type'], id.ALT)
+        self.assertEqual(ops[1]['type'], id.ALT)
+        self.assertEqual(ops[2], {'type': id.CLS, 'ranges': ((49, 50),),
+                                  'floor': 2})
+        self.assertEqual(ops[3], {'type': id.CLS, 'ranges': (
+            (48, 48), (51, 51), (81, 81), (113, 113)), 'floor': 1})
+        self.assertEqual(ops[4]['type'], id.ALT)
+        self.assertEqual(len(ops), 7)
+        self.assertEqual(grammar.phrase_lengths[1][1], (1, 1))
+        self.assertEqual(grammar.first_chars[1][1],
+                         (frozenset((48, 49, 50, 51, 81, 113)), False))
+        grammar = api.generate('S = %d97-122 / %d48-57\n')
+        self.assertEqual(grammar.rules[0]['opcodes'], (
+            {'type': id.CLS, 'ranges': ((48, 57), (97, 122)), 'floor': 2},))
+
+    def test_cls_2(self):
+        '''Test parsing with the character class opcode.'''
+        api = Api()
+        grammar = api.generate(
+            'S = 1*(%d48-57 / %d1000-2000 / %d65 / %d3000)'
+            ' &&(%d49 / %d3000) %d0-10000\n')
+        for parser_class in [Parser, StackParser, CompiledParser]:
+            parser = parser_class(grammar)
+            for (input, success) in [
+                    ([48, 1500, 65, 3000, 1], True),
+                    ([48, 49, 50, 3000], False),
+                    ([48, 49, 3000, 5000], True),
+                    ([48, 2000, 5000], False),
+                    ([1999, 2001, 1], False),
+                    ([66, 1], False),
+                    ([1000], False)]:
+                result = parser.parse(input)
+                self.assertEqual(result.success, success)
+
+    def test_cls_3(self):
+        '''Test look behind at the beginning of the input.'''
+        api = Api()
+        grammar = api.generate('S = &&(%d97-122 / %d48-57) "+"\n')
+        for parser_class in [Parser, StackParser, CompiledParser]:
+            parser = parser_class(grammar)
+            input = utils.string_to_tuple('-a+')
+            self.assertTrue(parser.parse(input, sub_begin=2).success)
+            input = utils.string_to_tuple('a-+')
+            self.assertFalse(parser.parse(input, sub_begin=2).success)
+            input = utils.string_to_tuple('+')
+            self.assertFalse(parser.parse(input).success)
+
+    def test_cls_4(self):
+        '''Test the trace, statistics and the grammar file.'''
+        api = Api()
+        grammar = api.generate('S = 1*(%d97-122 / %d48-57 / "-")\n')
+        parser = Parser(grammar)
+        trace = Trace(parser)
+        trace.file = io.StringIO()
+        stats = Stats(parser)
+        result = parser.parse(utils.string_to_tuple('ab-9'))
+        self.assertTrue(result.success)
+        self.assertTrue('CLS(48-57,97-122)' in trace.file.getvalue())
+        self.assertEqual(stats.stats[id.CLS][id.MATCH], 4)
+        with tempfile.TemporaryDirectory() as dir:
+            fname = os.path.join(dir, 'cls_grammar.py')
+            api.write_grammar(fname)
+            with open(fname) as file:
+                text = file.read()
+        self.assertTrue('#        CLS = 2' in text)
+        self.assertTrue("'floor': 2" in text)
+        self.assertTrue("'type': 19" in text)
+
+    def test_cls_5(self):
+        '''Test that the classes look behind as the terminals
+        they are merged from, TRG never matches the first input character.'''
+        api = Api()
+        inputs = ['a+', '0+', '-+', 'Z+']
+        grammars = [
+            # (grammar, the inputs matched at sub_begin = 1,
+            # the inputs matched after one more character)
+            ('S = &&(%d97-122 / %d48-57) "+"\n', [], ['a+', '0+']),
+            ('S = &&(%d97-122 / %d48-57 / %d45 / "z") "+"\n',
+             ['-+', 'Z+'], inputs),
+            ('S = &&(1*(%d97-122 / %d48-57 / %d45)) "+"\n',
+             ['-+'], ['a+', '0+', '-+']),
+            ('S = &&(1*(%d48-57 / %d45)) "+"\n', ['-+'], ['0+', '-+'])]
+        for (source, first, second) in grammars:
+            grammar = api.generate(source)
+            for parser_class in [Parser, StackParser, CompiledParser]:
+                parser = parser_class(grammar)
+                for input in inputs:
+                    result = parser.parse(utils.string_to_tuple(input),
+                                          sub_begin=1)
+                    self.assertEqual(result.success, input in first,
+                                     (source, parser_class.__name__, input))
+                    result = parser.parse(utils.string_to_tuple('+' + input),
+                                          sub_begin=2)
+                    self.assertEqual(result.success, input in second,
+                                     (source, parser_class.__name__, input))
+
+
+if __name__ == '__main__':
+    unittest.main()
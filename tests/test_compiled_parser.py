@@ -0,0 +1,263 @@
+import unittest
+import io
+import os
+import tempfile
+import importlib.util
+from apg_py.lib import identifiers as id
+from apg_py.lib import utilities as utils
+from apg_py.lib.parser import Parser
+from apg_py.lib.stack_parser import StackParser
+from apg_py.lib.compiled_parser import CompiledParser
+from apg_py.lib.ast import Ast
+from apg_py.lib.trace import Trace
+from apg_py.lib.stats import Stats
+from apg_py.api.api import Api
+from apg_py.api import sabnf_grammar
+from tests.grammars import abnf
+from tests.grammars import anbncn
+from tests.grammars import ast_branch_fail
+from tests.grammars import float_anchors
+from tests.grammars import float_bka_alt
+from tests.grammars import float_bka_cat
+from tests.grammars import float_bka_rep
+from tests.grammars import float_bka_rnm
+from tests.grammars import float_bka_tbs
+from tests.grammars import float_bka_tls
+from tests.grammars import float_bka_trg
+from tests.grammars import float_bka_udt
+from tests.grammars import float_bkn_tls
+from tests.grammars import float_udt
+from tests.grammars import recursive_html
+from tests.grammars import recursive_html_cs
+from tests.grammars import recursive_mr
+from tests.grammars import universal_bkr
+from tests.grammars import universal_html
+
+
+def udtSign(cbData):
+    # matches '+', '-' or empty string
+    cbData['phrase_length'] = 0
+    cbData['state'] = id.EMPTY
+    if(cbData['phrase_index'] < cbData['sub_end']):
+        char = cbData['input'][cbData['phrase_index']]
+        if(char == 43 or char == 45):
+            cbData['phrase_length'] = 1
+            cbData['state'] = id.MATCH
+
+
+def udtInteger(cbData):
+    # matches any string of digits 0-9
+    index = cbData['phrase_index']
+    length = 0
+    while(index < cbData['sub_end']):
+        char = cbData['input'][index]
+        if(char >= 48 and char <= 57):
+            length += 1
+            index += 1
+        else:
+            break
+    if(length > 0):
+        cbData['state'] = id.MATCH
+        cbData['phrase_length'] = length
+    else:
+        cbData['phrase_length'] = 0
+        cbData['state'] = id.NOMATCH
+
+
+def rule_callback(cbData):
+    cbData['user_data'].append(
+        (cbData['state'], cbData['phrase_index'], cbData['phrase_length'],
+         cbData['max_phrase_length']))
+
+
+def ast_callback(state, input, index, length, data):
+    data.append((state, index, length))
+    return id.SEM_OK
+
+
+def run(parser_class, grammar, input, sub_begin=0, udts=None, start=None):
+    '''Parse with rule callbacks and the AST attached
+    and collect everything that the parser produces.'''
+    parser = parser_class(grammar)
+    if(udts):
+        parser.add_callbacks(udts)
+    callbacks = {}
+    for rule in parser.rules:
+        callbacks[rule['name']] = rule_callback
+    parser.add_callbacks(callbacks)
+    ast = Ast(parser)
+    for name in ast.nodes:
+        ast.add_callback(name, ast_callback)
+    log = []
+    result = parser.parse(
+        utils.string_to_tuple(input),
+        start_rule=start,
+        sub_begin=sub_begin,
+        user_data=log)
+    data = []
+    ast.translate(data)
+    return (str(result), log, data)
+
+
+class TestCompiledParser(unittest.TestCase):
+    """Test the compiled parser against the opcode interpreter."""
+
+    def compare(self, grammar, input, sub_begin=0, udts=None, start=None):
+        expected = run(Parser, grammar, input, sub_begin, udts, start)
+        found = run(CompiledParser, grammar, input, sub_begin, udts, start)
+        self.assertEqual(expected[0], found[0], 'results differ')
+        self.assertEqual(expected[1], found[1], 'callbacks differ')
+        self.assertEqual(expected[2], found[2], 'ASTs differ')
+
+    def test_compiled_parser_1(self):
+        '''Test the basic operators.'''
+        self.compare(abnf, 'AB')
+        self.compare(abnf, 'CD')
+        self.compare(abnf, 'cd')
+        self.compare(abnf, '{|}')
+        self.compare(abnf, 'CX')
+        self.compare(ast_branch_fail, 'xyzabcxyz')
+        self.compare(ast_branch_fail, 'xyzxyz')
+        input = sabnf_grammar.to_string()
+        self.compare(sabnf_grammar, input)
+        self.compare(sabnf_grammar, input[:-20])
+
+    def test_compiled_parser_2(self):
+        '''Test look ahead and anchors.'''
+        self.compare(anbncn, 'aaabbbccc')
+        self.compare(anbncn, 'aaabbbcc')
+        self.compare(float_anchors, '+12.34E-10')
+        self.compare(float_anchors, 'x+12.34E-10', sub_begin=1)
+
+    def test_compiled_parser_3(self):
+        '''Test look behind.'''
+        self.compare(float_bka_alt, '---abc+12.34E+10', sub_begin=6)
+        self.compare(float_bka_cat, '---abcabcx+12.34E+10', sub_begin=10)
+        self.compare(float_bka_rep, '---ABCabcABC+12.34E+10', sub_begin=12)
+        self.compare(float_bka_rnm, '123+123.456E-10', sub_begin=3)
+        self.compare(float_bka_tbs, '---abc+12.34E+10', sub_begin=6)
+        self.compare(float_bka_tls, '---zzz+12.34E+10', sub_begin=6)
+        self.compare(float_bka_trg, '---abc+12.34E+10', sub_begin=6)
+        self.compare(float_bkn_tls, '---abc+12.34E+10', sub_begin=6)
+        self.compare(universal_bkr, 'xxabcabc', sub_begin=2,
+                     start='tls-start')
+
+    def test_compiled_parser_4(self):
+        '''Test back referencing.'''
+        self.compare(recursive_html, '<html><div></div><p><a></a></p></html>')
+        self.compare(recursive_html, '<html><div></div></html></html>')
+        self.compare(recursive_html_cs, '<html><div></DIV></html>')
+        self.compare(recursive_mr, '<html><div><h1></h1></div></html>')
+        self.compare(universal_html, '<html><div></div></div>')
+        self.compare(universal_html, '<html><div></div></html>')
+
+    def test_compiled_parser_5(self):
+        '''Test UDTs.'''
+        udts = {'e_sign': udtSign, 'u_integer': udtInteger}
+        self.compare(float_udt, '+12.34E-10', udts=udts)
+        self.compare(float_udt, '1234', udts=udts)
+        self.compare(float_udt, '12x34', udts=udts)
+
+    def test_compiled_parser_6(self):
+        '''Test the operators not allowed in look behind mode.'''
+        parser = CompiledParser(float_bka_udt)
+        parser.add_callbacks({'u_digits': udtInteger})
+        input = utils.string_to_tuple('123+12.34E+10')
+        self.assertRaises(Exception, parser.parse, input, sub_begin=3)
+        parser = CompiledParser(universal_bkr)
+        input = utils.string_to_tuple('xxabc')
+        self.assertRaises(Exception, parser.parse, input, sub_begin=2)
+
+    def test_compiled_parser_7(self):
+        '''Test the limits.'''
+        api = Api()
+        grammar = api.generate('S = "(" [S] ")"\n')
+        input = utils.string_to_tuple('(' * 100 + ')' * 100)
+        parser = CompiledParser(grammar)
+        result = parser.parse(input)
+        self.assertTrue(result.success)
+        self.assertEqual(result.max_tree_depth,
+                         Parser(grammar).parse(input).max_tree_depth)
+        parser.set_tree_depth_limit(50)
+        self.assertRaises(Exception, parser.parse, input)
+        parser.set_tree_depth_limit(1000)
+        parser.set_node_hit_limit(50)
+        self.assertRaises(Exception, parser.parse, input)
+
+    def test_compiled_parser_8(self):
+        '''Test the fall back to the interpreter.'''
+        parser = CompiledParser(anbncn)
+        trace = Trace(parser)
+        trace.file = io.StringIO()
+        Stats(parser)
+        result = parser.parse(utils.string_to_tuple('aaabbbccc'))
+        self.assertTrue(result.success)
+        self.assertTrue(len(trace.file.getvalue()) > 0)
+
+    def test_compiled_parser_9(self):
+        '''Test opcodes nested too deeply to be inlined.'''
+        alt = '"z"'
+        for i in range(30):
+            alt = '"a" (' + alt + ' / "q")'
+        rep = '"c"'
+        for i in range(12):
+            rep = '"c" *(' + rep + ')'
+        api = Api()
+        grammar = api.generate('S = ' + alt + ' ' + rep + '\n')
+        self.compare(grammar, 'a' * 30 + 'zcccc')
+        self.compare(grammar, 'a' * 30 + 'q' + 'c' * 20)
+        self.compare(grammar, 'a' * 29 + 'qc')
+
+    def test_compiled_parser_10(self):
+        '''Test grammar files written with compiled rules.'''
+        api = Api()
+        generated = api.generate(recursive_html.to_string())
+        with tempfile.TemporaryDirectory() as dir:
+            fname = os.path.join(dir, 'compiled_html.py')
+            api.write_grammar(fname, compiled=True)
+            spec = importlib.util.spec_from_file_location(
+                'compiled_html', fname)
+            grammar = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(grammar)
+        for rule in grammar.rules:
+            self.assertEqual(len(rule['opcodes']), 0)
+        for input in ['<html><div></div><p><a></a></p></html>',
+                      '<html><div></div></html></html>']:
+            expected = run(Parser, generated, input)
+            found = run(CompiledParser, grammar, input)
+            self.assertEqual(expected, found)
+        parser = CompiledParser(grammar)
+        Stats(parser)
+        self.assertRaises(Exception, parser.parse,
+                          utils.string_to_tuple('<a></a>'))
+        # the interpreters need the opcodes
+        with self.assertRaises(Exception) as context:
+            Parser(grammar)
+        self.assertTrue('CompiledParser' in str(context.exception))
+        self.assertRaises(Exception, StackParser, grammar)
+
+    def test_compiled_parser_11(self):
+        '''Test that the regular expressions, the pruning and the ALT
+        tables give the same results as the interpreter.'''
+        for (grammar, input, sub_begin) in [
+                (abnf, '{' * 20, 0),
+                (float_bka_alt, '---abc+12.34E+10', 6),
+                (float_bkn_tls, '---xyz+12.34E+10', 6),
+                (recursive_html, '<html><div></div><p><a></a></p></html>', 0),
+                (sabnf_grammar, sabnf_grammar.to_string(), 0)]:
+            input = utils.string_to_tuple(input)
+            for end in (len(input), len(input) - 3):
+                results = []
+                for parser_class in (Parser, CompiledParser):
+                    parser = parser_class(grammar)
+                    results.append(str(parser.parse(
+                        input[:end], sub_begin=sub_begin)))
+                self.assertEqual(results[0], results[1])
+        # the regular rule matched with its regular expression
+        parser = CompiledParser(abnf)
+        self.assertEqual(parser.parse(
+            utils.string_to_tuple('{' * 20)).node_hits, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
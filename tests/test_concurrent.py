@@ -0,0 +1,167 @@
+import asyncio
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from apg_py.lib import identifiers as id
+from apg_py.lib import utilities as utils
+from apg_py.lib.parser import Parser
+from apg_py.lib.stack_parser import StackParser
+from apg_py.lib.compiled_parser import CompiledParser
+from apg_py.lib.ast import Ast
+from apg_py.lib.memo import Memo
+from apg_py.api import sabnf_grammar
+from tests.grammars import float_udt
+from tests.grammars import recursive_html
+from tests.grammars import universal_html
+
+
+def udtSign(cbData):
+    # matches '+', '-' or empty string
+    cbData['phrase_length'] = 0
+    cbData['state'] = id.EMPTY
+    if(cbData['phrase_index'] < cbData['sub_end']):
+        char = cbData['input'][cbData['phrase_index']]
+        if(char == 43 or char == 45):
+            cbData['phrase_length'] = 1
+            cbData['state'] = id.MATCH
+
+
+def udtInteger(cbData):
+    # matches any string of digits 0-9
+    index = cbData['phrase_index']
+    length = 0
+    while(index < cbData['sub_end']):
+        char = cbData['input'][index]
+        if(char >= 48 and char <= 57):
+            length += 1
+            index += 1
+        else:
+            break
+    if(length > 0):
+        cbData['state'] = id.MATCH
+        cbData['phrase_length'] = length
+    else:
+        cbData['phrase_length'] = 0
+        cbData['state'] = id.NOMATCH
+
+
+def rule_callback(cbData):
+    if(cbData['state'] == id.MATCH):
+        cbData['user_data'].append(
+            (cbData['phrase_index'], cbData['phrase_length']))
+
+
+def ast_callback(state, input, index, length, data):
+    if(state == id.SEM_PRE):
+        data.append((index, length))
+    return id.SEM_OK
+
+
+def translate(ast):
+    data = []
+    ast.translate(data)
+    return data
+
+
+class TestConcurrent(unittest.TestCase):
+    """Test many concurrent parses with one parser."""
+
+    def run_all(self, parser, inputs, name=None):
+        '''Parse the inputs serially, then concurrently,
+        and compare the results.'''
+        def parse(input):
+            data = []
+            result = parser.parse(utils.string_to_tuple(input),
+                                  user_data=data)
+            return (str(result), data)
+        expected = [parse(input) for input in inputs]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            found = list(pool.map(parse, inputs * 4))
+        self.assertEqual(found, expected * 4)
+
+    def test_concurrent_1(self):
+        '''Test the parsers with back referencing and UDTs.'''
+        html = ['<html><div></div><p><a></a></p></html>',
+                '<html><div></div></html></html>',
+                '<a><b><c></c></b></a>' * 20]
+        floats = ['+12.34E-10', '1234', '12x34', '-5.' + '6' * 200]
+        for parser_class in [Parser, StackParser, CompiledParser]:
+            parser = parser_class(recursive_html)
+            parser.add_callbacks({'tag-name': rule_callback})
+            self.run_all(parser, html)
+            self.run_all(parser_class(universal_html), html)
+            parser = parser_class(float_udt)
+            parser.add_callbacks({'e_sign': udtSign, 'u_integer': udtInteger})
+            self.run_all(parser, floats)
+            parser = parser_class(sabnf_grammar)
+            self.run_all(parser, [sabnf_grammar.to_string(),
+                                  'rule = "a" / "b"\n', 'bad = '])
+
+    def test_concurrent_2(self):
+        '''Test the parse contexts.'''
+        parser = Parser(recursive_html)
+        context = parser.context()
+        self.assertFalse(context is parser)
+        self.assertFalse(context.bkrr_stack is parser.bkrr_stack)
+        self.assertTrue(context.opSelect[id.ALT].__self__ is context)
+        result = parser.parse(utils.string_to_tuple('<a></a>'))
+        self.assertTrue(result.success)
+        self.assertEqual(parser.bkrr_stack.stack, {'tag-name': []})
+        # the context is kept for the next parse
+        self.assertEqual(len(parser.contexts), 1)
+        self.assertTrue(parser.contexts[0].input is None)
+        kept = parser.contexts[0]
+        parser.parse(utils.string_to_tuple('<a></b>'))
+        self.assertEqual(parser.contexts, [kept])
+        # observed parses run on the parser
+        Memo(parser)
+        self.assertTrue(parser.context() is parser)
+        # parses with an AST run on a context with its own AST records
+        parser = Parser(recursive_html)
+        ast = Ast(parser)
+        context = parser.context()
+        self.assertFalse(context is parser)
+        self.assertFalse(context.ast is ast)
+        self.assertFalse(context.ast.record_states is ast.record_states)
+        self.assertTrue(context.ast.nodes is ast.nodes)
+
+    def test_concurrent_3(self):
+        '''Test interleaved parses with an AST.'''
+        html = ['<a><b></b></a>', '<c><d><e></e></d><f></f></c>']
+        for parser_class in [Parser, StackParser, CompiledParser]:
+            parser = parser_class(recursive_html)
+            ast = Ast(parser)
+            ast.add_callback('tag-name', ast_callback)
+            expected = []
+            for input in html:
+                self.assertTrue(parser.parse(input).success)
+                expected.append(translate(ast))
+            self.assertEqual(len(expected[0]), 2)
+            self.assertEqual(len(expected[1]), 4)
+            # the AST holds the records of the parse completed last
+            first = parser.parse_many(html)
+            second = parser.parse_many(reversed(html))
+            self.assertTrue(next(first).success)
+            self.assertEqual(translate(ast), expected[0])
+            self.assertTrue(next(second).success)
+            self.assertEqual(translate(ast), expected[1])
+            self.assertTrue(next(first).success)
+            self.assertEqual(translate(ast), expected[1])
+            self.assertTrue(next(second).success)
+            self.assertEqual(translate(ast), expected[0])
+            first.close()
+            second.close()
+        parser = StackParser(recursive_html)
+        ast = Ast(parser)
+        ast.add_callback('tag-name', ast_callback)
+
+        async def parse_both():
+            return await asyncio.gather(
+                parser.parse_async(html[1], node_hits=1, interval=0),
+                parser.parse_async(html[0], node_hits=1, interval=0))
+        results = asyncio.run(parse_both())
+        self.assertTrue(results[0].success and results[1].success)
+        self.assertEqual(translate(ast), expected[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+import unittest
+import io
+from apg_py.lib import identifiers as id
+from apg_py.lib.parser import Parser, LimitExceeded
+from apg_py.lib.stack_parser import StackParser
+from apg_py.lib.compiled_parser import CompiledParser
+from apg_py.lib.ast import Ast
+from apg_py.lib.trace import Trace
+from apg_py.lib.stats import Stats
+from apg_py.api.api import Api
+
+PARSERS = [Parser, StackParser, CompiledParser]
+
+
+def callback(state, input, index, length, data):
+    data.append((state, tuple(input[index:index + length])))
+    return id.SEM_OK
+
+
+def name_callback(state, input, index, length, data):
+    data.append(('s', state))
+    return id.SEM_SKIP
+
+
+def check(test, source, inputs):
+    '''Parse each input string with each parser and check the result.
+    @param inputs A list of (input, success) pairs.'''
+    api = Api()
+    grammar = api.generate(source)
+    test.assertFalse(api.errors)
+    for parser_class in PARSERS:
+        parser = parser_class(grammar)
+        for (input, success) in inputs:
+            result = parser.parse(input)
+            test.assertEqual(result.success, success,
+                             (parser_class.__name__, source, input))
+
+
+class TestCut(unittest.TestCase):
+    """Test the cut operator."""
+
+    def test_cut_1(self):
+        '''Test that a cut commits the enclosing ALT.'''
+        inputs = [('ab', True), ('ac', True), ('x', True)]
+        check(self, 'S = "a" "b" / "a" "c" / "x"\n', inputs)
+        inputs = [('ab', True), ('ac', False), ('x', True)]
+        check(self, 'S = "a" ~ "b" / "a" "c" / "x"\n', inputs)
+        # a cut before the first character
+        check(self, 'S = ~ "a" / "b"\n', [('a', True), ('b', False)])
+        # the outer ALT stays committed after the inner ALT
+        check(self, 'S = "x" ~ ("y" ~ "q" / "z") "w" / "xz"\n',
+              [('xzw', True), ('xz', False), ('xyqw', True)])
+        check(self, 'S = "x" ~ ("y" ~ "q" / "y") / "xy"\n',
+              [('xyq', True), ('xy', False)])
+
+    def test_cut_2(self):
+        '''Test that a cut commits the enclosing REP.'''
+        inputs = [('ababac', True), ('ac', True), ('aba', False)]
+        check(self, 'S = *("a" "b") "ac"\n', inputs)
+        inputs = [('ababac', False), ('ac', False), ('abab', False),
+                  ('', False)]
+        check(self, 'S = *("a" ~ "b") "ac"\n', inputs)
+        inputs = [('abab', True), ('', True), ('aba', False),
+                  ('abx', True)]
+        check(self, 'S = *("a" ~ "b") *%d120\n', inputs)
+        # a committed repetition that succeeds does not fail the REP
+        check(self, 'S = 2*2("a" ~ "b")\n', [('abab', True), ('ab', False)])
+
+    def test_cut_3(self):
+        '''Test the scope of a cut.'''
+        # a cut never commits an ALT of another rule
+        check(self, 'S = A / "ac"\nA = "a" ~ "b"\n', [('ac', True)])
+        # nor an ALT outside of a look around operator
+        check(self, 'S = "a" &(~ "b") / "ac"\n', [('ac', True)])
+        check(self, 'S = &("a" ~ "b" / "ac") "ac"\n', [('ac', False)])
+        # a cut with nothing to commit
+        check(self, 'S = "a" ~ "b"\n', [('ab', True), ('ac', False)])
+        # a cut in look behind mode, the ALT children are tried
+        # from last to first and the CAT children from right to left
+        check(self, 'S = "ab" &&("ab" / "x" "b")\n', [('ab', True)])
+        check(self, 'S = "ab" &&("ab" / "x" ~ "b")\n', [('ab', False)])
+        check(self, 'S = "ab" &&("ab" / ~ "x" "b")\n', [('ab', True)])
+
+    def test_cut_4(self):
+        '''Test that a committed parse frees the back referenced
+        phrases and the AST records.'''
+        source = 'S = *(R ~)\nR = N "=" \\N ";"\nN = 1*%d97-122\n'
+        input = 'abc=abc;' * 100
+        api = Api()
+        grammar = api.generate(source)
+        uncommitted = api.generate(source.replace('~', ''))
+        for parser_class in PARSERS:
+            parser = parser_class(grammar)
+            parser.check_interval = 10
+            parser.set_bkr_entry_limit(5)
+            self.assertTrue(parser.parse(input).success)
+            parser = parser_class(uncommitted)
+            parser.check_interval = 10
+            parser.set_bkr_entry_limit(5)
+            self.assertRaises(LimitExceeded, parser.parse, input)
+            # the AST records are translated at each commit
+            expected = []
+            parser = parser_class(grammar)
+            ast = Ast(parser)
+            ast.add_callback('R', callback)
+            ast.add_callback('N', callback)
+            self.assertTrue(parser.parse(input).success)
+            ast.translate(expected)
+            found = []
+            ast.translate_on_commit(found)
+            parser.check_interval = 10
+            parser.set_ast_record_limit(20)
+            self.assertTrue(parser.parse(input).success)
+            ast.translate(found)
+            self.assertEqual(found, expected)
+            # the open nodes see the phrase matched so far
+            ast.add_callback('S', callback)
+            found = []
+            ast.translate_on_commit(found)
+            self.assertTrue(parser.parse(input).success)
+            ast.translate(found)
+            self.assertEqual(found[0], (id.SEM_PRE, tuple(b'abc=abc;')))
+            self.assertEqual(found[1:-1], expected)
+            self.assertEqual(found[-1], (id.SEM_POST, tuple(input.encode())))
+            # a node skipped by its callback function
+            ast.add_callback('S', name_callback)
+            found = []
+            ast.translate_on_commit(found)
+            self.assertTrue(parser.parse(input).success)
+            ast.translate(found)
+            self.assertEqual(found, [('s', id.SEM_PRE),
+                                     ('s', id.SEM_POST)])
+
+    def test_cut_5(self):
+        '''Test that a committed ALT frees the stream buffer.'''
+        api = Api()
+        source = 'S = "<" ~ *%d97 ">" / "<" *%d97 "]"\n'
+        for (source, trimmed) in [(source, True),
+                                  (source.replace('~', ''), False)]:
+            parser = StackParser(api.generate(source))
+            stream = parser.stream()
+            stream.trim_size = 8
+            stream.feed('<')
+            longest = 0
+            for i in range(100):
+                stream.feed('aaaaaaaaaa')
+                longest = max(longest, len(stream.buffer))
+            stream.feed('>')
+            result = stream.finish()
+            self.assertTrue(result.success)
+            self.assertEqual(result.phrase_length, 1002)
+            self.assertEqual(longest < 40, trimmed)
+
+    def test_cut_6(self):
+        '''Test the strict ABNF error, the trace and the statistics.'''
+        api = Api()
+        api.generate('S = "a" ~ "b"\r\n', strict=True)
+        self.assertTrue(api.errors)
+        self.assertTrue('~ operator' in api.display_errors())
+        grammar = api.generate('S = *(R ~)\nR = "a" ~ "b" / "c"\n')
+        parser = Parser(grammar)
+        trace = Trace(parser)
+        trace.file = io.StringIO()
+        stats = Stats(parser)
+        self.assertFalse(parser.parse('abcax').success)
+        self.assertTrue('CUT' in trace.file.getvalue())
+        self.assertEqual(stats.stats[id.CUT][id.EMPTY], 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import unittest
+from apg_py.lib import utilities as utils
+from apg_py.lib.parser import Parser
+from apg_py.lib.stack_parser import StackParser
+from apg_py.lib.stats import Stats
+from apg_py.lib.dfa import Dfa, program, grammar_dfa
+from apg_py.api.api import Api
+from apg_py.exp.exp import ApgExp
+
+GRAMMAR = '''S = 1*(("ab" / "a") "c" / %s"ba" / 2*3R) [T] 0*1(U / "a")
+R = "x" / %d48-57 / "y" "z"
+T = 1*(%d1000000-1000010 / %d2000000) "." 1*2%d1000000
+U = *("a" / "b" "a") ("b" / "c")
+'''
+
+
+def parse(parser_class, grammar, input, start_rule=None, stats=False):
+    parser = parser_class(grammar)
+    if(stats):
+        # turns off the regular rules fast path
+        Stats(parser)
+    return parser.parse(input, start_rule=start_rule)
+
+
+class TestDfa(unittest.TestCase):
+    """Test the DFA for regular rules."""
+
+    def test_dfa_1(self):
+        '''Test the matches of the DFA.'''
+        api = Api()
+        grammar = api.generate(GRAMMAR)
+        rules = grammar.compiled_rules
+        for (index, input, end) in [
+                (0, 'abcacBAab', 9),
+                (0, 'xz', -1),
+                (0, 'x9yz1', 4),
+                (0, 'ac9yzxyzxba', 11),
+                (3, 'ababc', 4),
+                (3, 'abab', 4),
+                (3, 'abaab', 5),
+                (3, 'aa', -1),
+                (3, 'c', 1)]:
+            dfa = Dfa(program(rules, index))
+            self.assertEqual(dfa.match(
+                utils.string_to_tuple(input), 0, len(input)), end)
+        dfa = grammar_dfa(grammar, rules, 3)
+        self.assertTrue(dfa is grammar_dfa(grammar, rules, 3))
+        self.assertEqual(len(dfa.table), dfa.states * dfa.classes)
+        self.assertEqual(dfa.search(
+            utils.string_to_tuple('xxbaabc'), 0, 7), (2, 4))
+        self.assertEqual(dfa.search(
+            utils.string_to_tuple('xxbaa'), 0, 5), None)
+        # not regular
+        grammar = api.generate('S = A &"x"\nA = "(" [A] ")"\n')
+        rules = grammar.compiled_rules
+        self.assertEqual(grammar_dfa(grammar, rules, 0), None)
+        self.assertEqual(grammar_dfa(grammar, rules, 1), None)
+        self.assertEqual(program(rules, 0), None)
+
+    def test_dfa_2(self):
+        '''Test that the parser results are unchanged
+        for inputs with large character codes.'''
+        api = Api()
+        grammar = api.generate(GRAMMAR)
+        inputs = [(97, 98, 99, 1000000, 46, 1000000, 1000000, 97),
+                  (97, 99, 2000000, 1000010, 46, 1000000, 98, 99),
+                  (120, 2000000, 46, 98),
+                  (120, 121, 122, 2000000, 46, 1000000, 1000000, 1000000),
+                  (97, 99, 0x7fffffff)]
+        for input in inputs:
+            for parser_class in [Parser, StackParser]:
+                for start_rule in ['S', 'T', 'U']:
+                    found = parse(parser_class, grammar, input, start_rule)
+                    expected = parse(parser_class, grammar, input,
+                                     start_rule, stats=True)
+                    self.assertEqual(found.state, expected.state)
+                    self.assertEqual(found.phrase_length,
+                                     expected.phrase_length)
+                    self.assertTrue(found.node_hits <= expected.node_hits)
+
+    def test_dfa_3(self):
+        '''Test the ApgExp patterns matched by the DFA.'''
+        exp = ApgExp('word = 1*%d97-122 *("-" 1*%d97-122)\n', 'g')
+        input = 'one, two-three; 4 five-'
+        # the parser's statistics, without the DFA
+        # or the regular expressions
+        result = exp.exec(input)
+        self.assertTrue(result.node_hits > 1)
+        self.assertTrue(result.max_tree_depth > 1)
+        self.assertEqual(result.match, 'one')
+        exp.last_index = 0
+        exp.use_dfa = True
+        words = []
+        result = exp.exec(input)
+        while(result):
+            self.assertEqual(result.node_hits, None)
+            self.assertEqual(result.max_tree_depth, None)
+            words.append(result.match)
+            result = exp.exec(input)
+        self.assertEqual(words, ['one', 'two-three', 'five'])
+        exp = ApgExp('sep = 1*%d48-57\n')
+        exp.use_dfa = True
+        self.assertEqual(exp.split('a1b22c'), ['a', 'b', 'c'])
+        self.assertEqual(exp.replace('a1b22c', '#'), 'a#b22c')
+        self.assertTrue(exp.test('ab3'))
+        self.assertFalse(exp.test('abc'))
+        # the parser is used when the rule phrases are needed
+        exp = ApgExp('word = 1*%d97-122 *("-" 1*%d97-122)\n')
+        exp.use_dfa = True
+        exp.include(['word'])
+        result = exp.exec(input)
+        self.assertTrue(result.node_hits > 0)
+        self.assertEqual(result.match, 'one')
+        self.assertEqual(exp.rules['word'], [utils.string_to_tuple('one')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+from apg_py.lib import identifiers as id
+from apg_py.lib import utilities as utils
+from apg_py.lib.parser import Parser
+from apg_py.lib.stack_parser import StackParser
+from apg_py.lib.memo import Memo
+from apg_py.api import sabnf_grammar
+from tests.grammars import abnf
+from tests.grammars import anbncn
+from tests.grammars import float_bka_rep
+from tests.grammars import recursive_html
+from tests.grammars import universal_html
+
+
+def parse(parser_class, grammar, input, sub_begin, instrumented, memo):
+    parser = parser_class(grammar)
+    parser.regular_rules = False
+    if(instrumented):
+        # an unreachable limit selects the instrumented node loop
+        parser.set_node_hit_limit(id.MAX_INT - 1)
+    if(memo):
+        Memo(parser)
+    return parser.parse(utils.string_to_tuple(input), sub_begin=sub_begin)
+
+
+class TestDispatch(unittest.TestCase):
+    """Test the node loop without trace, statistics or limits."""
+
+    def test_dispatch_1(self):
+        '''Test that the results are unchanged.'''
+        html = '<html><div></div><p><a></a></p></html>'
+        for (grammar, input, sub_begin) in [
+                (abnf, '{' * 50, 0),
+                (abnf, 'CX', 0),
+                (anbncn, 'aaabbbcc', 0),
+                (float_bka_rep, '---ABCabcABC+12.34E+10', 12),
+                (recursive_html, html, 0),
+                (universal_html, '<html><div></div></div>', 0),
+                (sabnf_grammar, 'rule = "a" / "b"\nbad', 0)]:
+            for parser_class in [Parser, StackParser]:
+                for memo in [False, True]:
+                    expected = parse(parser_class, grammar, input,
+                                     sub_begin, True, memo)
+                    found = parse(parser_class, grammar, input,
+                                  sub_begin, False, memo)
+                    self.assertEqual(str(found), str(expected))
+                    self.assertEqual(found.max_phrase_length,
+                                     expected.max_phrase_length)
+                    self.assertEqual(found.node_hits, expected.node_hits)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,163 @@
+import unittest
+import importlib.util
+import os
+import tempfile
+from apg_py.lib import identifiers as id
+from apg_py.lib import utilities as utils
+from apg_py.lib.parser import Parser
+from apg_py.lib.stack_parser import StackParser
+from apg_py.lib.ast import Ast
+from apg_py.lib.stats import Stats
+from apg_py.api.api import Api
+from apg_py.api import sabnf_grammar
+
+
+def load_grammar(fname, name, text=None):
+    '''Import a grammar file, rewritten with text if not None.'''
+    if(text is not None):
+        with open(fname, 'w') as file:
+            file.write(text)
+    spec = importlib.util.spec_from_file_location(name, fname)
+    grammar = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(grammar)
+    return grammar
+
+
+def ast_callback(state, input, index, length, data):
+    data.append((state, index, length))
+    return id.SEM_OK
+
+
+def run(parser_class, grammar, input, stats=False):
+    '''Parse with the AST attached and collect the results.'''
+    parser = parser_class(grammar)
+    if(stats):
+        Stats(parser)
+    ast = Ast(parser)
+    for name in ast.nodes:
+        ast.add_callback(name, ast_callback)
+    result = parser.parse(utils.string_to_tuple(input))
+    data = []
+    ast.translate(data)
+    return (result, data)
+
+
+class TestFirstChars(unittest.TestCase):
+    """Test the first character sets and the ALT lookup tables."""
+
+    def test_first_chars_1(self):
+        '''Test the first character sets.'''
+        api = Api()
+        grammar = api.generate(
+            'S = "ab" / %s"Cd" / %d48-57 / A / [B] "x"\n'
+            'A = %d0-1000 / &"y" "q"\n'
+            'B = "z" B / ""\n')
+        self.assertTrue(api.first_chars is grammar.first_chars)
+        (first, empty) = grammar.first_chars[0][0]
+        self.assertEqual(first, None)
+        self.assertFalse(empty)
+        s = grammar.first_chars[0]
+        ops = grammar.rules[0]['opcodes']
+        alt = ops[0]['children']
+        self.assertEqual(s[alt[0]], (frozenset((97, 65)), False))
+        self.assertEqual(s[alt[1]], (frozenset((67,)), False))
+        self.assertEqual(s[alt[2]], (frozenset(range(48, 58)), False))
+        self.assertEqual(s[alt[3]], (None, False))
+        self.assertEqual(s[alt[4]], (frozenset((122, 120, 90, 88)), False))
+        a = grammar.first_chars[1]
+        self.assertEqual(a[0], (None, False))
+        self.assertEqual(a[1], (None, False))
+        self.assertEqual(a[2], (frozenset((113, 81)), False))
+        self.assertEqual(a[3], (frozenset(), True))
+        self.assertEqual(grammar.first_chars[2][0],
+                         (frozenset((122, 90)), True))
+
+    def test_first_chars_2(self):
+        '''Test the ALT lookup tables.'''
+        api = Api()
+        grammar = api.generate('S = "a" / "b" / "c" / D\nD = *"d"\n')
+        op = grammar.compiled_rules[0]['opcodes'][0]
+        self.assertEqual(op.alt_table[ord('b')], (2, 4))
+        self.assertEqual(op.alt_table[ord('B')], (2, 4))
+        self.assertEqual(op.alt_default, (4,))
+        # children that can begin with any character or are empty
+        # are never skipped
+        grammar = api.generate('S = %d0-1000 / *"a"\n')
+        op = grammar.compiled_rules[0]['opcodes'][0]
+        self.assertEqual(op.alt_table, None)
+        # grammar files written without the first character sets
+        # and phrase lengths
+        grammar = api.generate('S = "a" / "b"\n')
+        with tempfile.TemporaryDirectory() as dir:
+            fname = os.path.join(dir, 'old_grammar.py')
+            api.write_grammar(fname)
+            with open(fname) as file:
+                text = file.read()
+            text = text.replace('first_chars = ', 'old_first_chars = ')
+            text = text.replace('phrase_lengths = ', 'old_lengths = ')
+            old = load_grammar(fname, 'old_grammar', text)
+        op = Parser(old).rules[0]['opcodes'][0]
+        self.assertEqual(op.alt_table, None)
+        self.assertEqual(op.min_length, None)
+
+    def test_first_chars_3(self):
+        '''Test that skipping the ALT children does not change the parse.'''
+        api = Api()
+        grammar = api.generate(sabnf_grammar.to_string())
+        for input in [sabnf_grammar.to_string(),
+                      sabnf_grammar.to_string()[:-20],
+                      'S = "a" / %d49 / (B [C] / *D)\n']:
+            for parser_class in [Parser, StackParser]:
+                (result, data) = run(parser_class, grammar, input)
+                (expected, expected_data) = run(
+                    parser_class, grammar, input, True)
+                self.assertEqual(result.success, expected.success)
+                self.assertEqual(result.state, expected.state)
+                self.assertEqual(result.phrase_length,
+                                 expected.phrase_length)
+                self.assertEqual(result.max_phrase_length,
+                                 expected.max_phrase_length)
+                self.assertEqual(data, expected_data)
+                if(result.success):
+                    self.assertTrue(result.node_hits < expected.node_hits)
+                else:
+                    # parsed again without pruning (see Parser.repeat())
+                    self.assertEqual(result.node_hits, expected.node_hits)
+
+    def test_first_chars_4(self):
+        '''Test skipping all ALT children, at and before the end of input.'''
+        api = Api()
+        grammar = api.generate('S = 1*("a" / "b") [("c" / "d")]\n')
+        for parser_class in [Parser, StackParser]:
+            parser = parser_class(grammar)
+            for input in ['ab', 'abx', 'abc', 'x', '']:
+                result = parser.parse(utils.string_to_tuple(input))
+                self.assertEqual(result.success, input in ['ab', 'abc'])
+
+    def test_first_chars_5(self):
+        '''Test that the grammar files keep the first character sets
+        and phrase lengths.'''
+        api = Api()
+        generated = api.generate(sabnf_grammar.to_string())
+        with tempfile.TemporaryDirectory() as dir:
+            fname = os.path.join(dir, 'written_grammar.py')
+            api.write_grammar(fname)
+            written = load_grammar(fname, 'written_grammar')
+        self.assertEqual(written.first_chars, generated.first_chars)
+        self.assertEqual(written.phrase_lengths, generated.phrase_lengths)
+        for grammar in (written, sabnf_grammar):
+            rules = Parser(grammar).rules
+            tables = 0
+            for (rule, expected) in zip(rules, generated.compiled_rules):
+                for (op, op_expected) in zip(rule['opcodes'],
+                                             expected['opcodes']):
+                    self.assertEqual(op.alt_table, op_expected.alt_table)
+                    self.assertEqual(op.min_length, op_expected.min_length)
+                    self.assertEqual(op.max_length, op_expected.max_length)
+                    if(op.alt_table):
+                        tables += 1
+            self.assertTrue(tables > 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
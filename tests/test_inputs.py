@@ -0,0 +1,116 @@
+import unittest
+import array
+import mmap
+import tempfile
+from apg_py.lib import identifiers as id
+from apg_py.lib import utilities as utils
+from apg_py.lib.parser import Parser
+from apg_py.lib.stack_parser import StackParser
+from apg_py.lib.compiled_parser import CompiledParser
+from apg_py.lib.ast import Ast
+from apg_py.api.api import Api
+from apg_py.exp.exp import ApgExp
+from tests.grammars import recursive_html
+
+GRAMMAR = '''S = *(W / N / P)
+W = 1*%d97-122 ["-" 1*(%d97-122 / %d960-969)]
+N = 1*%d48-57 !"x" / %d1000000
+P = %d32 / "." / %d960-969
+'''
+
+
+def outcome(result):
+    # the regular rules are matched by regular expressions or DFAs,
+    # depending on the input type, the node hits
+    # and the maximum phrase length may differ
+    return (result.success, result.state, result.phrase_length,
+            result.input_length, result.sub_end)
+
+
+def parse(parser_class, grammar, input, sub_begin=0, sub_length=0):
+    '''Parse and collect the result and the AST phrases.'''
+    parser = parser_class(grammar)
+    ast = Ast(parser)
+    phrases = []
+
+    def callback(state, input, index, length, data):
+        if(state == id.SEM_POST):
+            data.append(tuple(input[index:index + length]))
+        return id.SEM_OK
+    for name in ast.nodes:
+        ast.add_callback(name, callback)
+    result = parser.parse(input, sub_begin=sub_begin, sub_length=sub_length)
+    ast.translate(phrases)
+    # and again without the AST
+    parser.ast = None
+    plain = parser.parse(input, sub_begin=sub_begin, sub_length=sub_length)
+    return (outcome(result), phrases, outcome(plain))
+
+
+class TestInputs(unittest.TestCase):
+    """Test the input string types."""
+
+    def test_inputs_1(self):
+        '''Test that the results are the same for all input types.'''
+        api = Api()
+        grammar = api.generate(GRAMMAR)
+        for string in ['abc 12.x-yz', 'ab-πρ 7', '12x']:
+            codes = utils.string_to_tuple(string)
+            inputs = [list(codes), string, utils.string_to_codes(string),
+                      array.array('I', codes)]
+            if(max(codes) < 256):
+                inputs += [bytes(codes), bytearray(codes),
+                           memoryview(bytes(codes)), array.array('B', codes)]
+            for parser_class in [Parser, StackParser, CompiledParser]:
+                for (sub_begin, sub_length) in [(0, 0), (1, 5)]:
+                    expected = parse(parser_class, grammar, codes,
+                                     sub_begin, sub_length)
+                    for input in inputs:
+                        self.assertEqual(
+                            parse(parser_class, grammar, input,
+                                  sub_begin, sub_length), expected)
+
+    def test_inputs_2(self):
+        '''Test back referencing and the memory mapped files.'''
+        html = b'<html><div></div><p><a></a></p></html>'
+        expected = outcome(Parser(recursive_html).parse(tuple(html)))
+        with tempfile.TemporaryFile() as file:
+            file.write(html)
+            file.flush()
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as map:
+                for parser_class in [Parser, StackParser, CompiledParser]:
+                    parser = parser_class(recursive_html)
+                    self.assertEqual(outcome(parser.parse(map)), expected)
+                    result = parser.parse(map, sub_begin=6, sub_length=11)
+                    self.assertTrue(result.success)
+                result = Parser(recursive_html).parse(html.decode())
+                self.assertEqual(outcome(result), expected)
+
+    def test_inputs_3(self):
+        '''Test the character codes of a string.'''
+        self.assertEqual(utils.string_to_codes('ab\xff'), b'ab\xff')
+        codes = utils.string_to_codes('aπ\U0010ffff\ud800')
+        self.assertEqual(tuple(codes), (97, 960, 0x10ffff, 0xd800))
+        self.assertEqual(codes[1], 960)
+        exp = ApgExp('word = 1*(%d97-122 / %d960-969)\n', 'g')
+        exp.include(['word'])
+        result = exp.exec('12 πab')
+        self.assertEqual(result.match, 'πab')
+        self.assertEqual(exp.rules['word'], [(960, 97, 98)])
+        self.assertEqual(exp.split('a1πb2'), ['1', '2'])
+
+    def test_inputs_4(self):
+        '''Test that the input is kept after the parse only on request.'''
+        input = '<html><div></div></html>'
+        parser = Parser(recursive_html)
+        self.assertTrue(parser.parse(input).success)
+        self.assertEqual(parser.text_cache, (None, None, None, None))
+        for context in parser.contexts:
+            self.assertEqual((context.input, context.text), (None, None))
+        parser.keep_input = True
+        self.assertTrue(parser.parse(input).success)
+        self.assertTrue(parser.text_cache[0] is input)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+import unittest
+import time
+from apg_py.lib import identifiers as id
+from apg_py.lib import utilities as utils
+from apg_py.lib.parser import Parser, LimitExceeded
+from apg_py.lib.stack_parser import StackParser
+from apg_py.lib.compiled_parser import CompiledParser
+from apg_py.lib.ast import Ast
+from apg_py.exp.exp import ApgExp
+from apg_py.api.api import Api
+from tests.grammars import recursive_html
+
+PARSERS = [Parser, StackParser, CompiledParser]
+
+
+def callback(state, input, index, length, data):
+    return id.SEM_OK
+
+
+def udtSlow(cbData):
+    # matches the empty string, slowly
+    time.sleep(0.001)
+    cbData['state'] = id.EMPTY
+    cbData['phrase_length'] = 0
+
+
+class TestLimits(unittest.TestCase):
+    """Test the parse limits and the LimitExceeded exception."""
+
+    def test_limits_1(self):
+        '''Test the tree depth and node hits limits.'''
+        api = Api()
+        grammar = api.generate('S = "(" [S] ")"\n')
+        input = utils.string_to_tuple('(' * 100 + ')' * 100)
+        for parser_class in PARSERS:
+            parser = parser_class(grammar)
+            parser.set_tree_depth_limit(50)
+            with self.assertRaises(LimitExceeded) as context:
+                parser.parse(input)
+            self.assertTrue('depth' in str(context.exception))
+            self.assertEqual(context.exception.max_tree_depth, 50)
+            parser.set_tree_depth_limit(id.MAX_INT)
+            parser.set_node_hit_limit(60)
+            with self.assertRaises(LimitExceeded) as context:
+                parser.parse(input, sub_begin=2)
+            self.assertTrue('node hits' in str(context.exception))
+            self.assertEqual(context.exception.node_hits, 60)
+            # the furthest position reached
+            self.assertEqual(context.exception.position, 17)
+            parser.set_node_hit_limit(id.MAX_INT)
+            self.assertTrue(parser.parse(input).success)
+
+    def test_limits_2(self):
+        '''Test the parse time limit.'''
+        api = Api()
+        grammar = api.generate('S = *(e_slow "a")\n')
+        input = 'a' * 1000
+        for parser_class in PARSERS:
+            parser = parser_class(grammar)
+            parser.add_callbacks({'e_slow': udtSlow})
+            parser.check_interval = 10
+            parser.set_time_limit(0.05)
+            start = time.monotonic()
+            with self.assertRaises(LimitExceeded) as context:
+                parser.parse(input)
+            self.assertTrue(time.monotonic() - start < 0.5)
+            self.assertTrue('time' in str(context.exception))
+            self.assertTrue(context.exception.node_hits < 1000)
+            self.assertTrue(context.exception.position > 0)
+            # the limit applies to each parse
+            self.assertTrue(parser.parse('a' * 5).success)
+            parser.set_time_limit(0)
+            self.assertTrue(parser.parse('a' * 100).success)
+
+    def test_limits_3(self):
+        '''Test the AST records limit.'''
+        api = Api()
+        grammar = api.generate('S = *A\nA = "a"\n')
+        input = 'a' * 100
+        for parser_class in PARSERS:
+            parser = parser_class(grammar)
+            ast = Ast(parser)
+            ast.add_callback('A', callback)
+            parser.check_interval = 10
+            parser.set_ast_record_limit(100)
+            with self.assertRaises(LimitExceeded) as context:
+                parser.parse(input)
+            self.assertTrue('AST' in str(context.exception))
+            parser.set_ast_record_limit(1000)
+            self.assertTrue(parser.parse(input).success)
+
+    def test_limits_4(self):
+        '''Test the back reference entries limit.'''
+        input = '<a>' * 30 + '</a>' * 30
+        for parser_class in PARSERS:
+            parser = parser_class(recursive_html)
+            self.assertTrue(parser.parse(input).success)
+            parser.check_interval = 10
+            parser.set_bkr_entry_limit(10)
+            with self.assertRaises(LimitExceeded) as context:
+                parser.parse(input)
+            self.assertTrue('back reference' in str(context.exception))
+            parser.set_bkr_entry_limit(id.MAX_INT)
+            self.assertTrue(parser.parse(input).success)
+
+    def test_limits_5(self):
+        '''Test the ApgExp limits.'''
+        exp = ApgExp('S = "(" [S] ")"\n')
+        input = 'x' + '(' * 100 + ')' * 100
+        self.assertEqual(exp.exec(input).index, 1)
+        exp.set_tree_depth(50)
+        self.assertRaises(LimitExceeded, exp.exec, input)
+        exp.set_tree_depth(0)
+        exp.set_node_hits(60)
+        self.assertRaises(LimitExceeded, exp.test, input)
+        exp.set_node_hits(0)
+        self.assertTrue(exp.test(input))
+        # the time limit applies to the exec() call as a whole
+        exp = ApgExp('S = e_slow "a"\n')
+        exp.define_udts({'e_slow': udtSlow})
+        exp.set_parse_time(0.02)
+        input = 'b' * 1000
+        start = time.monotonic()
+        with self.assertRaises(LimitExceeded) as context:
+            exp.exec(input)
+        self.assertTrue(time.monotonic() - start < 0.5)
+        self.assertEqual(context.exception.node_hits, 4)
+        self.assertTrue(exp.test('bba'))
+        self.assertRaises(LimitExceeded, exp.split, input)
+        exp.set_parse_time(0)
+        self.assertEqual(exp.split('bab'), ['b', 'b'])
+
+    def test_limits_6(self):
+        '''Test that the ApgExp tree depth limit limits the tree depth,
+        not the node hits.'''
+        exp = ApgExp('S = 1*(A / B)\nA = "a"\nB = "b"\n')
+        input = 'ab' * 100
+        result = exp.exec(input)
+        self.assertTrue(result.node_hits > 100)
+        exp.set_tree_depth(result.max_tree_depth + 1)
+        self.assertEqual(exp.exec(input).match, input)
+        exp.set_tree_depth(result.max_tree_depth - 1)
+        with self.assertRaises(LimitExceeded) as context:
+            exp.exec(input)
+        self.assertTrue('tree depth' in str(context.exception))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+import io
+from contextlib import redirect_stdout
+from apg_py.lib import identifiers as id
+from apg_py.lib.parser import Parser
+from apg_py.lib.stack_parser import StackParser
+from apg_py.lib.compiled_parser import CompiledParser
+from apg_py.lib.stats import Stats
+from apg_py.api.api import Api
+
+PARSERS = [Parser, StackParser, CompiledParser]
+
+
+def rule_callback(cbData):
+    if(cbData['state'] == id.ACTIVE):
+        cbData['user_data'].append(cbData['phrase_index'])
+
+
+class TestLookCache(unittest.TestCase):
+    """Test the cache of the look around results."""
+
+    def test_look_cache_1(self):
+        '''Test that the cached results are reused.'''
+        api = Api()
+        grammar = api.generate('S = K "b" / K "c"\nK = !X "a"\nX = "q"\n'
+                               'T = &&K "b" / &&K "c"\n')
+        for parser_class in PARSERS:
+            parser = parser_class(grammar)
+            # execute the opcodes, not the regular expressions
+            parser.regular_rules = False
+            cached = parser.parse('ac')
+            self.assertTrue(cached.success)
+            parser.cache_lookaround = False
+            result = parser.parse('ac')
+            self.assertTrue(result.success)
+            self.assertTrue(cached.node_hits < result.node_hits)
+            # the rule callbacks see every node
+            parser.cache_lookaround = True
+            parser.add_callbacks({'X': rule_callback})
+            data = []
+            self.assertTrue(parser.parse('ac', user_data=data).success)
+            self.assertEqual(data, [0, 0])
+            parser.add_callbacks({'X': None})
+            # look behind
+            self.assertTrue(parser.parse('ac', 'T', 1, 1).success)
+
+    def test_look_cache_2(self):
+        '''Test a look around result that depends on
+        the back referenced phrases.'''
+        api = Api()
+        source = ('S = A "b-" L R / "a" A "-" L R\nL = &(\\A "!")\n'
+                  'A = "a" / "b"\nR = *%d33-126\n')
+        grammar = api.generate(source)
+        recursive = api.generate(source.replace('\\A', '\\%rA'))
+        for parser_class in PARSERS:
+            for g in (grammar, recursive):
+                parser = parser_class(g)
+                self.assertTrue(parser.parse('ab-b!').success)
+                self.assertTrue(parser.parse('ab-a!').success)
+                self.assertFalse(parser.parse('ab-c!').success)
+
+    def test_look_cache_3(self):
+        '''Test the statistics of the cache.'''
+        api = Api()
+        grammar = api.generate('S = K "b" / K "c"\nK = !X "a"\nX = "q"\n')
+        parser = StackParser(grammar)
+        parser.regular_rules = False
+        stats = Stats(parser)
+        self.assertTrue(parser.parse('ac').success)
+        self.assertEqual(stats.look_stats[id.NOT], [1, 1])
+        self.assertEqual(stats.look_rate(id.NOT), 0.5)
+        self.assertEqual(stats.look_rate(), 0.5)
+        self.assertEqual(stats.look_rate(id.AND), 0)
+        self.assertEqual(stats.stats[id.NOT][id.EMPTY], 2)
+        out = io.StringIO()
+        with redirect_stdout(out):
+            stats.display()
+        self.assertTrue('LOOK AROUND CACHE' in out.getvalue())
+        stats.clear()
+        parser.cache_lookaround = False
+        self.assertTrue(parser.parse('ac').success)
+        self.assertEqual(stats.look_stats[id.NOT], [0, 0])
+        self.assertEqual(stats.stats[id.NOT][id.EMPTY], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
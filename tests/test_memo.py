@@ -0,0 +1,185 @@
+import unittest
+from apg_py.lib import identifiers as id
+from apg_py.lib import utilities as utils
+from apg_py.lib.parser import Parser
+from apg_py.lib.stack_parser import StackParser
+from apg_py.lib.ast import Ast
+from apg_py.lib.memo import Memo
+from apg_py.api.api import Api
+from tests.grammars import anbncn
+from tests.grammars import recursive_html
+
+document = '''doc  = *line %$
+line = *item %d10
+item = %^ "#" *%d97-122 / word / num / %d32 / !"q" &&%d32 "."
+word = 1*%d97-122 ["-" 1*%d97-122] &(%d10 / %d32 / %$)
+num  = 1*%d48-57 ["." 1*%d48-57] / "-" num
+'''
+
+backtrack = '''S = A "x" / A "y" / A "z"
+A = B "+" A / B "-" A / B
+B = "(" A ")" / 1*%d48-57
+'''
+
+
+def callback(state, input, index, length, data):
+    if(state == id.SEM_PRE):
+        data.append(('pre', index, length))
+    else:
+        data.append(('post', index, length))
+    return id.SEM_OK
+
+
+def translate(grammar, input, memo=True):
+    parser = Parser(grammar)
+    if(memo):
+        Memo(parser)
+    ast = Ast(parser)
+    ast.add_callback('a', callback)
+    ast.add_callback('b', callback)
+    result = parser.parse(utils.string_to_tuple(input))
+    data = []
+    ast.translate(data)
+    return (result, data)
+
+
+class TestMemo(unittest.TestCase):
+    """Test packrat memoization."""
+
+    def test_memo_1(self):
+        '''Test that memoization saves node hits and keeps the results.'''
+        api = Api()
+        grammar = api.generate(backtrack)
+        input = '((1+2)-(3+(4-5)))z'
+        plain = translate(grammar, input, memo=False)
+        memo = translate(grammar, input)
+        self.assertTrue(plain[0].success)
+        self.assertTrue(memo[0].success)
+        self.assertEqual(plain[0].phrase_length, memo[0].phrase_length)
+        self.assertEqual(plain[0].max_phrase_length,
+                         memo[0].max_phrase_length)
+        self.assertEqual(plain[1], memo[1])
+        self.assertTrue(memo[0].memo_hits > 0)
+        self.assertTrue(memo[0].node_hits < plain[0].node_hits)
+        self.assertEqual(plain[0].memo_hits, 0)
+        self.assertEqual(plain[0].memo_misses, 0)
+
+    def test_memo_2(self):
+        '''Test failed parses are unchanged by memoization.'''
+        api = Api()
+        grammar = api.generate(backtrack)
+        input = '((1+2)-(3+(4-5))w'
+        plain = translate(grammar, input, memo=False)
+        memo = translate(grammar, input)
+        self.assertFalse(plain[0].success)
+        self.assertFalse(memo[0].success)
+        self.assertEqual(plain[0].max_phrase_length,
+                         memo[0].max_phrase_length)
+
+    def test_memo_3(self):
+        '''Test the LRU eviction with a small memo table.'''
+        api = Api()
+        grammar = api.generate(backtrack)
+        input = '((1+2)-(3+(4-5)))z'
+        parser = Parser(grammar)
+        memo = Memo(parser, max_size=4)
+        result = parser.parse(utils.string_to_tuple(input))
+        self.assertTrue(result.success)
+        self.assertTrue(memo.size <= 4)
+        self.assertTrue(memo.evictions > 0)
+
+    def test_memo_4(self):
+        '''Test per-rule opt-in and opt-out.'''
+        api = Api()
+        grammar = api.generate(backtrack)
+        input = '((1+2)-(3+(4-5)))z'
+        parser = Parser(grammar)
+        memo = Memo(parser)
+        memo.include(['B'])
+        result = parser.parse(utils.string_to_tuple(input))
+        self.assertTrue(result.success)
+        for key in memo.table:
+            self.assertEqual(key[0], parser.rule_indexes['b'])
+        memo.exclude(['a', 'b', 's'])
+        result = parser.parse(utils.string_to_tuple(input))
+        self.assertTrue(result.success)
+        self.assertEqual(result.memo_hits + result.memo_misses, 0)
+        self.assertRaises(Exception, memo.include, ['not_a_rule'])
+
+    def test_memo_5(self):
+        '''Test that back referencing rules are not memoized.'''
+        parser = Parser(recursive_html)
+        memo = Memo(parser)
+        self.assertFalse(memo.eligible[parser.rule_indexes['html']])
+        self.assertFalse(memo.eligible[parser.rule_indexes['tag-name']])
+        self.assertTrue(memo.eligible[parser.rule_indexes['alphanum']])
+        self.assertRaises(Exception, memo.include, ['html'])
+        input = '<html><div></div><p><a></a></p></html>'
+        result = parser.parse(utils.string_to_tuple(input))
+        self.assertTrue(result.success)
+
+    def test_memo_6(self):
+        '''Test memoization with look ahead.'''
+        parser = Parser(anbncn)
+        Memo(parser)
+        result = parser.parse(utils.string_to_tuple('aaabbbccc'))
+        self.assertTrue(result.success)
+        result = parser.parse(utils.string_to_tuple('aaabbbcc'))
+        self.assertFalse(result.success)
+
+    def test_memo_7(self):
+        '''Test the incremental re-parse after edits.'''
+        api = Api()
+        grammar = api.generate(document)
+        line = 'one two-three 12.5 -7 .\n'
+        edits = [(0, 0, '#x '), (0, 4, ''), (5, 3, 'a b'),
+                 (25, 1, '9'), (40, 0, '\n'), (66, 2, ''),
+                 (10, 30, 'q'), (0, 1, 'a')]
+        for parser_class in [Parser, StackParser]:
+            for input in ['#title\n' + line * 3, (line * 4).encode()]:
+                parser = parser_class(grammar)
+                Memo(parser, incremental=True)
+                ast = Ast(parser)
+                ast.add_callback('word', callback)
+                ast.add_callback('num', callback)
+                parser.parse(input)
+                hits = 0
+                for (offset, deleted, inserted) in edits:
+                    found = parser.reparse(offset, deleted, inserted)
+                    hits += found.memo_hits
+                    data = []
+                    ast.translate(data)
+                    # a full parse of the edited input string
+                    edited = parser.text if(
+                        isinstance(input, str)) else parser.input
+                    full = Parser(grammar)
+                    full_ast = Ast(full)
+                    full_ast.add_callback('word', callback)
+                    full_ast.add_callback('num', callback)
+                    expected = full.parse(edited)
+                    for name in ['success', 'state', 'phrase_length',
+                                 'input_length']:
+                        self.assertEqual(getattr(found, name),
+                                         getattr(expected, name))
+                    expected = []
+                    full_ast.translate(expected)
+                    self.assertEqual(data, expected)
+                self.assertTrue(hits > 0)
+        # a local edit re-parses little of a long input string
+        parser = Parser(grammar)
+        Memo(parser, incremental=True)
+        full = parser.parse(line * 100)
+        found = parser.reparse(1200, 3, 'xyz')
+        self.assertTrue(found.success)
+        self.assertTrue(found.node_hits * 10 < full.node_hits)
+        self.assertRaises(Exception, parser.reparse, 0, 5000, '')
+        parser = Parser(grammar)
+        self.assertRaises(Exception, parser.reparse, 0, 0, '')
+        Memo(parser, incremental=True)
+        self.assertRaises(Exception, parser.reparse, 0, 0, '')
+        parser.parse(line, sub_begin=1)
+        self.assertRaises(Exception, parser.reparse, 0, 0, '')
+
+
+if __name__ == '__main__':
+    unittest.main()
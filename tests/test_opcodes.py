@@ -0,0 +1,92 @@
+import unittest
+import pickle
+import sys
+from apg_py.lib import identifiers as id
+from apg_py.lib import utilities as utils
+from apg_py.lib.parser import Parser
+from apg_py.lib.opcodes import Opcode, compile_rules, compiled_rules
+from apg_py.api.api import Api
+from tests.grammars import recursive_html
+
+
+class TestOpcodes(unittest.TestCase):
+    """Test the compiled opcodes."""
+
+    def test_opcodes_1(self):
+        '''Test the opcode fields and the dictionary compatibility.'''
+        api = Api()
+        grammar = api.generate('S = "ab" / %s"ab" / %d48-57 1*2S\n')
+        # the grammar keeps only the compiled rules,
+        # the dictionary form is made from them
+        self.assertFalse('rules' in vars(grammar))
+        op = grammar.rules[0]['opcodes'][0]
+        self.assertTrue(isinstance(op, dict))
+        self.assertEqual(list(grammar.rules[0]['opcodes'][4]),
+                         ['type', 'min', 'max'])
+        op = grammar.compiled_rules[0]['opcodes'][0]
+        self.assertTrue(isinstance(op, Opcode))
+        self.assertEqual(op.type, id.ALT)
+        self.assertEqual(op['type'], id.ALT)
+        self.assertEqual(op.children, (1, 2, 3))
+        self.assertEqual(op.min, None)
+        self.assertRaises(KeyError, op.__getitem__, 'min')
+        self.assertRaises(KeyError, op.__getitem__, 'not_a_field')
+        self.assertEqual(op.to_dict(), grammar.rules[0]['opcodes'][0])
+
+    def test_opcodes_2(self):
+        '''Test that identical terminal strings and names are shared.'''
+        api = Api()
+        grammar = api.generate('S = "ab" A "ab"\nA = %s"ab" "ab"\n')
+        strings = []
+        for rule in grammar.compiled_rules:
+            for op in rule['opcodes']:
+                if(op.type == id.TLS or op.type == id.TBS):
+                    strings.append(op.string)
+        self.assertEqual(len(strings), 4)
+        for string in strings:
+            self.assertTrue(string is strings[0])
+        rules = compile_rules(recursive_html.rules)
+        for rule in rules:
+            for op in rule['opcodes']:
+                if(op.type == id.BKR):
+                    self.assertTrue(op.lower is sys.intern('tag-name'))
+
+    def test_opcodes_3(self):
+        '''Test that grammar files are compiled once and cached.'''
+        rules = compiled_rules(recursive_html)
+        self.assertTrue(rules is compiled_rules(recursive_html))
+        parser = Parser(recursive_html)
+        self.assertTrue(parser.rules is rules)
+        input = '<html><div></div><p><a></a></p></html>'
+        result = parser.parse(utils.string_to_tuple(input))
+        self.assertTrue(result.success)
+
+    def test_opcodes_4(self):
+        '''Test that each opcode type keeps only its own fields.'''
+        api = Api()
+        grammar = api.generate('S = "ab" / %d48-57 1*2S / (%d1-2 / "x")\n')
+        ops = grammar.compiled_rules[0]['opcodes']
+        sizes = {}
+        for op in ops:
+            self.assertTrue(isinstance(op, Opcode))
+            sizes[op.type] = sys.getsizeof(op)
+        # fewer slots than the ALT opcode
+        self.assertTrue(sizes[id.TRG] < sizes[id.ALT])
+        # the fields of the other types are None and cannot be set
+        op = ops[3]
+        self.assertEqual(op.type, id.TRG)
+        self.assertEqual(op.children, None)
+        self.assertEqual(op.alt_table, None)
+        with self.assertRaises(AttributeError):
+            op.children = (1, 2)
+        # copied to the parallel parser's workers
+        copied = pickle.loads(pickle.dumps(grammar.compiled_rules))
+        for (op, cpy) in zip(ops, copied[0]['opcodes']):
+            self.assertTrue(type(op) is type(cpy))
+            self.assertEqual(op.to_dict(), cpy.to_dict())
+            self.assertEqual(op.min_length, cpy.min_length)
+            self.assertEqual(op.bitmap, cpy.bitmap)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+from apg_py.lib import identifiers as id
+from apg_py.lib.parser import Parser
+from apg_py.lib.stack_parser import StackParser
+from apg_py.lib.ast import Ast
+from apg_py.lib.parallel_parser import ParallelParser
+from apg_py.api.api import Api
+from tests.grammars import float_udt
+from tests.test_stack_parser import udtSign, udtInteger
+
+
+def callback(state, input, index, length, data):
+    if(state == id.SEM_PRE):
+        data.append(tuple(input[index:index + length]))
+    return id.SEM_OK
+
+
+class TestParallel(unittest.TestCase):
+    """Test parsing in a pool of worker processes."""
+
+    def test_parallel_1(self):
+        '''Test the results of a grammar object.'''
+        api = Api()
+        grammar = api.generate('S = 1*(W / " ")\nW = 1*%d97-122\n')
+        inputs = ['one two', '', 'one 2', 'abc'] * 20
+        parser = Parser(grammar)
+        with ParallelParser(grammar, workers=2) as pp:
+            for start_rule in [None, 'W']:
+                found = pp.parse(inputs, start_rule)
+                expected = list(parser.parse_many(inputs, start_rule))
+                self.assertEqual(found, expected)
+            self.assertEqual(pp.parse([]), [])
+
+    def test_parallel_2(self):
+        '''Test a grammar module, UDTs and the AST data.'''
+        udts = {'e_sign': udtSign, 'u_integer': udtInteger}
+        inputs = ['+12.5E3', '-7', 'x', '1.5e-10'] * 10
+        parser = StackParser(float_udt)
+        parser.add_callbacks(udts)
+        ast = Ast(parser)
+        ast.add_callback('integer', callback)
+        expected = []
+        for result in parser.parse_many(inputs):
+            data = []
+            ast.translate(data)
+            expected.append((result, data))
+        with ParallelParser(float_udt, udts, {'integer': callback},
+                            workers=2, parser_class=StackParser) as pp:
+            self.assertEqual(pp.parse(iter(inputs)), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
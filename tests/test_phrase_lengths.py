@@ -0,0 +1,111 @@
+import unittest
+from apg_py.lib import identifiers as id
+from apg_py.lib import utilities as utils
+from apg_py.lib.parser import Parser
+from apg_py.lib.stack_parser import StackParser
+from apg_py.lib.compiled_parser import CompiledParser
+from apg_py.lib.stats import Stats
+from apg_py.api.api import Api
+
+INF = id.MAX_INT
+
+
+def parse(parser_class, grammar, input, sub_begin=0, stats=False):
+    parser = parser_class(grammar)
+    if(stats):
+        Stats(parser)
+    return parser.parse(utils.string_to_tuple(input), sub_begin=sub_begin)
+
+
+class TestPhraseLengths(unittest.TestCase):
+    """Test the phrase lengths and the fail-fast pruning."""
+
+    def test_phrase_lengths_1(self):
+        '''Test the minimum and maximum phrase lengths.'''
+        api = Api()
+        grammar = api.generate(
+            'S = "abc" / 2*3%d48-57 / A\n'
+            'A = "(" [A] ")" / %s"x" *"y"\n'
+            'B = 2*2("ab" / "c") &"q" !!"z"\n'
+            'C = B A B\n')
+        self.assertTrue(api.phrase_lengths is grammar.phrase_lengths)
+        lengths = grammar.phrase_lengths
+        self.assertEqual(lengths[0][0], (1, INF))
+        self.assertEqual(lengths[0][1], (3, 3))
+        self.assertEqual(lengths[0][2], (2, 3))
+        self.assertEqual(lengths[1][0], (1, INF))
+        self.assertEqual(lengths[2][0], (2, 4))
+        self.assertEqual(lengths[3][0], (5, INF))
+        op = grammar.compiled_rules[3]['opcodes'][0]
+        self.assertEqual((op.min_length, op.max_length), (5, INF))
+
+    def test_phrase_lengths_2(self):
+        '''Test that pruning does not change the parse.'''
+        api = Api()
+        grammar = api.generate(
+            'S = 1*(R / "x")\n'
+            'R = "abcd" / 3*3"z" / ("a" "b" "q") / !!"xx" "ab"\n')
+        for input in ['abcd', 'abcdab', 'xxab', 'xab', 'abq', 'zzabq',
+                      'zz', 'abc']:
+            for parser_class in [Parser, StackParser]:
+                found = parse(parser_class, grammar, input)
+                expected = parse(parser_class, grammar, input, stats=True)
+                self.assertEqual(found.success, expected.success)
+                self.assertEqual(found.state, expected.state)
+                self.assertEqual(found.phrase_length, expected.phrase_length)
+                self.assertTrue(found.node_hits <= expected.node_hits)
+
+    def test_phrase_lengths_3(self):
+        '''Test that nodes needing more characters than are left fail.'''
+        api = Api()
+        grammar = api.generate('S = *("a" A) "a"\nA = "bc" / "b"\n')
+        for parser_class in [Parser, StackParser]:
+            found = parse(parser_class, grammar, 'abcaba')
+            expected = parse(parser_class, grammar, 'abcaba', stats=True)
+            self.assertTrue(found.success)
+            self.assertTrue(found.node_hits < expected.node_hits)
+        # look behind near the beginning of the input
+        grammar = api.generate('S = &&"xyz" "a" / !!"xyz" "b"\n')
+        for parser_class in [Parser, StackParser]:
+            for (input, sub_begin, success) in [
+                    ('xyza', 3, True), ('xya', 2, False),
+                    ('xyb', 2, True), ('xyzb', 3, False)]:
+                found = parse(parser_class, grammar, input, sub_begin)
+                self.assertEqual(found.success, success)
+
+    def test_phrase_lengths_4(self):
+        '''Test that a pruned parse finds the error position
+        of the unpruned parse.'''
+        api = Api()
+        grammar = api.generate('s = "ab" "cd" / "x"\n')
+        for parser_class in [Parser, StackParser, CompiledParser]:
+            for stats in [False, True]:
+                found = parse(parser_class, grammar, 'abc', stats=stats)
+                self.assertFalse(found.success)
+                self.assertEqual(found.max_phrase_length, 2)
+            parser = parser_class(grammar)
+            results = parser.parse_many(['abc', 'abcd', 'abx'])
+            self.assertEqual([result.max_phrase_length
+                              for result in results], [2, 4, 2])
+        stream = StackParser(grammar).stream()
+        stream.feed('abc')
+        self.assertEqual(stream.finish().max_phrase_length, 2)
+
+    def test_phrase_lengths_5(self):
+        '''Test that the UDTs and back references in look behind mode
+        raise an exception, also where they would be pruned.'''
+        api = Api()
+        grammars = [api.generate('S = &&u_x "a"\n'),
+                    api.generate('S = &&("ab" u_x) "a"\n'),
+                    api.generate('S = !!(A \\A) "a"\nA = "b"\n')]
+        for grammar in grammars:
+            for parser_class in [Parser, StackParser, CompiledParser]:
+                parser = parser_class(grammar)
+                if(grammar.udts):
+                    parser.add_callbacks({'u_x': lambda cbData: None})
+                self.assertRaises(Exception, parser.parse, 'xa',
+                                  sub_begin=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,163 @@
+import unittest
+import sys
+from apg_py.lib import identifiers as id
+from apg_py.lib import utilities as utils
+from apg_py.lib.parser import Parser
+from apg_py.lib.stack_parser import StackParser
+from apg_py.lib.compiled_parser import CompiledParser
+from apg_py.lib.ast import Ast
+from apg_py.lib.stats import Stats
+from apg_py.lib.regex_rules import regex_rules
+from apg_py.api.api import Api
+
+GRAMMAR = '''S = *(W / N / P / Q) [E]
+W = 1*%d97-122 ["-" 1*%d97-122]
+N = ["+" / "-"] 1*%d48-57 ["." *%d48-57] / "0x" 1*(%d48-57 / "a" / "b")
+P = %d32 / %d10 / "." / "--" / "ab" "c" / &"x" "x" / !"y" %d40-41
+Q = 2*3("z" / "zz" Z) ("q" / "")
+Z = "" / "zz"
+E = %^ "!" / "?"
+'''
+
+
+def parse(parser_class, grammar, input, start_rule=None, stats=False):
+    parser = parser_class(grammar)
+    if(stats):
+        Stats(parser)
+    return parser.parse(utils.string_to_tuple(input), start_rule=start_rule)
+
+
+@unittest.skipIf(sys.version_info < (3, 11),
+                 'requires atomic groups and possessive quantifiers')
+class TestRegexRules(unittest.TestCase):
+    """Test lowering the regular rules to regular expressions."""
+
+    def test_regex_rules_1(self):
+        '''Test which rules are regular.'''
+        api = Api()
+        grammar = api.generate(
+            'S = A B / C\n'
+            'A = "a" *("b" / %d48-57) !"c"\n'
+            'B = "(" [B] ")"\n'
+            'C = A %$ / D\n'
+            'D = &&"x" "y" / *[A]\n'
+            'E = A "=" A\n')
+        found = regex_rules(grammar.compiled_rules)
+        self.assertEqual([entry is not None for entry in found],
+                         [False, True, False, False, False, True])
+        (pattern, state, refers_to) = found[5]
+        self.assertEqual(state, id.MATCH)
+        self.assertEqual(refers_to, frozenset((1, 5)))
+        self.assertTrue(pattern.match('Ab9b=a') is not None)
+        self.assertTrue(pattern.match('Ab9c=a') is None)
+        self.assertEqual(found[1][1], id.MATCH)
+
+    def test_regex_rules_2(self):
+        '''Test that the results are unchanged.'''
+        api = Api()
+        grammar = api.generate(GRAMMAR)
+        found = regex_rules(grammar.compiled_rules)
+        self.assertTrue(all(found))
+        for input in ['', 'abc-def 12.5\n', '0xab1 (x)', '0x', 'zzzzq',
+                      'zzzzzzzq', 'zq', '!', 'a?', 'a!', 'abc--x..y',
+                      '-.5', '+1.']:
+            for parser_class in [Parser, StackParser]:
+                for start_rule in ['S', 'N', 'P', 'Q', 'Z', 'E']:
+                    found = parse(parser_class, grammar, input, start_rule)
+                    expected = parse(parser_class, grammar, input,
+                                     start_rule, stats=True)
+                    self.assertEqual(found.state, expected.state)
+                    self.assertEqual(found.phrase_length,
+                                     expected.phrase_length)
+                    self.assertTrue(found.node_hits <= expected.node_hits)
+
+    def test_regex_rules_3(self):
+        '''Test the fall back to the opcodes when the rule,
+        or a rule it refers to, is observed.'''
+        api = Api()
+        grammar = api.generate(GRAMMAR)
+        input = utils.string_to_tuple('abc 12 xyz')
+        for parser_class in [Parser, StackParser]:
+            parser = parser_class(grammar)
+            self.assertEqual(parser.parse(input).node_hits, 1)
+            phrases = []
+
+            def callback(data):
+                if(data['state'] == id.MATCH):
+                    phrases.append(data['phrase_length'])
+            parser.add_callbacks({'n': callback})
+            result = parser.parse(input)
+            self.assertTrue(result.success)
+            self.assertEqual(phrases, [2])
+            parser.add_callbacks({'n': None})
+            self.assertEqual(parser.parse(input).node_hits, 1)
+            ast = Ast(parser)
+            ast.add_callback('w', lambda *args: id.SEM_OK)
+            self.assertTrue(parser.parse(input).success)
+            self.assertEqual(len(ast.records), 4)
+
+    def test_regex_rules_4(self):
+        '''Test the inputs that have no str view and look behind.'''
+        api = Api()
+        grammar = api.generate(
+            'S = A &&A %d10\n'
+            'A = 1*%d1000000-1114112\n')
+        for parser_class in [Parser, StackParser]:
+            parser = parser_class(grammar)
+            result = parser.parse((1000000, 1114111, 10))
+            self.assertTrue(result.success)
+            result = parser.parse((1000000, 1114112, 10))
+            self.assertTrue(result.success)
+            self.assertEqual(result.phrase_length, 3)
+
+    def test_regex_rules_5(self):
+        '''Test that a failed regular expression match still finds
+        the furthest position reached, the error position.'''
+        api = Api()
+        grammar = api.generate('S = 1*(A / B) "!"\nA = "abc" "d"\n'
+                               'B = "x"\n')
+        for parser_class in [Parser, StackParser]:
+            for regular_rules in [True, False]:
+                parser = parser_class(grammar)
+                parser.regular_rules = regular_rules
+                for input in ['abcdxabcq', b'abcdxabcq']:
+                    result = parser.parse(input)
+                    self.assertFalse(result.success)
+                    self.assertEqual(result.max_phrase_length, 8)
+
+    def test_regex_rules_6(self):
+        '''Test that the error position, max_phrase_length, of a failed
+        parse is that of the opcodes, also after a regular rule that
+        matched a shorter phrase than it tried.'''
+        api = Api()
+        tests = [('file = *line\nline = *%d97-122 %d10\n',
+                  ['abc\nde\nfgh', 'abc\nde\n', 'ab1']),
+                 ('S = 1*(A / B) "!"\nA = "abc" "d"\nB = "x"\n',
+                  ['abcdxabcq', 'abcdx!', 'xabcdabc'])]
+        for (source, inputs) in tests:
+            grammar = api.generate(source)
+            expected = Parser(grammar)
+            expected.regular_rules = False
+            for parser_class in [Parser, StackParser, CompiledParser]:
+                for callback in [None, lambda cbData: None]:
+                    parser = parser_class(grammar)
+                    parser.add_callbacks(
+                        {grammar.rules[0]['name']: callback})
+                    batch = parser.parse_many(inputs)
+                    for (input, many) in zip(inputs, batch):
+                        result = parser.parse(input)
+                        opcodes = expected.parse(input)
+                        self.assertEqual(result.success, opcodes.success)
+                        if(not result.success):
+                            self.assertEqual(result.max_phrase_length,
+                                             opcodes.max_phrase_length,
+                                             (parser_class, input))
+                            self.assertEqual(many.max_phrase_length,
+                                             opcodes.max_phrase_length)
+        # the error position of a grammar syntax error
+        api.generate('s = a / \n')
+        self.assertEqual(api.errors[0]['index'], 9)
+
+
+if __name__ == '__main__':
+    unittest.main()
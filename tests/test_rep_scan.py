@@ -0,0 +1,164 @@
+import unittest
+import io
+from apg_py.lib import identifiers as id
+from apg_py.lib import utilities as utils
+from apg_py.lib.parser import Parser
+from apg_py.lib.stack_parser import StackParser
+from apg_py.lib.compiled_parser import CompiledParser
+from apg_py.lib.trace import Trace
+from apg_py.lib.stats import Stats
+from apg_py.lib.opcodes import compiled_rules
+from apg_py.api.api import Api
+from tests.grammars import float
+from tests.grammars import universal_html
+
+
+class Behind():
+    '''S = &&(*("a" / %d48-57)) "+", without the character class.'''
+    rules = ({'name': 'S', 'lower': 's', 'index': 0,
+              'is_bkru': False, 'is_bkrr': False, 'has_bkrr': False,
+              'opcodes': ({'type': id.CAT, 'children': (1, 6)},
+                          {'type': id.BKA},
+                          {'type': id.REP, 'min': 0, 'max': id.MAX_INT},
+                          {'type': id.ALT, 'children': (4, 5)},
+                          {'type': id.TLS, 'string': (97,)},
+                          {'type': id.TRG, 'min': 48, 'max': 57},
+                          {'type': id.TLS, 'string': (43,)})},)
+    udts = ()
+    has_bkru = False
+    has_bkrr = False
+
+
+def run(parser_class, grammar, input, sub_begin=0, trace=False):
+    '''Parse with statistics and, optionally, a trace
+    which turns off the single loop REP.'''
+    parser = parser_class(grammar)
+    stats = Stats(parser)
+    if(trace):
+        Trace(parser).file = io.StringIO()
+    result = parser.parse(utils.string_to_tuple(input), sub_begin=sub_begin)
+    return (str(result), stats.stats, stats.rule_stats)
+
+
+class TestRepScan(unittest.TestCase):
+    """Test the single loop REP over terminals."""
+
+    def compare(self, grammar, input, sub_begin=0):
+        for parser_class in [Parser, StackParser]:
+            expected = run(parser_class, grammar, input, sub_begin, True)
+            found = run(parser_class, grammar, input, sub_begin)
+            self.assertEqual(expected, found)
+
+    def test_rep_scan_1(self):
+        '''Test the REP opcodes that qualify.'''
+        api = Api()
+        grammar = api.generate(
+            'S = 1*%d48-57 *(%d32-126 / %d9) *%d97.98 2*"x" *("y" / "Z")\n'
+            'T = 1*(%d48-57 "a")\n')
+        rules = grammar.compiled_rules
+        ops = rules[0]['opcodes']
+        self.assertEqual(ops[1].scan, ((id.TRG, ((48, 57),), 2),))
+        # one class for the TRG and one for the TBS, see test_cls_5
+        self.assertEqual(ops[3].scan, ((id.CLS, ((32, 126),), 2),
+                                       (id.CLS, ((9, 9),), 1)))
+        self.assertEqual(ops[7].scan_string, (97, 98))
+        self.assertEqual(ops[9].scan, ((id.TLS, ((120, 120), (88, 88)), 1),))
+        self.assertEqual(ops[11].scan, ((id.CLS, ((89, 90), (121, 122)), 1),))
+        # ALTs of single characters in grammar files
+        ops = compiled_rules(universal_html)[2]['opcodes']
+        self.assertEqual(len(ops[4].scan), 3)
+        for op in rules[1]['opcodes']:
+            self.assertEqual(op.scan, None)
+            self.assertEqual(op.scan_string, None)
+
+    def test_rep_scan_2(self):
+        '''Test that the results and statistics are unchanged.'''
+        api = Api()
+        grammar = api.generate(
+            'S = 1*%d48-57 *(%d32-126 / %d9) *%d97.98 2*"x" *("y" / "Z")\n'
+            'T = 2*3%d48-57 1*2(%d9 / %d10-13 / "a") 2%d97.98 [U]\n'
+            'U = *(%d48-57 "a")\n')
+        self.compare(grammar, '123abc\tdef')
+        self.compare(grammar, '')
+        self.compare(grammar, '12\t')
+        self.compare(grammar, '12\x01')
+        self.compare(grammar, '123\n\nabab0a')
+        self.compare(grammar, '12\x00abab')
+        self.compare(grammar, '1234\t')
+        self.compare(grammar, '12aaba')
+
+    def test_rep_scan_3(self):
+        '''Test look behind mode.'''
+        api = Api()
+        grammar = api.generate(
+            'S = &&(2*%d48-57) "+" / !!(*(%d97-122 / "-")) "*" / '
+            '&&(*%d97.98) "."\n')
+        self.compare(grammar, '12+', 2)
+        self.compare(grammar, '1+', 1)
+        self.compare(grammar, '123+', 3)
+        self.compare(grammar, 'abc*', 3)
+        self.compare(grammar, 'a*', 1)
+        self.compare(grammar, '1*', 1)
+        self.compare(grammar, 'abab.', 4)
+        self.compare(grammar, 'aab.', 3)
+
+    def test_rep_scan_4(self):
+        '''Test the limits.'''
+        api = Api()
+        grammar = api.generate('S = *(%d48-57 / "a")\n')
+        input = utils.string_to_tuple('1' * 100)
+        parser = Parser(grammar)
+        parser.set_node_hit_limit(100)
+        self.assertRaises(Exception, parser.parse, input)
+        parser = Parser(grammar)
+        # the ALT of a TRG class and a TLS class
+        parser.set_tree_depth_limit(4)
+        self.assertRaises(Exception, parser.parse, input)
+        parser.set_tree_depth_limit(5)
+        result = parser.parse(input)
+        self.assertTrue(result.success)
+        self.assertEqual(result.max_tree_depth, 4)
+        self.assertEqual(result.node_hits, 202)
+        # an ALT of single characters in a grammar file
+        input = utils.string_to_tuple('<' + 'a' * 100 + '>')
+        parser = Parser(universal_html)
+        parser.set_tree_depth_limit(6)
+        self.assertRaises(Exception, parser.parse, input,
+                          start_rule='tag-name', sub_begin=1, sub_length=100)
+        parser.set_tree_depth_limit(7)
+        result = parser.parse(input, start_rule='tag-name', sub_begin=1,
+                              sub_length=100)
+        self.assertTrue(result.success)
+        self.assertEqual(result.max_tree_depth, 6)
+        # RNM, RNM, CAT, ALT and TRG for the first "a",
+        # then REP and an ALT and TRG for each of the other 99
+        self.assertEqual(result.node_hits, 5 + 1 + 99 * 2)
+
+    def test_rep_scan_5(self):
+        '''Test the ALTs of single characters in grammar files.'''
+        self.compare(universal_html, '<html><div></div></html>')
+        self.compare(universal_html, '<aZ09><b></b></AZ09>')
+        self.compare(universal_html, '<aZ0-9></aZ0-9>')
+        self.compare(float, '-12.34e+10')
+        self.compare(float, '+.1e5')
+        self.compare(Behind(), 'a1a+', 3)
+        self.compare(Behind(), 'a1-a+', 4)
+        self.compare(Behind(), '1a+', 2)
+        self.compare(Behind(), 'a+', 1)
+
+    def test_rep_scan_6(self):
+        '''Test the node hits of an ALT of single characters that
+        is pruned by its first characters (see Parser.opALT()).'''
+        api = Api()
+        grammar = api.generate('S = ";" *(%d32-126 / %d9) %d10\n')
+        for input in [';\n', ';ab\tc\n', ';\t\x01']:
+            hits = []
+            for parser_class in [Parser, StackParser, CompiledParser]:
+                parser = parser_class(grammar)
+                parser.regular_rules = False
+                hits.append(parser.parse(input).node_hits)
+            self.assertEqual(hits, [hits[2]] * 3, input)
+
+
+if __name__ == '__main__':
+    unittest.main()
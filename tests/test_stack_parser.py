@@ -0,0 +1,172 @@
+import unittest
+import io
+from apg_py.lib import identifiers as id
+from apg_py.lib import utilities as utils
+from apg_py.lib.parser import Parser
+from apg_py.lib.stack_parser import StackParser
+from apg_py.lib.ast import Ast
+from apg_py.lib.trace import Trace
+from apg_py.lib.stats import Stats
+from apg_py.lib.memo import Memo
+from apg_py.api.api import Api
+from tests.grammars import abnf
+from tests.grammars import anbncn
+from tests.grammars import ast_branch_fail
+from tests.grammars import float_anchors
+from tests.grammars import float_bka_alt
+from tests.grammars import float_bka_cat
+from tests.grammars import float_bka_rep
+from tests.grammars import float_bka_rnm
+from tests.grammars import float_bka_tls
+from tests.grammars import float_bkn_tls
+from tests.grammars import float_udt
+from tests.grammars import recursive_html
+from tests.grammars import recursive_mr
+from tests.grammars import universal_html
+
+
+def udtSign(cbData):
+    # matches '+', '-' or empty string
+    cbData['phrase_length'] = 0
+    cbData['state'] = id.EMPTY
+    if(cbData['phrase_index'] < cbData['sub_end']):
+        char = cbData['input'][cbData['phrase_index']]
+        if(char == 43 or char == 45):
+            cbData['phrase_length'] = 1
+            cbData['state'] = id.MATCH
+
+
+def udtInteger(cbData):
+    # matches any string of digits 0-9
+    index = cbData['phrase_index']
+    length = 0
+    while(index < cbData['sub_end']):
+        char = cbData['input'][index]
+        if(char >= 48 and char <= 57):
+            length += 1
+            index += 1
+        else:
+            break
+    if(length > 0):
+        cbData['state'] = id.MATCH
+        cbData['phrase_length'] = length
+    else:
+        cbData['phrase_length'] = 0
+        cbData['state'] = id.NOMATCH
+
+
+def rule_callback(cbData):
+    cbData['user_data'].append(
+        (cbData['state'], cbData['phrase_index'], cbData['phrase_length']))
+
+
+def ast_callback(state, input, index, length, data):
+    data.append((state, index, length))
+    return id.SEM_OK
+
+
+def run(parser_class, grammar, input, sub_begin=0, udts=None, memo=False):
+    '''Parse with trace, stats, rule callbacks and the AST all attached
+    and collect everything that the parser produces.'''
+    parser = parser_class(grammar)
+    if(udts):
+        parser.add_callbacks(udts)
+    callbacks = {}
+    for rule in parser.rules:
+        callbacks[rule['name']] = rule_callback
+    parser.add_callbacks(callbacks)
+    trace = Trace(parser)
+    trace.file = io.StringIO()
+    stats = Stats(parser)
+    ast = Ast(parser)
+    for name in ast.nodes:
+        ast.add_callback(name, ast_callback)
+    if(memo):
+        Memo(parser)
+    log = []
+    result = parser.parse(
+        utils.string_to_tuple(input),
+        sub_begin=sub_begin,
+        user_data=log)
+    data = []
+    ast.translate(data)
+    return (str(result), trace.file.getvalue(), log, data,
+            str(stats.stats), str(stats.rule_stats))
+
+
+class TestStackParser(unittest.TestCase):
+    """Test the non-recursive parser against the recursive parser."""
+
+    def compare(self, grammar, input, sub_begin=0, udts=None, memo=False):
+        expected = run(Parser, grammar, input, sub_begin, udts, memo)
+        found = run(StackParser, grammar, input, sub_begin, udts, memo)
+        self.assertEqual(expected[0], found[0], 'results differ')
+        self.assertEqual(expected[1], found[1], 'traces differ')
+        self.assertEqual(expected[2], found[2], 'callbacks differ')
+        self.assertEqual(expected[3], found[3], 'ASTs differ')
+        self.assertEqual(expected[4], found[4], 'stats differ')
+        self.assertEqual(expected[5], found[5], 'rule stats differ')
+
+    def test_stack_parser_1(self):
+        '''Test the basic operators.'''
+        self.compare(abnf, 'AB')
+        self.compare(abnf, 'CD')
+        self.compare(abnf, '{|}')
+        self.compare(abnf, 'CX')
+        self.compare(ast_branch_fail, 'xyzabcxyz')
+        self.compare(ast_branch_fail, 'xyzxyz')
+
+    def test_stack_parser_2(self):
+        '''Test look ahead and anchors.'''
+        self.compare(anbncn, 'aaabbbccc')
+        self.compare(anbncn, 'aaabbbcc')
+        self.compare(float_anchors, '+12.34E-10')
+        self.compare(float_anchors, 'x+12.34E-10', sub_begin=1)
+
+    def test_stack_parser_3(self):
+        '''Test look behind.'''
+        self.compare(float_bka_alt, '---abc+12.34E+10', sub_begin=6)
+        self.compare(float_bka_cat, '---abcabcx+12.34E+10', sub_begin=10)
+        self.compare(float_bka_rep, '---ABCabcABC+12.34E+10', sub_begin=12)
+        self.compare(float_bka_rnm, '123+123.456E-10', sub_begin=3)
+        self.compare(float_bka_tls, '---zzz+12.34E+10', sub_begin=6)
+        self.compare(float_bkn_tls, '---abc+12.34E+10', sub_begin=6)
+
+    def test_stack_parser_4(self):
+        '''Test back referencing.'''
+        self.compare(recursive_html, '<html><div></div><p><a></a></p></html>')
+        self.compare(recursive_html, '<html><div></div></html></html>')
+        self.compare(recursive_mr, '<html><div><h1></h1></div></html>')
+        self.compare(universal_html, '<html><div></div></div>')
+        self.compare(universal_html, '<html><div></div></html>')
+
+    def test_stack_parser_5(self):
+        '''Test UDTs.'''
+        udts = {'e_sign': udtSign, 'u_integer': udtInteger}
+        self.compare(float_udt, '+12.34E-10', udts=udts)
+        self.compare(float_udt, '1234', udts=udts)
+        self.compare(float_udt, '12x34', udts=udts)
+
+    def test_stack_parser_6(self):
+        '''Test memoization.'''
+        self.compare(ast_branch_fail, 'xyzabcxyz', memo=True)
+        self.compare(ast_branch_fail, 'xyzxyz', memo=True)
+        self.compare(anbncn, 'aaabbbccc', memo=True)
+
+    def test_stack_parser_7(self):
+        '''Test inputs nested too deeply for the recursive parser.'''
+        api = Api()
+        grammar = api.generate('S = "(" [S] ")"\n')
+        depth = 20000
+        input = utils.string_to_tuple('(' * depth + ')' * depth)
+        parser = StackParser(grammar)
+        result = parser.parse(input)
+        self.assertTrue(result.success)
+        self.assertEqual(result.phrase_length, 2 * depth)
+        self.assertRaises(RecursionError, Parser(grammar).parse, input)
+        parser.set_tree_depth_limit(1000)
+        self.assertRaises(Exception, parser.parse, input)
+
+
+if __name__ == '__main__':
+    unittest.main()
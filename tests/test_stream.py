@@ -0,0 +1,168 @@
+import unittest
+import io
+import re
+from apg_py.lib import identifiers as id
+from apg_py.lib import utilities as utils
+from apg_py.lib.stack_parser import StackParser, Stream
+from apg_py.lib.ast import Ast
+from apg_py.lib.trace import Trace
+from apg_py.lib.stats import Stats
+from apg_py.api.api import Api
+from tests.grammars import abnf
+from tests.grammars import anbncn
+from tests.grammars import float_anchors
+from tests.grammars import float_bka_rep
+from tests.grammars import float_udt
+from tests.grammars import recursive_html
+from tests.grammars import universal_html
+from tests.test_stack_parser import udtSign, udtInteger
+from tests.test_stack_parser import rule_callback, ast_callback
+
+
+def chunks(input, size):
+    return [input[i:i + size] for i in range(0, len(input), size)]
+
+
+def run(grammar, input, size=0, udts=None):
+    '''Parse with trace, stats, rule callbacks and the AST all attached,
+    in chunks of size characters if size > 0,
+    and collect everything that the parser produces.'''
+    parser = StackParser(grammar)
+    if(udts):
+        parser.add_callbacks(udts)
+    callbacks = {}
+    for rule in parser.rules:
+        callbacks[rule['name']] = rule_callback
+    parser.add_callbacks(callbacks)
+    trace = Trace(parser)
+    trace.file = io.StringIO()
+    stats = Stats(parser)
+    ast = Ast(parser)
+    for name in ast.nodes:
+        ast.add_callback(name, ast_callback)
+    log = []
+    if(size):
+        stream = parser.stream(user_data=log)
+        for chunk in chunks(input, size):
+            stream.feed(chunk)
+        result = stream.finish()
+    else:
+        result = parser.parse(input, user_data=log)
+    data = []
+    ast.translate(data)
+    # the trace shows the input that follows each node,
+    # a stream has only the input received so far
+    lines = [re.split('->|<-', line)[0] for line in
+             trace.file.getvalue().splitlines()]
+    return (str(result), lines, log, data,
+            str(stats.stats), str(stats.rule_stats))
+
+
+def outcome(result):
+    return (result.success, result.state, result.phrase_length,
+            result.input_length, result.sub_end)
+
+
+class TestStream(unittest.TestCase):
+    """Test the parse of input strings that arrive in chunks."""
+
+    def compare(self, grammar, input, udts=None):
+        expected = run(grammar, input, udts=udts)
+        for size in [1, 2, 3, 7, len(input) + 1]:
+            found = run(grammar, input, size, udts)
+            self.assertEqual(expected[0], found[0], 'results differ')
+            self.assertEqual(expected[1], found[1], 'traces differ')
+            self.assertEqual(expected[2], found[2], 'callbacks differ')
+            self.assertEqual(expected[3], found[3], 'ASTs differ')
+            self.assertEqual(expected[4], found[4], 'stats differ')
+            self.assertEqual(expected[5], found[5], 'rule stats differ')
+
+    def test_stream_1(self):
+        '''Test that everything the parser produces is unchanged.'''
+        self.compare(abnf, 'AB')
+        self.compare(abnf, 'CX')
+        self.compare(anbncn, 'aaabbbccc')
+        self.compare(anbncn, 'aaabbbcc')
+        self.compare(float_anchors, '+12.34E-10')
+        self.compare(float_bka_rep, '---ABCabcABC+12.34E+10')
+        self.compare(recursive_html, '<html><div></div><p><a></a></p></html>')
+        self.compare(universal_html, '<html><div></div></div>')
+        udts = {'e_sign': udtSign, 'u_integer': udtInteger}
+        self.compare(float_udt, '+12.34E-10', udts=udts)
+        self.compare(float_udt, '12x34', udts=udts)
+
+    def test_stream_2(self):
+        '''Test the unobserved parse against the whole input string.'''
+        api = Api()
+        grammar = api.generate(
+            'S = *(W / N / " ") [%d33 %$]\n'
+            'W = 1*%d97-122 ["-" 1*%d97-122]\n'
+            'N = 1*%d48-57 "." 1*%d48-57 / 1*%d48-57 "e"\n')
+        parser = StackParser(grammar)
+        for input in ['', 'one two-three 12.5 7e!', 'abc 12.', '12e12.3',
+                      'a!b', 'word!', 'x-']:
+            expected = outcome(parser.parse(input))
+            for size in [1, 2, 5]:
+                stream = parser.stream()
+                for chunk in chunks(input, size):
+                    stream.feed(chunk)
+                self.assertEqual(outcome(stream.finish()), expected)
+            # character codes
+            stream = parser.stream()
+            stream.feed(utils.string_to_tuple(input))
+            stream.feed(b'')
+            self.assertEqual(outcome(stream.finish()), expected)
+
+    def test_stream_3(self):
+        '''Test that the buffer only holds the input open to backtracking.'''
+        api = Api()
+        grammar = api.generate(
+            'lines = *(line / other)\n'
+            'line  = *%d97-122 %d10\n'
+            'other = *%d97-122 ";"\n')
+        parser = StackParser(grammar)
+        stream = parser.stream()
+        stream.trim_size = 8
+        longest = 0
+        for i in range(200):
+            stream.feed('abcdefg')
+            longest = max(longest, len(stream.buffer))
+            stream.feed(';' if(i % 2) else '\n')
+        result = stream.finish()
+        self.assertTrue(result.success)
+        self.assertEqual(result.phrase_length, 1600)
+        self.assertEqual(result.input_length, 1600)
+        self.assertTrue(longest < 40)
+        # the whole input string is kept if the AST may need it
+        Ast(parser)
+        stream = parser.stream()
+        stream.trim_size = 8
+        for i in range(10):
+            stream.feed('abc\n')
+        self.assertEqual(len(stream.buffer), 40)
+        self.assertTrue(stream.finish().success)
+
+    def test_stream_4(self):
+        '''Test the end of the input string.'''
+        api = Api()
+        grammar = api.generate('S = "ab" / "a"\n')
+        parser = StackParser(grammar)
+        stream = parser.stream()
+        stream.feed('a')
+        self.assertTrue(stream.finish().success)
+        # the parse is complete before the input string ends
+        stream = parser.stream()
+        stream.feed('abc')
+        stream.feed('d')
+        result = stream.finish()
+        self.assertFalse(result.success)
+        self.assertEqual(result.state, id.MATCH)
+        self.assertEqual(result.phrase_length, 2)
+        self.assertEqual(result.input_length, 4)
+        self.assertRaises(Exception, stream.feed, 'x')
+        self.assertRaises(Exception, stream.finish)
+        self.assertTrue(isinstance(parser.stream('S'), Stream))
+
+
+if __name__ == '__main__':
+    unittest.main()